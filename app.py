@@ -13,7 +13,8 @@ from config.settings import (
 )
 
 # Импорт инициализации БД
-from models.database import init_database
+from models.database import init_database, close_db_connection
+from models.request_data import init_request_data, add_round_trips_header
 
 # Импорт blueprints
 from routes.public import public_bp
@@ -22,6 +23,11 @@ from routes.api import api_bp
 
 # Импорт контекстных процессоров
 from utils.template_helpers import inject_common_variables
+from utils.json_provider import ISODateJSONProvider
+from utils.render_cache import init_render_cache
+from utils.compression import init_compression
+from utils.assets import init_assets
+from utils.fonts import init_fonts
 
 # Импорт WebSocket обработчиков
 from services.websocket_service import register_socketio_handlers
@@ -29,11 +35,15 @@ from services.websocket_service import register_socketio_handlers
 # Импорт фоновых задач
 from services.scheduler_service import start_scheduler
 from services.email_service import start_email_worker
+from services.image_service import start_image_worker
+from services.export_service import start_export_worker
+from services.invalidation_service import start_invalidation_listener
 
 
 def create_app():
     """Фабрика приложений Flask"""
     app = Flask(__name__)
+    app.json = ISODateJSONProvider(app)
     
     # Конфигурация
     app.secret_key = SECRET_KEY
@@ -54,6 +64,23 @@ def create_app():
     
     # Регистрация контекстных процессоров
     app.context_processor(inject_common_variables)
+    init_render_cache(app)
+    
+    # Данные (g.data) загружаются не больше одного раза за запрос
+    app.before_request(init_request_data)
+    app.after_request(add_round_trips_header)
+    
+    # Бандлы статики (до предсжатия, чтобы они тоже получили .gz/.br)
+    init_assets(app)
+    
+    # Собственные шрифты и подмножество иконок (если собраны: python -m utils.fonts)
+    init_fonts(app)
+    
+    # gzip/brotli для ответов и предсжатая статика
+    init_compression(app)
+    
+    # Соединение с БД выдаётся на запрос и возвращается в пул в teardown
+    app.teardown_appcontext(close_db_connection)
     
     # Регистрация WebSocket обработчиков
     register_socketio_handlers(socketio)
@@ -64,7 +91,10 @@ def create_app():
     
     # Запуск фоновых задач
     start_email_worker()
+    start_image_worker()
+    start_export_worker()
     start_scheduler()
+    start_invalidation_listener()
     
     return app, socketio
 
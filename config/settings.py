@@ -13,13 +13,75 @@ HOST_PASSWORD = os.getenv('HOST_PASSWORD', 'default')
 DB_FILE = 'school.db'
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Пул соединений
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_MAX_IDLE = int(os.environ.get('DB_POOL_MAX_IDLE', '300'))  # секунды
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '10'))  # секунды
+
+# Keyset-пагинация списков (/api/work, /api/news, /all)
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '200'))
+
+# Экспорт работ (/api/export/work): строк за одно чтение курсора
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
 # ================= ФАЙЛЫ =================
 UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+# Исходники загрузок до обработки (вне static/: наружу отдаётся только копия без EXIF/GPS)
+UPLOAD_INCOMING_FOLDER = os.environ.get('UPLOAD_INCOMING_FOLDER', 'uploads_incoming')
+# Ширины вариантов изображений новостей (px) и качество сжатия
+IMAGE_VARIANT_WIDTHS = (320, 640, 960, 1280)
+IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', '80'))  # 1-100
+IMAGE_PLACEHOLDER_WIDTH = 16
+# Сколько секунд файл без ссылок из news.image_url не удаляется сборщиком мусора
+UPLOAD_GC_GRACE_PERIOD = int(os.environ.get('UPLOAD_GC_GRACE_PERIOD', '3600'))
+
+# Файлы фоновых экспортов (services.export_service) и сколько секунд они хранятся
+EXPORT_FOLDER = os.environ.get('EXPORT_FOLDER', 'exports')
+EXPORT_MAX_AGE = int(os.environ.get('EXPORT_MAX_AGE', str(24 * 3600)))
+# Выполняемая задача без отметки дольше этого (сек) считается брошенной (процесс умер)
+EXPORT_STALE_AFTER = int(os.environ.get('EXPORT_STALE_AFTER', '600'))
+
+# Хранилище загрузок: local (UPLOAD_FOLDER) или s3 (S3/MinIO/R2, см. utils/storage.py)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+S3_BUCKET = os.environ.get('S3_BUCKET', '')
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL', '')  # пусто — AWS
+S3_REGION = os.environ.get('S3_REGION', '')
+S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID', '')
+S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY', '')
+# Публичный адрес бакета или CDN; пусто — подписанные ссылки через /uploads/<ключ>
+S3_PUBLIC_URL = os.environ.get('S3_PUBLIC_URL', '')
+S3_PRESIGN_EXPIRES = int(os.environ.get('S3_PRESIGN_EXPIRES', '3600'))  # секунды
 
 # ================= КЭШ =================
 CACHE_DURATION = 30  # секунды
+CACHE_STALE_DURATION = 60  # секунды после CACHE_DURATION, когда отдаётся старое значение с фоновым обновлением
+CACHE_MAX_ENTRIES = 256
+# Как часто процесс сверяет версии данных на SQLite (на PostgreSQL — LISTEN/NOTIFY)
+DATA_VERSION_POLL_INTERVAL = float(os.environ.get('DATA_VERSION_POLL_INTERVAL', '1'))
+
+# ================= HTTP КЭШ =================
+# Входит в ETag страниц: после деплоя (новые шаблоны) старые ETag не совпадут
+RELEASE_ID = os.environ.get('RELEASE_ID') or os.environ.get('RENDER_GIT_COMMIT', '')
+
+# Кеш отрендеренного HTML (utils.render_cache): ключи включают версии данных,
+# поэтому TTL только ограничивает время жизни неиспользуемых записей
+RENDER_CACHE_TTL = int(os.environ.get('RENDER_CACHE_TTL', '3600'))  # секунды
+RENDER_CACHE_MAX_PAGES = int(os.environ.get('RENDER_CACHE_MAX_PAGES', '128'))
+RENDER_CACHE_MAX_FRAGMENTS = int(os.environ.get('RENDER_CACHE_MAX_FRAGMENTS', '2048'))
+
+# Сжатие ответов (utils.compression)
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))  # байты
+COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', '6'))  # 1-9
+COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', '5'))  # 0-11
+
+# Ленты iCalendar (/calendar.ics, /subject/<имя>.ics, services.ics_service)
+CALENDAR_TIMEZONE = os.environ.get('CALENDAR_TIMEZONE', 'Europe/Riga')  # зона времени работ
+ICS_REFRESH_MINUTES = int(os.environ.get('ICS_REFRESH_MINUTES', '15'))  # подсказка клиентам
+ICS_EVENT_CACHE_SIZE = int(os.environ.get('ICS_EVENT_CACHE_SIZE', '4096'))  # готовых VEVENT
 
 # ================= SMTP НАСТРОЙКИ =================
 SMTP_SERVER = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
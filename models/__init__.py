@@ -5,6 +5,7 @@ from .database import get_db_connection, init_database, is_postgresql_connection
 from .subjects import load_subjects, save_subject, delete_subject
 from .tests import load_tests, save_test, delete_test
 from .homework import load_homework, save_homework, delete_homework
+from .work import load_work, get_work_item, update_work_item, delete_work_item
 
 __all__ = [
     'get_db_connection',
@@ -19,4 +20,8 @@ __all__ = [
     'load_homework',
     'save_homework',
     'delete_homework',
+    'load_work',
+    'get_work_item',
+    'update_work_item',
+    'delete_work_item',
 ]
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Версии наборов данных для межпроцессной инвалидации кешей
+
+Каждая запись в БД увеличивает версию затронутого набора (tests, homework,
+subjects, news, terms, updates) в той же транзакции. На PostgreSQL вместе с
+этим отправляется NOTIFY — он доставляется слушателям только после COMMIT.
+Другие процессы узнают об изменении через services.invalidation_service и
+сбрасывают только свои кеши этого набора.
+
+Локальные кеши регистрируются через register_invalidator():
+
+    register_invalidator('tests', WORK_CACHES[KIND_TEST].invalidate)
+
+Типичный путь записи:
+
+    execute(cursor, INSERT_NEWS, (...))
+    bump_versions(cursor, 'news')
+    conn.commit()
+    invalidate_local('news')
+
+Свои записи процесс применяет сам (invalidate_local после commit), поэтому
+уведомления и новые версии от них слушатель пропускает. Кеши, которые
+умеют применить запись построчно (models.work.DEADLINE_INDEX),
+регистрируются с own_writes=False и целиком сбрасываются только
+изменениями других процессов (invalidate_changed).
+
+current_versions() отдаёт версии и время изменения наборов для ETag и
+Last-Modified (utils.http_cache) и кешируется до следующей инвалидации.
+"""
+import os
+import socket
+import threading
+from datetime import datetime
+from models.database import get_db_connection
+from models.queries import Query, POSTGRESQL, cursor_dialect, epoch_value, execute
+from utils.cache import cached
+
+
+DATASETS = ('tests', 'homework', 'subjects', 'news', 'terms', 'updates')
+
+# Канал LISTEN/NOTIFY PostgreSQL, полезная нагрузка — имя набора
+CHANNEL = 'data_changed'
+
+BUMP_VERSION = Query('data_versions.bump', '''
+    UPDATE data_versions SET version = version + 1, changed_at = ? WHERE dataset = ?
+    RETURNING version
+''')
+
+NOTIFY_CHANGE = Query('data_versions.notify', f"SELECT pg_notify('{CHANNEL}', ?)")
+
+SELECT_VERSIONS = Query('data_versions.select_all', 'SELECT dataset, version FROM data_versions')
+
+SELECT_VERSION_STATE = Query('data_versions.select_state', 'SELECT dataset, version, changed_at FROM data_versions')
+
+_invalidators = {}
+_invalidators_lock = threading.Lock()
+
+# Версии, записанные потоком до commit, и последние свои версии после commit
+_pending = threading.local()
+_own_versions = {}
+
+
+def _pending_versions():
+    if not hasattr(_pending, 'versions'):
+        _pending.versions = {}
+    return _pending.versions
+
+
+def _origin():
+    """Метка процесса в уведомлениях (считается при вызове — процессы gunicorn форкаются)"""
+    return f'{socket.gethostname()}/{os.getpid()}'
+
+
+def register_invalidator(dataset, callback, own_writes=True):
+    """
+    Регистрирует функцию сброса локального кеша для набора данных
+
+    Args:
+        own_writes (bool): Вызывать и после записей своего процесса; False —
+            кеш применяет их сам и сбрасывается только чужими изменениями
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    with _invalidators_lock:
+        _invalidators.setdefault(dataset, []).append((callback, own_writes))
+
+
+def bump_versions(cursor, *datasets):
+    """Отмечает изменение наборов данных (вызывать до commit, в той же транзакции)"""
+    postgres = cursor_dialect(cursor) == POSTGRESQL
+    changed_at = epoch_value(cursor, datetime.now().replace(microsecond=0))
+    pending = _pending_versions()
+    for dataset in datasets:
+        row = execute(cursor, BUMP_VERSION, (changed_at, dataset)).fetchone()
+        if row:
+            pending[dataset] = row[0]
+        if postgres:
+            execute(cursor, NOTIFY_CHANGE, (f'{dataset}:{_origin()}',))
+
+
+def _run_invalidators(datasets, own_write):
+    with _invalidators_lock:
+        callbacks = [callback for dataset in datasets
+                     for callback, own_writes in _invalidators.get(dataset, ()) if own_writes or not own_write]
+    for callback in callbacks:
+        callback()
+
+
+def invalidate_local(*datasets):
+    """Сбрасывает кеши наборов данных после записи текущего процесса (после commit)"""
+    pending = _pending_versions()
+    with _invalidators_lock:
+        for dataset in datasets:
+            if dataset in pending:
+                _own_versions[dataset] = pending.pop(dataset)
+    _run_invalidators(datasets, own_write=True)
+
+
+def invalidate_changed(*datasets):
+    """Сбрасывает все кеши наборов данных: изменения других процессов или неизвестно чьи"""
+    _run_invalidators(datasets, own_write=False)
+
+
+def parse_notification(payload):
+    """
+    Разбирает уведомление NOTIFY
+
+    Returns:
+        tuple: (набор данных, True — записан этим процессом)
+    """
+    dataset, _, origin = payload.partition(':')
+    return dataset, origin == _origin()
+
+
+def foreign_changes(known, versions):
+    """
+    Наборы, изменённые другими процессами с прошлого опроса
+
+    Версия, выросшая ровно на одну запись этого процесса, не считается —
+    её кеши процесс обновил сам.
+
+    Args:
+        known (dict): Версии прошлого опроса
+        versions (dict): Текущие версии (read_versions)
+    """
+    with _invalidators_lock:
+        own = dict(_own_versions)
+    return [dataset for dataset, version in versions.items()
+            if known.get(dataset) != version
+            and not (own.get(dataset) == version and known.get(dataset) == version - 1)]
+
+
+def read_versions(cursor):
+    """Текущие версии всех наборов ({dataset: version})"""
+    execute(cursor, SELECT_VERSIONS)
+    return {dataset: version for dataset, version in cursor.fetchall()}
+
+
+# Без stale_ttl: устаревшая версия дала бы 304 на изменившиеся данные
+@cached(stale_ttl=0)
+def _fetch_version_state():
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_VERSION_STATE)
+        state = {}
+        for dataset, version, changed_at in cursor.fetchall():
+            # На SQLite changed_at хранится в epoch-секундах
+            if isinstance(changed_at, int):
+                changed_at = datetime.fromtimestamp(changed_at)
+            state[dataset] = (version, changed_at)
+        return state
+    finally:
+        conn.close()
+
+
+for _dataset in DATASETS:
+    register_invalidator(_dataset, _fetch_version_state.cache_clear)
+
+
+def current_versions():
+    """Версии и время изменения наборов ({dataset: (version, changed_at)})"""
+    return _fetch_version_state()
@@ -3,77 +3,312 @@
 """
 import os
 import sqlite3
+import threading
+import time
+from collections import deque
 import psycopg
-from datetime import datetime
-from config.settings import DB_FILE, DATABASE_URL
+from flask import g, has_app_context
+from config.settings import (
+    DB_FILE, DATABASE_URL,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_MAX_IDLE, DB_CONNECT_TIMEOUT
+)
 
 
-def get_db_connection():
-    """Универсальное подключение к базе данных"""
-    # PostgreSQL (Render)
-    if DATABASE_URL:
-        try:
-            conn = psycopg.connect(DATABASE_URL)
-            print("✅ PostgreSQL connection successful")
+class PoolTimeout(Exception):
+    """Не удалось получить соединение из пула за отведённое время"""
+
+
+class PooledConnection:
+    """
+    Обёртка над соединением из пула.
+
+    Ведёт себя как обычное соединение (cursor/commit/rollback), но close()
+    возвращает соединение в пул. Соединение, выданное на весь запрос через g,
+    закрывается только в teardown.
+    """
+
+    def __init__(self, raw, pool, request_scoped=False):
+        self.raw = raw
+        self._pool = pool
+        self._request_scoped = request_scoped
+        self._released = False
+
+    def close(self):
+        """Возвращает соединение в пул"""
+        if self._request_scoped:
+            # Соединение живёт до конца запроса, но упавшую транзакцию
+            # сбрасываем сразу, чтобы следующие запросы не получили ошибку
+            self.reset_failed_transaction()
+            return
+        self.release()
+
+    def reset_failed_transaction(self):
+        """Откатывает транзакцию PostgreSQL, оставшуюся в состоянии ошибки"""
+        if isinstance(self.raw, psycopg.Connection) and \
+                self.raw.info.transaction_status == psycopg.pq.TransactionStatus.INERROR:
+            self.raw.rollback()
+
+    def release(self):
+        """Окончательно отдаёт соединение пулу"""
+        if not self._released:
+            self._released = True
+            self._pool.putconn(self.raw)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class PostgresPool:
+    """Потокобезопасный пул соединений PostgreSQL"""
+
+    def __init__(self, conninfo, min_size=1, max_size=10, max_idle=300, timeout=10):
+        self.conninfo = conninfo
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+
+        self._idle = deque()  # (conn, last_used)
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {'created': 0, 'checked_out': 0, 'waiting': 0, 'closed_idle': 0, 'timeouts': 0}
+
+    def _connect(self):
+        conn = psycopg.connect(self.conninfo, connect_timeout=self.timeout)
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _expire_idle(self, now):
+        """Закрывает простаивающие соединения сверх min_size (вызывать под блокировкой)"""
+        expired = []
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats['closed_idle'] += 1
+            expired.append(conn)
+        return expired
+
+    def getconn(self):
+        """Выдаёт соединение, при необходимости ожидая освобождения"""
+        deadline = time.monotonic() + self.timeout
+
+        with self._cond:
+            expired = self._expire_idle(time.monotonic())
+            conn = None
+
+            while True:
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(f"No free connection after {self.timeout}s")
+
+                self._stats['waiting'] += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._stats['waiting'] -= 1
+
+            self._stats['checked_out'] += 1
+
+        for old in expired:
+            _close_quietly(old)
+
+        if conn is not None and not conn.closed:
             return conn
-        except Exception as e:
-            print(f"❌ PostgreSQL error: {e}")
-            # Fallback to SQLite
+
+        # Новое соединение открываем вне блокировки
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._stats['checked_out'] -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn):
+        """Возвращает соединение в пул"""
+        broken = conn.closed
+        if not broken and conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
             try:
-                conn = sqlite3.connect(DB_FILE)
-                conn.row_factory = sqlite3.Row
-                print("✅ SQLite connection (fallback)")
-                return conn
-            except Exception as e2:
-                print(f"❌ SQLite error: {e2}")
-                raise e
-    
-    # SQLite (local development)
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        print("✅ SQLite connection (development)")
+                conn.rollback()
+            except Exception:
+                broken = True
+
+        with self._cond:
+            self._stats['checked_out'] -= 1
+            if broken:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if broken:
+            _close_quietly(conn)
+
+    def stats(self):
+        """Статистика пула для мониторинга"""
+        with self._cond:
+            return dict(
+                self._stats,
+                backend='postgresql',
+                size=self._size,
+                idle=len(self._idle),
+                max_size=self.max_size
+            )
+
+
+class SQLitePool:
+    """Одно переиспользуемое соединение SQLite на поток"""
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'checked_out': 0, 'waiting': 0}
+
+    def getconn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=DB_CONNECT_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._lock:
+                self._stats['created'] += 1
+        with self._lock:
+            self._stats['checked_out'] += 1
         return conn
+
+    def putconn(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._stats['checked_out'] -= 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, backend='sqlite')
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _get_pool():
+    """Создаёт пул при первом обращении"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if DATABASE_URL:
+                    _pool = PostgresPool(
+                        DATABASE_URL,
+                        min_size=DB_POOL_MIN_SIZE,
+                        max_size=DB_POOL_MAX_SIZE,
+                        max_idle=DB_POOL_MAX_IDLE,
+                        timeout=DB_CONNECT_TIMEOUT
+                    )
+                    print(f"✅ PostgreSQL pool ready (max {DB_POOL_MAX_SIZE} connections)")
+                else:
+                    _pool = SQLitePool(DB_FILE)
+                    print("✅ SQLite per-thread connections (development)")
+    return _pool
+
+
+_fallback_pool = None
+
+
+def _acquire(request_scoped=False):
+    """Берёт соединение из пула, с fallback на SQLite при недоступности PostgreSQL"""
+    global _fallback_pool
+    pool = _get_pool()
+    try:
+        return PooledConnection(pool.getconn(), pool, request_scoped)
+    except PoolTimeout:
+        raise
     except Exception as e:
-        print(f"❌ SQLite error: {e}")
-        raise e
+        if not isinstance(pool, PostgresPool):
+            print(f"❌ SQLite error: {e}")
+            raise
+        print(f"❌ PostgreSQL error: {e}")
+        # Fallback to SQLite
+        if _fallback_pool is None:
+            _fallback_pool = SQLitePool(DB_FILE)
+        print("✅ SQLite connection (fallback)")
+        return PooledConnection(_fallback_pool.getconn(), _fallback_pool, request_scoped)
+
+
+def get_db_connection():
+    """
+    Универсальное подключение к базе данных.
+
+    Внутри запроса Flask возвращает одно соединение на весь запрос (через g),
+    которое освобождается в teardown. Вне запроса (фоновые задачи) каждое
+    соединение берётся из пула и возвращается в него при close().
+    """
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = _acquire(request_scoped=True)
+            g._db_conn = conn
+        else:
+            # Предыдущий вызов мог упасть, не дойдя до close()
+            conn.reset_failed_transaction()
+        return conn
+
+    return _acquire()
+
+
+def close_db_connection(exception=None):
+    """Возвращает соединение запроса в пул (teardown_appcontext)"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn.release()
+
+
+def get_pool_stats():
+    """Статистика пула соединений (checked out, waiting, created)"""
+    stats = _get_pool().stats()
+    if _fallback_pool is not None:
+        stats['fallback'] = _fallback_pool.stats()
+    return stats
 
 
 def is_postgresql_connection(conn):
     """Проверяет тип подключения"""
-    return isinstance(conn, psycopg.Connection)
+    return isinstance(getattr(conn, 'raw', conn), psycopg.Connection)
 
 
 def init_database():
-    """Инициализирует все таблицы"""
-    from models.subjects import init_subjects_table
-    from models.tests import init_tests_table
-    from models.homework import init_homework_table
-    from models.news import init_news_table
-    from models.terms import init_terms_table
-    from models.users import init_user_tables
-    from models.email_system import init_email_tables
-    
-    print("🔧 Initializing database tables...")
-    
-    init_subjects_table()
-    init_tests_table()
-    init_homework_table()
-    init_news_table()
-    init_terms_table()
-    init_user_tables()
-    init_email_tables()
-    
-    print("✅ Database initialization complete!")
+    """Приводит схему БД к последней версии (см. models/migrations)"""
+    from models.migrations import run_migrations
+
+    print("🔧 Running database migrations...")
+    run_migrations()
 
 
 def reset_transaction():
     """Сбрасывает статус транзакции PostgreSQL"""
     try:
         conn = get_db_connection()
-        if isinstance(conn, psycopg.Connection):
+        if is_postgresql_connection(conn):
             conn.rollback()
             print("✅ Transaction reset")
         conn.close()
     except Exception as e:
-        print(f"❌ Error resetting transaction: {e}")
\ No newline at end of file
+        print(f"❌ Error resetting transaction: {e}")
@@ -0,0 +1,155 @@
+"""
+Начальная схема: таблицы, которые раньше создавались init_*_table() при каждом старте
+"""
+from datetime import datetime
+from models.queries import Query, execute, fetch_value
+
+DESCRIPTION = 'initial schema'
+
+
+CREATE_SUBJECTS = Query('migration_0001.create_subjects', '''
+    CREATE TABLE IF NOT EXISTS subjects (
+        id {pk},
+        name TEXT UNIQUE NOT NULL,
+        color TEXT DEFAULT '#4361ee',
+        created_date TEXT,
+        description TEXT
+    )
+''', prepare=False)
+
+CREATE_TESTS = Query('migration_0001.create_tests', '''
+    CREATE TABLE IF NOT EXISTS tests (
+        id {pk},
+        subject TEXT NOT NULL,
+        type TEXT NOT NULL,
+        date TEXT NOT NULL,
+        time TEXT DEFAULT '23:59',
+        description TEXT,
+        due_date TEXT,
+        added_date TEXT
+    )
+''', prepare=False)
+
+CREATE_HOMEWORK = Query('migration_0001.create_homework', '''
+    CREATE TABLE IF NOT EXISTS homework (
+        id {pk},
+        subject TEXT NOT NULL,
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,
+        time TEXT DEFAULT '23:59',
+        description TEXT,
+        type TEXT DEFAULT 'Mājasdarbs',
+        due_date TEXT,
+        added_date TEXT
+    )
+''', prepare=False)
+
+CREATE_NEWS = Query('migration_0001.create_news', '''
+    CREATE TABLE IF NOT EXISTS news (
+        id {pk},
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        date TEXT NOT NULL,
+        image_url TEXT,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_date TEXT,
+        updated_date TEXT
+    )
+''', prepare=False)
+
+CREATE_UPDATES = Query('migration_0001.create_updates', '''
+    CREATE TABLE IF NOT EXISTS updates (
+        id {pk},
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        date TEXT NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_date TEXT,
+        updated_date TEXT
+    )
+''', prepare=False)
+
+CREATE_TERMS = Query('migration_0001.create_terms', '''
+    CREATE TABLE IF NOT EXISTS terms (
+        id {pk},
+        content TEXT NOT NULL,
+        updated_date TEXT
+    )
+''', prepare=False)
+
+COUNT_TERMS = Query('migration_0001.count_terms', 'SELECT COUNT(*) FROM terms')
+
+INSERT_DEFAULT_TERMS = Query('migration_0001.insert_default_terms',
+                             'INSERT INTO terms (content, updated_date) VALUES (?, ?)')
+
+CREATE_USER_SETTINGS = Query('migration_0001.create_user_settings', '''
+    CREATE TABLE IF NOT EXISTS user_settings (
+        id {pk},
+        device_id TEXT UNIQUE NOT NULL,
+        theme TEXT DEFAULT 'default',
+        primary_color TEXT DEFAULT '#4361ee',
+        secondary_color TEXT DEFAULT '#3f37c9',
+        bg_gradient TEXT DEFAULT 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        custom_background TEXT,
+        created_date {timestamp} DEFAULT CURRENT_TIMESTAMP,
+        updated_date {timestamp} DEFAULT CURRENT_TIMESTAMP
+    )
+''', prepare=False)
+
+CREATE_TIMER_SESSIONS = Query('migration_0001.create_timer_sessions', '''
+    CREATE TABLE IF NOT EXISTS timer_sessions (
+        id {pk},
+        user_id TEXT NOT NULL,
+        seconds INTEGER,
+        date TEXT,
+        created_at TEXT
+    )
+''', prepare=False)
+
+CREATE_EMAIL_SUBSCRIPTIONS = Query('migration_0001.create_email_subscriptions', '''
+    CREATE TABLE IF NOT EXISTS email_subscriptions (
+        id {pk},
+        email TEXT UNIQUE NOT NULL,
+        notify_1_day BOOLEAN DEFAULT TRUE,
+        notify_3_days BOOLEAN DEFAULT TRUE,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_date {timestamp} DEFAULT CURRENT_TIMESTAMP
+    )
+''', prepare=False)
+
+CREATE_EMAIL_SUBJECT_SUBSCRIPTIONS = Query('migration_0001.create_email_subject_subscriptions', '''
+    CREATE TABLE IF NOT EXISTS email_subject_subscriptions (
+        id {pk},
+        email TEXT NOT NULL,
+        subject_name TEXT NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_date {timestamp} DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(email, subject_name)
+    )
+''', prepare=False)
+
+CREATE_SENT_NOTIFICATIONS = Query('migration_0001.create_sent_notifications', '''
+    CREATE TABLE IF NOT EXISTS sent_notifications (
+        id {pk},
+        user_email TEXT NOT NULL,
+        work_id INTEGER NOT NULL,
+        work_type TEXT NOT NULL,
+        notification_type TEXT NOT NULL,
+        sent_date {timestamp} DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(user_email, work_id, notification_type)
+    )
+''', prepare=False)
+
+
+def upgrade(cursor):
+    # IF NOT EXISTS: на существующих базах таблицы уже созданы старым init_database
+    for query in (CREATE_SUBJECTS, CREATE_TESTS, CREATE_HOMEWORK, CREATE_NEWS, CREATE_UPDATES,
+                  CREATE_TERMS, CREATE_USER_SETTINGS, CREATE_TIMER_SESSIONS,
+                  CREATE_EMAIL_SUBSCRIPTIONS, CREATE_EMAIL_SUBJECT_SUBSCRIPTIONS,
+                  CREATE_SENT_NOTIFICATIONS):
+        execute(cursor, query)
+
+    # Начальный текст условий использования
+    if fetch_value(execute(cursor, COUNT_TERMS), 0) == 0:
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
+        execute(cursor, INSERT_DEFAULT_TERMS, ('Šeit būs lietošanas noteikumi...', current_time))
@@ -0,0 +1,57 @@
+"""
+timer_sessions: колонки duration_seconds/session_date, которые использует services.timer_service
+
+Таблица из init_user_tables() хранила seconds/date, а сервис таймера пишет и
+читает duration_seconds/session_date. Добавляем недостающие колонки и
+переносим в них существующие данные.
+"""
+from models.queries import Query, POSTGRESQL, cursor_dialect, execute
+
+DESCRIPTION = 'timer_sessions duration_seconds/session_date columns'
+
+
+ADD_DURATION_SECONDS = Query('migration_0002.add_duration_seconds',
+                             'ALTER TABLE timer_sessions ADD COLUMN duration_seconds INTEGER', prepare=False)
+
+ADD_SESSION_DATE = Query('migration_0002.add_session_date',
+                         'ALTER TABLE timer_sessions ADD COLUMN session_date {date}', prepare=False)
+
+BACKFILL = Query('migration_0002.backfill', '''
+    UPDATE timer_sessions
+    SET duration_seconds = COALESCE(duration_seconds, seconds),
+        session_date = COALESCE(session_date, CAST(date AS {date}))
+    WHERE date IS NOT NULL
+''', prepare=False)
+
+# На PostgreSQL старая таблица создавалась с NOT NULL на seconds/date
+DROP_LEGACY_NOT_NULL = Query('migration_0002.drop_legacy_not_null', '''
+    ALTER TABLE timer_sessions
+    ALTER COLUMN seconds DROP NOT NULL,
+    ALTER COLUMN date DROP NOT NULL
+''', prepare=False)
+
+
+def _columns(cursor, table):
+    if cursor_dialect(cursor) == POSTGRESQL:
+        cursor.execute(
+            'SELECT column_name FROM information_schema.columns WHERE table_name = %s',
+            (table,)
+        )
+    else:
+        cursor.execute(f'PRAGMA table_info({table})')
+        return {row[1] for row in cursor.fetchall()}
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upgrade(cursor):
+    columns = _columns(cursor, 'timer_sessions')
+
+    if 'duration_seconds' not in columns:
+        execute(cursor, ADD_DURATION_SECONDS)
+    if 'session_date' not in columns:
+        execute(cursor, ADD_SESSION_DATE)
+
+    if 'seconds' in columns and 'date' in columns:
+        execute(cursor, BACKFILL)
+        if cursor_dialect(cursor) == POSTGRESQL:
+            execute(cursor, DROP_LEGACY_NOT_NULL)
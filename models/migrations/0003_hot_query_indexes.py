@@ -0,0 +1,36 @@
+"""
+Составные индексы для горячих запросов
+
+- tests/homework (date, time): ORDER BY date, time во всех списках работ
+- tests/homework (subject, date): выборки и удаление по предмету
+- timer_sessions (user_id, session_date): суммы в статистике таймера
+- email_subject_subscriptions (subject_name, is_active): JOIN при выборе подписчиков
+
+user_settings.device_id отдельный индекс не нужен: UNIQUE уже создаёт его.
+"""
+from models.queries import Query, execute
+
+DESCRIPTION = 'composite indexes for hot queries'
+
+
+INDEXES = [
+    Query('migration_0003.idx_tests_date_time',
+          'CREATE INDEX IF NOT EXISTS idx_tests_date_time ON tests (date, time)', prepare=False),
+    Query('migration_0003.idx_tests_subject_date',
+          'CREATE INDEX IF NOT EXISTS idx_tests_subject_date ON tests (subject, date)', prepare=False),
+    Query('migration_0003.idx_homework_date_time',
+          'CREATE INDEX IF NOT EXISTS idx_homework_date_time ON homework (date, time)', prepare=False),
+    Query('migration_0003.idx_homework_subject_date',
+          'CREATE INDEX IF NOT EXISTS idx_homework_subject_date ON homework (subject, date)', prepare=False),
+    Query('migration_0003.idx_timer_sessions_user_date',
+          'CREATE INDEX IF NOT EXISTS idx_timer_sessions_user_date ON timer_sessions (user_id, session_date)',
+          prepare=False),
+    Query('migration_0003.idx_email_subject_subscriptions_subject_active',
+          'CREATE INDEX IF NOT EXISTS idx_email_subject_subscriptions_subject_active '
+          'ON email_subject_subscriptions (subject_name, is_active)', prepare=False),
+]
+
+
+def upgrade(cursor):
+    for query in INDEXES:
+        execute(cursor, query)
@@ -0,0 +1,86 @@
+"""
+Типизированные даты работ и предвычисленный deadline_at
+
+Даты tests/homework/news хранились как TEXT, и каждая загрузка заново
+парсила их через strptime. На PostgreSQL колонки переводятся в DATE/TIME,
+на SQLite (нет ALTER COLUMN TYPE) остаются ISO-строками.
+
+deadline_at = (due_date или date) + time — момент дедлайна, вычисляется один
+раз при записи: TIMESTAMP на PostgreSQL, epoch-секунды на SQLite.
+"""
+from models.queries import Query, POSTGRESQL, cursor_dialect, epoch_value, execute
+from utils.date_utils import compute_deadline_at
+
+DESCRIPTION = 'typed work dates and precomputed deadline_at'
+
+WORK_TABLES = ('tests', 'homework')
+
+
+# DEFAULT '23:59' нельзя привести к TIME автоматически — снимаем и ставим заново
+CONVERT_TYPES = {
+    table: Query(f'migration_0004.convert_{table}', f'''
+        ALTER TABLE {table}
+        ALTER COLUMN time DROP DEFAULT,
+        ALTER COLUMN date TYPE DATE USING NULLIF(date, '')::date,
+        ALTER COLUMN time TYPE TIME USING COALESCE(NULLIF(time, ''), '23:59')::time,
+        ALTER COLUMN due_date TYPE DATE USING NULLIF(due_date, '')::date,
+        ALTER COLUMN time SET DEFAULT '23:59'
+    ''', prepare=False)
+    for table in WORK_TABLES
+}
+
+CONVERT_NEWS = Query('migration_0004.convert_news',
+                     'ALTER TABLE news ALTER COLUMN date TYPE DATE USING date::date', prepare=False)
+
+ADD_DEADLINE_AT = {
+    table: Query(f'migration_0004.add_{table}_deadline_at',
+                 f'ALTER TABLE {table} ADD COLUMN deadline_at {{epoch}}', prepare=False)
+    for table in WORK_TABLES
+}
+
+SELECT_DATES = {
+    table: Query(f'migration_0004.select_{table}_dates',
+                 f'SELECT id, date, time, due_date FROM {table}', prepare=False)
+    for table in WORK_TABLES
+}
+
+UPDATE_DEADLINE_AT = {
+    table: Query(f'migration_0004.update_{table}_deadline_at',
+                 f'UPDATE {table} SET deadline_at = ? WHERE id = ?', prepare=False)
+    for table in WORK_TABLES
+}
+
+# Пустые due_date из форм — это отсутствие значения
+CLEAR_EMPTY_DUE_DATE = {
+    table: Query(f'migration_0004.clear_{table}_due_date',
+                 f"UPDATE {table} SET due_date = NULL WHERE due_date = ''", prepare=False)
+    for table in WORK_TABLES
+}
+
+INDEXES = [
+    Query('migration_0004.idx_tests_deadline_at',
+          'CREATE INDEX IF NOT EXISTS idx_tests_deadline_at ON tests (deadline_at)', prepare=False),
+    Query('migration_0004.idx_homework_deadline_at',
+          'CREATE INDEX IF NOT EXISTS idx_homework_deadline_at ON homework (deadline_at)', prepare=False),
+]
+
+
+def upgrade(cursor):
+    if cursor_dialect(cursor) == POSTGRESQL:
+        for table in WORK_TABLES:
+            execute(cursor, CONVERT_TYPES[table])
+        execute(cursor, CONVERT_NEWS)
+    else:
+        for table in WORK_TABLES:
+            execute(cursor, CLEAR_EMPTY_DUE_DATE[table])
+
+    for table in WORK_TABLES:
+        execute(cursor, ADD_DEADLINE_AT[table])
+
+        rows = execute(cursor, SELECT_DATES[table]).fetchall()
+        for work_id, date_value, time_value, due_date in rows:
+            execute(cursor, UPDATE_DEADLINE_AT[table],
+                    (epoch_value(cursor, compute_deadline_at(date_value, time_value, due_date)), work_id))
+
+    for query in INDEXES:
+        execute(cursor, query)
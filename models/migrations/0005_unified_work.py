@@ -0,0 +1,111 @@
+"""
+Единая таблица work для тестов и домашних заданий
+
+Раньше у tests и homework были пересекающиеся последовательности id, поэтому
+поиск работы по id перебирал обе таблицы. Теперь все работы лежат в work с
+глобальным первичным ключом и колонкой kind ('test' / 'homework').
+
+Тесты сохраняют свои id, домашние задания сдвигаются на наибольший id,
+когда-либо выданный тесту (последовательность, а не MAX(id) — у удалённых
+тестов могли остаться уведомления). Ссылки из sent_notifications
+пересчитываются тем же сдвигом через отрицательные id, чтобы UNIQUE
+(user_email, work_id, notification_type) не нарушался посреди UPDATE.
+"""
+from models.queries import Query, POSTGRESQL, SQLITE, cursor_dialect, execute, fetch_value
+
+DESCRIPTION = 'unified work table with global ids'
+
+
+CREATE_WORK = Query('migration_0005.create_work', '''
+    CREATE TABLE IF NOT EXISTS work (
+        id {pk},
+        kind TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        type TEXT NOT NULL,
+        title TEXT,
+        date {date} NOT NULL,
+        time {time} DEFAULT '23:59',
+        description TEXT,
+        due_date {date},
+        deadline_at {epoch},
+        added_date TEXT
+    )
+''', prepare=False)
+
+COPY_TESTS = Query('migration_0005.copy_tests', '''
+    INSERT INTO work (id, kind, subject, type, title, date, time, description, due_date, deadline_at, added_date)
+    SELECT id, 'test', subject, type, NULL, date, time, description, due_date, deadline_at, added_date
+    FROM tests
+''', prepare=False)
+
+# Наибольший id теста: в таблице, в уведомлениях и в последовательности
+MAX_TEST_ID = Query('migration_0005.max_test_id', '''
+    SELECT MAX(id) FROM (
+        SELECT MAX(id) AS id FROM tests
+        UNION ALL
+        SELECT MAX(work_id) FROM sent_notifications WHERE work_type = 'test'
+    ) AS ids
+''', prepare=False)
+
+TESTS_SEQUENCE_VALUE = {
+    POSTGRESQL: Query('migration_0005.tests_sequence_pg', '''
+        SELECT pg_sequence_last_value(pg_get_serial_sequence('tests', 'id')::regclass)
+    ''', prepare=False),
+    SQLITE: Query('migration_0005.tests_sequence_sqlite',
+                  "SELECT seq FROM sqlite_sequence WHERE name = 'tests'", prepare=False),
+}
+
+COPY_HOMEWORK = Query('migration_0005.copy_homework', '''
+    INSERT INTO work (id, kind, subject, type, title, date, time, description, due_date, deadline_at, added_date)
+    SELECT id + ?, 'homework', subject, COALESCE(type, 'Mājasdarbs'), title, date, time, description,
+           due_date, deadline_at, added_date
+    FROM homework
+''', prepare=False)
+
+# Сначала в отрицательные id (ни с чем не совпадают), затем сдвиг: ни на одном
+# шаге две строки не получают одинаковый work_id
+NEGATE_NOTIFICATIONS = Query('migration_0005.negate_notifications', '''
+    UPDATE sent_notifications SET work_id = -work_id WHERE work_type = 'homework'
+''', prepare=False)
+
+REMAP_NOTIFICATIONS = Query('migration_0005.remap_notifications', '''
+    UPDATE sent_notifications SET work_id = ? - work_id WHERE work_type = 'homework' AND work_id < 0
+''', prepare=False)
+
+# После вставки с явными id последовательность SERIAL нужно подвинуть вручную
+SYNC_SEQUENCE = Query('migration_0005.sync_sequence', '''
+    SELECT setval(pg_get_serial_sequence('work', 'id'), (SELECT COALESCE(MAX(id), 0) + 1 FROM work), false)
+''', prepare=False)
+
+DROP_TESTS = Query('migration_0005.drop_tests', 'DROP TABLE tests', prepare=False)
+
+DROP_HOMEWORK = Query('migration_0005.drop_homework', 'DROP TABLE homework', prepare=False)
+
+INDEXES = [
+    Query('migration_0005.idx_work_kind_date_time',
+          'CREATE INDEX IF NOT EXISTS idx_work_kind_date_time ON work (kind, date, time)', prepare=False),
+    Query('migration_0005.idx_work_subject_date',
+          'CREATE INDEX IF NOT EXISTS idx_work_subject_date ON work (subject, date)', prepare=False),
+    Query('migration_0005.idx_work_deadline_at',
+          'CREATE INDEX IF NOT EXISTS idx_work_deadline_at ON work (deadline_at)', prepare=False),
+]
+
+
+def upgrade(cursor):
+    execute(cursor, CREATE_WORK)
+
+    offset = max(fetch_value(execute(cursor, MAX_TEST_ID), 0),
+                 fetch_value(execute(cursor, TESTS_SEQUENCE_VALUE[cursor_dialect(cursor)]), 0))
+    execute(cursor, COPY_TESTS)
+    execute(cursor, COPY_HOMEWORK, (offset,))
+    execute(cursor, NEGATE_NOTIFICATIONS)
+    execute(cursor, REMAP_NOTIFICATIONS, (offset,))
+
+    if cursor_dialect(cursor) == POSTGRESQL:
+        execute(cursor, SYNC_SEQUENCE)
+
+    execute(cursor, DROP_TESTS)
+    execute(cursor, DROP_HOMEWORK)
+
+    for query in INDEXES:
+        execute(cursor, query)
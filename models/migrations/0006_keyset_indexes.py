@@ -0,0 +1,23 @@
+"""
+Индексы для keyset-пагинации
+
+Страницы /api/work и /all сортируются по (date, time, id), страницы новостей —
+по (date, id) в обратном порядке; индексы с тем же порядком колонок позволяют
+читать страницу с позиции курсора без сортировки всей таблицы.
+"""
+from models.queries import Query, execute
+
+DESCRIPTION = 'indexes for keyset pagination'
+
+
+INDEXES = [
+    Query('migration_0006.idx_work_date_time_id',
+          'CREATE INDEX IF NOT EXISTS idx_work_date_time_id ON work (date, time, id)', prepare=False),
+    Query('migration_0006.idx_news_date_id',
+          'CREATE INDEX IF NOT EXISTS idx_news_date_id ON news (date, id)', prepare=False),
+]
+
+
+def upgrade(cursor):
+    for query in INDEXES:
+        execute(cursor, query)
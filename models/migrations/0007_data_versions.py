@@ -0,0 +1,30 @@
+"""
+Таблица data_versions: счётчик версии для каждого набора данных
+
+Пути записи увеличивают версию набора в той же транзакции, а фоновый поток
+каждого процесса (services.invalidation_service) сверяет версии и сбрасывает
+устаревшие кеши. На SQLite это единственный канал между процессами, на
+PostgreSQL — дополнение к LISTEN/NOTIFY.
+"""
+from models.queries import Query, execute
+
+DESCRIPTION = 'data_versions table for cache invalidation'
+
+DATASETS = ('tests', 'homework', 'subjects', 'news', 'terms', 'updates')
+
+
+CREATE_DATA_VERSIONS = Query('migration_0007.create_data_versions', '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        dataset TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+''', prepare=False)
+
+INSERT_DATASET = Query('migration_0007.insert_dataset',
+                       'INSERT INTO data_versions (dataset, version) VALUES (?, 0)', prepare=False)
+
+
+def upgrade(cursor):
+    execute(cursor, CREATE_DATA_VERSIONS)
+    for dataset in DATASETS:
+        execute(cursor, INSERT_DATASET, (dataset,))
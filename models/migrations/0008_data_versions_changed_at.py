@@ -0,0 +1,23 @@
+"""
+Время последнего изменения набора данных (data_versions.changed_at)
+
+Нужно для заголовка Last-Modified: bump_versions() записывает момент
+изменения вместе с новой версией. Для уже существующих наборов точное время
+неизвестно, поэтому берётся момент миграции.
+"""
+from datetime import datetime
+from models.queries import Query, epoch_value, execute
+
+DESCRIPTION = 'data_versions.changed_at for Last-Modified'
+
+
+ADD_CHANGED_AT = Query('migration_0008.add_changed_at',
+                       'ALTER TABLE data_versions ADD COLUMN changed_at {epoch}', prepare=False)
+
+SET_CHANGED_AT = Query('migration_0008.set_changed_at',
+                       'UPDATE data_versions SET changed_at = ?', prepare=False)
+
+
+def upgrade(cursor):
+    execute(cursor, ADD_CHANGED_AT)
+    execute(cursor, SET_CHANGED_AT, (epoch_value(cursor, datetime.now().replace(microsecond=0)),))
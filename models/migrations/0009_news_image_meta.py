@@ -0,0 +1,18 @@
+"""
+Метаданные обработанного изображения новости (news.image_meta)
+
+JSON с размерами, вариантами по ширине (WebP и исходный формат) и
+размытой заглушкой — его пишет services.image_service после обработки
+загрузки. NULL — изображение ещё не обработано или загружено до миграции.
+"""
+from models.queries import Query, execute
+
+DESCRIPTION = 'news.image_meta for responsive images'
+
+
+ADD_IMAGE_META = Query('migration_0009.add_image_meta',
+                       'ALTER TABLE news ADD COLUMN image_meta TEXT', prepare=False)
+
+
+def upgrade(cursor):
+    execute(cursor, ADD_IMAGE_META)
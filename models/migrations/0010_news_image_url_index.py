@@ -0,0 +1,18 @@
+"""
+Индекс по news.image_url
+
+По адресу изображения ищутся новости для записи метаданных после обработки
+и для повторной загрузки того же файла (services.image_service), а сборщик
+мусора читает список всех адресов.
+"""
+from models.queries import Query, execute
+
+DESCRIPTION = 'index on news.image_url for upload references'
+
+
+CREATE_INDEX = Query('migration_0010.idx_news_image_url',
+                     'CREATE INDEX IF NOT EXISTS idx_news_image_url ON news (image_url)', prepare=False)
+
+
+def upgrade(cursor):
+    execute(cursor, CREATE_INDEX)
@@ -0,0 +1,50 @@
+"""
+Полнотекстовый индекс search_index (models.search)
+
+PostgreSQL — таблица с tsvector и GIN-индексом, SQLite — виртуальная таблица
+FTS5. Индекс заполняется существующими работами и активными новостями.
+"""
+from models.queries import Query, POSTGRESQL, cursor_dialect, execute, fetch_all
+from models.search import DOC_NEWS, DOC_WORK, index_document, news_document, work_document
+
+DESCRIPTION = 'full-text search index (tsvector/GIN or FTS5)'
+
+
+CREATE_INDEX_PG = [
+    Query('migration_0011.create_search_index_pg', '''
+        CREATE TABLE IF NOT EXISTS search_index (
+            doc_type TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            document TSVECTOR NOT NULL,
+            PRIMARY KEY (doc_type, doc_id)
+        )
+    ''', prepare=False),
+    Query('migration_0011.idx_search_index_document',
+          'CREATE INDEX IF NOT EXISTS idx_search_index_document ON search_index USING GIN (document)',
+          prepare=False),
+]
+
+CREATE_INDEX_FTS = Query('migration_0011.create_search_index_fts', '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index
+    USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')
+''', prepare=False)
+
+SELECT_WORK = Query('migration_0011.select_work',
+                    'SELECT id, subject, type, title, description FROM work', prepare=False)
+
+SELECT_ACTIVE_NEWS = Query('migration_0011.select_active_news',
+                           'SELECT id, title, content FROM news WHERE is_active = TRUE', prepare=False)
+
+
+def upgrade(cursor):
+    if cursor_dialect(cursor) == POSTGRESQL:
+        for query in CREATE_INDEX_PG:
+            execute(cursor, query)
+    else:
+        execute(cursor, CREATE_INDEX_FTS)
+
+    for work in fetch_all(execute(cursor, SELECT_WORK)):
+        index_document(cursor, DOC_WORK, work['id'], *work_document(work))
+
+    for news in fetch_all(execute(cursor, SELECT_ACTIVE_NEWS)):
+        index_document(cursor, DOC_NEWS, news['id'], *news_document(news))
@@ -0,0 +1,37 @@
+"""
+work.time NOT NULL
+
+Страницы работ сортируются и листаются по ключу (date, time, id): строка с
+NULL в time при сравнении кортежей даёт NULL и выпадает из keyset-страниц.
+Пустое время везде означает '23:59' (конец дня), поэтому NULL заменяются
+им, а колонка становится NOT NULL. SQLite не меняет ограничения колонок
+без пересоздания таблицы — там NULL запрещают триггеры.
+"""
+from models.queries import Query, POSTGRESQL, cursor_dialect, execute
+
+DESCRIPTION = 'work.time NOT NULL for keyset pagination'
+
+
+FILL_TIME = Query('migration_0012.fill_time', "UPDATE work SET time = '23:59' WHERE time IS NULL", prepare=False)
+
+SET_NOT_NULL_PG = Query('migration_0012.set_not_null_pg', '''
+    ALTER TABLE work ALTER COLUMN time SET DEFAULT '23:59', ALTER COLUMN time SET NOT NULL
+''', prepare=False)
+
+NOT_NULL_TRIGGERS_SQLITE = [
+    Query(f'migration_0012.work_time_not_null_{event.lower()}', f'''
+        CREATE TRIGGER IF NOT EXISTS work_time_not_null_{event.lower()}
+        BEFORE {event} ON work WHEN NEW.time IS NULL
+        BEGIN SELECT RAISE(ABORT, 'NOT NULL constraint failed: work.time'); END
+    ''', prepare=False)
+    for event in ('INSERT', 'UPDATE')
+]
+
+
+def upgrade(cursor):
+    execute(cursor, FILL_TIME)
+    if cursor_dialect(cursor) == POSTGRESQL:
+        execute(cursor, SET_NOT_NULL_PG)
+    else:
+        for query in NOT_NULL_TRIGGERS_SQLITE:
+            execute(cursor, query)
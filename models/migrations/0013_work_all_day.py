@@ -0,0 +1,24 @@
+"""
+work.all_day — работа сохранена без времени
+
+Пустое время хранится как '23:59' (конец дня), поэтому по самому time
+нельзя отличить работу без времени от работы, сданной ровно в 23:59.
+Лента iCalendar показывает первые событиями на весь день, вторые — в
+указанный момент; признак пишется при сохранении. Старые строки с
+'23:59' почти всегда были сохранены без времени и получают TRUE.
+"""
+from models.queries import Query, execute
+
+DESCRIPTION = 'work.all_day for work saved without a time'
+
+
+ADD_ALL_DAY = Query('migration_0013.add_all_day',
+                    'ALTER TABLE work ADD COLUMN all_day BOOLEAN NOT NULL DEFAULT FALSE', prepare=False)
+
+FILL_ALL_DAY = Query('migration_0013.fill_all_day',
+                     "UPDATE work SET all_day = TRUE WHERE time = '23:59'", prepare=False)
+
+
+def upgrade(cursor):
+    execute(cursor, ADD_ALL_DAY)
+    execute(cursor, FILL_ALL_DAY)
@@ -0,0 +1,176 @@
+"""
+Версионированные миграции схемы БД
+
+Миграции лежат в этом пакете в файлах вида ``0001_initial_schema.py`` и
+применяются по порядку номеров. Каждый модуль объявляет ``DESCRIPTION`` и
+функцию ``upgrade(cursor)``. Применённые версии записываются в таблицу
+schema_version, так что при старте выполняются только новые миграции.
+
+Для горячих запросов runner печатает план выполнения до и после каждой
+миграции, чтобы было видно, какие из них начали использовать индексы.
+"""
+import importlib
+import os
+import re
+from datetime import datetime
+from models.database import get_db_connection
+from models.queries import Query, POSTGRESQL, cursor_dialect, execute, get_query
+
+
+CREATE_SCHEMA_VERSION_TABLE = Query('schema_version.create_table', '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT
+    )
+''', prepare=False)
+
+SELECT_APPLIED_VERSIONS = Query('schema_version.select_versions', 'SELECT version FROM schema_version')
+
+INSERT_SCHEMA_VERSION = Query('schema_version.insert', '''
+    INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)
+''')
+
+# Горячие запросы, план которых отслеживается: (имя запроса, пример параметров)
+PLAN_PROBES = [
+    ('work.select_by_kind', ('test',)),
+    ('work.select_by_id', (1,)),
+    ('work.delete_by_subject', ('Matemātika',)),
+    ('news.select_active_page_after', ('2024-01-01', 1, 51)),
+    ('timer_service.sum_seconds_on_day', ('device', '2024-01-01')),
+    ('timer_service.sum_seconds_since', ('device', '2024-01-01')),
+    ('user_settings.select', ('device',)),
+    ('email_subscriptions.select_subscribers', ('Matemātika', 1, 1)),
+]
+
+# Модули, в которых объявлены запросы из PLAN_PROBES
+PLAN_PROBE_MODULES = [
+    'models.work',
+    'models.news',
+    'models.users',
+    'models.email_system',
+    'services.timer_service',
+]
+
+_MIGRATION_FILE_RE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+def discover_migrations():
+    """
+    Находит модули миграций в пакете
+
+    Returns:
+        list: [(version, name, module)] по возрастанию версии
+    """
+    migrations = []
+    for filename in sorted(os.listdir(os.path.dirname(__file__))):
+        match = _MIGRATION_FILE_RE.match(filename)
+        if not match:
+            continue
+        version, name = int(match.group(1)), match.group(2)
+        module = importlib.import_module(f'{__name__}.{filename[:-3]}')
+        migrations.append((version, name, module))
+    return migrations
+
+
+def explain(cursor, query, params=None):
+    """Возвращает план выполнения запроса одной строкой"""
+    if isinstance(query, str):
+        query = get_query(query)
+
+    dialect = cursor_dialect(cursor)
+    prefix = 'EXPLAIN ' if dialect == POSTGRESQL else 'EXPLAIN QUERY PLAN '
+    text = prefix + query.text(dialect)
+
+    if query.has_params:
+        cursor.execute(text, params)
+    else:
+        cursor.execute(text)
+
+    if dialect == POSTGRESQL:
+        lines = [row[0].strip() for row in cursor.fetchall()]
+    else:
+        lines = [row[-1] for row in cursor.fetchall()]
+    return '; '.join(lines)
+
+
+def collect_plans(conn):
+    """Планы всех отслеживаемых запросов ({имя: план})"""
+    for module_name in PLAN_PROBE_MODULES:
+        importlib.import_module(module_name)
+
+    plans = {}
+    cursor = conn.cursor()
+    for name, params in PLAN_PROBES:
+        try:
+            plans[name] = explain(cursor, name, params)
+        except Exception:
+            # Таблицы ещё может не быть (до первой миграции)
+            plans[name] = None
+            conn.rollback()
+    conn.rollback()
+    return plans
+
+
+def report_plans(before, after):
+    """Печатает планы запросов, изменившиеся после миграции"""
+    changed = [name for name in after if before.get(name) != after[name]]
+    for name in changed:
+        print(f"   📊 {name}")
+        print(f"      before: {before.get(name) or 'n/a'}")
+        print(f"      after:  {after[name] or 'n/a'}")
+    if not changed:
+        print("   📊 Query plans unchanged")
+    return changed
+
+
+def run_migrations(report=True):
+    """
+    Применяет все непримененные миграции по порядку
+
+    Args:
+        report (bool): Печатать планы горячих запросов до/после каждой миграции
+
+    Returns:
+        list: Номера применённых миграций
+    """
+    conn = get_db_connection()
+    applied_now = []
+    try:
+        cursor = conn.cursor()
+        execute(cursor, CREATE_SCHEMA_VERSION_TABLE)
+        conn.commit()
+
+        execute(cursor, SELECT_APPLIED_VERSIONS)
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for version, name, module in discover_migrations():
+            if version in applied:
+                continue
+
+            before = collect_plans(conn) if report else None
+
+            print(f"🔧 Applying migration {version:04d}_{name}: {module.DESCRIPTION}")
+            try:
+                cursor = conn.cursor()
+                module.upgrade(cursor)
+                execute(cursor, INSERT_SCHEMA_VERSION,
+                        (version, name, datetime.now().strftime('%Y-%m-%d %H:%M')))
+                conn.commit()
+            except Exception as e:
+                print(f"❌ Migration {version:04d}_{name} failed: {e}")
+                conn.rollback()
+                raise
+
+            applied_now.append(version)
+
+            if report:
+                report_plans(before, collect_plans(conn))
+
+        if applied_now:
+            print(f"✅ Applied {len(applied_now)} migration(s)")
+        else:
+            print("✅ Database schema is up to date")
+        return applied_now
+    finally:
+        conn.close()
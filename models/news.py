@@ -1,80 +1,155 @@
 """
 Модель для работы с новостями
 """
+import json
 from datetime import datetime
-from models.database import get_db_connection, is_postgresql_connection
+from models.data_versions import bump_versions, invalidate_local, register_invalidator
+from models.database import get_db_connection
+from models.queries import Query, execute, fetch_all, fetch_one, fetch_value
+from models.search import DOC_NEWS, index_document, news_document, remove_document
+from utils.cache import cached
+from utils.date_utils import normalize_date_fields
+from utils.pagination import make_cursor
 
 
-def init_news_table():
-    """Инициализирует таблицу новостей"""
+SELECT_NEWS = Query('news.select_all', 'SELECT * FROM news ORDER BY date DESC')
+
+SELECT_NEWS_BY_ID = Query('news.select_by_id', 'SELECT * FROM news WHERE id = ?')
+
+# Страницы активных новостей: ORDER BY date DESC, id DESC + keyset по (date, id)
+SELECT_ACTIVE_NEWS_PAGE = Query('news.select_active_page', '''
+    SELECT * FROM news WHERE is_active = TRUE
+    ORDER BY date DESC, id DESC LIMIT ?
+''')
+
+SELECT_ACTIVE_NEWS_PAGE_AFTER = Query('news.select_active_page_after', '''
+    SELECT * FROM news WHERE is_active = TRUE AND (date, id) < (?, ?)
+    ORDER BY date DESC, id DESC LIMIT ?
+''')
+
+SELECT_NEWS_PAGE = Query('news.select_page', 'SELECT * FROM news ORDER BY date DESC, id DESC LIMIT ?')
+
+SELECT_NEWS_PAGE_AFTER = Query('news.select_page_after', '''
+    SELECT * FROM news WHERE (date, id) < (?, ?)
+    ORDER BY date DESC, id DESC LIMIT ?
+''')
+
+INSERT_NEWS = Query('news.insert', '''
+    INSERT INTO news (title, content, date, image_url, is_active, created_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+    RETURNING id
+''')
+
+# Метаданные изображения сбрасываются, если изображение заменено
+UPDATE_NEWS = Query('news.update', '''
+    UPDATE news SET title = ?, content = ?, date = ?,
+           image_meta = CASE WHEN image_url = ? THEN image_meta ELSE NULL END,
+           image_url = ?, is_active = ?, updated_date = ? WHERE id = ?
+''')
+
+# Ссылки на загруженные изображения (services.image_service.collect_garbage)
+SELECT_IMAGE_URLS = Query('news.select_image_urls', '''
+    SELECT DISTINCT image_url FROM news WHERE image_url IS NOT NULL AND image_url != ''
+''')
+
+SELECT_IMAGE_META = Query('news.select_image_meta', '''
+    SELECT image_meta FROM news WHERE image_url = ? AND image_meta IS NOT NULL LIMIT 1
+''')
+
+UPDATE_IMAGE_META = Query('news.update_image_meta', 'UPDATE news SET image_url = ?, image_meta = ? WHERE image_url = ?')
+
+DELETE_NEWS = Query('news.delete', 'DELETE FROM news WHERE id = ?')
+
+
+def _normalize(news):
+    """Даты и разобранный JSON метаданных изображения (services.image_service)"""
+    news = normalize_date_fields(news)
+    if isinstance(news.get('image_meta'), str):
+        try:
+            news['image_meta'] = json.loads(news['image_meta'])
+        except ValueError:
+            news['image_meta'] = None
+    return news
+
+
+@cached()
+def _fetch_news():
+    """Все новости из БД (кешируется, сбрасывается через data_versions)"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        if is_postgresql_connection(conn):
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS news (
-                    id SERIAL PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    image_url TEXT,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_date TEXT,
-                    updated_date TEXT
-                )
-            ''')
-        else:
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS news (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    image_url TEXT,
-                    is_active BOOLEAN DEFAULT 1,
-                    created_date TEXT,
-                    updated_date TEXT
-                )
-            ''')
-        
-        conn.commit()
-        print("✅ News table initialized")
-    except Exception as e:
-        print(f"❌ Error initializing news table: {e}")
-        conn.rollback()
+        cursor = conn.cursor()
+        execute(cursor, SELECT_NEWS)
+        return [_normalize(news) for news in fetch_all(cursor)]
     finally:
         conn.close()
 
 
+register_invalidator('news', _fetch_news.cache_clear)
+
+
 def load_news():
     """Загружает все новости"""
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM news ORDER BY date DESC')
-        
-        if is_postgresql_connection(conn):
-            news_data = cursor.fetchall()
-            news = []
-            for row in news_data:
-                news.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'content': row[2],
-                    'date': row[3],
-                    'image_url': row[4],
-                    'is_active': row[5],
-                    'created_date': row[6],
-                    'updated_date': row[7]
-                })
-            return news
-        else:
-            news = cursor.fetchall()
-            return [dict(item) for item in news]
+        return _fetch_news()
     except Exception as e:
         print(f"❌ Error loading news: {e}")
         return []
+
+
+def load_news_page(active_only=True, after=None, limit=50):
+    """
+    Страница новостей (новые сначала) с keyset-пагинацией
+
+    Args:
+        active_only (bool): Только активные новости
+        after (tuple, optional): Ключ (date, id) последней новости предыдущей страницы
+        limit (int): Размер страницы
+
+    Returns:
+        tuple: (список новостей, курсор следующей страницы или None)
+    """
+    if active_only:
+        query = SELECT_ACTIVE_NEWS_PAGE_AFTER if after else SELECT_ACTIVE_NEWS_PAGE
+    else:
+        query = SELECT_NEWS_PAGE_AFTER if after else SELECT_NEWS_PAGE
+    
+    # Лишняя строка показывает, есть ли следующая страница
+    params = (*after, limit + 1) if after else (limit + 1,)
+    
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, query, params)
+        items = [_normalize(news) for news in fetch_all(cursor)]
+    finally:
+        conn.close()
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = make_cursor(items[-1]['date'], items[-1]['id'])
+    return items, next_cursor
+
+
+def _index_news(cursor, news_id, title, content, is_active):
+    """В поиске только активные новости"""
+    if is_active:
+        index_document(cursor, DOC_NEWS, news_id, *news_document({'title': title, 'content': content}))
+    else:
+        remove_document(cursor, DOC_NEWS, news_id)
+
+
+def get_news_by_id(news_id):
+    """Новость по ID или None"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_NEWS_BY_ID, (news_id,))
+        news = fetch_one(cursor)
+        return _normalize(news) if news else None
+    except Exception as e:
+        print(f"❌ Error loading news {news_id}: {e}")
+        return None
     finally:
         conn.close()
 
@@ -86,18 +161,13 @@ def save_news(title, content, date, image_url, is_active):
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                'INSERT INTO news (title, content, date, image_url, is_active, created_date) VALUES (%s, %s, %s, %s, %s, %s)',
-                (title, content, date, image_url, is_active, current_time)
-            )
-        else:
-            cursor.execute(
-                'INSERT INTO news (title, content, date, image_url, is_active, created_date) VALUES (?, ?, ?, ?, ?, ?)',
-                (title, content, date, image_url, is_active, current_time)
-            )
+        news_id = execute(cursor, INSERT_NEWS,
+                          (title, content, date, image_url, is_active, current_time)).fetchone()[0]
+        _index_news(cursor, news_id, title, content, is_active)
+        bump_versions(cursor, 'news')
         
         conn.commit()
+        invalidate_local('news')
         print(f"✅ News saved: {title}")
         return True
     except Exception as e:
@@ -115,20 +185,12 @@ def update_news(news_id, title, content, date, image_url, is_active):
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                '''UPDATE news SET title = %s, content = %s, date = %s, image_url = %s, 
-                   is_active = %s, updated_date = %s WHERE id = %s''',
-                (title, content, date, image_url, is_active, current_time, news_id)
-            )
-        else:
-            cursor.execute(
-                '''UPDATE news SET title = ?, content = ?, date = ?, image_url = ?, 
-                   is_active = ?, updated_date = ? WHERE id = ?''',
-                (title, content, date, image_url, is_active, current_time, news_id)
-            )
+        execute(cursor, UPDATE_NEWS, (title, content, date, image_url, image_url, is_active, current_time, news_id))
+        _index_news(cursor, news_id, title, content, is_active)
+        bump_versions(cursor, 'news')
         
         conn.commit()
+        invalidate_local('news')
         print(f"✅ News updated: {news_id}")
         return True
     except Exception as e:
@@ -144,13 +206,12 @@ def delete_news(news_id):
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        
-        if is_postgresql_connection(conn):
-            cursor.execute('DELETE FROM news WHERE id = %s', (news_id,))
-        else:
-            cursor.execute('DELETE FROM news WHERE id = ?', (news_id,))
+        execute(cursor, DELETE_NEWS, (news_id,))
+        remove_document(cursor, DOC_NEWS, news_id)
+        bump_versions(cursor, 'news')
         
         conn.commit()
+        invalidate_local('news')
         print(f"✅ News deleted: {news_id}")
         return True
     except Exception as e:
@@ -158,4 +219,56 @@ def delete_news(news_id):
         conn.rollback()
         return False
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def set_image_meta(image_url, meta, new_url=None):
+    """
+    Записывает метаданные обработанного изображения во все новости с ним
+
+    Args:
+        image_url (str): Текущий адрес изображения в новостях
+        meta (dict): Метаданные (размеры, srcset, заглушка)
+        new_url (str, optional): Новый адрес (копия заменена вариантом)
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, UPDATE_IMAGE_META, (new_url or image_url, json.dumps(meta), image_url))
+        bump_versions(cursor, 'news')
+        
+        conn.commit()
+        invalidate_local('news')
+        return True
+    except Exception as e:
+        print(f"❌ Error saving image meta: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def find_image_meta(image_url):
+    """Метаданные изображения из любой новости с этим адресом или None"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_IMAGE_META, (image_url,))
+        meta = fetch_value(cursor)
+        return json.loads(meta) if meta else None
+    except Exception as e:
+        print(f"❌ Error loading image meta: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def load_image_urls():
+    """Все адреса изображений, на которые ссылаются новости"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_IMAGE_URLS)
+        return [row['image_url'] for row in fetch_all(cursor)]
+    finally:
+        conn.close()
@@ -0,0 +1,229 @@
+"""
+Диалектно-нейтральный слой SQL-запросов
+
+Каждый запрос описывается один раз (плейсхолдеры ``?``) и адаптируется
+к активному драйверу при выполнении:
+
+    SELECT_TESTS = Query('tests.select_all', 'SELECT * FROM tests ORDER BY date, time')
+
+    cursor = conn.cursor()
+    execute(cursor, SELECT_TESTS)
+    tests = fetch_all(cursor)
+
+Для PostgreSQL плейсхолдеры превращаются в ``%s``, а запросы выполняются как
+server-side prepared statements (psycopg кеширует их на соединении, а
+соединения живут в пуле), поэтому горячие запросы не планируются заново.
+
+В DDL можно использовать токены диалекта: ``{pk}``, ``{date}``, ``{time}``,
+``{timestamp}``, ``{epoch}`` (момент времени: TIMESTAMP на PostgreSQL,
+epoch-секунды на SQLite; datetime-параметры для таких колонок передаются
+через epoch_value()).
+
+Внутри запроса Flask execute() считает обращения к БД (request_round_trips).
+"""
+import re
+import threading
+import psycopg
+from flask import g, has_app_context
+
+
+POSTGRESQL = 'postgresql'
+SQLITE = 'sqlite'
+
+# Различия в DDL между диалектами
+DIALECT_TOKENS = {
+    POSTGRESQL: {
+        'pk': 'SERIAL PRIMARY KEY',
+        'date': 'DATE',
+        'time': 'TIME',
+        'timestamp': 'TIMESTAMP',
+        'epoch': 'TIMESTAMP',
+    },
+    SQLITE: {
+        'pk': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+        'date': 'TEXT',
+        'time': 'TEXT',
+        'timestamp': 'TEXT',
+        'epoch': 'INTEGER',
+    },
+}
+
+_TOKEN_RE = re.compile(r'\{(' + '|'.join(DIALECT_TOKENS[SQLITE]) + r')\}')
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Query:
+    """Именованный SQL-запрос, хранящийся в одном экземпляре"""
+
+    def __init__(self, name, sql, prepare=True):
+        """
+        Args:
+            name (str): Уникальное имя запроса ('tests.select_all')
+            sql (str): Текст запроса с плейсхолдерами ?
+            prepare (bool): Выполнять как prepared statement на PostgreSQL
+                (для DDL должно быть False)
+        """
+        self.name = name
+        self.sql = sql
+        self.prepare = prepare
+        self.has_params = '?' in _strip_literals(sql)
+        self._texts = {}
+
+        with _registry_lock:
+            if name in _registry and _registry[name].sql != sql:
+                raise ValueError(f"Query '{name}' is already registered")
+            _registry[name] = self
+
+    def text(self, dialect):
+        """Текст запроса для диалекта (результат кешируется)"""
+        text = self._texts.get(dialect)
+        if text is None:
+            tokens = DIALECT_TOKENS[dialect]
+            text = _TOKEN_RE.sub(lambda m: tokens[m.group(1)], self.sql)
+            if dialect == POSTGRESQL and self.has_params:
+                text = _to_pyformat(text)
+            self._texts[dialect] = text
+        return text
+
+    def __repr__(self):
+        return f"<Query {self.name}>"
+
+
+def get_query(name):
+    """Возвращает зарегистрированный запрос по имени"""
+    return _registry[name]
+
+
+def registered_queries():
+    """Все зарегистрированные запросы (для диагностики)"""
+    with _registry_lock:
+        return dict(_registry)
+
+
+def _strip_literals(sql):
+    """Удаляет строковые литералы, чтобы не путать '?' внутри них с плейсхолдерами"""
+    return re.sub(r"'(?:[^']|'')*'", "''", sql)
+
+
+def _to_pyformat(sql):
+    """Заменяет ? на %s вне строковых литералов и экранирует %"""
+    result = []
+    in_literal = False
+    for char in sql:
+        if char == "'":
+            in_literal = not in_literal
+            result.append(char)
+        elif char == '%':
+            result.append('%%')
+        elif char == '?' and not in_literal:
+            result.append('%s')
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def cursor_dialect(cursor):
+    """Определяет диалект по курсору"""
+    if isinstance(cursor.connection, psycopg.Connection):
+        return POSTGRESQL
+    return SQLITE
+
+
+def epoch_value(cursor, value):
+    """Параметр для колонки {epoch}: datetime на PostgreSQL, epoch-секунды на SQLite"""
+    if value is None or cursor_dialect(cursor) == POSTGRESQL:
+        return value
+    return int(value.timestamp())
+
+
+def execute(cursor, query, params=None):
+    """
+    Выполняет именованный запрос на курсоре
+
+    Args:
+        cursor: Курсор sqlite3 или psycopg
+        query (Query | str): Запрос или его имя
+        params (tuple, optional): Параметры
+
+    Returns:
+        cursor (для цепочек вида execute(...).fetchone())
+    """
+    if isinstance(query, str):
+        query = get_query(query)
+
+    if has_app_context():
+        g._db_round_trips = g.get('_db_round_trips', 0) + 1
+
+    dialect = cursor_dialect(cursor)
+    text = query.text(dialect)
+
+    if isinstance(cursor, psycopg.ServerCursor):
+        # DECLARE CURSOR не выполняется как prepared statement
+        cursor.execute(text, params if query.has_params else None)
+    elif dialect == POSTGRESQL:
+        cursor.execute(text, params if query.has_params else None, prepare=query.prepare)
+    elif query.has_params:
+        cursor.execute(text, params)
+    else:
+        cursor.execute(text)
+
+    return cursor
+
+
+def request_round_trips():
+    """Число запросов, выполненных через execute() в текущем контексте Flask"""
+    if not has_app_context():
+        return 0
+    return g.get('_db_round_trips', 0)
+
+
+def _columns(cursor):
+    return [column[0] for column in cursor.description]
+
+
+def fetch_all(cursor):
+    """Все строки результата в виде списка словарей"""
+    columns = _columns(cursor)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def fetch_one(cursor):
+    """Одна строка результата в виде словаря или None"""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip(_columns(cursor), row))
+
+
+def streaming_cursor(conn, name):
+    """
+    Курсор для чтения большого результата порциями (iter_rows)
+
+    На PostgreSQL — серверный курсор (DECLARE CURSOR, строки не копятся в
+    памяти клиента), на SQLite обычный курсор и так читает строки по мере fetch.
+    """
+    raw = getattr(conn, 'raw', conn)
+    if isinstance(raw, psycopg.Connection):
+        return raw.cursor(name=name)
+    return raw.cursor()
+
+
+def iter_rows(cursor, batch_size=500):
+    """Строки результата словарями, по batch_size за обращение к БД"""
+    columns = _columns(cursor)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict(zip(columns, row))
+
+
+def fetch_value(cursor, default=None):
+    """Первое значение первой строки (COUNT, SUM и т.п.)"""
+    row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return default
+    return row[0]
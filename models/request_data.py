@@ -0,0 +1,80 @@
+"""
+Данные запроса: каждый набор загружается не больше одного раза за запрос
+
+Маршруты обращаются к g.data вместо прямых вызовов load_*():
+
+    tests = g.data.tests
+    stats = g.data.stats
+
+Значения вычисляются при первом обращении и живут до конца запроса.
+Загрузчики отдают копии, поэтому внутри запроса все получают один и тот же
+список — сортировать его нужно через sorted(), а не .sort().
+"""
+from datetime import datetime
+from functools import cached_property
+from flask import g
+from models.homework import load_homework
+from models.news import load_news
+from models.queries import request_round_trips
+from models.subjects import load_subjects
+from models.terms import load_terms
+from models.tests import load_tests
+from models.updates import load_updates
+
+
+class RequestData:
+    """Лениво загружаемые наборы данных текущего запроса"""
+
+    @cached_property
+    def tests(self):
+        return load_tests()
+
+    @cached_property
+    def homework(self):
+        return load_homework()
+
+    @cached_property
+    def all_work(self):
+        """Тесты и домашние задания одним списком"""
+        return self.tests + self.homework
+
+    @cached_property
+    def subjects(self):
+        return load_subjects()
+
+    @cached_property
+    def news(self):
+        return load_news()
+
+    @cached_property
+    def updates(self):
+        return load_updates()
+
+    @cached_property
+    def terms(self):
+        return load_terms()
+
+    @cached_property
+    def stats(self):
+        """Общая статистика для всех страниц"""
+        today = datetime.now().date().strftime('%Y-%m-%d')
+        return {
+            'today': len([w for w in self.all_work if w.get('date') == today]),
+            'total': len(self.all_work)
+        }
+
+    @property
+    def db_round_trips(self):
+        """Сколько запросов к БД выполнено за текущий запрос"""
+        return request_round_trips()
+
+
+def init_request_data():
+    """Создаёт контекст данных запроса (before_request)"""
+    g.data = RequestData()
+
+
+def add_round_trips_header(response):
+    """Отдаёт число запросов к БД в заголовке X-DB-Round-Trips (after_request)"""
+    response.headers['X-DB-Round-Trips'] = str(request_round_trips())
+    return response
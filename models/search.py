@@ -0,0 +1,102 @@
+"""
+Полнотекстовый индекс работ и новостей (таблица search_index)
+
+PostgreSQL — колонка tsvector с GIN-индексом (заголовок с весом A, текст — B),
+ранжирование ts_rank_cd. SQLite — виртуальная таблица FTS5, ранжирование
+bm25. Текст и запрос сворачиваются одной функцией utils.text.fold (регистр и
+диакритика), поэтому "majasdarbs" находит "Mājasdarbs" на обоих драйверах.
+
+Индекс обновляется в той же транзакции, что и изменение строки
+(models.work, models.news, models.subjects).
+"""
+from models.queries import Query, POSTGRESQL, cursor_dialect, execute
+from utils.text import fold, strip_tags
+
+
+DOC_WORK = 'work'
+DOC_NEWS = 'news'
+
+# SQLite: rowid строки FTS5 = id документа * 8 + код типа
+# (UNINDEXED-колонки FTS5 не индексируются, а по rowid удаление — точечное)
+DOC_TYPE_CODES = {DOC_WORK: 0, DOC_NEWS: 1}
+DOC_TYPE_SLOTS = 8
+
+UPSERT_PG = Query('search.upsert_pg', '''
+    INSERT INTO search_index (doc_type, doc_id, document)
+    VALUES (?, ?, setweight(to_tsvector('simple', ?), 'A') || setweight(to_tsvector('simple', ?), 'B'))
+    ON CONFLICT (doc_type, doc_id) DO UPDATE SET document = EXCLUDED.document
+''')
+
+DELETE_PG = Query('search.delete_pg', 'DELETE FROM search_index WHERE doc_type = ? AND doc_id = ?')
+
+SEARCH_PG = Query('search.search_pg', '''
+    SELECT doc_type, doc_id FROM search_index, to_tsquery('simple', ?) query
+    WHERE document @@ query
+    ORDER BY ts_rank_cd(document, query) DESC, doc_type, doc_id DESC
+    LIMIT ? OFFSET ?
+''')
+
+UPSERT_FTS = Query('search.upsert_fts', 'INSERT OR REPLACE INTO search_index (rowid, title, body) VALUES (?, ?, ?)')
+
+DELETE_FTS = Query('search.delete_fts', 'DELETE FROM search_index WHERE rowid = ?')
+
+# Заголовок весит в 10 раз больше текста (как A/B на PostgreSQL)
+SEARCH_FTS = Query('search.search_fts', '''
+    SELECT rowid FROM search_index WHERE search_index MATCH ?
+    ORDER BY bm25(search_index, 10.0, 1.0), rowid DESC
+    LIMIT ? OFFSET ?
+''')
+
+
+def work_document(work):
+    """(заголовок, текст) работы для индекса: предмет, тип и название — заголовок"""
+    title = ' '.join(str(work.get(field) or '') for field in ('subject', 'type', 'title'))
+    return title, work.get('description') or ''
+
+
+def news_document(news):
+    """(заголовок, текст) новости для индекса"""
+    return news.get('title') or '', strip_tags(news.get('content'))
+
+
+def index_document(cursor, doc_type, doc_id, title, body):
+    """Добавляет или заменяет документ в индексе"""
+    title, body = fold(title), fold(body)
+    if cursor_dialect(cursor) == POSTGRESQL:
+        execute(cursor, UPSERT_PG, (doc_type, doc_id, title, body))
+    else:
+        execute(cursor, UPSERT_FTS, (doc_id * DOC_TYPE_SLOTS + DOC_TYPE_CODES[doc_type], title, body))
+
+
+def remove_document(cursor, doc_type, doc_id):
+    """Удаляет документ из индекса"""
+    if cursor_dialect(cursor) == POSTGRESQL:
+        execute(cursor, DELETE_PG, (doc_type, doc_id))
+    else:
+        execute(cursor, DELETE_FTS, (doc_id * DOC_TYPE_SLOTS + DOC_TYPE_CODES[doc_type],))
+
+
+def search_documents(cursor, terms, limit, offset=0):
+    """
+    Документы, содержащие все слова (как префиксы), по убыванию релевантности
+
+    Args:
+        terms (list): Слова запроса из utils.text.search_terms
+        limit (int): Сколько документов вернуть
+        offset (int): Сколько пропустить
+
+    Returns:
+        list: [(тип документа, id), ...]
+    """
+    if not terms:
+        return []
+
+    if cursor_dialect(cursor) == POSTGRESQL:
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        execute(cursor, SEARCH_PG, (tsquery, limit, offset))
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+
+    match = ' '.join(f'"{term}"*' for term in terms)
+    execute(cursor, SEARCH_FTS, (match, limit, offset))
+    types = {code: doc_type for doc_type, code in DOC_TYPE_CODES.items()}
+    return [(types[row[0] % DOC_TYPE_SLOTS], row[0] // DOC_TYPE_SLOTS) for row in cursor.fetchall()]
@@ -2,72 +2,53 @@
 Модель для работы с предметами (subjects)
 """
 from datetime import datetime
-from models.database import get_db_connection, is_postgresql_connection
+from models.data_versions import bump_versions, invalidate_local, register_invalidator
+from models.database import get_db_connection
+from models.queries import Query, execute, fetch_all, fetch_one
+from models.search import DOC_WORK, remove_document
+from models.work import DEADLINE_INDEX, DELETE_SUBJECT_WORK, work_datasets
+from utils.cache import cached
 
 
-def init_subjects_table():
-    """Инициализирует таблицу предметов"""
+SELECT_SUBJECTS = Query('subjects.select_all', 'SELECT * FROM subjects ORDER BY name')
+
+SELECT_SUBJECT_BY_NAME = Query('subjects.select_by_name', 'SELECT * FROM subjects WHERE name = ?')
+
+SELECT_SUBJECT_NAME = Query('subjects.select_name', 'SELECT name FROM subjects WHERE id = ?')
+
+INSERT_SUBJECT = Query('subjects.insert', '''
+    INSERT INTO subjects (name, color, created_date, description) VALUES (?, ?, ?, ?)
+''')
+
+UPDATE_SUBJECT = Query('subjects.update', '''
+    UPDATE subjects SET name = ?, color = ?, description = ? WHERE id = ?
+''')
+
+DELETE_SUBJECT = Query('subjects.delete', 'DELETE FROM subjects WHERE id = ?')
+
+
+@cached()
+def _fetch_subjects():
+    """Все предметы из БД (кешируется, сбрасывается через data_versions)"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        if is_postgresql_connection(conn):
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS subjects (
-                    id SERIAL PRIMARY KEY,
-                    name TEXT UNIQUE NOT NULL,
-                    color TEXT DEFAULT '#4361ee',
-                    created_date TEXT,
-                    description TEXT
-                )
-            ''')
-        else:
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS subjects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    color TEXT DEFAULT '#4361ee',
-                    created_date TEXT,
-                    description TEXT
-                )
-            ''')
-        
-        conn.commit()
-        print("✅ Subjects table initialized")
-    except Exception as e:
-        print(f"❌ Error initializing subjects table: {e}")
-        conn.rollback()
+        cursor = conn.cursor()
+        execute(cursor, SELECT_SUBJECTS)
+        return fetch_all(cursor)
     finally:
         conn.close()
 
 
+register_invalidator('subjects', _fetch_subjects.cache_clear)
+
+
 def load_subjects():
     """Загружает все предметы"""
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM subjects ORDER BY name')
-        
-        if is_postgresql_connection(conn):
-            subjects_data = cursor.fetchall()
-            subjects = []
-            for row in subjects_data:
-                subjects.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'color': row[2],
-                    'created_date': row[3],
-                    'description': row[4] if len(row) > 4 else ''
-                })
-            return subjects
-        else:
-            subjects = cursor.fetchall()
-            return [dict(subject) for subject in subjects]
+        return _fetch_subjects()
     except Exception as e:
         print(f"❌ Error loading subjects: {e}")
         return []
-    finally:
-        conn.close()
 
 
 def save_subject(name, color, description=''):
@@ -77,18 +58,11 @@ def save_subject(name, color, description=''):
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                'INSERT INTO subjects (name, color, created_date, description) VALUES (%s, %s, %s, %s)',
-                (name, color, current_time, description)
-            )
-        else:
-            cursor.execute(
-                'INSERT INTO subjects (name, color, created_date, description) VALUES (?, ?, ?, ?)',
-                (name, color, current_time, description)
-            )
+        execute(cursor, INSERT_SUBJECT, (name, color, current_time, description))
+        bump_versions(cursor, 'subjects')
         
         conn.commit()
+        invalidate_local('subjects')
         print(f"✅ Subject saved: {name}")
         return True
     except Exception as e:
@@ -106,27 +80,24 @@ def delete_subject(subject_id):
         cursor = conn.cursor()
         
         # Получаем имя предмета
-        if is_postgresql_connection(conn):
-            cursor.execute('SELECT name FROM subjects WHERE id = %s', (subject_id,))
-        else:
-            cursor.execute('SELECT name FROM subjects WHERE id = ?', (subject_id,))
-        
-        subject_result = cursor.fetchone()
+        execute(cursor, SELECT_SUBJECT_NAME, (subject_id,))
+        subject_result = fetch_one(cursor)
         
         if subject_result:
-            subject_name = subject_result[0] if is_postgresql_connection(conn) else subject_result['name']
+            subject_name = subject_result['name']
             
             # Удаляем связанные работы
-            if is_postgresql_connection(conn):
-                cursor.execute('DELETE FROM tests WHERE subject = %s', (subject_name,))
-                cursor.execute('DELETE FROM homework WHERE subject = %s', (subject_name,))
-                cursor.execute('DELETE FROM subjects WHERE id = %s', (subject_id,))
-            else:
-                cursor.execute('DELETE FROM tests WHERE subject = ?', (subject_name,))
-                cursor.execute('DELETE FROM homework WHERE subject = ?', (subject_name,))
-                cursor.execute('DELETE FROM subjects WHERE id = ?', (subject_id,))
+            datasets = ['subjects', *work_datasets(cursor, subject_name)]
+            work_ids = [work_id for (work_id,) in execute(cursor, DELETE_SUBJECT_WORK, (subject_name,)).fetchall()]
+            for work_id in work_ids:
+                remove_document(cursor, DOC_WORK, work_id)
+            execute(cursor, DELETE_SUBJECT, (subject_id,))
+            bump_versions(cursor, *datasets)
             
             conn.commit()
+            for work_id in work_ids:
+                DEADLINE_INDEX.discard(work_id)
+            invalidate_local(*datasets)
             print(f"✅ Subject '{subject_name}' deleted")
             return True
     except Exception as e:
@@ -142,25 +113,8 @@ def get_subject_details(subject_name):
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        
-        if is_postgresql_connection(conn):
-            cursor.execute('SELECT * FROM subjects WHERE name = %s', (subject_name,))
-        else:
-            cursor.execute('SELECT * FROM subjects WHERE name = ?', (subject_name,))
-        
-        subject = cursor.fetchone()
-        if subject:
-            if is_postgresql_connection(conn):
-                return {
-                    'id': subject[0],
-                    'name': subject[1],
-                    'color': subject[2],
-                    'created_date': subject[3],
-                    'description': subject[4] if len(subject) > 4 else ''
-                }
-            else:
-                return dict(subject)
-        return None
+        execute(cursor, SELECT_SUBJECT_BY_NAME, (subject_name,))
+        return fetch_one(cursor)
     except Exception as e:
         print(f"❌ Error getting subject details: {e}")
         return None
@@ -174,18 +128,11 @@ def update_subject(subject_id, name, color, description=''):
     try:
         cursor = conn.cursor()
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                'UPDATE subjects SET name = %s, color = %s, description = %s WHERE id = %s',
-                (name, color, description, subject_id)
-            )
-        else:
-            cursor.execute(
-                'UPDATE subjects SET name = ?, color = ?, description = ? WHERE id = ?',
-                (name, color, description, subject_id)
-            )
+        execute(cursor, UPDATE_SUBJECT, (name, color, description, subject_id))
+        bump_versions(cursor, 'subjects')
         
         conn.commit()
+        invalidate_local('subjects')
         print(f"✅ Subject updated: {name}")
         return True
     except Exception as e:
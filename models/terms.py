@@ -2,77 +2,42 @@
 Модель для условий использования (Terms)
 """
 from datetime import datetime
-from models.database import get_db_connection, is_postgresql_connection
+from models.data_versions import bump_versions, invalidate_local, register_invalidator
+from models.database import get_db_connection
+from models.queries import Query, execute, fetch_value
+from utils.cache import cached
 
 
-def init_terms_table():
-    """Инициализирует таблицу условий использования"""
+SELECT_LATEST_TERMS = Query('terms.select_latest', 'SELECT content FROM terms ORDER BY id DESC LIMIT 1')
+
+INSERT_TERMS = Query('terms.insert', 'INSERT INTO terms (content, updated_date) VALUES (?, ?)')
+
+
+DEFAULT_TERMS = 'Šeit būs lietošanas noteikumi...'
+
+
+@cached()
+def _fetch_terms():
+    """Актуальные условия из БД (кешируется, сбрасывается через data_versions)"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        if is_postgresql_connection(conn):
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS terms (
-                    id SERIAL PRIMARY KEY,
-                    content TEXT NOT NULL,
-                    updated_date TEXT
-                )
-            ''')
-        else:
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS terms (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content TEXT NOT NULL,
-                    updated_date TEXT
-                )
-            ''')
-        
-        # Добавляем начальные данные
-        cursor.execute('SELECT COUNT(*) FROM terms')
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-            if is_postgresql_connection(conn):
-                cursor.execute(
-                    'INSERT INTO terms (content, updated_date) VALUES (%s, %s)',
-                    ('Šeit būs lietošanas noteikumi...', current_time)
-                )
-            else:
-                cursor.execute(
-                    'INSERT INTO terms (content, updated_date) VALUES (?, ?)',
-                    ('Šeit būs lietošanas noteikumi...', current_time)
-                )
-        
-        conn.commit()
-        print("✅ Terms table initialized")
-    except Exception as e:
-        print(f"❌ Error initializing terms table: {e}")
-        conn.rollback()
+        cursor = conn.cursor()
+        execute(cursor, SELECT_LATEST_TERMS)
+        return fetch_value(cursor, DEFAULT_TERMS)
     finally:
         conn.close()
 
 
+register_invalidator('terms', _fetch_terms.cache_clear)
+
+
 def load_terms():
     """Загружает условия использования"""
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT content FROM terms ORDER BY id DESC LIMIT 1')
-        terms = cursor.fetchone()
-        
-        if terms:
-            if is_postgresql_connection(conn):
-                return terms[0]
-            else:
-                return terms['content']
-        return 'Šeit būs lietošanas noteikumi...'
+        return _fetch_terms()
     except Exception as e:
         print(f"❌ Error loading terms: {e}")
-        return 'Šeit būs lietošanas noteikumi...'
-    finally:
-        conn.close()
+        return DEFAULT_TERMS
 
 
 def save_terms(content):
@@ -82,18 +47,11 @@ def save_terms(content):
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                'INSERT INTO terms (content, updated_date) VALUES (%s, %s)',
-                (content, current_time)
-            )
-        else:
-            cursor.execute(
-                'INSERT INTO terms (content, updated_date) VALUES (?, ?)',
-                (content, current_time)
-            )
+        execute(cursor, INSERT_TERMS, (content, current_time))
+        bump_versions(cursor, 'terms')
         
         conn.commit()
+        invalidate_local('terms')
         print("✅ Terms saved")
         return True
     except Exception as e:
@@ -2,78 +2,48 @@
 Модель для обновлений (Updates)
 """
 from datetime import datetime
-from models.database import get_db_connection, is_postgresql_connection
+from models.data_versions import bump_versions, invalidate_local, register_invalidator
+from models.database import get_db_connection
+from models.queries import Query, execute, fetch_all
+from utils.cache import cached
 
 
-def init_updates_table():
-    """Инициализирует таблицу обновлений"""
+SELECT_UPDATES = Query('updates.select_all', 'SELECT * FROM updates ORDER BY date DESC')
+
+INSERT_UPDATE = Query('updates.insert', '''
+    INSERT INTO updates (title, content, date, is_active, created_date) VALUES (?, ?, ?, ?, ?)
+''')
+
+UPDATE_UPDATE = Query('updates.update', '''
+    UPDATE updates SET title = ?, content = ?, date = ?,
+           is_active = ?, updated_date = ? WHERE id = ?
+''')
+
+DELETE_UPDATE = Query('updates.delete', 'DELETE FROM updates WHERE id = ?')
+
+
+@cached()
+def _fetch_updates():
+    """Все обновления из БД (кешируется, сбрасывается через data_versions)"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        if is_postgresql_connection(conn):
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS updates (
-                    id SERIAL PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_date TEXT,
-                    updated_date TEXT
-                )
-            ''')
-        else:
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS updates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    is_active BOOLEAN DEFAULT 1,
-                    created_date TEXT,
-                    updated_date TEXT
-                )
-            ''')
-        
-        conn.commit()
-        print("✅ Updates table initialized")
-    except Exception as e:
-        print(f"❌ Error initializing updates table: {e}")
-        conn.rollback()
+        cursor = conn.cursor()
+        execute(cursor, SELECT_UPDATES)
+        return fetch_all(cursor)
     finally:
         conn.close()
 
 
+register_invalidator('updates', _fetch_updates.cache_clear)
+
+
 def load_updates():
     """Загружает все обновления"""
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM updates ORDER BY date DESC')
-        
-        if is_postgresql_connection(conn):
-            updates_data = cursor.fetchall()
-            updates = []
-            for row in updates_data:
-                updates.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'content': row[2],
-                    'date': row[3],
-                    'is_active': row[4],
-                    'created_date': row[5],
-                    'updated_date': row[6] if len(row) > 6 else None
-                })
-            return updates
-        else:
-            updates = cursor.fetchall()
-            return [dict(update) for update in updates]
+        return _fetch_updates()
     except Exception as e:
         print(f"❌ Error loading updates: {e}")
         return []
-    finally:
-        conn.close()
 
 
 def save_update(title, content, date, is_active):
@@ -83,18 +53,11 @@ def save_update(title, content, date, is_active):
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                'INSERT INTO updates (title, content, date, is_active, created_date) VALUES (%s, %s, %s, %s, %s)',
-                (title, content, date, is_active, current_time)
-            )
-        else:
-            cursor.execute(
-                'INSERT INTO updates (title, content, date, is_active, created_date) VALUES (?, ?, ?, ?, ?)',
-                (title, content, date, is_active, current_time)
-            )
+        execute(cursor, INSERT_UPDATE, (title, content, date, is_active, current_time))
+        bump_versions(cursor, 'updates')
         
         conn.commit()
+        invalidate_local('updates')
         print(f"✅ Update saved: {title}")
         return True
     except Exception as e:
@@ -112,20 +75,11 @@ def update_update(update_id, title, content, date, is_active):
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        if is_postgresql_connection(conn):
-            cursor.execute(
-                '''UPDATE updates SET title = %s, content = %s, date = %s, 
-                   is_active = %s, updated_date = %s WHERE id = %s''',
-                (title, content, date, is_active, current_time, update_id)
-            )
-        else:
-            cursor.execute(
-                '''UPDATE updates SET title = ?, content = ?, date = ?, 
-                   is_active = ?, updated_date = ? WHERE id = ?''',
-                (title, content, date, is_active, current_time, update_id)
-            )
+        execute(cursor, UPDATE_UPDATE, (title, content, date, is_active, current_time, update_id))
+        bump_versions(cursor, 'updates')
         
         conn.commit()
+        invalidate_local('updates')
         print(f"✅ Update updated: {update_id}")
         return True
     except Exception as e:
@@ -141,13 +95,11 @@ def delete_update(update_id):
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        
-        if is_postgresql_connection(conn):
-            cursor.execute('DELETE FROM updates WHERE id = %s', (update_id,))
-        else:
-            cursor.execute('DELETE FROM updates WHERE id = ?', (update_id,))
+        execute(cursor, DELETE_UPDATE, (update_id,))
+        bump_versions(cursor, 'updates')
         
         conn.commit()
+        invalidate_local('updates')
         print(f"✅ Update deleted: {update_id}")
         return True
     except Exception as e:
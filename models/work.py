@@ -0,0 +1,452 @@
+"""
+Модель для работы с единой таблицей work (тесты и домашние задания)
+
+У всех работ общий первичный ключ, поэтому поиск, изменение и удаление по id —
+один запрос по индексу. load_tests()/load_homework() — выборки по kind,
+закешированные в SnapshotCache (days_left считается при каждом чтении) и
+сбрасываемые во всех процессах через models.data_versions.
+
+Ближайшие дедлайны (upcoming_work) отвечает DEADLINE_INDEX — работы с
+дедлайном от начала сегодняшнего дня, отсортированные по deadline_at. Пока
+он холодный, те же запросы идут в БД по idx_work_deadline_at с LIMIT.
+Записи этого процесса переносятся в индекс построчно (строка из RETURNING),
+изменения других процессов сбрасывают его целиком.
+"""
+import threading
+from datetime import datetime, timedelta
+from functools import partial
+from config.settings import EXPORT_BATCH_SIZE
+from models.data_versions import bump_versions, invalidate_local, register_invalidator
+from models.database import get_db_connection
+from models.queries import Query, epoch_value, execute, fetch_all, fetch_one, fetch_value, iter_rows, streaming_cursor
+from models.search import DOC_WORK, index_document, remove_document, work_document
+from utils.cache import DeadlineIndex, SnapshotCache
+from utils.date_utils import compute_deadline_at, days_left_until, normalize_date_fields
+from utils.pagination import make_cursor
+
+
+KIND_TEST = 'test'
+KIND_HOMEWORK = 'homework'
+
+# Наборы данных models.data_versions для каждого вида работ
+DATASETS = {KIND_TEST: 'tests', KIND_HOMEWORK: 'homework'}
+
+SELECT_WORK_BY_KIND = Query('work.select_by_kind', 'SELECT * FROM work WHERE kind = ? ORDER BY date, time')
+
+SELECT_WORK_BY_ID = Query('work.select_by_id', 'SELECT * FROM work WHERE id = ?')
+
+INSERT_WORK = Query('work.insert', '''
+    INSERT INTO work (kind, subject, type, title, date, time, all_day, description, due_date, deadline_at, added_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING *
+''')
+
+UPDATE_WORK = Query('work.update', '''
+    UPDATE work SET subject = ?, type = ?, title = ?, date = ?, time = ?, all_day = ?, description = ?,
+           due_date = ?, deadline_at = ?
+    WHERE id = ?
+    RETURNING *
+''')
+
+DELETE_WORK = Query('work.delete', 'DELETE FROM work WHERE id = ? RETURNING kind')
+
+SELECT_SUBJECT_KINDS = Query('work.select_subject_kinds', 'SELECT DISTINCT kind FROM work WHERE subject = ?')
+
+# Календарь: число работ по дням, видам и предметам (диапазон по idx_work_date_time_id)
+COUNT_WORK_BY_DAY = Query('work.count_by_day', '''
+    SELECT date, kind, subject, COUNT(*) AS count FROM work
+    WHERE date >= ? AND date <= ?
+    GROUP BY date, kind, subject ORDER BY date
+''')
+
+# Ближайшие дедлайны (диапазон по idx_work_deadline_at, без сортировки)
+SELECT_UPCOMING_WORK = Query('work.select_upcoming', '''
+    SELECT * FROM work WHERE deadline_at >= ? ORDER BY deadline_at, id LIMIT ?
+''')
+
+SELECT_DUE_WORK = Query('work.select_due', '''
+    SELECT * FROM work WHERE deadline_at >= ? AND deadline_at < ? ORDER BY deadline_at, id LIMIT ?
+''')
+
+COUNT_UPCOMING_WORK = Query('work.count_upcoming', 'SELECT COUNT(*) FROM work WHERE deadline_at >= ?')
+
+COUNT_DUE_WORK = Query('work.count_due', 'SELECT COUNT(*) FROM work WHERE deadline_at >= ? AND deadline_at < ?')
+
+SELECT_FUTURE_WORK = Query('work.select_future', '''
+    SELECT * FROM work WHERE deadline_at >= ? ORDER BY deadline_at, id
+''')
+
+DELETE_SUBJECT_WORK = Query('work.delete_by_subject', 'DELETE FROM work WHERE subject = ? RETURNING id')
+
+# Условия, из которых собирается запрос find_work() (в этом порядке)
+WORK_FILTERS = (
+    ('kind', 'kind = ?'),
+    ('subject', 'subject = ?'),
+    ('date_from', 'date >= ?'),
+    ('date_to', 'date <= ?'),
+)
+
+_page_queries = {}
+_page_queries_lock = threading.Lock()
+
+
+def _add_days_left(work, now=None):
+    """days_left считается от готового deadline_at, без парсинга дат"""
+    work['days_left'] = days_left_until(work['deadline_at'], now)
+    return work
+
+
+def _prepare_row(work, now=None):
+    """Приводит даты строки к единому виду и добавляет days_left"""
+    normalize_date_fields(work)
+    return _add_days_left(work, now)
+
+
+def _fetch_kind(kind):
+    """Все работы одного вида из БД (без полей, зависящих от времени)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_WORK_BY_KIND, (kind,))
+        rows = [normalize_date_fields(work) for work in fetch_all(cursor)]
+        print(f"✅ Loaded {len(rows)} work items ({kind})")
+        return rows
+    finally:
+        conn.close()
+
+
+WORK_CACHES = {
+    kind: SnapshotCache(f'work.{kind}', partial(_fetch_kind, kind), decorate=_add_days_left)
+    for kind in (KIND_TEST, KIND_HOMEWORK)
+}
+
+for _kind, _cache in WORK_CACHES.items():
+    register_invalidator(DATASETS[_kind], _cache.invalidate)
+
+
+def _fetch_future(since):
+    """Работы с дедлайном не раньше since, по возрастанию дедлайна"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_FUTURE_WORK, (epoch_value(cursor, since),))
+        rows = [normalize_date_fields(work) for work in fetch_all(cursor)]
+        print(f"✅ Loaded {len(rows)} upcoming deadlines")
+        return rows
+    finally:
+        conn.close()
+
+
+DEADLINE_INDEX = DeadlineIndex('work.deadlines', _fetch_future,
+                               key=lambda work: work['deadline_at'], decorate=_add_days_left)
+
+for _dataset in DATASETS.values():
+    register_invalidator(_dataset, DEADLINE_INDEX.invalidate, own_writes=False)
+
+
+def work_datasets(cursor, subject):
+    """Наборы данных, затрагиваемые изменением работ предмета (до удаления)"""
+    execute(cursor, SELECT_SUBJECT_KINDS, (subject,))
+    return [DATASETS[row[0]] for row in cursor.fetchall()]
+
+
+def load_work(kind):
+    """
+    Загружает все работы одного вида (через кеш снимков)
+
+    Args:
+        kind (str): KIND_TEST или KIND_HOMEWORK
+
+    Returns:
+        list: Новые копии строк, отсортированные по дате и времени
+    """
+    return WORK_CACHES[kind].get()
+
+
+def _page_query(filters, keyset, descending, limited):
+    """
+    Запрос страницы работ для набора фильтров
+
+    Для каждой комбинации фильтров текст собирается один раз и регистрируется
+    как обычный Query, поэтому на PostgreSQL он тоже становится prepared statement.
+    """
+    key = (filters, keyset, descending, limited)
+    query = _page_queries.get(key)
+    if query is not None:
+        return query
+
+    direction = 'DESC' if descending else 'ASC'
+    conditions = [sql for name, sql in WORK_FILTERS if name in filters]
+    if keyset:
+        conditions.append('(date, time, id) < (?, ?, ?)' if descending else '(date, time, id) > (?, ?, ?)')
+
+    sql = 'SELECT * FROM work'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += f' ORDER BY date {direction}, time {direction}, id {direction}'
+    if limited:
+        sql += ' LIMIT ?'
+
+    name = 'work.select_page:' + ','.join(
+        list(filters) + (['after'] if keyset else []) + (['desc'] if descending else []) + (['limit'] if limited else [])
+    )
+    with _page_queries_lock:
+        query = _page_queries.setdefault(key, Query(name, sql))
+    return query
+
+
+def find_work(kind=None, subject=None, date_from=None, date_to=None, after=None, limit=None, descending=False):
+    """
+    Выборка работ с фильтрами, сортировкой и keyset-пагинацией на стороне БД
+
+    Args:
+        kind (str, optional): KIND_TEST или KIND_HOMEWORK
+        subject (str, optional): Предмет
+        date_from, date_to (str, optional): Границы даты 'YYYY-MM-DD' (включительно)
+        after (tuple, optional): Ключ (date, time, id) последней строки предыдущей страницы
+        limit (int, optional): Размер страницы (None — все строки)
+        descending (bool): Сначала поздние работы
+
+    Returns:
+        tuple: (список работ, курсор следующей страницы или None)
+    """
+    values = {'kind': kind, 'subject': subject, 'date_from': date_from, 'date_to': date_to}
+    filters = tuple(name for name, _ in WORK_FILTERS if values[name])
+
+    params = [values[name] for name in filters]
+    if after:
+        params.extend(after)
+    if limit:
+        # Лишняя строка показывает, есть ли следующая страница
+        params.append(limit + 1)
+
+    query = _page_query(filters, bool(after), descending, bool(limit))
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, query, tuple(params))
+
+        now = datetime.now()
+        items = [_prepare_row(work, now) for work in fetch_all(cursor)]
+    finally:
+        conn.close()
+
+    next_cursor = None
+    if limit and len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = make_cursor(last['date'], last['time'], last['id'])
+    return items, next_cursor
+
+
+def iter_work(kind=None, subject=None, date_from=None, date_to=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Все работы с фильтрами find_work() по одной, без загрузки всего результата
+
+    Строки читаются курсором models.queries.streaming_cursor порциями по
+    batch_size, поэтому память не зависит от числа работ (экспорт). Внутри
+    запроса Flask генератор нужно оборачивать в stream_with_context.
+
+    Yields:
+        dict: Работа (как в find_work)
+    """
+    values = {'kind': kind, 'subject': subject, 'date_from': date_from, 'date_to': date_to}
+    filters = tuple(name for name, _ in WORK_FILTERS if values[name])
+    query = _page_query(filters, False, False, False)
+
+    conn = get_db_connection()
+    cursor = streaming_cursor(conn, 'work_export')
+    try:
+        execute(cursor, query, tuple(values[name] for name in filters))
+        now = datetime.now()
+        for work in iter_rows(cursor, batch_size):
+            yield _prepare_row(work, now)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def upcoming_work(limit=1, within_days=None):
+    """
+    Ближайшие работы: дедлайн сегодня или позже, по возрастанию дедлайна
+
+    Отвечает DEADLINE_INDEX за O(log n); пока он холодный — запрос к БД
+    с LIMIT по idx_work_deadline_at (индекс тем временем загружается в фоне).
+
+    Args:
+        limit (int): Сколько работ вернуть
+        within_days (int, optional): Только со сроком не позже чем через
+            столько календарных дней (0 — сегодня)
+
+    Returns:
+        tuple: (список работ, сколько всего работ подходит)
+    """
+    since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    until = since + timedelta(days=within_days + 1) if within_days is not None else None
+
+    result = (DEADLINE_INDEX.upcoming(since, limit) if until is None
+              else DEADLINE_INDEX.between(since, until, limit))
+    if result is not None:
+        return result
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        start = epoch_value(cursor, since)
+        if until is None:
+            execute(cursor, SELECT_UPCOMING_WORK, (start, limit))
+            rows = fetch_all(cursor)
+            execute(cursor, COUNT_UPCOMING_WORK, (start,))
+        else:
+            end = epoch_value(cursor, until)
+            execute(cursor, SELECT_DUE_WORK, (start, end, limit))
+            rows = fetch_all(cursor)
+            execute(cursor, COUNT_DUE_WORK, (start, end))
+        total = fetch_value(cursor)
+    finally:
+        conn.close()
+
+    now = datetime.now()
+    return [_prepare_row(work, now) for work in rows], total
+
+
+def count_work_by_day(date_from, date_to):
+    """
+    Число работ по дням в диапазоне дат (агрегируется в БД)
+
+    Args:
+        date_from, date_to (str): Границы 'YYYY-MM-DD' (включительно)
+
+    Returns:
+        list: [{'date', 'kind', 'subject', 'count'}, ...] по возрастанию даты
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, COUNT_WORK_BY_DAY, (date_from, date_to))
+        return [normalize_date_fields(row) for row in fetch_all(cursor)]
+    finally:
+        conn.close()
+
+
+def get_work_item(work_id):
+    """Получает работу любого вида по ID (один запрос по первичному ключу)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        execute(cursor, SELECT_WORK_BY_ID, (work_id,))
+        work = fetch_one(cursor)
+        return _prepare_row(work) if work else None
+    except Exception as e:
+        print(f"❌ Error loading work {work_id}: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def save_work_item(kind, subject, work_type, title, date, time, description, due_date=None):
+    """
+    Сохраняет новую работу
+
+    Returns:
+        bool: True если успешно
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+        # Без времени — работа на весь день, дедлайн в конце дня
+        all_day = not time
+        if all_day:
+            time = '23:59'
+        due_date = due_date or None
+        deadline_at = epoch_value(cursor, compute_deadline_at(date, time, due_date))
+
+        execute(cursor, INSERT_WORK,
+                (kind, subject, work_type, title, date, time, all_day, description, due_date, deadline_at, current_time))
+        work = normalize_date_fields(fetch_one(cursor))
+        index_document(cursor, DOC_WORK, work['id'], *work_document(work))
+        bump_versions(cursor, DATASETS[kind])
+
+        conn.commit()
+        DEADLINE_INDEX.put(work)
+        invalidate_local(DATASETS[kind])
+        return True
+    except Exception as e:
+        print(f"❌ Error saving {kind}: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def update_work_item(work_id, subject, work_type, title, date, time, description, due_date=None):
+    """
+    Обновляет работу по ID
+
+    Returns:
+        bool: True если работа найдена и обновлена
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        all_day = not time
+        if all_day:
+            time = '23:59'
+        due_date = due_date or None
+        deadline_at = epoch_value(cursor, compute_deadline_at(date, time, due_date))
+
+        execute(cursor, UPDATE_WORK,
+                (subject, work_type, title, date, time, all_day, description, due_date, deadline_at, work_id))
+        work = fetch_one(cursor)
+        if work is None:
+            conn.rollback()
+            return False
+        normalize_date_fields(work)
+        index_document(cursor, DOC_WORK, work_id, *work_document(work))
+        bump_versions(cursor, DATASETS[work['kind']])
+
+        conn.commit()
+        print(f"✅ Work updated: {work_id}")
+        DEADLINE_INDEX.put(work)
+        invalidate_local(DATASETS[work['kind']])
+        return True
+    except Exception as e:
+        print(f"❌ Error updating work {work_id}: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def delete_work_item(work_id):
+    """
+    Удаляет работу по ID
+
+    Returns:
+        bool: True если работа существовала и удалена
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        row = execute(cursor, DELETE_WORK, (work_id,)).fetchone()
+        if row is None:
+            conn.rollback()
+            return False
+        remove_document(cursor, DOC_WORK, work_id)
+        bump_versions(cursor, DATASETS[row[0]])
+
+        conn.commit()
+        print(f"✅ Work deleted: {work_id}")
+        DEADLINE_INDEX.discard(work_id)
+        invalidate_local(DATASETS[row[0]])
+        return True
+    except Exception as e:
+        print(f"❌ Error deleting work {work_id}: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
@@ -1,14 +1,16 @@
 """
 Защищенные маршруты (доступные только хосту)
 """
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, g, render_template, request, redirect, url_for, session, flash
 from datetime import datetime
-from models.subjects import load_subjects, save_subject, delete_subject
-from models.tests import load_tests, save_test, delete_test
-from models.homework import load_homework, save_homework, delete_homework
-from models.news import load_news, save_news, delete_news, update_news
-from models.terms import load_terms, save_terms
-from models.updates import load_updates, save_update, delete_update, update_update
+from models.subjects import save_subject, delete_subject
+from models.tests import save_test, update_test, delete_test
+from models.homework import save_homework, update_homework, delete_homework
+from models.work import KIND_TEST, KIND_HOMEWORK, find_work, get_work_item
+from models.news import save_news, delete_news, update_news
+from models.terms import save_terms
+from models.updates import save_update, delete_update, update_update
+from services.image_service import save_upload, process_upload_async
 from utils.auth import is_host, login_required
 
 admin_bp = Blueprint('admin', __name__)
@@ -63,16 +65,16 @@ def register():
 @login_required
 def dashboard():
     """Главная панель администратора"""
-    tests = load_tests()
-    homework_list = load_homework()
-    subjects = load_subjects()
-    news_list = load_news()
-    updates_list = load_updates()
+    tests = g.data.tests
+    homework_list = g.data.homework
+    subjects = g.data.subjects
+    news_list = g.data.news
+    updates_list = g.data.updates
     
     # Статистика
-    today = datetime.now().date()
-    upcoming_tests = [t for t in tests if t.get('date', '') >= today.strftime('%Y-%m-%d')]
-    upcoming_homework = [h for h in homework_list if h.get('date', '') >= today.strftime('%Y-%m-%d')]
+    today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+    upcoming_tests = [t for t in tests if t.get('deadline_at') and t['deadline_at'] >= today_start]
+    upcoming_homework = [h for h in homework_list if h.get('deadline_at') and h['deadline_at'] >= today_start]
     
     stats = {
         'total_works': len(tests) + len(homework_list),
@@ -89,7 +91,7 @@ def dashboard():
     
     return render_template(
         'pages/admin/dashboard.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         stats=stats,
         is_host=True
     )
@@ -101,8 +103,8 @@ def analytics():
     """Аналитика и статистика"""
     from services.subject_service import get_subjects_with_work_count
     
-    tests = load_tests()
-    homework_list = load_homework()
+    tests = g.data.tests
+    homework_list = g.data.homework
     subjects = get_subjects_with_work_count()
     
     # Расчёт аналитики
@@ -114,7 +116,7 @@ def analytics():
     from datetime import timedelta
     
     daily_stats = defaultdict(int)
-    for work in tests + homework_list:
+    for work in g.data.all_work:
         work_date = work.get('date')
         if work_date:
             daily_stats[work_date] += 1
@@ -133,7 +135,7 @@ def analytics():
     
     return render_template(
         'pages/admin/analytics.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         analytics=analytics_data,
         is_host=True
     )
@@ -145,10 +147,10 @@ def analytics():
 @login_required
 def add_test():
     """Добавить тест"""
-    subjects = load_subjects()
+    subjects = g.data.subjects
     
     if request.method == 'POST':
-        time_value = request.form.get('time', '23:59')
+        time_value = request.form.get('time', '')
         due_date = request.form.get('due_date')
         
         save_test(
@@ -165,7 +167,7 @@ def add_test():
     min_date = datetime.now().strftime('%Y-%m-%d')
     return render_template(
         'pages/admin/add_work.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         min_date=min_date,
         subjects=subjects,
         work_type='test',
@@ -177,15 +179,13 @@ def add_test():
 @login_required
 def manage_tests():
     """Управление тестами"""
-    tests = load_tests()
-    subjects = load_subjects()
-    
-    # Сортировка по дате
-    tests.sort(key=lambda x: x.get('date', ''), reverse=True)
+    # Сначала новые — сортировка в БД
+    tests, _ = find_work(kind=KIND_TEST, descending=True)
+    subjects = g.data.subjects
     
     return render_template(
         'pages/admin/manage_tests.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         tests=tests,
         subjects=subjects,
         is_host=True
@@ -207,10 +207,10 @@ def delete_test_route(test_id):
 @login_required
 def add_homework_route():
     """Добавить домашнее задание"""
-    subjects = load_subjects()
+    subjects = g.data.subjects
     
     if request.method == 'POST':
-        time_value = request.form.get('time', '23:59')
+        time_value = request.form.get('time', '')
         due_date = request.form.get('due_date')
         
         save_homework(
@@ -227,7 +227,7 @@ def add_homework_route():
     min_date = datetime.now().strftime('%Y-%m-%d')
     return render_template(
         'pages/admin/add_work.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         min_date=min_date,
         subjects=subjects,
         work_type='homework',
@@ -239,15 +239,13 @@ def add_homework_route():
 @login_required
 def manage_homework():
     """Управление домашними заданиями"""
-    homework_list = load_homework()
-    subjects = load_subjects()
-    
-    # Сортировка по дате
-    homework_list.sort(key=lambda x: x.get('date', ''), reverse=True)
+    # Сначала новые — сортировка в БД
+    homework_list, _ = find_work(kind=KIND_HOMEWORK, descending=True)
+    subjects = g.data.subjects
     
     return render_template(
         'pages/admin/manage_homework.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         homework=homework_list,
         subjects=subjects,
         is_host=True
@@ -282,7 +280,7 @@ def add_subject():
     
     return render_template(
         'pages/admin/edit_subject.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         subject=None,
         is_host=True
     )
@@ -313,7 +311,7 @@ def edit_subject(subject_id):
     
     return render_template(
         'pages/admin/edit_subject.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         subject=subject,
         is_host=True
     )
@@ -323,22 +321,18 @@ def edit_subject(subject_id):
 @login_required
 def manage_subjects():
     """Управление предметами"""
-    subjects = load_subjects()
+    subjects = g.data.subjects
     
     # Добавляем количество работ для каждого предмета
-    tests = load_tests()
-    homework_list = load_homework()
-    all_work = tests + homework_list
-    
     for subject in subjects:
         subject['work_count'] = sum(
-            1 for work in all_work 
+            1 for work in g.data.all_work 
             if work.get('subject') == subject['name']
         )
     
     return render_template(
         'pages/admin/manage_subjects.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         subjects=subjects,
         is_host=True
     )
@@ -360,24 +354,11 @@ def delete_subject_route(subject_id):
 def manage_news():
     """Управление новостями"""
     if request.method == 'POST':
-        from werkzeug.utils import secure_filename
-        import uuid
-        import os
-        
         image_url = ''
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename != '':
-                filename = secure_filename(file.filename)
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                upload_dir = 'static/uploads'
-                
-                # Создаем директорию если её нет
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                file_path = os.path.join(upload_dir, unique_filename)
-                file.save(file_path)
-                image_url = f"/static/uploads/{unique_filename}"
+                image_url = save_upload(file)
         
         save_news(
             request.form.get('title'),
@@ -386,16 +367,18 @@ def manage_news():
             image_url,
             request.form.get('is_active') == 'on'
         )
+        # Варианты и заглушка делаются в фоне, после сохранения новости
+        if image_url:
+            process_upload_async(image_url)
         flash('Ziņa pievienota!', 'success')
         return redirect('/admin/news')
     
-    news_list = load_news()
-    news_list.sort(key=lambda x: x.get('date', ''), reverse=True)
+    news_list = sorted(g.data.news, key=lambda x: x.get('date', ''), reverse=True)
     min_date = datetime.now().strftime('%Y-%m-%d')
     
     return render_template(
         'pages/admin/manage_news.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         news=news_list,
         min_date=min_date,
         is_host=True
@@ -409,33 +392,25 @@ def edit_news(news_id):
     from models.news import get_news_by_id
     
     if request.method == 'POST':
-        from werkzeug.utils import secure_filename
-        import uuid
-        import os
-        
         image_url = request.form.get('existing_image', '')
+        uploaded_url = ''
         
-        # Новое изображение
+        # Новое изображение (старое без ссылок удалит сборщик мусора)
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename != '':
-                filename = secure_filename(file.filename)
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                upload_dir = 'static/uploads'
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                file_path = os.path.join(upload_dir, unique_filename)
-                file.save(file_path)
-                image_url = f"/static/uploads/{unique_filename}"
+                uploaded_url = save_upload(file)
         
         update_news(
             news_id,
             request.form.get('title'),
             request.form.get('content'),
             request.form.get('date'),
-            image_url,
+            uploaded_url or image_url,
             request.form.get('is_active') == 'on'
         )
+        if uploaded_url:
+            process_upload_async(uploaded_url)
         flash('Ziņa atjaunināta!', 'success')
         return redirect('/admin/news')
     
@@ -447,7 +422,7 @@ def edit_news(news_id):
     
     return render_template(
         'pages/admin/manage_news.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         news_item=news,
         min_date=datetime.now().strftime('%Y-%m-%d'),
         is_host=True
@@ -479,13 +454,12 @@ def manage_updates():
         flash('Atjauninājums pievienots!', 'success')
         return redirect('/admin/updates')
     
-    updates_list = load_updates()
-    updates_list.sort(key=lambda x: x.get('date', ''), reverse=True)
+    updates_list = sorted(g.data.updates, key=lambda x: x.get('date', ''), reverse=True)
     min_date = datetime.now().strftime('%Y-%m-%d')
     
     return render_template(
         'pages/admin/manage_news.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         updates=updates_list,
         min_date=min_date,
         is_host=True
@@ -517,7 +491,7 @@ def edit_update(update_id):
     
     return render_template(
         'pages/admin/manage_news.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         update_item=update,
         min_date=datetime.now().strftime('%Y-%m-%d'),
         is_host=True
@@ -539,34 +513,23 @@ def delete_update_route(update_id):
 @login_required
 def edit_work(work_id):
     """Редактировать работу (тест или ДЗ)"""
-    # Пробуем найти в тестах
-    tests = load_tests()
-    work = next((t for t in tests if t.get('id') == work_id), None)
-    work_type = 'test'
-    
-    # Если нет в тестах, ищем в домашних заданиях
-    if not work:
-        homework_list = load_homework()
-        work = next((h for h in homework_list if h.get('id') == work_id), None)
-        work_type = 'homework'
+    work = get_work_item(work_id)
     
     if not work:
         flash('Darbs nav atrasts!', 'error')
         return redirect('/all')
     
-    subjects = load_subjects()
+    work_type = work['kind']
+    subjects = g.data.subjects
     
     if request.method == 'POST':
-        from models.tests import update_test
-        from models.homework import update_homework
-        
-        if work_type == 'test':
+        if work_type == KIND_TEST:
             update_test(
                 work_id,
                 request.form.get('subject'),
                 request.form.get('type'),
                 request.form.get('date'),
-                request.form.get('time', '23:59'),
+                request.form.get('time', ''),
                 request.form.get('description', ''),
                 request.form.get('due_date')
             )
@@ -576,7 +539,7 @@ def edit_work(work_id):
                 request.form.get('subject'),
                 request.form.get('title'),
                 request.form.get('date'),
-                request.form.get('time', '23:59'),
+                request.form.get('time', ''),
                 request.form.get('description', ''),
                 request.form.get('due_date')
             )
@@ -586,7 +549,7 @@ def edit_work(work_id):
     
     return render_template(
         'pages/admin/edit_work.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         work=work,
         work_type=work_type,
         subjects=subjects,
@@ -2,13 +2,19 @@
 API маршруты для AJAX запросов
 Комбинированная версия со всеми эндпоинтами
 """
-from flask import Blueprint, jsonify, request, session
-from datetime import datetime
-from models.subjects import load_subjects, update_subject
-from models.tests import load_tests, save_test, delete_test
-from models.homework import load_homework, save_homework, delete_homework
-from models.news import load_news
+import os
+from flask import Blueprint, current_app, g, jsonify, request, send_file, session, stream_with_context
+from datetime import datetime, timedelta
+from models.subjects import update_subject
+from models.tests import save_test
+from models.homework import save_homework
+from models.work import count_work_by_day, find_work, get_work_item, delete_work_item, upcoming_work
+from models.news import load_news_page
+from models.database import get_pool_stats
 from utils.auth import is_host, login_required
+from utils.cache import cache_stats
+from utils.http_cache import conditional
+from utils.pagination import cursor_date, cursor_time, parse_cursor, parse_limit
 from services.theme_service import save_user_theme, save_custom_theme
 
 api_bp = Blueprint('api', __name__)
@@ -23,22 +29,20 @@ def status():
         'success': True,
         'status': 'online',
         'timestamp': datetime.now().isoformat(),
-        'is_host': is_host()
+        'is_host': is_host(),
+        'database': get_pool_stats(),
+        'db_round_trips': g.data.db_round_trips,
+        'cache': cache_stats()
     })
 
 
 @api_bp.route('/stats', methods=['GET'])
+@conditional('tests', 'homework', 'subjects', max_age=60)
 def get_stats():
     """Получить общую статистику"""
-    tests = load_tests()
-    homework_list = load_homework()
-    subjects = load_subjects()
-    
-    today = datetime.now().date()
-    today_work = [
-        w for w in tests + homework_list 
-        if w.get('date') == today.strftime('%Y-%m-%d')
-    ]
+    tests = g.data.tests
+    homework_list = g.data.homework
+    subjects = g.data.subjects
     
     return jsonify({
         'success': True,
@@ -47,7 +51,7 @@ def get_stats():
             'total_homework': len(homework_list),
             'total_work': len(tests) + len(homework_list),
             'total_subjects': len(subjects),
-            'today_work': len(today_work)
+            'today_work': g.data.stats['today']
         }
     })
 
@@ -55,51 +59,65 @@ def get_stats():
 # ==================== РАБОТЫ (твой оригинальный функционал) ====================
 
 @api_bp.route('/next_work')
+@conditional('tests', 'homework', max_age=60)
 def api_next_work():
-    """Возвращает следующую работу (твой оригинальный код)"""
+    """Возвращает следующую работу (ближайший дедлайн из индекса дедлайнов)"""
     try:
-        tests = load_tests()
-        homework_list = load_homework()
-        all_work = tests + homework_list
+        upcoming, total = upcoming_work(limit=1)
         
-        if not all_work:
-            return jsonify({
-                'success': True,
-                'next_work': None,
-                'message': 'Nav darbu'
-            })
-        
-        # Находим ближайшую работу
-        upcoming_work = []
-        today = datetime.now().date()
-        
-        for work in all_work:
-            try:
-                work_date = datetime.strptime(work['date'], '%Y-%m-%d').date()
-                days_left = (work_date - today).days
-                
-                if days_left >= 0:
-                    work_copy = work.copy()
-                    work_copy['days_left'] = days_left
-                    upcoming_work.append(work_copy)
-            except:
-                continue
-        
-        if not upcoming_work:
+        if not upcoming:
             return jsonify({
                 'success': True,
                 'next_work': None,
                 'message': 'Nav tuvojošos darbu'
             })
         
-        # Сортируем по близости
-        upcoming_work.sort(key=lambda x: x['days_left'])
-        next_work = upcoming_work[0]
+        # Дни — по календарным датам (сегодня = 0, завтра = 1)
+        next_work = upcoming[0]
+        next_work['days_left'] = (next_work['deadline_at'].date() - datetime.now().date()).days
         
         return jsonify({
             'success': True,
             'next_work': next_work,
-            'total_upcoming': len(upcoming_work)
+            'total_upcoming': total
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api_bp.route('/upcoming')
+@conditional('tests', 'homework', max_age=60)
+def api_upcoming():
+    """
+    Ближайшие работы по дедлайну
+    
+    ?limit= — сколько вернуть, ?days=K — только со сроком в ближайшие K дней
+    """
+    try:
+        days = request.args.get('days')
+        within_days = int(days) if days not in (None, '') else None
+        if within_days is not None and within_days < 0:
+            raise ValueError('days must be >= 0')
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    try:
+        work, total = upcoming_work(limit=parse_limit(request.args.get('limit'), default=5), within_days=within_days)
+        today = datetime.now().date()
+        for item in work:
+            item['days_left'] = (item['deadline_at'].date() - today).days
+        
+        return jsonify({
+            'success': True,
+            'work': work,
+            'count': len(work),
+            'total': total
         })
     except Exception as e:
         return jsonify({
@@ -109,41 +127,44 @@ def api_next_work():
 
 
 @api_bp.route('/work', methods=['GET'])
+@conditional('tests', 'homework')
 def get_all_work():
-    """Получить все работы с фильтрацией (новый функционал)"""
-    tests = load_tests()
-    homework_list = load_homework()
-    all_work = tests + homework_list
-    
-    # Фильтрация по предмету
-    subject = request.args.get('subject')
-    if subject:
-        all_work = [w for w in all_work if w.get('subject') == subject]
+    """
+    Получить работы с фильтрацией (новый функционал)
     
-    # Фильтрация по дате
-    date_from = request.args.get('date_from')
-    date_to = request.args.get('date_to')
-    
-    if date_from:
-        all_work = [w for w in all_work if w.get('date', '') >= date_from]
-    if date_to:
-        all_work = [w for w in all_work if w.get('date', '') <= date_to]
+    Фильтры, сортировка и keyset-пагинация выполняются в БД:
+    ?subject=&date_from=&date_to=&kind=&after=<курсор>&limit=
+    """
+    try:
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        work, next_cursor = find_work(
+            kind=request.args.get('kind'),
+            subject=request.args.get('subject'),
+            date_from=cursor_date(date_from) if date_from else None,
+            date_to=cursor_date(date_to) if date_to else None,
+            after=parse_cursor(request.args.get('after'), cursor_date, cursor_time, int),
+            limit=parse_limit(request.args.get('limit'))
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     
     return jsonify({
         'success': True,
-        'work': all_work,
-        'count': len(all_work)
+        'work': work,
+        'count': len(work),
+        'next_cursor': next_cursor
     })
 
 
 @api_bp.route('/work/<int:work_id>', methods=['GET'])
+@conditional('tests', 'homework')
 def get_work_by_id(work_id):
     """Получить работу по ID (новый функционал)"""
-    tests = load_tests()
-    homework_list = load_homework()
-    all_work = tests + homework_list
-    
-    work = next((w for w in all_work if w.get('id') == work_id), None)
+    work = get_work_item(work_id)
     
     if not work:
         return jsonify({
@@ -177,7 +198,7 @@ def create_work():
                 data.get('subject'),
                 data.get('title'),
                 data.get('date'),
-                data.get('time', '23:59'),
+                data.get('time', ''),
                 data.get('description', ''),
                 data.get('due_date')
             )
@@ -186,7 +207,7 @@ def create_work():
                 data.get('subject'),
                 data.get('test_type'),
                 data.get('date'),
-                data.get('time', '23:59'),
+                data.get('time', ''),
                 data.get('description', ''),
                 data.get('due_date')
             )
@@ -206,25 +227,12 @@ def create_work():
 @login_required
 def delete_work(work_id):
     """Удалить работу (новый функционал)"""
-    # Пробуем удалить как тест
-    try:
-        delete_test(work_id)
+    # id работ глобальные, поэтому удаление — один запрос
+    if delete_work_item(work_id):
         return jsonify({
             'success': True,
             'message': 'Darbs izdzēsts!'
         })
-    except:
-        pass
-    
-    # Пробуем удалить как домашнее задание
-    try:
-        delete_homework(work_id)
-        return jsonify({
-            'success': True,
-            'message': 'Darbs izdzēsts!'
-        })
-    except:
-        pass
     
     return jsonify({
         'success': False,
@@ -235,9 +243,10 @@ def delete_work(work_id):
 # ==================== ПРЕДМЕТЫ ====================
 
 @api_bp.route('/subjects', methods=['GET'])
+@conditional('subjects')
 def get_subjects():
     """Получить все предметы (новый функционал)"""
-    subjects = load_subjects()
+    subjects = g.data.subjects
     
     return jsonify({
         'success': True,
@@ -247,6 +256,7 @@ def get_subjects():
 
 
 @api_bp.route('/subjects/<int:subject_id>', methods=['GET'])
+@conditional('subjects')
 def get_subject(subject_id):
     """Получить предмет по ID (новый функционал)"""
     from models.subjects import get_subject_by_id
@@ -286,28 +296,33 @@ def api_update_subject(subject_id):
 # ==================== НОВОСТИ ====================
 
 @api_bp.route('/news', methods=['GET'])
+@conditional('news')
 def get_news():
     """Получить новости (новый функционал)"""
-    news_list = load_news()
-    
-    # Фильтрация активных
     active_only = request.args.get('active', 'true').lower() == 'true'
-    if active_only:
-        news_list = [n for n in news_list if n.get('is_active', True)]
     
-    # Ограничение количества
-    limit = request.args.get('limit', type=int)
-    if limit:
-        news_list = news_list[:limit]
+    try:
+        news_list, next_cursor = load_news_page(
+            active_only=active_only,
+            after=parse_cursor(request.args.get('after'), cursor_date, int),
+            limit=parse_limit(request.args.get('limit'))
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     
     return jsonify({
         'success': True,
         'news': news_list,
-        'count': len(news_list)
+        'count': len(news_list),
+        'next_cursor': next_cursor
     })
 
 
 @api_bp.route('/news/<int:news_id>', methods=['GET'])
+@conditional('news')
 def get_news_by_id(news_id):
     """Получить новость по ID (новый функционал)"""
     from models.news import get_news_by_id as get_news
@@ -329,8 +344,16 @@ def get_news_by_id(news_id):
 # ==================== ПОИСК ====================
 
 @api_bp.route('/search', methods=['GET'])
+@conditional('tests', 'homework', 'news')
 def search():
-    """Поиск по работам (новый функционал)"""
+    """
+    Полнотекстовый поиск по работам и новостям
+    
+    ?q=&limit=&after=<курсор> — результаты по релевантности, с подсветкой
+    совпадений (<mark>) в title/subject/kind/snippet
+    """
+    from services.search_service import search as run_search
+    
     query = request.args.get('q', '').strip()
     
     if not query:
@@ -339,50 +362,109 @@ def search():
             'error': 'Meklēšanas vaicājums nav norādīts'
         }), 400
     
-    tests = load_tests()
-    homework_list = load_homework()
-    all_work = tests + homework_list
+    try:
+        offset = (parse_cursor(request.args.get('after'), int) or (0,))[0]
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     
-    # Поиск
-    query_lower = query.lower()
-    results = [
-        w for w in all_work if 
-        query_lower in str(w.get('subject', '')).lower() or
-        query_lower in str(w.get('title', '')).lower() or
-        query_lower in str(w.get('type', '')).lower() or
-        query_lower in str(w.get('description', '')).lower()
-    ]
+    results, next_cursor = run_search(query, parse_limit(request.args.get('limit'), default=20), offset)
     
     return jsonify({
         'success': True,
         'results': results,
         'count': len(results),
-        'query': query
+        'query': query,
+        'next_cursor': next_cursor
+    })
+
+
+@api_bp.route('/suggest', methods=['GET'])
+@conditional('tests', 'homework', 'subjects')
+def suggest():
+    """
+    Подсказки при вводе: предметы, названия и типы работ
+
+    ?q=&limit= — нечёткий поиск по префиксам и триграммам (индекс в памяти)
+    """
+    from services.suggest_service import suggest as run_suggest
+
+    query = request.args.get('q', '').strip()
+    suggestions = run_suggest(query, parse_limit(request.args.get('limit'), default=8, maximum=20))
+
+    return jsonify({
+        'success': True,
+        'query': query,
+        'suggestions': suggestions
     })
 
 
 # ==================== КАЛЕНДАРЬ ====================
 
+# Самый длинный диапазон одного запроса календаря (сетка месяца — до 6 недель)
+MAX_CALENDAR_DAYS = 62
+
+
+def _calendar_range(args):
+    """Границы (date, date) из ?month=YYYY-MM или ?from=&to= (по умолчанию — текущий месяц)"""
+    if args.get('from') or args.get('to'):
+        date_from = datetime.strptime(args.get('from', ''), '%Y-%m-%d').date()
+        date_to = datetime.strptime(args.get('to', ''), '%Y-%m-%d').date()
+        if date_to < date_from:
+            raise ValueError('Parameter "to" is before "from"')
+        if (date_to - date_from).days >= MAX_CALENDAR_DAYS:
+            raise ValueError(f'Date range is longer than {MAX_CALENDAR_DAYS} days')
+        return date_from, date_to
+
+    month = args.get('month')
+    date_from = datetime.strptime(month, '%Y-%m').date() if month else datetime.now().date().replace(day=1)
+    next_month = (date_from.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return date_from, next_month - timedelta(days=1)
+
+
 @api_bp.route('/calendar', methods=['GET'])
+@conditional('tests', 'homework', 'subjects', max_age=60)
 def get_calendar_data():
-    """Получить данные для календаря (новый функционал)"""
-    tests = load_tests()
-    homework_list = load_homework()
-    all_work = tests + homework_list
-    
-    # Группировка по датам
-    calendar_data = {}
-    for work in all_work:
-        date = work.get('date')
-        if date:
-            if date not in calendar_data:
-                calendar_data[date] = []
-            calendar_data[date].append(work)
+    """
+    Сводка календаря по дням: ?month=YYYY-MM или ?from=&to=
+    
+    Для каждого дня — только количество работ по видам и по предметам
+    (с цветом предмета); сами работы дня отдаёт /api/work?date_from=&date_to=
+    """
+    try:
+        date_from, date_to = _calendar_range(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    colors = {subject['name']: subject.get('color') for subject in g.data.subjects}
+    
+    days = {}
+    for row in count_work_by_day(date_from.isoformat(), date_to.isoformat()):
+        day = days.setdefault(row['date'], {'total': 0, 'kinds': {}, 'subjects': []})
+        day['total'] += row['count']
+        day['kinds'][row['kind']] = day['kinds'].get(row['kind'], 0) + row['count']
+        for subject in day['subjects']:
+            if subject['name'] == row['subject']:
+                subject['count'] += row['count']
+                break
+        else:
+            day['subjects'].append({
+                'name': row['subject'],
+                'color': colors.get(row['subject']),
+                'count': row['count']
+            })
     
     return jsonify({
         'success': True,
-        'calendar': calendar_data,
-        'total_days': len(calendar_data)
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'days': days,
+        'total_days': len(days)
     })
 
 
@@ -488,23 +570,114 @@ def save_timer_session():
 
 # ==================== ЭКСПОРТ ====================
 
+def _export_params(args):
+    """Формат и фильтры экспорта из параметров запроса (ValueError — неверные)"""
+    from services.export_service import FORMATS
+    
+    export_format = args.get('format', 'json')
+    if export_format not in FORMATS:
+        raise ValueError('Neatbalstīts formāts')
+    
+    filters = {
+        'kind': args.get('kind') or None,
+        'subject': args.get('subject') or None,
+        'date_from': cursor_date(args['date_from']) if args.get('date_from') else None,
+        'date_to': cursor_date(args['date_to']) if args.get('date_to') else None,
+    }
+    return export_format, {name: value for name, value in filters.items() if value}
+
+
 @api_bp.route('/export/work', methods=['GET'])
+@conditional('tests', 'homework')
 def export_work():
-    """Экспорт работ в JSON (новый функционал)"""
-    tests = load_tests()
-    homework_list = load_homework()
-    all_work = tests + homework_list
+    """
+    Экспорт работ потоком: ?format=json|ndjson|csv|ics&kind=&subject=&date_from=&date_to=
     
-    export_format = request.args.get('format', 'json')
+    Строки читаются из БД порциями и сразу отдаются клиенту; при
+    Accept-Encoding: gzip поток сжимается на лету.
+    """
+    from services.export_service import FORMATS, export_filename, generate_export
+    from utils.compression import choose_encoding, compress_stream
     
-    if export_format == 'json':
+    try:
+        export_format, filters = _export_params(request.args)
+    except ValueError as e:
         return jsonify({
-            'success': True,
-            'data': all_work,
-            'exported_at': datetime.now().isoformat()
-        })
+            'success': False,
+            'error': str(e)
+        }), 400
     
+    chunks = stream_with_context(generate_export(export_format, filters))
+    headers = {'Content-Disposition': f'attachment; filename="{export_filename(export_format)}"'}
+    if choose_encoding(('gzip',)):
+        chunks = compress_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    response = current_app.response_class(chunks, mimetype=FORMATS[export_format][0], headers=headers)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@api_bp.route('/export/work/jobs', methods=['POST'])
+@login_required
+def create_export_job():
+    """Фоновый экспорт (для очень больших выгрузок); параметры — как у GET /export/work"""
+    from services.export_service import create_export_job as queue_export
+    
+    try:
+        export_format, filters = _export_params(request.get_json(silent=True) or request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    job_id = queue_export(export_format, filters)
     return jsonify({
-        'success': False,
-        'error': 'Neatbalstīts formāts'
-    }), 400
\ No newline at end of file
+        'success': True,
+        'job_id': job_id,
+        'status': 'pending',
+        'status_url': f'/api/export/jobs/{job_id}'
+    }), 202
+
+
+@api_bp.route('/export/jobs/<job_id>', methods=['GET'])
+@login_required
+def export_job_status(job_id):
+    """Состояние фонового экспорта и ссылка на файл"""
+    from services.export_service import export_job_status as job_status
+    
+    status, detail = job_status(job_id)
+    if status is None:
+        return jsonify({
+            'success': False,
+            'error': 'Eksports nav atrasts'
+        }), 404
+    
+    result = {'success': True, 'job_id': job_id, 'status': status}
+    if status == 'done':
+        result['download_url'] = f'/api/export/jobs/{job_id}/download'
+    elif status == 'failed':
+        result['error'] = detail
+    return jsonify(result)
+
+
+@api_bp.route('/export/jobs/<job_id>/download', methods=['GET'])
+@login_required
+def download_export(job_id):
+    """Готовый фоновый экспорт (.gz)"""
+    from services.export_service import export_job_status as job_status
+    
+    status, path = job_status(job_id)
+    if status != 'done':
+        return jsonify({
+            'success': False,
+            'error': 'Eksports nav gatavs'
+        }), 404
+    
+    return send_file(
+        os.path.abspath(path),
+        mimetype='application/gzip',
+        as_attachment=True,
+        download_name=f'classmate-work-{job_id[:8]}.{os.path.basename(path).split(".", 1)[1]}'
+    )
@@ -1,47 +1,30 @@
 """
 Публичные маршруты (доступные всем пользователям)
 """
-from flask import Blueprint, render_template, request, session
+from flask import Blueprint, abort, current_app, g, redirect, render_template, request, session
 from datetime import datetime
-from models.subjects import load_subjects
-from models.tests import load_tests
-from models.homework import load_homework
-from models.news import load_news
-from models.terms import load_terms
+from models.work import find_work
 from utils.auth import is_host
+from utils.http_cache import conditional
+from utils.pagination import cursor_date, cursor_time, parse_cursor, parse_limit
 
 public_bp = Blueprint('public', __name__)
 
-
-def get_common_stats():
-    """Получить общую статистику для всех страниц"""
-    tests = load_tests()
-    homework_list = load_homework()
-    today = datetime.now().date()
-    
-    # Подсчёт работ на сегодня
-    today_work = [w for w in tests + homework_list 
-                  if w.get('date') == today.strftime('%Y-%m-%d')]
-    
-    return {
-        'today': len(today_work),
-        'total': len(tests) + len(homework_list)
-    }
+# Статистика и условия использования есть на каждой странице
+PAGE_DATASETS = ('tests', 'homework', 'terms')
 
 
 @public_bp.route('/')
+@conditional(*PAGE_DATASETS, 'subjects', 'news', render_cache=True)
 def index():
     """Главная страница"""
-    subjects = load_subjects()
-    news_list = load_news()
-    tests = load_tests()
-    homework_list = load_homework()
+    subjects = g.data.subjects
+    news_list = g.data.news
     
     # Группировка работ по предметам
     work_by_subject = {}
-    all_work = tests + homework_list
     
-    for work in all_work:
+    for work in g.data.all_work:
         if isinstance(work, dict):
             subject = work.get('subject')
             if subject:
@@ -56,64 +39,71 @@ def index():
     
     return render_template(
         'pages/public/index.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         work_by_subject=work_by_subject,
         subjects=subjects,
         news=latest_news,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/all')
+@conditional(*PAGE_DATASETS, 'subjects', render_cache=True)
 def all_tests():
-    """Все работы (тесты + домашние задания)"""
-    tests = load_tests()
-    homework_list = load_homework()
-    subjects = load_subjects()
-    all_work = tests + homework_list
+    """Все работы (тесты + домашние задания), постранично"""
+    from services.subject_service import get_subject_colors
     
-    # Сортировка по дате
-    all_work.sort(key=lambda x: x.get('date', ''), reverse=False)
+    subjects = g.data.subjects
+    
+    try:
+        after = parse_cursor(request.args.get('after'), cursor_date, cursor_time, int)
+    except ValueError:
+        after = None
+    
+    # Сортировка и пагинация выполняются в БД
+    all_work, next_cursor = find_work(after=after, limit=parse_limit(request.args.get('limit')))
     
     return render_template(
         'pages/public/all.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         tests=all_work,
+        next_cursor=next_cursor,
         subjects=subjects,
+        subject_colors=get_subject_colors(),
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/homework')
+@conditional(*PAGE_DATASETS, 'subjects', render_cache=True)
 def homework():
     """Страница домашних заданий"""
-    homework_list = load_homework()
-    subjects = load_subjects()
-    
-    # Сортировка по дате
-    homework_list.sort(key=lambda x: x.get('date', ''), reverse=False)
+    # Уже отсортированы в БД (ORDER BY date, time)
+    homework_list = g.data.homework
+    subjects = g.data.subjects
     
     return render_template(
         'pages/public/homework.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         homework=homework_list,
         subjects=subjects,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/subject/<subject_name>')
+@conditional(*PAGE_DATASETS, 'subjects', render_cache=True)
 def subject_details(subject_name):
     """Детальная страница предмета"""
-    from services.subject_service import get_subject_with_stats
+    from services.subject_service import get_subject_statistics, get_subject_with_stats
     
-    subjects = load_subjects()
+    subjects = g.data.subjects
     subject_details, subject_work = get_subject_with_stats(subject_name)
     
     if not subject_details:
@@ -124,21 +114,22 @@ def subject_details(subject_name):
     
     return render_template(
         'pages/public/subject.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         subject_name=subject_name,
-        subject_details=subject_details,
-        tests=subject_work,
+        subject=subject_details,
+        works=subject_work,
         subjects=subjects,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=get_subject_statistics(subject_name),
         now=datetime.now()
     )
 
 
 @public_bp.route('/news')
+@conditional(*PAGE_DATASETS, 'news', render_cache=True)
 def news():
     """Страница новостей"""
-    news_list = load_news()
+    news_list = g.data.news
     
     # Фильтрация активных новостей
     active_news = [n for n in news_list if n.get('is_active', True)]
@@ -146,15 +137,16 @@ def news():
     
     return render_template(
         'pages/public/news.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         news=active_news,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/news/<int:news_id>')
+@conditional(*PAGE_DATASETS, 'news', render_cache=True)
 def news_detail(news_id):
     """Детальная страница новости"""
     from models.news import get_news_by_id
@@ -169,102 +161,114 @@ def news_detail(news_id):
     
     return render_template(
         'pages/public/news_detail.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         news=news_item,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/calendar')
+@conditional(*PAGE_DATASETS, 'subjects', render_cache=True)
 def calendar():
-    """Календарь событий"""
-    tests = load_tests()
-    homework_list = load_homework()
-    subjects = load_subjects()
-    all_work = tests + homework_list
-    
-    # Сортировка по дате
-    all_work.sort(key=lambda x: x.get('date', ''))
-    
+    """Календарь событий (работы месяца загружает calendar.js через /api/calendar)"""
     return render_template(
         'pages/public/calendar.html',
-        terms_content=load_terms(),
-        work=all_work,
-        subjects=subjects,
+        terms_content=g.data.terms,
+        subjects=g.data.subjects,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
+def _ics_response(name, work):
+    """Потоковый ответ с лентой iCalendar"""
+    from services.ics_service import generate_feed
+    
+    return current_app.response_class(
+        generate_feed(name, work),
+        mimetype='text/calendar',
+        headers={'Content-Disposition': 'inline; filename="calendar.ics"'}
+    )
+
+
+@public_bp.route('/calendar.ics')
+@conditional('tests', 'homework', strong=True)
+def calendar_feed():
+    """Лента iCalendar со всеми работами класса (подписка)"""
+    return _ics_response('Classmate', g.data.all_work)
+
+
+@public_bp.route('/subject/<subject_name>.ics')
+@conditional('tests', 'homework', 'subjects', strong=True)
+def subject_feed(subject_name):
+    """Лента iCalendar с работами одного предмета"""
+    if not any(subject['name'] == subject_name for subject in g.data.subjects):
+        abort(404)
+    
+    work = [item for item in g.data.all_work if item.get('subject') == subject_name]
+    return _ics_response(f'Classmate: {subject_name}', work)
+
+
 @public_bp.route('/search')
+@conditional(*PAGE_DATASETS, 'news')
 def search():
-    """Поиск по работам"""
+    """Поиск по работам и новостям (полнотекстовый индекс, по релевантности)"""
+    from services.search_service import search as run_search
+    
     query = request.args.get('q', '').strip()
-    results = []
+    try:
+        offset = (parse_cursor(request.args.get('after'), int) or (0,))[0]
+    except ValueError:
+        offset = 0
     
-    if query:
-        tests = load_tests()
-        homework_list = load_homework()
-        subjects = load_subjects()
-        all_work = tests + homework_list
-        
-        # Поиск по предмету, названию, описанию
-        query_lower = query.lower()
-        results = [
-            w for w in all_work if 
-            query_lower in str(w.get('subject', '')).lower() or
-            query_lower in str(w.get('title', '')).lower() or
-            query_lower in str(w.get('type', '')).lower() or
-            query_lower in str(w.get('description', '')).lower()
-        ]
-        
-        # Сортировка по дате
-        results.sort(key=lambda x: x.get('date', ''), reverse=False)
+    results, next_cursor = run_search(query, parse_limit(request.args.get('limit'), default=20), offset)
     
     return render_template(
         'pages/public/search.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         query=query,
         results=results,
+        next_cursor=next_cursor,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/settings')
+@conditional(*PAGE_DATASETS)
 def settings():
     """Настройки пользователя"""
     return render_template(
         'pages/public/settings.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/timer')
+@conditional(*PAGE_DATASETS, render_cache=True)
 def timer():
     """Pomodoro таймер"""
     return render_template(
         'pages/public/timer.html',
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
     )
 
 
 @public_bp.route('/updates')
+@conditional(*PAGE_DATASETS, 'updates', render_cache=True)
 def updates_log():
     """Журнал обновлений системы"""
-    from models.updates import load_updates
-    
-    updates_list = load_updates()
+    updates_list = g.data.updates
     
     # Фильтрация активных обновлений
     active_updates = [u for u in updates_list if u.get('is_active', True)]
@@ -272,9 +276,26 @@ def updates_log():
     
     return render_template(
         'pages/public/news.html',  # Используем тот же шаблон что и для новостей
-        terms_content=load_terms(),
+        terms_content=g.data.terms,
         news=active_updates,  # Передаём как news для совместимости с шаблоном
         is_host=is_host(),
-        stats=get_common_stats(),
+        stats=g.data.stats,
         now=datetime.now()
-    )
\ No newline at end of file
+    )
+
+@public_bp.route('/uploads/<path:key>')
+def upload(key):
+    """Загруженный файл: редирект на прямой (для S3 — подписанный) адрес в хранилище"""
+    from config.settings import S3_PRESIGN_EXPIRES
+    from services.image_service import is_upload_key
+    from utils.storage import get_storage
+    
+    # Подписываются только ключи загрузок: бакет может хранить и другие объекты
+    if not is_upload_key(key):
+        abort(404)
+    
+    response = redirect(get_storage().direct_url(key))
+    # Браузер может повторять редирект, пока подпись ссылки действительна
+    response.cache_control.private = True
+    response.cache_control.max_age = max(S3_PRESIGN_EXPIRES // 2, 0)
+    return response
@@ -0,0 +1,107 @@
+"""
+Размер HTML и статики по страницам (до/после изменений шаблонов)
+
+Рендерит страницы через тестовый клиент Flask на текущей БД и считает:
+размер HTML, сколько в нём встроенных <style>/<script>, размер HTML в gzip,
+число и объём локальных ассетов при первом визите и сколько из них браузер
+перезапросит при повторном (всё, что не помечено immutable).
+
+    python scripts/payload_benchmark.py --save before.json
+    # ... изменения ...
+    python scripts/payload_benchmark.py --compare before.json
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGES = ['/', '/all', '/homework', '/calendar', '/search?q=a', '/timer', '/updates', '/admin/dashboard']
+
+INLINE_RE = re.compile(r'<(style|script)(?![^>]*\bsrc=)[^>]*>(.*?)</\1>', re.S)
+LOCAL_ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+def measure_page(client, path):
+    response = client.get(path)
+    html = response.get_data()
+    text = html.decode('utf-8', errors='replace')
+
+    inline = sum(len(match.group(2).encode('utf-8')) for match in INLINE_RE.finditer(text))
+
+    asset_bytes = 0
+    repeat_requests = 0
+    assets = sorted(set(LOCAL_ASSET_RE.findall(text)))
+    for url in assets:
+        asset = client.get(url)
+        asset_bytes += len(asset.get_data())
+        if 'immutable' not in asset.headers.get('Cache-Control', ''):
+            repeat_requests += 1
+        asset.close()
+
+    return {
+        'status': response.status_code,
+        'html': len(html),
+        'html_gzip': len(gzip.compress(html, mtime=0)),
+        'inline': inline,
+        'assets': len(assets),
+        'asset_bytes': asset_bytes,
+        'repeat_requests': repeat_requests,
+    }
+
+
+def measure(pages):
+    from app import app
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        # Админские страницы тоже участвуют в замере
+        session['is_host'] = True
+    return {path: measure_page(client, path) for path in pages}
+
+
+def print_report(results, baseline=None):
+    columns = ['html', 'html_gzip', 'inline', 'assets', 'asset_bytes', 'repeat_requests']
+    print(f"{'page':<18}" + ''.join(f'{column:>18}' for column in columns))
+    for path, row in results.items():
+        cells = []
+        for column in columns:
+            value = row[column]
+            before = (baseline or {}).get(path, {}).get(column)
+            cells.append(f'{before} -> {value}' if before is not None and before != value else str(value))
+        status = '' if row['status'] == 200 else f"  (HTTP {row['status']})"
+        print(f'{path:<18}' + ''.join(f'{cell:>18}' for cell in cells) + status)
+
+    if baseline:
+        before = sum(row['html'] for path, row in baseline.items() if path in results)
+        after = sum(row['html'] for row in results.values())
+        if before:
+            print(f"\nHTML total: {before} -> {after} bytes ({(after - before) * 100 / before:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--save', help='Сохранить результаты в JSON')
+    parser.add_argument('--compare', help='Сравнить с ранее сохранёнными результатами')
+    parser.add_argument('pages', nargs='*', default=PAGES)
+    args = parser.parse_args()
+
+    results = measure(args.pages)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
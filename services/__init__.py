@@ -1,6 +1,26 @@
 """
 Сервисы - заглушки для остальных модулей
 """
+from models.queries import Query
+
+_SUM_TIMER_TODAY = Query('services.sum_timer_today',
+                         'SELECT SUM(seconds) as total FROM timer_sessions WHERE user_id = ? AND date = ?')
+_SUM_TIMER_TOTAL = Query('services.sum_timer_total',
+                         'SELECT SUM(seconds) as total FROM timer_sessions WHERE user_id = ?')
+_SELECT_TIMER_SESSION = Query('services.select_timer_session',
+                              'SELECT id FROM timer_sessions WHERE user_id = ? AND date = ?')
+_UPDATE_TIMER_SESSION = Query('services.update_timer_session',
+                              'UPDATE timer_sessions SET seconds = ? WHERE id = ?')
+_INSERT_TIMER_SESSION = Query('services.insert_timer_session',
+                              'INSERT INTO timer_sessions (user_id, seconds, date, created_at) VALUES (?, ?, ?, ?)')
+_UPDATE_THEME = Query('services.update_theme',
+                      'UPDATE user_settings SET theme = ?, updated_date = ? WHERE device_id = ?')
+_INSERT_THEME = Query('services.insert_theme',
+                      'INSERT INTO user_settings (device_id, theme, created_date, updated_date) VALUES (?, ?, ?, ?)')
+_UPDATE_CUSTOM_BACKGROUND = Query('services.update_custom_background',
+                                  'UPDATE user_settings SET custom_background = ?, updated_date = ? WHERE device_id = ?')
+_INSERT_CUSTOM_BACKGROUND = Query('services.insert_custom_background',
+                                  'INSERT INTO user_settings (device_id, custom_background, created_date, updated_date) VALUES (?, ?, ?, ?)')
 
 # ================= scheduler_service.py =================
 def start_scheduler():
@@ -66,12 +86,11 @@ def register_socketio_handlers(socketio):
 # ================= subject_service.py =================
 def get_subject_with_stats(subject_name):
     """Получает предмет со статистикой"""
+    from flask import g
     from models.subjects import get_subject_details
-    from models.tests import load_tests
-    from models.homework import load_homework
     
-    tests = load_tests()
-    homework_list = load_homework()
+    tests = g.data.tests
+    homework_list = g.data.homework
     
     subject_work = []
     
@@ -101,6 +120,7 @@ def get_user_timer_stats(user_id):
     """Получает статистику таймера пользователя"""
     from datetime import datetime
     from models.database import get_db_connection
+    from models.queries import execute, fetch_value
     
     today = datetime.now().strftime('%Y-%m-%d')
     
@@ -108,20 +128,10 @@ def get_user_timer_stats(user_id):
     cursor = conn.cursor()
     
     # Сегодняшнее время
-    cursor.execute(
-        'SELECT SUM(seconds) as total FROM timer_sessions WHERE user_id = ? AND date = ?',
-        (user_id, today)
-    )
-    today_result = cursor.fetchone()
-    today_seconds = today_result[0] if today_result and today_result[0] else 0
+    today_seconds = fetch_value(execute(cursor, _SUM_TIMER_TODAY, (user_id, today)), 0)
     
     # Общее время
-    cursor.execute(
-        'SELECT SUM(seconds) as total FROM timer_sessions WHERE user_id = ?',
-        (user_id,)
-    )
-    total_result = cursor.fetchone()
-    total_seconds = total_result[0] if total_result and total_result[0] else 0
+    total_seconds = fetch_value(execute(cursor, _SUM_TIMER_TOTAL, (user_id,)), 0)
     
     conn.close()
     
@@ -136,6 +146,7 @@ def save_timer_data(user_id, seconds):
     """Сохраняет данные таймера"""
     from datetime import datetime
     from models.database import get_db_connection
+    from models.queries import execute
     
     today = datetime.now().strftime('%Y-%m-%d')
     
@@ -144,24 +155,16 @@ def save_timer_data(user_id, seconds):
     
     try:
         # Проверяем существующую сессию
-        cursor.execute(
-            'SELECT id FROM timer_sessions WHERE user_id = ? AND date = ?',
-            (user_id, today)
-        )
+        execute(cursor, _SELECT_TIMER_SESSION, (user_id, today))
         existing = cursor.fetchone()
         
         if existing:
             # Обновляем
-            cursor.execute(
-                'UPDATE timer_sessions SET seconds = ? WHERE id = ?',
-                (seconds, existing[0])
-            )
+            execute(cursor, _UPDATE_TIMER_SESSION, (seconds, existing[0]))
         else:
             # Создаем новую
-            cursor.execute(
-                'INSERT INTO timer_sessions (user_id, seconds, date, created_at) VALUES (?, ?, ?, ?)',
-                (user_id, seconds, today, datetime.now().strftime('%Y-%m-%d %H:%M'))
-            )
+            execute(cursor, _INSERT_TIMER_SESSION,
+                    (user_id, seconds, today, datetime.now().strftime('%Y-%m-%d %H:%M')))
         
         conn.commit()
         return True
@@ -177,7 +180,8 @@ def save_timer_data(user_id, seconds):
 def save_user_theme(device_id, theme):
     """Сохраняет тему пользователя"""
     from datetime import datetime
-    from models.database import get_db_connection, is_postgresql_connection
+    from models.database import get_db_connection
+    from models.queries import execute
     from models.users import get_user_settings
     
     conn = get_db_connection()
@@ -188,28 +192,10 @@ def save_user_theme(device_id, theme):
         
         if existing_settings:
             # Обновляем
-            if is_postgresql_connection(conn):
-                cursor.execute(
-                    'UPDATE user_settings SET theme = %s, updated_date = %s WHERE device_id = %s',
-                    (theme, current_time, device_id)
-                )
-            else:
-                cursor.execute(
-                    'UPDATE user_settings SET theme = ?, updated_date = ? WHERE device_id = ?',
-                    (theme, current_time, device_id)
-                )
+            execute(cursor, _UPDATE_THEME, (theme, current_time, device_id))
         else:
             # Создаем новый
-            if is_postgresql_connection(conn):
-                cursor.execute(
-                    'INSERT INTO user_settings (device_id, theme, created_date, updated_date) VALUES (%s, %s, %s, %s)',
-                    (device_id, theme, current_time, current_time)
-                )
-            else:
-                cursor.execute(
-                    'INSERT INTO user_settings (device_id, theme, created_date, updated_date) VALUES (?, ?, ?, ?)',
-                    (device_id, theme, current_time, current_time)
-                )
+            execute(cursor, _INSERT_THEME, (device_id, theme, current_time, current_time))
         
         conn.commit()
         print(f"✅ Theme saved for device: {device_id}")
@@ -226,7 +212,8 @@ def save_custom_theme(device_id, settings):
     """Сохраняет кастомную тему"""
     import json
     from datetime import datetime
-    from models.database import get_db_connection, is_postgresql_connection
+    from models.database import get_db_connection
+    from models.queries import execute
     from models.users import get_user_settings
     
     conn = get_db_connection()
@@ -239,28 +226,10 @@ def save_custom_theme(device_id, settings):
         
         if existing_settings:
             # Обновляем
-            if is_postgresql_connection(conn):
-                cursor.execute(
-                    'UPDATE user_settings SET custom_background = %s, updated_date = %s WHERE device_id = %s',
-                    (settings_json, current_time, device_id)
-                )
-            else:
-                cursor.execute(
-                    'UPDATE user_settings SET custom_background = ?, updated_date = ? WHERE device_id = ?',
-                    (settings_json, current_time, device_id)
-                )
+            execute(cursor, _UPDATE_CUSTOM_BACKGROUND, (settings_json, current_time, device_id))
         else:
             # Создаем новый
-            if is_postgresql_connection(conn):
-                cursor.execute(
-                    'INSERT INTO user_settings (device_id, custom_background, created_date, updated_date) VALUES (%s, %s, %s, %s)',
-                    (device_id, settings_json, current_time, current_time)
-                )
-            else:
-                cursor.execute(
-                    'INSERT INTO user_settings (device_id, custom_background, created_date, updated_date) VALUES (?, ?, ?, ?)',
-                    (device_id, settings_json, current_time, current_time)
-                )
+            execute(cursor, _INSERT_CUSTOM_BACKGROUND, (device_id, settings_json, current_time, current_time))
         
         conn.commit()
         print(f"✅ Custom theme saved: {device_id}")
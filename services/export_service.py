@@ -0,0 +1,301 @@
+"""
+Export Service - Экспорт работ в JSON, NDJSON, CSV и iCalendar
+
+Экспорт — генератор частей файла поверх models.work.iter_work (строки
+читаются из БД порциями), поэтому память не зависит от числа работ:
+маршрут отдаёт его потоком, фоновая задача пишет в файл.
+
+Фоновые задачи (большие экспорты) выполняются в потоке, как обработка
+изображений. Состояние задачи — файлы в EXPORT_FOLDER, видимые всем
+процессам на сервере:
+
+    <id>.pending     параметры задачи (JSON), пока её никто не взял
+    <id>.running     то же, задача выполняется (mtime — отметка жизни)
+    <id>.<ext>.gz    готовый экспорт
+    <id>.error       текст ошибки
+
+Задачу берёт тот процесс, чей rename(<id>.pending, <id>.running) удался,
+поэтому при нескольких воркерах gunicorn она выполняется один раз.
+.running без отметки дольше EXPORT_STALE_AFTER остался от умершего
+процесса — при старте он возвращается в .pending.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from config.settings import EXPORT_FOLDER, EXPORT_MAX_AGE, EXPORT_STALE_AFTER
+from utils import ics
+from utils.json_provider import ISODateJSONProvider
+
+# format -> (MIME-тип, расширение файла)
+FORMATS = {
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'ics': ('text/calendar', 'ics'),
+}
+
+# Колонки CSV (в этом порядке)
+CSV_FIELDS = ('id', 'kind', 'subject', 'type', 'title', 'date', 'time', 'due_date',
+              'description', 'days_left', 'added_date')
+
+# Фильтры экспорта (аргументы models.work.iter_work)
+FILTERS = ('kind', 'subject', 'date_from', 'date_to')
+
+JOB_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# Части потока собираются в блоки примерно такого размера
+CHUNK_SIZE = 64 * 1024
+
+# Как часто (сек) выполняемая задача обновляет mtime своего .running
+HEARTBEAT_INTERVAL = 60
+
+export_queue = queue.Queue()
+export_thread = None
+
+
+def _json_dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=ISODateJSONProvider.default)
+
+
+def _json_chunks(rows):
+    yield f'{{"success": true, "exported_at": {_json_dumps(datetime.now().isoformat())}, "data": ['
+    separator = ''
+    for row in rows:
+        yield separator + _json_dumps(row)
+        separator = ','
+    yield ']}'
+
+
+def _ndjson_chunks(rows):
+    for row in rows:
+        yield _json_dumps(row) + '\n'
+
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    for row in rows:
+        writer.writerow([
+            ISODateJSONProvider.default(value) if hasattr(value, 'isoformat') else value
+            for value in (row.get(field) for field in CSV_FIELDS)
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ics_chunks(rows):
+    from services.ics_service import work_event
+
+    yield ics.calendar_start('Classmate')
+    for row in rows:
+        try:
+            yield work_event(row)
+        except (TypeError, ValueError) as e:
+            print(f"❌ Cannot serialize work {row.get('id')} to iCalendar: {e}")
+    yield ics.CALENDAR_END
+
+
+WRITERS = {
+    'json': _json_chunks,
+    'ndjson': _ndjson_chunks,
+    'csv': _csv_chunks,
+    'ics': _ics_chunks,
+}
+
+
+def generate_export(export_format, filters=None):
+    """
+    Экспорт работ по частям
+
+    Args:
+        export_format (str): Ключ FORMATS
+        filters (dict, optional): kind / subject / date_from / date_to
+
+    Yields:
+        str: Части файла, собранные в блоки ~CHUNK_SIZE символов
+    """
+    from models.work import iter_work
+
+    rows = iter_work(**{name: value for name, value in (filters or {}).items() if name in FILTERS})
+    block, size = [], 0
+    for part in WRITERS[export_format](rows):
+        block.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
+
+
+def export_filename(export_format):
+    """Имя файла для Content-Disposition"""
+    return f"classmate-work-{datetime.now().strftime('%Y%m%d')}.{FORMATS[export_format][1]}"
+
+
+# ==================== ФОНОВЫЕ ЗАДАЧИ ====================
+
+def _job_path(job_id, suffix):
+    return os.path.join(EXPORT_FOLDER, f'{job_id}.{suffix}')
+
+
+def start_export_worker():
+    """Запускает фоновые экспорты и дозапускает незавершённые с прошлого запуска"""
+    global export_thread
+
+    if export_thread is None or not export_thread.is_alive():
+        export_thread = threading.Thread(target=export_worker, daemon=True)
+        export_thread.start()
+        print("✅ Export worker started")
+
+    if not os.path.isdir(EXPORT_FOLDER):
+        return
+
+    now = time.time()
+    for name in sorted(os.listdir(EXPORT_FOLDER)):
+        job_id, _, suffix = name.partition('.')
+        if suffix == 'running':
+            try:
+                if now - os.path.getmtime(_job_path(job_id, 'running')) < EXPORT_STALE_AFTER:
+                    continue  # Выполняется другим процессом
+                os.rename(_job_path(job_id, 'running'), _job_path(job_id, 'pending'))
+            except OSError:
+                continue  # Уже завершилась или её вернул другой процесс
+            print(f"✅ Stale export job requeued: {job_id}")
+        elif suffix != 'pending':
+            continue
+        # Ставят в очередь все процессы, выполнит тот, кто первым возьмёт
+        export_queue.put(job_id)
+
+
+def export_worker():
+    """Фоновый процесс экспорта"""
+    while True:
+        try:
+            job_id = export_queue.get(timeout=300)
+
+            if job_id is None:  # Сигнал остановки
+                break
+
+            run_export_job(job_id)
+            export_queue.task_done()
+        except queue.Empty:
+            continue
+        except Exception as e:
+            print(f"❌ Export worker error: {e}")
+
+
+def create_export_job(export_format, filters):
+    """
+    Ставит экспорт в очередь
+
+    Returns:
+        str: ID задачи
+    """
+    job_id = uuid.uuid4().hex
+    os.makedirs(EXPORT_FOLDER, exist_ok=True)
+    with open(_job_path(job_id, 'pending'), 'w', encoding='utf-8') as out:
+        json.dump({'format': export_format, 'filters': filters}, out)
+    export_queue.put(job_id)
+    print(f"✅ Export job queued: {job_id} ({export_format})")
+    return job_id
+
+
+def _claim(job_id):
+    """Берёт задачу себе; False — её уже взял другой процесс или поток"""
+    running = _job_path(job_id, 'running')
+    try:
+        os.rename(_job_path(job_id, 'pending'), running)
+        os.utime(running)
+    except OSError:
+        return False
+    return True
+
+
+def run_export_job(job_id):
+    """Пишет экспорт задачи в <id>.<ext>.gz"""
+    if not _claim(job_id):
+        return
+
+    running = _job_path(job_id, 'running')
+    tmp_path = None
+    try:
+        with open(running, encoding='utf-8') as source:
+            job = json.load(source)
+
+        extension = FORMATS[job['format']][1]
+        target = _job_path(job_id, f'{extension}.gz')
+        tmp_path = f'{target}.{os.getpid()}-{threading.get_ident()}.tmp'
+        touched = time.monotonic()
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as out:
+            for chunk in generate_export(job['format'], job['filters']):
+                out.write(chunk)
+                if time.monotonic() - touched > HEARTBEAT_INTERVAL:
+                    os.utime(running)
+                    touched = time.monotonic()
+        os.replace(tmp_path, target)
+        print(f"✅ Export job done: {job_id}")
+    except Exception as e:
+        print(f"❌ Export job {job_id} failed: {e}")
+        with open(_job_path(job_id, 'error'), 'w', encoding='utf-8') as out:
+            out.write(str(e))
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    finally:
+        os.remove(running)
+
+
+def export_job_status(job_id):
+    """
+    Состояние задачи
+
+    Returns:
+        tuple: (статус 'pending' | 'done' | 'failed' | None, путь к файлу или текст ошибки)
+    """
+    if not JOB_ID_RE.match(job_id) or not os.path.isdir(EXPORT_FOLDER):
+        return None, None
+
+    if os.path.exists(_job_path(job_id, 'pending')) or os.path.exists(_job_path(job_id, 'running')):
+        return 'pending', None
+    for _, extension in FORMATS.values():
+        path = _job_path(job_id, f'{extension}.gz')
+        if os.path.exists(path):
+            return 'done', path
+    if os.path.exists(_job_path(job_id, 'error')):
+        with open(_job_path(job_id, 'error'), encoding='utf-8') as source:
+            return 'failed', source.read()
+    return None, None
+
+
+def cleanup_exports(max_age=EXPORT_MAX_AGE):
+    """
+    Удаляет файлы экспортов старше max_age (кроме ожидающих и выполняемых задач)
+
+    Returns:
+        int: Сколько файлов удалено
+    """
+    if not os.path.isdir(EXPORT_FOLDER):
+        return 0
+
+    removed = 0
+    now = time.time()
+    for name in os.listdir(EXPORT_FOLDER):
+        path = os.path.join(EXPORT_FOLDER, name)
+        try:
+            if not name.endswith(('.pending', '.running')) and now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,78 @@
+"""
+ICS Service - Ленты iCalendar с работами (подписка в календарных приложениях)
+
+Лента собирается из тех же снимков работ, что и страницы (g.data), и
+отдаётся потоком: заголовок, VEVENT каждой работы, конец календаря.
+Готовые VEVENT кешируются по содержимому строки, поэтому после изменения
+одной работы заново сериализуется только она.
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from config.settings import CALENDAR_TIMEZONE, ICS_EVENT_CACHE_SIZE, ICS_REFRESH_MINUTES
+from utils import ics
+from utils.cache import LRUCache
+
+# Поля строки, от которых зависит VEVENT (ключ кеша)
+EVENT_FIELDS = ('id', 'kind', 'subject', 'type', 'title', 'date', 'time', 'all_day', 'due_date', 'description',
+                'added_date')
+
+event_cache = LRUCache(name='ics_events', max_entries=ICS_EVENT_CACHE_SIZE, ttl=24 * 3600)
+
+
+def _serialize(work):
+    """
+    VEVENT работы: на момент дедлайна (due_date или date + time)
+
+    Работа, сохранённая без времени (all_day), — событие на весь день;
+    время остальных задано в зоне календаря и выводится в UTC.
+    """
+    deadline_date = datetime.strptime(work.get('due_date') or work['date'], '%Y-%m-%d')
+    all_day = bool(work.get('all_day')) or not work.get('time')
+    start = deadline_date if all_day else datetime.combine(
+        deadline_date.date(), datetime.strptime(work['time'], '%H:%M').time(), ZoneInfo(CALENDAR_TIMEZONE))
+
+    summary = f"{work.get('type') or ''}: {work.get('subject') or ''}"
+    if work.get('title'):
+        summary += f" — {work['title']}"
+
+    description = work.get('description') or ''
+    if work.get('due_date') and work['due_date'] != work['date']:
+        description = f"Uzdots: {work['date']}\n{description}".strip()
+
+    return ics.event(
+        uid=f"work-{work['id']}@classmate",
+        stamp=ics.parse_stamp(work.get('added_date'), start, CALENDAR_TIMEZONE),
+        summary=summary,
+        start=start.date() if all_day else start,
+        all_day=all_day,
+        description=description,
+        categories=[work.get('subject'), work.get('type')],
+    )
+
+
+def work_event(work):
+    """VEVENT работы из кеша или сериализованный заново"""
+    key = tuple(work.get(field) for field in EVENT_FIELDS)
+    return event_cache.get_or_load(key, lambda: _serialize(work))
+
+
+def generate_feed(name, work):
+    """
+    Лента iCalendar по частям (для потокового ответа)
+
+    Args:
+        name (str): Имя календаря у подписчика
+        work (list): Работы (строки моделей work), уже отобранные для ленты
+
+    Yields:
+        str: Части файла .ics
+    """
+    yield ics.calendar_start(name, CALENDAR_TIMEZONE, ICS_REFRESH_MINUTES)
+    for item in sorted(work, key=lambda w: (w.get('due_date') or w.get('date') or '', w.get('id'))):
+        if not item.get('date'):
+            continue
+        try:
+            yield work_event(item)
+        except (TypeError, ValueError) as e:
+            print(f"❌ Cannot serialize work {item.get('id')} to iCalendar: {e}")
+    yield ics.CALENDAR_END
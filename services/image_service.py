@@ -0,0 +1,320 @@
+"""
+Сервис обработки загруженных изображений новостей
+
+Запрос пересохраняет загрузку без метаданных (EXIF, GPS, комментарии) и
+кладёт эту копию в хранилище (utils.storage: локальный диск или S3) —
+новость сразу её показывает. Сам исходник остаётся только в
+UPLOAD_INCOMING_FOLDER (вне static/) и ждёт очереди. Фоновый поток делает
+варианты по ширине в WebP и исходном формате (utils.images), пишет их в
+хранилище, переключает новости на самый большой вариант с метаданными в
+news.image_meta и удаляет промежуточную копию полного размера. Если
+обработка не удалась, новости продолжают показывать эту копию.
+GIF не нарезаются на варианты — они потеряли бы анимацию.
+
+Без Pillow загрузки отклоняются: удалить из них метаданные нечем.
+
+Файлы адресуются содержимым: ключ — sha256 загруженных байтов, разложенный
+по префиксам из первых двух символов (каталоги остаются небольшими):
+
+    /static/uploads/3f/3fa1...c9.orig.jpg  копия без метаданных, пока нет вариантов
+    /static/uploads/3f/3fa1...c9.jpg       самый большой вариант (news.image_url)
+    /static/uploads/3f/3fa1...c9-640.webp  варианты для srcset
+
+Повторная загрузка того же файла не создаёт копий и не обрабатывается
+заново. Ссылки на файлы — news.image_url; файлы, на которые больше не
+ссылается ни одна новость, удаляет collect_garbage() (задача планировщика).
+"""
+import hashlib
+import io
+import mimetypes
+import os
+import queue
+import re
+import threading
+import time
+from config.settings import UPLOAD_INCOMING_FOLDER, ALLOWED_EXTENSIONS, UPLOAD_GC_GRACE_PERIOD
+from utils import images
+from utils.storage import get_storage, key_from_url
+
+# Очередь путей в UPLOAD_INCOMING_FOLDER
+image_queue = queue.Queue()
+image_thread = None
+
+# Необработанные загрузки старше суток считаются брошенными
+INCOMING_MAX_AGE = 24 * 3600
+
+CHUNK_SIZE = 64 * 1024
+
+# Загрузки этих форматов не нарезаются на варианты (только очищаются от метаданных)
+PASSTHROUGH_EXTENSIONS = {'gif'}
+
+# Необработанная загрузка, обработка которой не удалась (не ставится в очередь повторно)
+FAILED_SUFFIX = '.failed'
+
+# Ключ загрузки: шард / хеш, начинающийся с шарда [-ширина | .orig] . расширение
+UPLOAD_KEY_RE = re.compile(r'^([0-9a-f]{2})/\1[0-9a-f]{30}(?:-[1-9][0-9]*|\.orig)?\.(?:' +
+                           '|'.join(sorted(ALLOWED_EXTENSIONS | {'jpg', 'webp'})) + r')$')
+
+
+def start_image_worker():
+    """Запускает фоновую обработку изображений и дообрабатывает оставшиеся с прошлого запуска"""
+    global image_thread
+
+    if not images.is_available():
+        print("❌ Pillow not installed, image uploads are rejected")
+        return
+
+    if image_thread is None or not image_thread.is_alive():
+        image_thread = threading.Thread(target=image_worker, daemon=True)
+        image_thread.start()
+        print("✅ Image worker started")
+
+    if os.path.isdir(UPLOAD_INCOMING_FOLDER):
+        for name in sorted(os.listdir(UPLOAD_INCOMING_FOLDER)):
+            if not name.endswith(('.tmp', FAILED_SUFFIX)):
+                image_queue.put(os.path.join(UPLOAD_INCOMING_FOLDER, name))
+
+
+def image_worker():
+    """Фоновый процесс обработки изображений"""
+    while True:
+        try:
+            path = image_queue.get(timeout=300)
+
+            if path is None:  # Сигнал остановки
+                break
+
+            process_upload(path)
+            image_queue.task_done()
+        except queue.Empty:
+            continue
+        except Exception as e:
+            print(f"❌ Image worker error: {e}")
+
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+
+
+def _output_extension(ext):
+    """Расширение самого большого варианта в исходном формате"""
+    return 'jpg' if ext in ('jpg', 'jpeg') else ext
+
+
+def variant_name(digest, width, ext, largest):
+    """Ключ варианта в хранилище: самый большой без суффикса ширины"""
+    name = f'{digest}.{ext}' if largest else f'{digest}-{width}.{ext}'
+    return f'{digest[:2]}/{name}'
+
+
+def original_name(digest, ext):
+    """Ключ копии без метаданных в хранилище (пока нет вариантов)"""
+    return f'{digest[:2]}/{digest}.orig.{ext}'
+
+
+def is_upload_key(key):
+    """Ключ из раскладки загрузок (копия или вариант), а не произвольный объект хранилища"""
+    return UPLOAD_KEY_RE.match(key) is not None
+
+
+def image_url(digest, ext):
+    """URL изображения (самого большого варианта) по хешу содержимого"""
+    return get_storage().url(variant_name(digest, None, ext, True))
+
+
+def _digest_from_url(url):
+    return os.path.basename(url).split('.', 1)[0]
+
+
+def _content_type(key):
+    return mimetypes.guess_type(key)[0] or 'application/octet-stream'
+
+
+def group_key(key):
+    """
+    Ключ группы файлов одного изображения: ключ без суффикса ширины и расширения
+
+    Одинаково считается для ключа из news.image_url и для файлов в хранилище,
+    в том числе для старых загрузок вида <uuid>_<имя>.<ext>.
+    """
+    directory, _, name = key.rpartition('/')
+    stem = name.split('.', 1)[0].split('-', 1)[0]
+    return f'{directory}/{stem}' if directory else stem
+
+
+def save_upload(file):
+    """
+    Сохраняет загруженное изображение до обработки
+
+    Файл пишется потоково с подсчётом sha256 в UPLOAD_INCOMING_FOLDER, а в
+    хранилище кладётся его копия без метаданных — её и видно, пока нет
+    вариантов. Если такое изображение уже загружено, загрузка отбрасывается
+    и возвращается адрес существующего (обработанного или ещё нет; его время
+    изменения обновляется, чтобы сборщик мусора не удалил файлы до
+    сохранения новости).
+
+    Args:
+        file: FileStorage из request.files
+
+    Returns:
+        str: URL изображения ('' — файл не изображение или нет Pillow)
+    """
+    ext = _extension(file.filename or '')
+    if ext not in ALLOWED_EXTENSIONS:
+        print(f"❌ Upload rejected: {file.filename}")
+        return ''
+    if not images.is_available():
+        print(f"❌ Upload rejected (Pillow not installed): {file.filename}")
+        return ''
+
+    os.makedirs(UPLOAD_INCOMING_FOLDER, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_INCOMING_FOLDER, f'{os.getpid()}-{threading.get_ident()}.tmp')
+    sha256 = hashlib.sha256()
+    with open(tmp_path, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+            out.write(chunk)
+    digest = sha256.hexdigest()[:32]
+
+    storage = get_storage()
+    ext = _output_extension(ext)
+    process = ext not in PASSTHROUGH_EXTENSIONS
+    keys = [variant_name(digest, None, ext, True)] + ([original_name(digest, ext)] if process else [])
+    for key in keys:
+        if storage.exists(key):
+            os.remove(tmp_path)
+            storage.touch(key)
+            print(f"✅ Upload deduplicated: {digest}")
+            return storage.url(key)
+
+    # Наружу исходные байты не попадают: в них EXIF с GPS и моделью камеры
+    try:
+        data = images.strip_metadata(tmp_path, ext)
+    except Exception as e:
+        os.remove(tmp_path)
+        print(f"❌ Upload rejected: {file.filename}: {e}")
+        return ''
+
+    # GIF так и отдаётся, без вариантов
+    key = keys[-1]
+    storage.save(key, io.BytesIO(data), _content_type(key))
+
+    if process:
+        os.replace(tmp_path, os.path.join(UPLOAD_INCOMING_FOLDER, f'{digest}.{ext}'))
+    else:
+        os.remove(tmp_path)
+    return storage.url(key)
+
+
+def process_upload_async(url):
+    """
+    Ставит загрузку в очередь обработки
+
+    Вызывается после сохранения новости, чтобы метаданные было куда записать.
+    Уже обработанное изображение (повторная загрузка) получает метаданные
+    из другой новости с тем же адресом; новость, сохранённая с адресом
+    копии уже после обработки, переключается на самый большой вариант.
+    """
+    from models.news import find_image_meta, set_image_meta
+
+    if not url or not images.is_available():
+        return
+
+    digest = _digest_from_url(url)
+    if os.path.isdir(UPLOAD_INCOMING_FOLDER):
+        for name in os.listdir(UPLOAD_INCOMING_FOLDER):
+            if name.startswith(digest + '.') and not name.endswith(FAILED_SUFFIX):
+                image_queue.put(os.path.join(UPLOAD_INCOMING_FOLDER, name))
+                return
+
+    processed_url = url.replace(f'{digest}.orig.', f'{digest}.')
+    meta = find_image_meta(processed_url)
+    if meta:
+        set_image_meta(url, meta, processed_url)
+
+
+def process_upload(path):
+    """Делает варианты загруженного изображения и записывает метаданные в новость"""
+    from models.news import set_image_meta
+
+    if not os.path.exists(path):
+        return  # Уже обработан (повторно поставлен в очередь)
+
+    digest, ext = os.path.splitext(os.path.basename(path))
+    ext = ext.lstrip('.').lower()
+    storage = get_storage()
+
+    try:
+        info, variants = images.render_variants(path, ext)
+        largest_width = variants[-1][0]
+        srcset = {}
+        # Самый большой вариант пишется последним: по нему save_upload()
+        # решает, что изображение уже обработано
+        for width, variant_ext, data in sorted(variants, key=lambda v: v[0] == largest_width):
+            key = variant_name(digest, width, variant_ext, width == largest_width)
+            storage.save(key, io.BytesIO(data), _content_type(key))
+            fmt = 'webp' if variant_ext == 'webp' else 'original'
+            srcset.setdefault(fmt, []).append([width, storage.url(key)])
+    except Exception as e:
+        # Новости продолжают показывать копию без метаданных, она не удаляется
+        print(f"❌ Cannot process image {path}: {e}")
+        os.replace(path, path + FAILED_SUFFIX)
+        return
+
+    # Исходник WebP — его варианты и есть "исходный формат"
+    srcset.setdefault('original', srcset['webp'])
+
+    meta = dict(info, srcset=srcset)
+    original = original_name(digest, ext)
+    if set_image_meta(storage.url(original), meta, image_url(digest, ext)):
+        storage.delete(original)
+    os.remove(path)
+    print(f"✅ Image processed: {digest} ({len(variants)} variants)")
+
+
+def collect_garbage(grace_period=UPLOAD_GC_GRACE_PERIOD):
+    """
+    Удаляет файлы изображений, на которые не ссылается ни одна новость
+
+    Файлы одного изображения (все варианты) удаляются вместе и только если
+    самый свежий из них старше grace_period: новость с только что
+    загруженным изображением может быть ещё не сохранена.
+
+    Returns:
+        tuple: (удалено файлов, освобождено байт)
+    """
+    from models.news import load_image_urls
+
+    storage = get_storage()
+    referenced = {group_key(key) for key in map(key_from_url, load_image_urls()) if key}
+
+    groups = {}
+    for key, mtime, size in storage.list():
+        groups.setdefault(group_key(key), []).append((key, mtime, size))
+
+    now = time.time()
+    removed, freed = 0, 0
+    for group, files in groups.items():
+        if group in referenced or now - max(mtime for _, mtime, _ in files) < grace_period:
+            continue
+        for key, _, size in files:
+            try:
+                storage.delete(key)
+            except Exception as e:
+                print(f"❌ Cannot delete upload {key}: {e}")
+                continue
+            removed += 1
+            freed += size
+
+    # Брошенные необработанные загрузки
+    if os.path.isdir(UPLOAD_INCOMING_FOLDER):
+        for name in os.listdir(UPLOAD_INCOMING_FOLDER):
+            path = os.path.join(UPLOAD_INCOMING_FOLDER, name)
+            try:
+                if now - os.path.getmtime(path) > INCOMING_MAX_AGE:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+
+    return removed, freed
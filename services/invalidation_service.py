@@ -0,0 +1,77 @@
+"""
+Invalidation Service - межпроцессный сброс кешей данных
+
+Каждый процесс (gunicorn worker) запускает фоновый поток, который узнаёт об
+изменениях, сделанных другими процессами, и сбрасывает только затронутые
+наборы данных (см. models.data_versions). Свои записи процесс уже применил
+сам, их уведомления и версии пропускаются:
+
+- PostgreSQL: LISTEN на отдельном соединении, уведомления приходят сразу
+  после COMMIT пишущей транзакции
+- SQLite: опрос таблицы data_versions раз в DATA_VERSION_POLL_INTERVAL секунд
+"""
+
+import threading
+import time
+import psycopg
+from config.settings import DATABASE_URL, DATA_VERSION_POLL_INTERVAL
+from models.data_versions import CHANNEL, DATASETS, foreign_changes, invalidate_changed, parse_notification, read_versions
+from models.database import get_db_connection
+
+
+listener_thread = None
+
+
+def start_invalidation_listener():
+    """Запускает фоновый поток инвалидации кешей"""
+    global listener_thread
+    
+    if listener_thread is None or not listener_thread.is_alive():
+        target = listen_notifications if DATABASE_URL else poll_data_versions
+        listener_thread = threading.Thread(target=target, daemon=True)
+        listener_thread.start()
+        print("✅ Cache invalidation listener started")
+
+
+def listen_notifications():
+    """PostgreSQL: ждёт NOTIFY data_changed и сбрасывает кеш набора из payload"""
+    delay = 1
+    while True:
+        try:
+            with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+                conn.execute(f'LISTEN {CHANNEL}')
+                # Уведомления, пришедшие до (пере)подключения, потеряны
+                invalidate_changed(*DATASETS)
+                delay = 1
+                
+                for notify in conn.notifies():
+                    dataset, own = parse_notification(notify.payload)
+                    if dataset in DATASETS and not own:
+                        invalidate_changed(dataset)
+        except Exception as e:
+            print(f"❌ Invalidation listener error: {e}")
+        
+        time.sleep(delay)
+        delay = min(delay * 2, 60)
+
+
+def poll_data_versions():
+    """SQLite: сравнивает версии наборов с последними увиденными"""
+    known = None
+    while True:
+        try:
+            conn = get_db_connection()
+            try:
+                versions = read_versions(conn.cursor())
+            finally:
+                conn.close()
+            
+            if known is not None:
+                changed = foreign_changes(known, versions)
+                if changed:
+                    invalidate_changed(*changed)
+            known = versions
+        except Exception as e:
+            print(f"❌ Data version poll error: {e}")
+        
+        time.sleep(DATA_VERSION_POLL_INTERVAL)
@@ -4,11 +4,15 @@ Scheduler Service - Planned tasks (email notifications, cleanup)
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, timedelta
+from models.queries import Query, execute
 import atexit
 
 
 scheduler = BackgroundScheduler()
 
+DELETE_OLD_TIMER_SESSIONS = Query('scheduler.delete_old_timer_sessions',
+                                  "DELETE FROM timer_sessions WHERE created_at < ?")
+
 
 def start_scheduler():
     """Запускает планировщик задач"""
@@ -32,6 +36,26 @@ def start_scheduler():
         replace_existing=True
     )
     
+    # Файлы изображений без ссылок из новостей — каждый день в 3:30
+    scheduler.add_job(
+        func=cleanup_uploads,
+        trigger="cron",
+        hour=3,
+        minute=30,
+        id='cleanup_uploads',
+        replace_existing=True
+    )
+    
+    # Старые файлы фоновых экспортов — каждый день в 3:45
+    scheduler.add_job(
+        func=cleanup_exports,
+        trigger="cron",
+        hour=3,
+        minute=45,
+        id='cleanup_exports',
+        replace_existing=True
+    )
+    
     scheduler.start()
     print("✓ Scheduler started")
     
@@ -57,12 +81,8 @@ def check_deadlines():
         # Работы на сегодня и завтра
         urgent = []
         for work in all_work:
-            try:
-                work_date = datetime.strptime(work['date'], '%Y-%m-%d').date()
-                if work_date in [today, tomorrow]:
-                    urgent.append(work)
-            except:
-                continue
+            if work.get('deadline_at') and work['deadline_at'].date() in [today, tomorrow]:
+                urgent.append(work)
         
         if urgent:
             print(f"Found {len(urgent)} urgent work items")
@@ -85,10 +105,7 @@ def cleanup_old_data():
         six_months_ago = datetime.now() - timedelta(days=180)
         
         # Удаление старых сессий таймера
-        cursor.execute(
-            "DELETE FROM timer_sessions WHERE created_at < ?",
-            (six_months_ago.isoformat(),)
-        )
+        execute(cursor, DELETE_OLD_TIMER_SESSIONS, (six_months_ago.isoformat(),))
         
         deleted = cursor.rowcount
         conn.commit()
@@ -100,6 +117,31 @@ def cleanup_old_data():
         print(f"Error cleaning up data: {e}")
 
 
+def cleanup_uploads():
+    """Удаляет загруженные изображения, на которые не ссылается ни одна новость"""
+    try:
+        from services.image_service import collect_garbage
+        
+        print(f"[{datetime.now()}] Collecting unreferenced uploads...")
+        removed, freed = collect_garbage()
+        print(f"Removed {removed} upload files ({freed // 1024} KB)")
+        
+    except Exception as e:
+        print(f"Error cleaning up uploads: {e}")
+
+
+def cleanup_exports():
+    """Удаляет устаревшие файлы фоновых экспортов"""
+    try:
+        from services.export_service import cleanup_exports as remove_old_exports
+        
+        print(f"[{datetime.now()}] Cleaning up exports...")
+        print(f"Removed {remove_old_exports()} export files")
+        
+    except Exception as e:
+        print(f"Error cleaning up exports: {e}")
+
+
 def send_deadline_notifications():
     """Отправляет уведомления о дедлайнах"""
     # TODO: интеграция с email service
@@ -0,0 +1,90 @@
+"""
+Search Service - Полнотекстовый поиск по работам и новостям
+
+Индекс (models.search) возвращает id документов по релевантности, сами
+строки берутся из данных запроса (g.data), а совпадения подсвечиваются
+utils.text по свёрнутому тексту — одинаково на PostgreSQL и SQLite.
+"""
+from urllib.parse import quote
+from flask import g
+from models.database import get_db_connection
+from models.search import DOC_NEWS, DOC_WORK, search_documents
+from utils.pagination import make_cursor
+from utils.text import highlight, search_terms, snippet, strip_tags
+
+
+def _work_hit(work, terms):
+    return {
+        'type': DOC_WORK,
+        'id': work['id'],
+        'title': highlight(work.get('title') or work.get('type'), terms),
+        'subject': highlight(work.get('subject'), terms),
+        'kind': highlight(work.get('type'), terms),
+        'snippet': snippet(work.get('description'), terms),
+        'date': work.get('date'),
+        'url': f"/subject/{quote(work['subject'])}#work-{work['id']}",
+        'item': work,
+    }
+
+
+def _news_hit(news, terms):
+    return {
+        'type': DOC_NEWS,
+        'id': news['id'],
+        'title': highlight(news.get('title'), terms),
+        'subject': None,
+        'kind': None,
+        'snippet': snippet(strip_tags(news.get('content')), terms),
+        'date': news.get('date'),
+        'url': f"/news/{news['id']}",
+        'item': news,
+    }
+
+
+def search(query, limit, offset=0):
+    """
+    Страница результатов поиска
+
+    Args:
+        query (str): Строка запроса
+        limit (int): Размер страницы
+        offset (int): Сколько результатов пропустить
+
+    Returns:
+        tuple: (список результатов с подсветкой, курсор следующей страницы или None)
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], None
+
+    # Документы индекса, которых нет в данных запроса (скрытые новости,
+    # только что удалённые работы), пропускаются и не занимают места на
+    # странице; курсор указывает на позицию первого непоказанного результата
+    sources = {
+        DOC_WORK: ({work['id']: work for work in g.data.all_work}, _work_hit),
+        DOC_NEWS: ({news['id']: news for news in g.data.news if news.get('is_active', True)}, _news_hit),
+    }
+
+    hits = []
+    next_cursor = None
+    position = offset
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        while next_cursor is None:
+            # Лишний документ показывает, есть ли следующая страница
+            documents = search_documents(cursor, terms, limit + 1, position)
+            for doc_type, doc_id in documents:
+                items, make_hit = sources[doc_type]
+                if doc_id in items:
+                    if len(hits) == limit:
+                        next_cursor = make_cursor(position)
+                        break
+                    hits.append(make_hit(items[doc_id], terms))
+                position += 1
+            if len(documents) <= limit:
+                break
+    finally:
+        conn.close()
+
+    return hits, next_cursor
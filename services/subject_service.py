@@ -1,13 +1,40 @@
 """
 Subject Service - Управление предметами
+
+Данные берутся из контекста запроса (g.data), поэтому вызывать функции
+нужно внутри запроса Flask.
 """
 
-from models.subjects import get_all_subjects, get_subject_by_name
-from models.tests import load_tests
-from models.homework import load_homework
+from flask import g
+from models.work import KIND_HOMEWORK, KIND_TEST
 from datetime import datetime
 
 
+def get_subject_with_stats(subject_name):
+    """
+    Предмет и его работы (тесты и домашние задания) по дате
+    
+    Args:
+        subject_name (str): Название предмета
+        
+    Returns:
+        tuple: (предмет или None, список работ с полем source)
+    """
+    subject_details = next((s for s in g.data.subjects if s['name'] == subject_name), None)
+    
+    subject_work = []
+    for work in g.data.all_work:
+        if work['subject'] == subject_name:
+            work_copy = work.copy()
+            work_copy['source'] = work['kind']
+            subject_work.append(work_copy)
+    
+    # Сортируем по дате
+    subject_work.sort(key=lambda x: x['date'])
+    
+    return subject_details, subject_work
+
+
 def get_subjects_with_work_count():
     """
     Получает все предметы с количеством работ
@@ -16,19 +43,15 @@ def get_subjects_with_work_count():
         list: Список предметов с work_count
     """
     try:
-        subjects = get_all_subjects()
-        tests = load_tests()
-        homework = load_homework()
-        all_work = tests + homework
+        work_count = {}
+        for work in g.data.all_work:
+            work_count[work.get('subject')] = work_count.get(work.get('subject'), 0) + 1
         
-        # Подсчитываем работы для каждого предмета
-        for subject in subjects:
-            subject['work_count'] = sum(
-                1 for work in all_work 
-                if work.get('subject') == subject['name']
-            )
-        
-        return subjects
+        # Копии: g.data.subjects общий для всего запроса
+        return [
+            dict(subject, work_count=work_count.get(subject['name'], 0))
+            for subject in g.data.subjects
+        ]
         
     except Exception as e:
         print(f"Error getting subjects with work count: {e}")
@@ -46,19 +69,15 @@ def get_subject_statistics(subject_name):
         dict: Статистика
     """
     try:
-        tests = load_tests()
-        homework = load_homework()
-        all_work = tests + homework
-        
         # Фильтруем работы по предмету
-        subject_work = [w for w in all_work if w.get('subject') == subject_name]
+        subject_work = [w for w in g.data.all_work if w.get('subject') == subject_name]
         
         today = datetime.now().date()
         
         stats = {
             'total': len(subject_work),
-            'tests': sum(1 for w in subject_work if w.get('source') == 'test'),
-            'homework': sum(1 for w in subject_work if w.get('source') == 'homework'),
+            'tests': sum(1 for w in subject_work if w.get('kind') == KIND_TEST),
+            'homework': sum(1 for w in subject_work if w.get('kind') == KIND_HOMEWORK),
             'today': 0,
             'tomorrow': 0,
             'week': 0,
@@ -66,20 +85,18 @@ def get_subject_statistics(subject_name):
         }
         
         for work in subject_work:
-            try:
-                work_date = datetime.strptime(work['date'], '%Y-%m-%d').date()
-                days_left = (work_date - today).days
-                
-                if days_left == 0:
-                    stats['today'] += 1
-                elif days_left == 1:
-                    stats['tomorrow'] += 1
-                elif 2 <= days_left <= 7:
-                    stats['week'] += 1
-                elif days_left < 0:
-                    stats['overdue'] += 1
-            except:
+            if work.get('deadline_at') is None:
                 continue
+            days_left = (work['deadline_at'].date() - today).days
+            
+            if days_left == 0:
+                stats['today'] += 1
+            elif days_left == 1:
+                stats['tomorrow'] += 1
+            elif 2 <= days_left <= 7:
+                stats['week'] += 1
+            elif days_left < 0:
+                stats['overdue'] += 1
         
         return stats
         
@@ -104,13 +121,9 @@ def get_work_by_subject():
         dict: {subject_name: [works]}
     """
     try:
-        tests = load_tests()
-        homework = load_homework()
-        all_work = tests + homework
-        
         work_by_subject = {}
         
-        for work in all_work:
+        for work in g.data.all_work:
             subject = work.get('subject', 'Другое')
             if subject not in work_by_subject:
                 work_by_subject[subject] = []
@@ -137,10 +150,9 @@ def get_subject_colors():
         dict: {subject_name: color}
     """
     try:
-        subjects = get_all_subjects()
         return {
             s['name']: s.get('color', '#667eea') 
-            for s in subjects
+            for s in g.data.subjects
         }
     except:
         return {}
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Suggest Service - Подсказки при вводе поискового запроса
+
+Индекс (utils.suggest) строится из предметов и работ в памяти процесса.
+После записи в БД набор данных (subjects, tests, homework) помечается
+изменённым через data_versions, а при следующем запросе подсказок его
+записи сверяются с индексом — меняются только добавленные и удалённые.
+"""
+import threading
+from functools import partial
+from urllib.parse import quote
+from models.data_versions import register_invalidator
+from models.subjects import load_subjects
+from models.work import DATASETS, KIND_HOMEWORK, KIND_TEST, load_work
+from utils.suggest import SuggestIndex
+from utils.text import fold, highlight, search_terms
+
+CATEGORY_SUBJECT = 'subject'
+CATEGORY_TITLE = 'title'
+CATEGORY_TYPE = 'type'
+
+_index = SuggestIndex()
+_stale = set()
+_stale_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def _subject_entries():
+    return {
+        (CATEGORY_SUBJECT, fold(subject['name'])): (subject['name'], {
+            'label': subject['name'],
+            'category': CATEGORY_SUBJECT,
+            'url': f"/subject/{quote(subject['name'])}",
+        })
+        for subject in load_subjects() if subject.get('name')
+    }
+
+
+def _work_entries(kind):
+    """Названия и типы работ (одинаковые — одна подсказка)"""
+    entries = {}
+    for work in load_work(kind):
+        for category, field in ((CATEGORY_TITLE, 'title'), (CATEGORY_TYPE, 'type')):
+            label = (work.get(field) or '').strip()
+            if label:
+                entries[(category, fold(label))] = (label, {
+                    'label': label,
+                    'category': category,
+                    'url': f'/search?q={quote(label)}',
+                })
+    return entries
+
+
+SOURCES = {
+    'subjects': _subject_entries,
+    DATASETS[KIND_TEST]: partial(_work_entries, KIND_TEST),
+    DATASETS[KIND_HOMEWORK]: partial(_work_entries, KIND_HOMEWORK),
+}
+
+
+def _mark_stale(source):
+    with _stale_lock:
+        _stale.add(source)
+
+
+for _source in SOURCES:
+    _stale.add(_source)
+    register_invalidator(_source, partial(_mark_stale, _source))
+
+
+def _refresh():
+    """Сверяет изменённые источники с индексом"""
+    if not _stale:
+        return
+    with _refresh_lock:
+        with _stale_lock:
+            sources = list(_stale)
+            _stale.clear()
+        for source in sources:
+            try:
+                changed = _index.replace(source, SOURCES[source]())
+            except Exception as e:
+                print(f"❌ Error indexing suggestions ({source}): {e}")
+                _mark_stale(source)
+                continue
+            if changed:
+                print(f"✅ Suggest index updated: {source} ({changed} entries)")
+
+
+def suggest(query, limit):
+    """
+    Подсказки для начала поискового запроса
+
+    Returns:
+        list: [{'label', 'html', 'category', 'url', 'score'}, ...]
+    """
+    _refresh()
+    terms = search_terms(query)
+    return [
+        dict(data, html=highlight(data['label'], terms), score=score)
+        for data, score in _index.lookup(query, limit)
+    ]
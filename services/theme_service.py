@@ -5,10 +5,42 @@ Theme Service - Управление темами пользователей
 """
 
 from models.database import get_db_connection
-from config.settings import DATABASE_URL
+from models.queries import Query, execute, fetch_value
 import json
 from datetime import datetime
 
+SELECT_THEME = Query('theme_service.select_theme', """
+    SELECT theme_name, custom_settings
+    FROM user_settings
+    WHERE device_id = ?
+""")
+
+SELECT_DEVICE = Query('theme_service.select_device', "SELECT device_id FROM user_settings WHERE device_id = ?")
+
+UPDATE_THEME = Query('theme_service.update_theme', """
+    UPDATE user_settings
+    SET theme_name = ?,
+        custom_settings = ?,
+        updated_at = ?
+    WHERE device_id = ?
+""")
+
+INSERT_THEME = Query('theme_service.insert_theme', """
+    INSERT INTO user_settings
+    (device_id, theme_name, custom_settings, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+""")
+
+COUNT_THEMED_USERS = Query('theme_service.count_themed_users',
+                           "SELECT COUNT(*) FROM user_settings WHERE theme_name IS NOT NULL")
+
+COUNT_BY_THEME = Query('theme_service.count_by_theme', """
+    SELECT theme_name, COUNT(*)
+    FROM user_settings
+    WHERE theme_name IS NOT NULL
+    GROUP BY theme_name
+""")
+
 # ============================================
 # THEME MANAGEMENT
 # ============================================
@@ -31,24 +63,7 @@ def get_user_theme(device_id):
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        if DATABASE_URL:  # PostgreSQL
-            cursor.execute(
-                """
-                SELECT theme_name, custom_settings 
-                FROM user_settings 
-                WHERE device_id = %s
-                """,
-                (device_id,)
-            )
-        else:  # SQLite
-            cursor.execute(
-                """
-                SELECT theme_name, custom_settings 
-                FROM user_settings 
-                WHERE device_id = ?
-                """,
-                (device_id,)
-            )
+        execute(cursor, SELECT_THEME, (device_id,))
         
         result = cursor.fetchone()
         conn.close()
@@ -102,64 +117,18 @@ def save_user_theme(device_id, theme_name, custom_settings=None):
         custom_json = json.dumps(custom_settings) if custom_settings else None
         
         # Проверяем существует ли запись
-        if DATABASE_URL:  # PostgreSQL
-            cursor.execute(
-                "SELECT device_id FROM user_settings WHERE device_id = %s",
-                (device_id,)
-            )
-        else:  # SQLite
-            cursor.execute(
-                "SELECT device_id FROM user_settings WHERE device_id = ?",
-                (device_id,)
-            )
+        execute(cursor, SELECT_DEVICE, (device_id,))
         
         exists = cursor.fetchone()
         
+        now = datetime.now().isoformat()
+        
         if exists:
             # UPDATE существующей записи
-            if DATABASE_URL:  # PostgreSQL
-                cursor.execute(
-                    """
-                    UPDATE user_settings 
-                    SET theme_name = %s, 
-                        custom_settings = %s, 
-                        updated_at = %s
-                    WHERE device_id = %s
-                    """,
-                    (theme_name, custom_json, datetime.now(), device_id)
-                )
-            else:  # SQLite
-                cursor.execute(
-                    """
-                    UPDATE user_settings 
-                    SET theme_name = ?, 
-                        custom_settings = ?, 
-                        updated_at = ?
-                    WHERE device_id = ?
-                    """,
-                    (theme_name, custom_json, datetime.now().isoformat(), device_id)
-                )
+            execute(cursor, UPDATE_THEME, (theme_name, custom_json, now, device_id))
         else:
             # INSERT новой записи
-            if DATABASE_URL:  # PostgreSQL
-                cursor.execute(
-                    """
-                    INSERT INTO user_settings 
-                    (device_id, theme_name, custom_settings, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (device_id, theme_name, custom_json, datetime.now(), datetime.now())
-                )
-            else:  # SQLite
-                cursor.execute(
-                    """
-                    INSERT INTO user_settings 
-                    (device_id, theme_name, custom_settings, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (device_id, theme_name, custom_json, 
-                     datetime.now().isoformat(), datetime.now().isoformat())
-                )
+            execute(cursor, INSERT_THEME, (device_id, theme_name, custom_json, now, now))
         
         conn.commit()
         conn.close()
@@ -279,18 +248,10 @@ def get_theme_statistics():
         cursor = conn.cursor()
         
         # Общее количество пользователей с темой
-        cursor.execute("SELECT COUNT(*) FROM user_settings WHERE theme_name IS NOT NULL")
-        total = cursor.fetchone()[0]
+        total = fetch_value(execute(cursor, COUNT_THEMED_USERS), 0)
         
         # Подсчет по темам
-        cursor.execute(
-            """
-            SELECT theme_name, COUNT(*) 
-            FROM user_settings 
-            WHERE theme_name IS NOT NULL
-            GROUP BY theme_name
-            """
-        )
+        execute(cursor, COUNT_BY_THEME)
         
         by_theme = {}
         for row in cursor.fetchall():
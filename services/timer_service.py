@@ -3,11 +3,58 @@ Timer Service - Pomodoro timer data management
 """
 
 from models.database import get_db_connection
-from config.settings import DATABASE_URL
+from models.queries import Query, execute, fetch_value
 from datetime import datetime, timedelta
 import json
 
 
+INSERT_TIMER_SESSION = Query('timer_service.insert_session', """
+    INSERT INTO timer_sessions
+    (user_id, duration_seconds, session_date, created_at)
+    VALUES (?, ?, ?, ?)
+""")
+
+SUM_SECONDS_ON_DAY = Query('timer_service.sum_seconds_on_day', """
+    SELECT COALESCE(SUM(duration_seconds), 0)
+    FROM timer_sessions
+    WHERE user_id = ? AND session_date = ?
+""")
+
+SUM_SECONDS_SINCE = Query('timer_service.sum_seconds_since', """
+    SELECT COALESCE(SUM(duration_seconds), 0)
+    FROM timer_sessions
+    WHERE user_id = ? AND session_date >= ?
+""")
+
+COUNT_SESSIONS_ON_DAY = Query('timer_service.count_sessions_on_day', """
+    SELECT COUNT(*)
+    FROM timer_sessions
+    WHERE user_id = ? AND session_date = ?
+""")
+
+SELECT_HISTORY = Query('timer_service.select_history', """
+    SELECT duration_seconds, session_date, created_at
+    FROM timer_sessions
+    WHERE user_id = ? AND session_date >= ?
+    ORDER BY created_at DESC
+""")
+
+CREATE_TIMER_TABLE = Query('timer_service.create_table', """
+    CREATE TABLE IF NOT EXISTS timer_sessions (
+        id {pk},
+        user_id TEXT NOT NULL,
+        duration_seconds INTEGER NOT NULL,
+        session_date {date} NOT NULL,
+        created_at {timestamp} DEFAULT CURRENT_TIMESTAMP
+    )
+""", prepare=False)
+
+CREATE_TIMER_INDEX = Query('timer_service.create_index', """
+    CREATE INDEX IF NOT EXISTS idx_timer_user_date
+    ON timer_sessions(user_id, session_date)
+""", prepare=False)
+
+
 def save_timer_data(user_id, seconds):
     """
     Сохраняет сессию таймера
@@ -23,25 +70,8 @@ def save_timer_data(user_id, seconds):
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        if DATABASE_URL:  # PostgreSQL
-            cursor.execute(
-                """
-                INSERT INTO timer_sessions 
-                (user_id, duration_seconds, session_date, created_at)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (user_id, seconds, datetime.now().date(), datetime.now())
-            )
-        else:  # SQLite
-            cursor.execute(
-                """
-                INSERT INTO timer_sessions 
-                (user_id, duration_seconds, session_date, created_at)
-                VALUES (?, ?, ?, ?)
-                """,
-                (user_id, seconds, datetime.now().date().isoformat(), 
-                 datetime.now().isoformat())
-            )
+        execute(cursor, INSERT_TIMER_SESSION,
+                (user_id, seconds, datetime.now().date().isoformat(), datetime.now().isoformat()))
         
         conn.commit()
         conn.close()
@@ -70,70 +100,13 @@ def get_user_timer_stats(user_id):
         week_ago = today - timedelta(days=7)
         
         # Сегодня
-        if DATABASE_URL:
-            cursor.execute(
-                """
-                SELECT COALESCE(SUM(duration_seconds), 0) 
-                FROM timer_sessions 
-                WHERE user_id = %s AND session_date = %s
-                """,
-                (user_id, today)
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT COALESCE(SUM(duration_seconds), 0) 
-                FROM timer_sessions 
-                WHERE user_id = ? AND session_date = ?
-                """,
-                (user_id, today.isoformat())
-            )
-        
-        today_seconds = cursor.fetchone()[0]
+        today_seconds = fetch_value(execute(cursor, SUM_SECONDS_ON_DAY, (user_id, today.isoformat())), 0)
         
         # За неделю
-        if DATABASE_URL:
-            cursor.execute(
-                """
-                SELECT COALESCE(SUM(duration_seconds), 0) 
-                FROM timer_sessions 
-                WHERE user_id = %s AND session_date >= %s
-                """,
-                (user_id, week_ago)
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT COALESCE(SUM(duration_seconds), 0) 
-                FROM timer_sessions 
-                WHERE user_id = ? AND session_date >= ?
-                """,
-                (user_id, week_ago.isoformat())
-            )
-        
-        week_seconds = cursor.fetchone()[0]
+        week_seconds = fetch_value(execute(cursor, SUM_SECONDS_SINCE, (user_id, week_ago.isoformat())), 0)
         
         # Количество сессий сегодня
-        if DATABASE_URL:
-            cursor.execute(
-                """
-                SELECT COUNT(*) 
-                FROM timer_sessions 
-                WHERE user_id = %s AND session_date = %s
-                """,
-                (user_id, today)
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT COUNT(*) 
-                FROM timer_sessions 
-                WHERE user_id = ? AND session_date = ?
-                """,
-                (user_id, today.isoformat())
-            )
-        
-        sessions_count = cursor.fetchone()[0]
+        sessions_count = fetch_value(execute(cursor, COUNT_SESSIONS_ON_DAY, (user_id, today.isoformat())), 0)
         
         conn.close()
         
@@ -175,26 +148,7 @@ def get_timer_history(user_id, days=7):
         
         date_limit = datetime.now().date() - timedelta(days=days)
         
-        if DATABASE_URL:
-            cursor.execute(
-                """
-                SELECT duration_seconds, session_date, created_at
-                FROM timer_sessions
-                WHERE user_id = %s AND session_date >= %s
-                ORDER BY created_at DESC
-                """,
-                (user_id, date_limit)
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT duration_seconds, session_date, created_at
-                FROM timer_sessions
-                WHERE user_id = ? AND session_date >= ?
-                ORDER BY created_at DESC
-                """,
-                (user_id, date_limit.isoformat())
-            )
+        execute(cursor, SELECT_HISTORY, (user_id, date_limit.isoformat()))
         
         sessions = []
         for row in cursor.fetchall():
@@ -220,34 +174,8 @@ def create_timer_table():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        if DATABASE_URL:  # PostgreSQL
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS timer_sessions (
-                    id SERIAL PRIMARY KEY,
-                    user_id VARCHAR(255) NOT NULL,
-                    duration_seconds INTEGER NOT NULL,
-                    session_date DATE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timer_user_date 
-                ON timer_sessions(user_id, session_date)
-            """)
-        else:  # SQLite
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS timer_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    duration_seconds INTEGER NOT NULL,
-                    session_date TEXT NOT NULL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timer_user_date 
-                ON timer_sessions(user_id, session_date)
-            """)
+        execute(cursor, CREATE_TIMER_TABLE)
+        execute(cursor, CREATE_TIMER_INDEX)
         
         conn.commit()
         conn.close()
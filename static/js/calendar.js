@@ -1,75 +1,177 @@
 // Calendar.js
+// Сводка месяца — /api/calendar?month=YYYY-MM (по дням только количество),
+// работы дня — /api/work?date_from=&date_to= при клике.
+// Соседние месяцы загружаются заранее, чтобы листание было мгновенным.
 class Calendar {
     constructor() {
-        this.currentDate = new Date();
-        this.works = [];
+        const today = new Date();
+        this.currentDate = new Date(today.getFullYear(), today.getMonth(), 1);
+        this.months = new Map();  // 'YYYY-MM' -> Promise с данными /api/calendar
+        this.selectedDate = null;
         this.init();
     }
-    
+
     async init() {
-        await this.loadWorks();
-        this.render();
         this.setupEvents();
+        await this.show();
     }
-    
-    async loadWorks() {
-        try {
-            const res = await fetch('/api/works');
-            const data = await res.json();
-            this.works = data.works || [];
-        } catch (e) {
-            console.error('Failed to load works:', e);
+
+    static pad(value) {
+        return String(value).padStart(2, '0');
+    }
+
+    // Локальная дата без перевода в UTC (toISOString сдвигает день)
+    static dateKey(date) {
+        return `${date.getFullYear()}-${Calendar.pad(date.getMonth() + 1)}-${Calendar.pad(date.getDate())}`;
+    }
+
+    static monthKey(date) {
+        return `${date.getFullYear()}-${Calendar.pad(date.getMonth() + 1)}`;
+    }
+
+    static escape(text) {
+        const div = document.createElement('div');
+        div.textContent = text ?? '';
+        return div.innerHTML;
+    }
+
+    loadMonth(date) {
+        const key = Calendar.monthKey(date);
+        if (!this.months.has(key)) {
+            const request = fetch(`/api/calendar?month=${key}`)
+                .then(res => {
+                    if (!res.ok) throw new Error(`HTTP error! status: ${res.status}`);
+                    return res.json();
+                })
+                .then(data => data.days || {})
+                .catch(e => {
+                    // Неудачная загрузка не кешируется — повторится при следующем показе
+                    this.months.delete(key);
+                    console.error('Failed to load calendar:', e);
+                    return {};
+                });
+            this.months.set(key, request);
         }
+        return this.months.get(key);
+    }
+
+    prefetchNeighbours() {
+        const year = this.currentDate.getFullYear();
+        const month = this.currentDate.getMonth();
+        this.loadMonth(new Date(year, month - 1, 1));
+        this.loadMonth(new Date(year, month + 1, 1));
     }
-    
-    render() {
+
+    async show() {
+        const shown = this.currentDate.getTime();
+        const days = await this.loadMonth(this.currentDate);
+        // Пока ждали ответ, пользователь мог перелистнуть дальше
+        if (shown !== this.currentDate.getTime()) return;
+        this.render(days);
+        this.prefetchNeighbours();
+    }
+
+    render(days) {
         const grid = document.getElementById('calendar');
         if (!grid) return;
-        
+
         const year = this.currentDate.getFullYear();
         const month = this.currentDate.getMonth();
-        
-        document.getElementById('monthYear').textContent = 
+
+        document.getElementById('monthYear').textContent =
             new Date(year, month).toLocaleDateString('lv-LV', { year: 'numeric', month: 'long' });
-        
+
         const firstDay = new Date(year, month, 1).getDay();
         const daysInMonth = new Date(year, month + 1, 0).getDate();
-        
+        const todayStr = Calendar.dateKey(new Date());
+
         let html = '<div class="calendar-days">';
         ['P', 'O', 'T', 'C', 'Pk', 'S', 'Sv'].forEach(day => {
             html += `<div class="calendar-day-header">${day}</div>`;
         });
         html += '</div><div class="calendar-dates">';
-        
+
         for (let i = 0; i < (firstDay || 7) - 1; i++) {
             html += '<div class="calendar-date empty"></div>';
         }
-        
+
         for (let day = 1; day <= daysInMonth; day++) {
-            const date = new Date(year, month, day);
-            const dateStr = date.toISOString().split('T')[0];
-            const dayWorks = this.works.filter(w => w.date === dateStr);
-            const isToday = dateStr === new Date().toISOString().split('T')[0];
-            
-            html += `<div class="calendar-date ${isToday ? 'today' : ''}" data-date="${dateStr}">
+            const dateStr = Calendar.dateKey(new Date(year, month, day));
+            const summary = days[dateStr];
+            const classes = ['calendar-date'];
+            if (dateStr === todayStr) classes.push('today');
+            if (dateStr === this.selectedDate) classes.push('selected');
+
+            let dots = '';
+            if (summary) {
+                dots = '<div class="work-dots">' + summary.subjects.slice(0, 4).map(subject =>
+                    `<span class="work-dot" title="${Calendar.escape(subject.name)}: ${subject.count}"` +
+                    (subject.color ? ` style="background:${Calendar.escape(subject.color)}"` : '') + '></span>'
+                ).join('') + '</div>' +
+                `<span class="work-count">${summary.total}</span>`;
+            }
+
+            html += `<div class="${classes.join(' ')}" data-date="${dateStr}">
                 <span>${day}</span>
-                ${dayWorks.length ? `<div class="work-dots">${'•'.repeat(Math.min(dayWorks.length, 3))}</div>` : ''}
+                ${dots}
             </div>`;
         }
-        
+
         html += '</div>';
         grid.innerHTML = html;
     }
-    
+
+    async showDay(dateStr) {
+        this.selectedDate = dateStr;
+        document.querySelectorAll('.calendar-date.selected').forEach(el => el.classList.remove('selected'));
+        document.querySelector(`.calendar-date[data-date="${dateStr}"]`)?.classList.add('selected');
+
+        const details = document.getElementById('calendarDetails');
+        const list = document.getElementById('calendarDetailsList');
+        if (!details || !list) return;
+
+        document.getElementById('calendarDetailsTitle').textContent =
+            new Date(`${dateStr}T00:00`).toLocaleDateString('lv-LV', { day: 'numeric', month: 'long', weekday: 'long' });
+        details.hidden = false;
+        list.innerHTML = '<div class="loading-spinner"></div>';
+
+        try {
+            const res = await fetch(`/api/work?date_from=${dateStr}&date_to=${dateStr}`);
+            const data = await res.json();
+            if (this.selectedDate !== dateStr) return;
+
+            const work = data.work || [];
+            list.innerHTML = work.length ? work.map(item => `
+                <article class="work-card">
+                    <h3 class="work-card-title">${Calendar.escape(item.title || item.type)}</h3>
+                    <div class="work-card-meta">
+                        <span class="work-card-subject">${Calendar.escape(item.subject)}</span>
+                        <span class="work-card-meta-item"><i class="fas fa-tag"></i> ${Calendar.escape(item.type)}</span>
+                        <span class="work-card-meta-item"><i class="far fa-clock"></i> ${Calendar.escape(item.time)}</span>
+                    </div>
+                    ${item.description ? `<p class="work-card-description">${Calendar.escape(item.description)}</p>` : ''}
+                </article>
+            `).join('') : '<p class="empty-state-description">Šajā dienā darbu nav</p>';
+        } catch (e) {
+            console.error('Failed to load day:', e);
+            list.innerHTML = '<p class="empty-state-description">Kļūda ielādējot datus</p>';
+        }
+    }
+
     setupEvents() {
         document.getElementById('prevMonth')?.addEventListener('click', () => {
             this.currentDate.setMonth(this.currentDate.getMonth() - 1);
-            this.render();
+            this.show();
         });
-        
+
         document.getElementById('nextMonth')?.addEventListener('click', () => {
             this.currentDate.setMonth(this.currentDate.getMonth() + 1);
-            this.render();
+            this.show();
+        });
+
+        document.getElementById('calendar')?.addEventListener('click', (e) => {
+            const cell = e.target.closest('.calendar-date[data-date]');
+            if (cell) this.showDay(cell.dataset.date);
         });
     }
 }
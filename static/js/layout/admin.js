@@ -0,0 +1,24 @@
+// admin.js - layouts/admin.html
+// Mobile sidebar toggle
+document.addEventListener('DOMContentLoaded', function() {
+    if (window.innerWidth <= 768) {
+        // Create toggle button
+        const toggleBtn = document.createElement('button');
+        toggleBtn.className = 'admin-toggle';
+        toggleBtn.innerHTML = '<i class="fas fa-bars"></i>';
+        document.body.appendChild(toggleBtn);
+        
+        const sidebar = document.querySelector('.admin-sidebar');
+        
+        toggleBtn.addEventListener('click', function() {
+            sidebar.classList.toggle('open');
+        });
+        
+        // Close on outside click
+        document.addEventListener('click', function(e) {
+            if (!sidebar.contains(e.target) && !toggleBtn.contains(e.target)) {
+                sidebar.classList.remove('open');
+            }
+        });
+    }
+});
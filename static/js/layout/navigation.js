@@ -0,0 +1,39 @@
+// navigation.js - components/navigation.html
+// Mobile menu toggle
+document.getElementById('mobileMenuToggle')?.addEventListener('click', function() {
+    document.getElementById('navbarMenu')?.classList.toggle('active');
+    this.classList.toggle('active');
+});
+
+// Navbar scroll effect
+window.addEventListener('scroll', function() {
+    const navbar = document.getElementById('navbar');
+    if (window.scrollY > 50) {
+        navbar?.classList.add('scrolled');
+    } else {
+        navbar?.classList.remove('scrolled');
+    }
+});
+
+// Fetch next work countdown
+async function updateNextWork() {
+    try {
+        const response = await fetch('/api/next_work');
+        const data = await response.json();
+        
+        const counter = document.getElementById('nextWorkCounter');
+        if (data.next_work) {
+            const days = data.next_work.days_left;
+            counter.querySelector('.stat-value').textContent = 
+                days === 0 ? 'Šodien!' : 
+                days === 1 ? 'Rīt' : 
+                `${days}d`;
+        }
+    } catch (error) {
+        console.error('Error fetching next work:', error);
+    }
+}
+
+// Update on load
+updateNextWork();
+setInterval(updateNextWork, 60000); // Update every minute
@@ -0,0 +1,86 @@
+// all.js - all.html
+// Filter functionality
+const filterBtns = document.querySelectorAll('.filter-btn');
+const subjectFilter = document.getElementById('subjectFilter');
+const sortSelect = document.getElementById('sortSelect');
+const worksContainer = document.getElementById('worksContainer');
+const workItems = document.querySelectorAll('.work-item');
+
+// Calculate stats
+function updateStats() {
+    const works = document.querySelectorAll('.work-item:not([style*="display: none"])');
+    let today = 0, tomorrow = 0;
+    
+    works.forEach(work => {
+        const daysLeft = parseInt(work.dataset.daysLeft);
+        if (daysLeft === 0) today++;
+        if (daysLeft === 1) tomorrow++;
+    });
+    
+    document.getElementById('todayWorks').textContent = today;
+    document.getElementById('tomorrowWorks').textContent = tomorrow;
+    document.getElementById('totalWorks').textContent = works.length;
+}
+
+// Filter by type
+filterBtns.forEach(btn => {
+    btn.addEventListener('click', function() {
+        filterBtns.forEach(b => b.classList.remove('active'));
+        this.classList.add('active');
+        applyFilters();
+    });
+});
+
+// Filter by subject
+if (subjectFilter) {
+    subjectFilter.addEventListener('change', applyFilters);
+}
+
+// Sort
+if (sortSelect) {
+    sortSelect.addEventListener('change', applySorting);
+}
+
+function applyFilters() {
+    const activeType = document.querySelector('.filter-btn.active').dataset.filter;
+    const selectedSubject = subjectFilter ? subjectFilter.value : 'all';
+    
+    workItems.forEach(item => {
+        const itemType = item.dataset.type;
+        const itemSubject = item.dataset.subject;
+        
+        const typeMatch = activeType === 'all' || itemType === activeType;
+        const subjectMatch = selectedSubject === 'all' || itemSubject === selectedSubject;
+        
+        if (typeMatch && subjectMatch) {
+            item.style.display = 'grid';
+        } else {
+            item.style.display = 'none';
+        }
+    });
+    
+    updateStats();
+}
+
+function applySorting() {
+    const sortValue = sortSelect.value;
+    const itemsArray = Array.from(workItems);
+    
+    itemsArray.sort((a, b) => {
+        switch(sortValue) {
+            case 'date-asc':
+                return new Date(a.dataset.date) - new Date(b.dataset.date);
+            case 'date-desc':
+                return new Date(b.dataset.date) - new Date(a.dataset.date);
+            case 'subject':
+                return a.dataset.subject.localeCompare(b.dataset.subject);
+            case 'days-left':
+                return parseInt(a.dataset.daysLeft) - parseInt(b.dataset.daysLeft);
+        }
+    });
+    
+    itemsArray.forEach(item => worksContainer.appendChild(item));
+}
+
+// Initial stats
+updateStats();
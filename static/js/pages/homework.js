@@ -0,0 +1,126 @@
+// homework.js - homework.html
+// Homework completion tracking with localStorage
+const HomeworkManager = {
+    storageKey: 'classmate_homework_completed',
+    
+    getCompleted() {
+        const data = localStorage.getItem(this.storageKey);
+        return data ? JSON.parse(data) : [];
+    },
+    
+    saveCompleted(completedIds) {
+        localStorage.setItem(this.storageKey, JSON.stringify(completedIds));
+    },
+    
+    toggleCompleted(id) {
+        let completed = this.getCompleted();
+        if (completed.includes(id)) {
+            completed = completed.filter(cid => cid !== id);
+        } else {
+            completed.push(id);
+        }
+        this.saveCompleted(completed);
+        return completed.includes(id);
+    },
+    
+    init() {
+        // Load completed state
+        const completed = this.getCompleted();
+        document.querySelectorAll('.homework-check').forEach(checkbox => {
+            const id = checkbox.dataset.id;
+            if (completed.includes(id)) {
+                checkbox.checked = true;
+                checkbox.closest('.homework-item').classList.add('completed');
+            }
+        });
+        
+        // Add event listeners
+        document.querySelectorAll('.homework-check').forEach(checkbox => {
+            checkbox.addEventListener('change', function() {
+                const id = this.dataset.id;
+                const isCompleted = HomeworkManager.toggleCompleted(id);
+                const item = this.closest('.homework-item');
+                
+                if (isCompleted) {
+                    item.classList.add('completed');
+                } else {
+                    item.classList.remove('completed');
+                }
+                
+                updateStats();
+            });
+        });
+    }
+};
+
+// Filter and sort functionality
+const subjectFilter = document.getElementById('subjectFilter');
+const sortSelect = document.getElementById('sortSelect');
+const showCompleted = document.getElementById('showCompleted');
+const homeworkItems = document.querySelectorAll('.homework-item');
+
+function updateStats() {
+    const visible = Array.from(homeworkItems).filter(item => item.style.display !== 'none');
+    const completed = Array.from(homeworkItems).filter(item => item.classList.contains('completed'));
+    let today = 0;
+    
+    visible.forEach(item => {
+        const daysLeft = parseInt(item.dataset.daysLeft);
+        if (daysLeft === 0) today++;
+    });
+    
+    document.getElementById('totalHomework').textContent = visible.length;
+    document.getElementById('todayHomework').textContent = today;
+    document.getElementById('completedHomework').textContent = completed.length;
+}
+
+function applyFilters() {
+    const selectedSubject = subjectFilter ? subjectFilter.value : 'all';
+    const showCompletedChecked = showCompleted.checked;
+    
+    homeworkItems.forEach(item => {
+        const itemSubject = item.dataset.subject;
+        const isCompleted = item.classList.contains('completed');
+        
+        const subjectMatch = selectedSubject === 'all' || itemSubject === selectedSubject;
+        const completedMatch = showCompletedChecked || !isCompleted;
+        
+        if (subjectMatch && completedMatch) {
+            item.style.display = 'flex';
+        } else {
+            item.style.display = 'none';
+        }
+    });
+    
+    updateStats();
+}
+
+function applySorting() {
+    const sortValue = sortSelect.value;
+    const container = document.getElementById('homeworkContainer');
+    const itemsArray = Array.from(homeworkItems);
+    
+    itemsArray.sort((a, b) => {
+        switch(sortValue) {
+            case 'date-asc':
+                return new Date(a.dataset.date) - new Date(b.dataset.date);
+            case 'date-desc':
+                return new Date(b.dataset.date) - new Date(a.dataset.date);
+            case 'subject':
+                return a.dataset.subject.localeCompare(b.dataset.subject);
+            case 'days-left':
+                return parseInt(a.dataset.daysLeft) - parseInt(b.dataset.daysLeft);
+        }
+    });
+    
+    itemsArray.forEach(item => container.appendChild(item));
+}
+
+// Event listeners
+if (subjectFilter) subjectFilter.addEventListener('change', applyFilters);
+if (sortSelect) sortSelect.addEventListener('change', applySorting);
+if (showCompleted) showCompleted.addEventListener('change', applyFilters);
+
+// Initialize
+HomeworkManager.init();
+updateStats();
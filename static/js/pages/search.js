@@ -0,0 +1,34 @@
+// search.js - search.html
+// Подсказки при вводе (/api/suggest)
+const searchInput = document.getElementById('searchInput');
+const searchSuggestions = document.getElementById('searchSuggestions');
+let suggestRequest = 0;
+
+const loadSuggestions = debounce(async function() {
+    const query = searchInput.value.trim();
+    const request = ++suggestRequest;
+
+    if (!query) {
+        searchSuggestions.innerHTML = '';
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/suggest?q=${encodeURIComponent(query)}`);
+        if (!response.ok) return;
+        const data = await response.json();
+        // Ответ на устаревший ввод не нужен
+        if (request !== suggestRequest) return;
+
+        searchSuggestions.innerHTML = '';
+        data.suggestions.forEach(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion.label;
+            searchSuggestions.appendChild(option);
+        });
+    } catch (error) {
+        console.error('Suggest error:', error);
+    }
+}, 150);
+
+searchInput.addEventListener('input', loadSuggestions);
@@ -0,0 +1,102 @@
+"""
+Общие фикстуры тестов
+
+Тесты работают на SQLite. DB_FILE, загрузки и экспорты заданы
+относительными путями, поэтому до импорта приложения рабочий каталог
+меняется на временный — файлы проекта не затрагиваются.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.pop('DATABASE_URL', None)
+
+WORK_DIR = tempfile.mkdtemp(prefix='classmate-tests-')
+os.chdir(WORK_DIR)
+
+
+def pytest_unconfigure(config):
+    os.chdir(ROOT)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Приложение с общей тестовой БД (миграции применяются при создании)"""
+    from app import app as flask_app
+
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def host_client(app):
+    """Клиент в режиме хоста (админ-маршруты)"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['is_host'] = True
+    return client
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """
+    Пустая БД SQLite на время теста
+
+    Подменяет пул соединений models.database, так что get_db_connection()
+    и всё, что через него работает, видят только эту БД. Локальные кеши
+    наборов данных сбрасываются до и после теста.
+    """
+    from models import database
+    from models.data_versions import DATASETS, invalidate_changed
+
+    monkeypatch.setattr(database, '_pool', database.SQLitePool(str(tmp_path / 'school.db')))
+    invalidate_changed(*DATASETS)
+    yield database.get_db_connection
+    invalidate_changed(*DATASETS)
+
+
+@pytest.fixture
+def migrated_db(fresh_db):
+    """Пустая БД со всеми миграциями"""
+    from models.migrations import run_migrations
+
+    run_migrations(report=False)
+    return fresh_db
+
+
+@pytest.fixture
+def migrate_to(fresh_db):
+    """
+    Схема старой версии приложения
+
+    migrate_to(last_version) применяет миграции до last_version включительно
+    и возвращает курсор на соединении fresh_db().
+    """
+    from models.migrations import CREATE_SCHEMA_VERSION_TABLE, INSERT_SCHEMA_VERSION, discover_migrations
+    from models.queries import execute
+
+    def migrate(last_version):
+        conn = fresh_db()
+        cursor = conn.cursor()
+        execute(cursor, CREATE_SCHEMA_VERSION_TABLE)
+        for version, name, module in discover_migrations():
+            if version > last_version:
+                break
+            module.upgrade(cursor)
+            execute(cursor, INSERT_SCHEMA_VERSION, (version, name, None))
+        conn.commit()
+        return cursor
+
+    return migrate
@@ -0,0 +1,80 @@
+"""
+Тесты сборки бандлов статики (utils/assets.py)
+"""
+import re
+import pytest
+from utils import assets
+from utils.assets import build_assets, minify_css, minify_js
+
+
+def test_minify_css():
+    source = '/* шапка */\nbody {\n  color: red;\n  margin: 0 ;\n}\n\na > b , c { x: 1; }\n'
+
+    assert minify_css(source) == 'body{color:red;margin:0}a>b,c{x:1}'
+
+
+def test_minify_js_keeps_template_literals():
+    source = '// комментарий\nfunction f() {\n    return `\n    line\n\n`;\n}\n\n  const x = 1;  \n'
+
+    assert minify_js(source) == 'function f() {\nreturn `\n    line\n\n`;\n}\nconst x = 1;'
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'a.css').write_text('a { color: red; }')
+    (tmp_path / 'css' / 'b.css').write_text('b { color: blue; }')
+    monkeypatch.setattr(assets, 'BUNDLES', {'site.css': ['css/a.css', 'css/b.css']})
+    return tmp_path
+
+
+def test_bundle_name_follows_content(static_dir):
+    first = build_assets(str(static_dir))['site.css']
+
+    assert re.fullmatch(r'dist/site\.[0-9a-f]{12}\.css', first)
+    assert (static_dir / first).read_text() == 'a{color:red}\nb{color:blue}'
+    assert build_assets(str(static_dir))['site.css'] == first
+
+    (static_dir / 'css' / 'b.css').write_text('b { color: green; }')
+    second = build_assets(str(static_dir))['site.css']
+    assert second != first
+    assert (static_dir / first).exists()
+
+
+def test_pages_reference_bundles(client):
+    html = client.get('/').get_data(as_text=True)
+
+    urls = re.findall(r'/static/dist/main\.[0-9a-f]{12}\.(?:css|js)', html)
+    assert len(set(urls)) == 2
+
+
+def test_bundles_are_immutable(client):
+    url = re.search(r'/static/dist/main\.[0-9a-f]{12}\.css', client.get('/').get_data(as_text=True)).group(0)
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == assets.IMMUTABLE_MAX_AGE
+    assert response.cache_control.public
+    response.close()
+
+    source = client.get('/static/css/base.css')
+    assert not source.cache_control.immutable
+    source.close()
+
+
+@pytest.mark.parametrize('url, bundles', [
+    ('/', ['main.css', 'index.css', 'layout.css', 'main.js']),
+    ('/all', ['main.css', 'all.css', 'layout.css', 'main.js', 'all.js']),
+    ('/homework', ['main.css', 'homework.css', 'layout.css', 'main.js', 'homework.js']),
+    ('/timer', ['main.css', 'timer.css', 'layout.css', 'main.js', 'timer.js']),
+])
+def test_pages_have_no_inline_styles_or_scripts(client, url, bundles):
+    html = client.get(url).get_data(as_text=True)
+
+    assert '<style' not in html
+    assert not re.findall(r'<script(?![^>]*\bsrc=)[^>]*>', html)
+    # Порядок важен: стили навигации идут после стилей страницы
+    linked = re.findall(r'/static/dist/([\w-]+)\.[0-9a-f]{12}\.(css|js)', html)
+    assert [f'{stem}.{ext}' for stem, ext in linked] == bundles
@@ -0,0 +1,270 @@
+"""
+Тесты кешей данных (utils/cache.py)
+"""
+import threading
+import time
+import pytest
+from utils.cache import LRUCache, SnapshotCache, cached
+
+
+def _wait_for(condition):
+    deadline = time.time() + 5
+    while not condition():
+        assert time.time() < deadline, 'condition was not reached'
+        time.sleep(0.005)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+
+def test_lru_ttl_per_key(monkeypatch):
+    cache = LRUCache(ttl=10)
+    cache.set('short', 1, ttl=1)
+    cache.set('long', 2)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 5)
+
+    assert cache.get('short') is None
+    assert cache.get('long') == 2
+
+
+def test_concurrent_misses_share_one_load():
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    cache = LRUCache()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('key', loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: cache.stats()['misses'] == 8)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ['value'] * 8
+    assert calls == [1]
+    assert cache.stats()['loads'] == 1
+
+
+def test_load_error_is_shared_and_not_cached():
+    release = threading.Event()
+    calls = []
+
+    def failing_loader():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError('db down')
+
+    cache = LRUCache()
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load('key', failing_loader)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: cache.stats()['misses'] == 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3 and calls == [1]
+    assert cache.get_or_load('key', lambda: 'ok') == 'ok'
+    assert cache.stats()['load_errors'] == 1
+
+
+def test_stale_value_is_served_while_refreshing(monkeypatch):
+    cache = LRUCache(ttl=10, stale_ttl=60)
+    cache.get_or_load('key', lambda: 'old')
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return 'new'
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 20)
+    assert cache.get_or_load('key', slow_loader) == 'old'
+    assert cache.get_or_load('key', slow_loader) == 'old'
+    assert cache.stats()['refreshes'] == 1
+
+    release.set()
+    _wait_for(lambda: cache.stats()['loads'] == 2)
+    assert cache.get_or_load('key', slow_loader) == 'new'
+
+
+def test_expired_past_stale_window_loads_synchronously(monkeypatch):
+    cache = LRUCache(ttl=10, stale_ttl=5)
+    cache.get_or_load('key', lambda: 'old')
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 20)
+
+    assert cache.get_or_load('key', lambda: 'new') == 'new'
+    assert cache.stats()['expired'] == 1
+
+
+def test_clear_during_load_discards_result():
+    release = threading.Event()
+    cache = LRUCache()
+
+    def slow_loader():
+        release.wait(5)
+        return 'stale'
+
+    reader = threading.Thread(target=lambda: cache.get_or_load('key', slow_loader))
+    reader.start()
+    _wait_for(lambda: cache.stats()['misses'] == 1)
+    cache.clear()
+    release.set()
+    reader.join(5)
+
+    assert cache.get('key') is None
+
+
+def test_cached_returns_deep_copies():
+    calls = []
+
+    @cached(name='test.cached_copies')
+    def load(kind):
+        calls.append(kind)
+        return [{'kind': kind}]
+
+    load('a')[0]['kind'] = 'changed'
+
+    assert load('a') == [{'kind': 'a'}]
+    assert load(kind='a') == [{'kind': 'a'}]
+    assert calls == ['a', 'a']
+
+    load.cache_clear()
+    load('a')
+    assert calls == ['a', 'a', 'a']
+
+
+def test_subject_loader_follows_writes(migrated_db):
+    from models.subjects import load_subjects, save_subject
+
+    assert load_subjects() == []
+    assert save_subject('Fizika', '#00aa00')
+    assert [subject['name'] for subject in load_subjects()] == ['Fizika']
+
+
+def _snapshot(rows, **kwargs):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [dict(row) for row in rows]
+
+    cache = SnapshotCache(kwargs.pop('name', 'test.snapshot'), loader, **kwargs)
+    cache.calls = calls
+    return cache
+
+
+def test_snapshot_loads_once_and_returns_copies():
+    cache = _snapshot([{'id': 1}, {'id': 2}])
+
+    first = cache.get()
+    first[0]['id'] = 100
+    first.reverse()
+
+    assert cache.get() == [{'id': 1}, {'id': 2}]
+    assert len(cache.calls) == 1
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'refreshes': 0, 'invalidations': 0, 'cached_rows': 2}
+
+
+def test_snapshot_rows_are_read_only():
+    cache = _snapshot([{'id': 1}])
+    cache.get()
+
+    with pytest.raises(TypeError):
+        cache._rows[0]['id'] = 2
+
+
+def test_decorate_runs_on_every_read():
+    cache = _snapshot([{'id': 1}], decorate=lambda row, now: row.update(seen_at=now))
+
+    first, second = cache.get()[0], cache.get()[0]
+
+    assert second['seen_at'] >= first['seen_at']
+    assert 'seen_at' not in cache._rows[0]
+
+
+def test_ttl_refreshes_snapshot(monkeypatch):
+    cache = _snapshot([{'id': 1}], ttl=10)
+    cache.get()
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 11)
+    cache.get()
+
+    assert len(cache.calls) == 2
+    assert cache.stats()['refreshes'] == 1
+
+
+def test_invalidate_reloads():
+    rows = [{'id': 1}]
+    cache = _snapshot(rows)
+    cache.get()
+
+    rows.append({'id': 2})
+    cache.invalidate()
+
+    assert [row['id'] for row in cache.get()] == [1, 2]
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_write_during_load_is_not_cached():
+    started, release = threading.Event(), threading.Event()
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return [{'id': 1}]
+
+    cache = SnapshotCache('test.slow_snapshot', slow_loader)
+    reader = threading.Thread(target=cache.get)
+    reader.start()
+    started.wait(5)
+    cache.invalidate()
+    release.set()
+    reader.join(5)
+
+    assert cache.stats()['cached_rows'] == 0
+
+
+def test_work_loaders_follow_writes(migrated_db):
+    from models.work import KIND_TEST, WORK_CACHES, delete_work_item, load_work, save_work_item
+
+    assert load_work(KIND_TEST) == []
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, '2030-01-02', '09:00', '')
+    assert [work['subject'] for work in load_work(KIND_TEST)] == ['Matemātika']
+    assert 'days_left' in load_work(KIND_TEST)[0]
+
+    hits = WORK_CACHES[KIND_TEST].stats()['hits']
+    load_work(KIND_TEST)
+    assert WORK_CACHES[KIND_TEST].stats()['hits'] == hits + 1
+
+    assert delete_work_item(load_work(KIND_TEST)[0]['id'])
+    assert load_work(KIND_TEST) == []
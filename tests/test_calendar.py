@@ -0,0 +1,76 @@
+"""
+Тесты сводки календаря по дням (/api/calendar)
+"""
+from datetime import datetime
+import pytest
+from models.subjects import save_subject
+from models.work import KIND_HOMEWORK, KIND_TEST, save_work_item
+
+
+@pytest.fixture
+def work_db(migrated_db):
+    assert save_subject('Fizika', '#00aa00')
+    for kind, subject, date in [
+        (KIND_TEST, 'Fizika', '2030-01-31'),
+        (KIND_TEST, 'Fizika', '2030-02-01'),
+        (KIND_HOMEWORK, 'Fizika', '2030-02-01'),
+        (KIND_HOMEWORK, 'Matemātika', '2030-02-01'),
+        (KIND_TEST, 'Fizika', '2030-02-28'),
+        (KIND_TEST, 'Fizika', '2030-03-01'),
+    ]:
+        assert save_work_item(kind, subject, 'Darbs', None, date, '', '')
+    return migrated_db
+
+
+def test_month_window(client, work_db):
+    data = client.get('/api/calendar?month=2030-02').get_json()
+
+    assert (data['from'], data['to']) == ('2030-02-01', '2030-02-28')
+    assert sorted(data['days']) == ['2030-02-01', '2030-02-28']
+    assert data['total_days'] == 2
+
+
+def test_day_aggregates(client, work_db):
+    day = client.get('/api/calendar?month=2030-02').get_json()['days']['2030-02-01']
+
+    assert day['total'] == 3
+    assert day['kinds'] == {KIND_TEST: 1, KIND_HOMEWORK: 1 + 1}
+    assert day['subjects'] == [
+        {'name': 'Fizika', 'color': '#00aa00', 'count': 2},
+        {'name': 'Matemātika', 'color': None, 'count': 1},
+    ]
+
+
+def test_explicit_range_is_inclusive(client, work_db):
+    data = client.get('/api/calendar?from=2030-01-31&to=2030-02-01').get_json()
+
+    assert sorted(data['days']) == ['2030-01-31', '2030-02-01']
+
+
+def test_default_is_current_month(client, migrated_db):
+    data = client.get('/api/calendar').get_json()
+
+    assert data['from'] == datetime.now().date().replace(day=1).isoformat()
+    assert data['days'] == {}
+
+
+@pytest.mark.parametrize('query', [
+    'month=2030-13', 'from=2030-01-01', 'from=2030-02-01&to=2030-01-01', 'from=2030-01-01&to=2030-03-04',
+])
+def test_bad_ranges_are_rejected(client, migrated_db, query):
+    response = client.get(f'/api/calendar?{query}')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_longest_range_is_accepted(client, migrated_db):
+    assert client.get('/api/calendar?from=2030-01-01&to=2030-03-03').status_code == 200
+
+
+def test_month_is_cacheable(client, work_db):
+    response = client.get('/api/calendar?month=2030-02')
+
+    assert response.cache_control.max_age == 60
+    assert client.get('/api/calendar?month=2030-02', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get('/api/calendar?month=2030-03').headers['ETag'] != response.headers['ETag']
@@ -0,0 +1,85 @@
+"""
+Тесты сжатия ответов и предсжатой статики (utils/compression.py)
+"""
+import gzip
+import os
+import pytest
+from utils import compression
+from utils.compression import precompress_static
+
+needs_brotli = pytest.mark.skipif(compression.brotli is None, reason='brotli is not installed')
+
+
+def test_html_is_gzipped(client):
+    plain = client.get('/')
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+
+
+@needs_brotli
+def test_brotli_is_preferred_at_equal_quality(client):
+    plain = client.get('/')
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert compression.brotli.decompress(response.data) == plain.data
+    assert client.get('/', headers={'Accept-Encoding': 'br;q=0.5, gzip'}).headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_and_unsupported_responses_are_not_compressed(client, monkeypatch):
+    monkeypatch.setattr(compression, 'COMPRESS_MIN_SIZE', 10 ** 9)
+    assert 'Content-Encoding' not in client.get('/', headers={'Accept-Encoding': 'gzip'}).headers
+
+    monkeypatch.setattr(compression, 'COMPRESS_MIN_SIZE', 0)
+    assert 'Content-Encoding' not in client.get('/', headers={'Accept-Encoding': 'identity'}).headers
+
+
+def test_not_modified_is_not_compressed(client):
+    etag = client.get('/').headers['ETag']
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_static_is_served_precompressed(app, client):
+    source = os.path.join(app.static_folder, 'css', 'base.css')
+    with open(source, 'rb') as f:
+        original = f.read()
+
+    response = client.get('/static/css/base.css', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/css'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()) == original
+    response.close()
+
+    plain = client.get('/static/css/base.css')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.get_data() == original
+    plain.close()
+
+
+def test_precompress_static_writes_only_stale_files(tmp_path):
+    css = tmp_path / 'css' / 'site.css'
+    css.parent.mkdir()
+    css.write_text('body { color: red; }' * 50)
+    (tmp_path / 'logo.png').write_bytes(b'png')
+    encodings = 2 if compression.brotli else 1
+
+    assert precompress_static(str(tmp_path)) == encodings
+    assert gzip.decompress((tmp_path / 'css' / 'site.css.gz').read_bytes()) == css.read_bytes()
+    assert not (tmp_path / 'logo.png.gz').exists()
+    assert precompress_static(str(tmp_path)) == 0
+
+    css.write_text('body { color: blue; }')
+    newer = os.path.getmtime(tmp_path / 'css' / 'site.css.gz') + 10
+    os.utime(css, (newer, newer))
+    assert precompress_static(str(tmp_path)) == encodings
+    assert gzip.decompress((tmp_path / 'css' / 'site.css.gz').read_bytes()) == b'body { color: blue; }'
@@ -0,0 +1,127 @@
+"""
+Тесты версий наборов данных и межпроцессной инвалидации (models/data_versions.py)
+"""
+import threading
+import pytest
+from models import data_versions
+from models.data_versions import (
+    DATASETS, bump_versions, foreign_changes, invalidate_changed, invalidate_local, parse_notification,
+    read_versions, register_invalidator
+)
+from models.work import KIND_HOMEWORK, KIND_TEST, WORK_CACHES, delete_work_item, save_work_item, update_work_item
+
+
+def _versions(get_connection):
+    return read_versions(get_connection().cursor())
+
+
+def test_every_dataset_starts_at_a_version(migrated_db):
+    assert set(_versions(migrated_db)) == set(DATASETS)
+
+
+def test_work_writes_bump_only_their_kind(migrated_db):
+    before = _versions(migrated_db)
+
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, '2030-01-02', '09:00', '')
+    after_save = _versions(migrated_db)
+    assert after_save['tests'] == before['tests'] + 1
+    assert after_save['homework'] == before['homework']
+
+    assert update_work_item(1, 'Fizika', 'Tests', None, '2030-01-02', '09:00', '')
+    assert delete_work_item(1)
+    after_delete = _versions(migrated_db)
+    assert after_delete['tests'] == before['tests'] + 3
+    assert after_delete['homework'] == before['homework']
+
+
+def test_missing_work_does_not_bump(migrated_db):
+    before = _versions(migrated_db)
+
+    assert not update_work_item(99, 'Fizika', 'Tests', None, '2030-01-02', '', '')
+    assert not delete_work_item(99)
+
+    assert _versions(migrated_db) == before
+
+
+def test_rolled_back_bump_is_invisible(migrated_db):
+    before = _versions(migrated_db)
+    conn = migrated_db()
+    cursor = conn.cursor()
+
+    bump_versions(cursor, 'news')
+    conn.rollback()
+
+    assert _versions(migrated_db) == before
+
+
+def test_invalidate_local_calls_only_dataset_invalidators(migrated_db):
+    calls = []
+    register_invalidator('terms', lambda: calls.append('terms'))
+    tests_invalidations = WORK_CACHES[KIND_TEST].stats()['invalidations']
+    homework_invalidations = WORK_CACHES[KIND_HOMEWORK].stats()['invalidations']
+
+    invalidate_local('homework', 'terms')
+
+    assert calls == ['terms']
+    assert WORK_CACHES[KIND_TEST].stats()['invalidations'] == tests_invalidations
+    assert WORK_CACHES[KIND_HOMEWORK].stats()['invalidations'] == homework_invalidations + 1
+
+
+def test_unknown_dataset_is_rejected():
+    with pytest.raises(ValueError):
+        register_invalidator('grades', lambda: None)
+
+
+def test_own_writes_skip_self_applying_invalidators(migrated_db):
+    calls = []
+    register_invalidator('updates', lambda: calls.append('own'))
+    register_invalidator('updates', lambda: calls.append('foreign only'), own_writes=False)
+
+    invalidate_local('updates')
+    assert calls == ['own']
+
+    invalidate_changed('updates')
+    assert calls == ['own', 'own', 'foreign only']
+
+
+def _foreign_bump(get_connection, dataset):
+    """Запись "другого процесса": свой поток, без invalidate_local"""
+    def write():
+        conn = get_connection()
+        bump_versions(conn.cursor(), dataset)
+        conn.commit()
+        conn.close()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join()
+
+
+def test_poll_skips_own_writes(migrated_db):
+    known = _versions(migrated_db)
+
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, '2030-01-02', '09:00', '')
+    assert foreign_changes(known, _versions(migrated_db)) == []
+
+    _foreign_bump(migrated_db, 'tests')
+    assert foreign_changes(known, _versions(migrated_db)) == ['tests']
+
+
+def test_rolled_back_own_bump_does_not_hide_foreign_write(migrated_db):
+    known = _versions(migrated_db)
+    conn = migrated_db()
+    bump_versions(conn.cursor(), 'news')
+    conn.rollback()
+
+    # Другой процесс получил ту же версию, что была у отменённой записи
+    _foreign_bump(migrated_db, 'news')
+
+    assert foreign_changes(known, _versions(migrated_db)) == ['news']
+
+
+def test_notification_origin():
+    dataset, own = parse_notification(f'news:{data_versions._origin()}')
+    assert (dataset, own) == ('news', True)
+
+    assert parse_notification('news:other-host/1') == ('news', False)
+    assert parse_notification('news') == ('news', False)
@@ -0,0 +1,160 @@
+"""
+Тесты пула соединений и соединения на запрос (models/database.py)
+"""
+import threading
+from types import SimpleNamespace
+import psycopg
+import pytest
+from flask import Flask
+from models import database
+from models.database import PoolTimeout, PostgresPool, SQLitePool, close_db_connection, get_db_connection
+
+IDLE = psycopg.pq.TransactionStatus.IDLE
+INERROR = psycopg.pq.TransactionStatus.INERROR
+
+
+class FakeConnection:
+    """Минимальное соединение psycopg для PostgresPool без сервера"""
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.rollbacks = 0
+        self.info = SimpleNamespace(transaction_status=IDLE)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class FakePostgresPool(PostgresPool):
+    def __init__(self, **kwargs):
+        super().__init__('postgresql://test', **kwargs)
+        self.opened = []
+
+    def _connect(self):
+        conn = FakeConnection(len(self.opened) + 1)
+        self.opened.append(conn)
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+
+def test_postgres_pool_reuses_returned_connections():
+    pool = FakePostgresPool(max_size=2)
+
+    first = pool.getconn()
+    pool.putconn(first)
+    assert pool.getconn() is first
+
+    second = pool.getconn()
+    assert second is not first
+    stats = pool.stats()
+    assert (stats['created'], stats['checked_out'], stats['size']) == (2, 2, 2)
+
+
+def test_postgres_pool_times_out_when_exhausted():
+    pool = FakePostgresPool(max_size=1, timeout=0.05)
+    pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_postgres_pool_waiter_gets_released_connection():
+    pool = FakePostgresPool(max_size=1, timeout=5)
+    conn = pool.getconn()
+    received = []
+
+    waiter = threading.Thread(target=lambda: received.append(pool.getconn()))
+    waiter.start()
+    while pool.stats()['waiting'] == 0:
+        pass
+    pool.putconn(conn)
+    waiter.join(5)
+
+    assert received == [conn]
+    assert pool.stats()['created'] == 1
+
+
+def test_postgres_pool_rolls_back_and_drops_broken():
+    pool = FakePostgresPool(max_size=2)
+    dirty, broken = pool.getconn(), pool.getconn()
+    dirty.info.transaction_status = INERROR
+    broken.closed = True
+
+    pool.putconn(dirty)
+    pool.putconn(broken)
+
+    assert dirty.rollbacks == 1
+    stats = pool.stats()
+    assert (stats['size'], stats['idle']) == (1, 1)
+    assert pool.getconn() is dirty
+
+
+def test_postgres_pool_expires_idle_above_min_size(monkeypatch):
+    pool = FakePostgresPool(min_size=1, max_size=3, max_idle=10)
+    connections = [pool.getconn() for _ in range(3)]
+    for conn in connections:
+        pool.putconn(conn)
+
+    now = database.time.monotonic()
+    monkeypatch.setattr(database.time, 'monotonic', lambda: now + 60)
+    pool.getconn()
+
+    stats = pool.stats()
+    assert stats['closed_idle'] == 2
+    assert stats['size'] == 1
+    assert sum(conn.closed for conn in connections) == 2
+
+
+def test_sqlite_pool_keeps_one_connection_per_thread(tmp_path):
+    pool = SQLitePool(str(tmp_path / 'school.db'))
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.getconn()))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not conn
+    assert pool.stats()['created'] == 2
+
+
+def test_sqlite_pool_rolls_back_open_transaction(tmp_path):
+    pool = SQLitePool(str(tmp_path / 'school.db'))
+    conn = pool.getconn()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.execute('INSERT INTO t VALUES (1)')
+
+    pool.putconn(conn)
+
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+
+def test_connection_outside_request_goes_back_on_close(fresh_db):
+    conn = get_db_connection()
+    assert database._pool.stats()['checked_out'] == 1
+
+    conn.close()
+    assert database._pool.stats()['checked_out'] == 0
+
+
+def test_connection_is_shared_for_the_whole_request(fresh_db):
+    app = Flask(__name__)
+    app.teardown_appcontext(close_db_connection)
+
+    with app.app_context():
+        conn = get_db_connection()
+        conn.close()
+        assert get_db_connection() is conn
+        assert database._pool.stats()['checked_out'] == 1
+
+    assert database._pool.stats()['checked_out'] == 0
@@ -0,0 +1,74 @@
+"""
+Тесты типизированных дат работ и deadline_at (utils/date_utils.py, миграция 0004)
+"""
+from datetime import date, datetime, time
+import pytest
+from utils.date_utils import compute_deadline_at, days_left_until, normalize_date_fields
+
+
+@pytest.mark.parametrize('args, expected', [
+    (('2030-01-05', '09:30'), datetime(2030, 1, 5, 9, 30)),
+    (('2030-01-05', ''), datetime(2030, 1, 5, 23, 59)),
+    (('2030-01-05', None, '2030-01-07'), datetime(2030, 1, 7, 23, 59)),
+    ((date(2030, 1, 5), time(8, 0)), datetime(2030, 1, 5, 8, 0)),
+    (('05.01.2030', '09:30'), None),
+    ((None, '09:30'), None),
+])
+def test_compute_deadline_at(args, expected):
+    assert compute_deadline_at(*args) == expected
+
+
+def test_days_left_until():
+    now = datetime(2030, 1, 1, 12, 0)
+
+    assert days_left_until(datetime(2030, 1, 3, 13, 0), now) == 2
+    assert days_left_until(datetime(2030, 1, 1, 13, 0), now) == 0
+    assert days_left_until(datetime(2029, 12, 31), now) == 0
+    assert days_left_until(None, now) == 999
+
+
+def test_normalize_date_fields():
+    deadline = datetime(2030, 1, 5, 9, 30)
+    row = {'date': date(2030, 1, 5), 'time': time(9, 30), 'deadline_at': int(deadline.timestamp()),
+           'added_date': '2030-01-01 10:00', 'subject': 'Fizika'}
+
+    assert normalize_date_fields(row) == {'date': '2030-01-05', 'time': '09:30', 'deadline_at': deadline,
+                                          'added_date': '2030-01-01 10:00', 'subject': 'Fizika'}
+
+
+def test_saved_work_gets_deadline_at(migrated_db):
+    from models.homework import load_homework, save_homework
+    from models.tests import load_tests, save_test
+
+    assert save_test('Matemātika', 'Tests', '2030-01-05', '09:30', '')
+    assert save_homework('Fizika', 'Darbs', '2030-01-05', '', '', due_date='2030-01-07')
+
+    cursor = migrated_db().cursor()
+    cursor.execute("SELECT deadline_at FROM work WHERE kind = 'test'")
+    assert cursor.fetchone()[0] == int(datetime(2030, 1, 5, 9, 30).timestamp())
+
+    test = load_tests()[0]
+    assert test['deadline_at'] == datetime(2030, 1, 5, 9, 30)
+    assert test['days_left'] == days_left_until(test['deadline_at'])
+    assert load_homework()[0]['deadline_at'] == datetime(2030, 1, 7, 23, 59)
+
+
+def test_0004_backfills_deadline_at(migrate_to):
+    from models.migrations import run_migrations
+
+    cursor = migrate_to(3)
+    cursor.executemany('INSERT INTO tests (subject, type, date, time, due_date) VALUES (?, ?, ?, ?, ?)', [
+        ('Matemātika', 'Tests', '2030-01-05', '09:30', ''),
+        ('Matemātika', 'Tests', '2030-01-05', '', '2030-01-06'),
+    ])
+    cursor.execute("INSERT INTO homework (subject, title, date, time) VALUES ('Fizika', 'Darbs', '2030-01-08', '10:00')")
+    cursor.connection.commit()
+
+    run_migrations(report=False)
+
+    cursor.execute('SELECT deadline_at, due_date FROM work ORDER BY id')
+    assert [tuple(row) for row in cursor.fetchall()] == [
+        (int(datetime(2030, 1, 5, 9, 30).timestamp()), None),
+        (int(datetime(2030, 1, 6, 23, 59).timestamp()), '2030-01-06'),
+        (int(datetime(2030, 1, 8, 10, 0).timestamp()), None),
+    ]
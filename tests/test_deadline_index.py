@@ -0,0 +1,261 @@
+"""
+Тесты индекса ближайших дедлайнов (utils.cache.DeadlineIndex, models.work.upcoming_work)
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from utils.cache import DeadlineIndex
+
+START = datetime(2030, 1, 1)
+
+
+def _rows(*days):
+    """Строки с дедлайнами START + days, уже по возрастанию (как ORDER BY deadline_at)"""
+    return [{'id': number, 'deadline_at': START + timedelta(days=day)} for number, day in enumerate(days, 1)]
+
+
+def _wait_loaded(index, loads=1):
+    deadline = time.time() + 5
+    while index.stats()['loads'] < loads:
+        assert time.time() < deadline, 'deadline index did not load'
+        time.sleep(0.005)
+
+
+def _index(rows, name='test.deadlines', **kwargs):
+    calls = []
+
+    def loader(since):
+        calls.append(since)
+        return [row for row in rows if row['deadline_at'] >= since]
+
+    index = DeadlineIndex(name, loader, key=lambda row: row['deadline_at'], **kwargs)
+    index.calls = calls
+    return index
+
+
+def _ids(result):
+    rows, _ = result
+    return [row['id'] for row in rows]
+
+
+@pytest.fixture
+def warm_index():
+    index = _index(_rows(0, 1, 1, 1, 3, 7))
+    assert index.upcoming(START, 3) is None
+    _wait_loaded(index)
+    return index
+
+
+def test_cold_index_loads_once_in_background():
+    index = _index(_rows(0, 1))
+
+    assert index.upcoming(START, 1) is None
+    assert index.between(START, START + timedelta(days=1), 1) is None
+    _wait_loaded(index)
+
+    assert index.calls == [START]
+    assert index.stats()['cold'] == 2
+
+
+def test_upcoming_in_deadline_order(warm_index):
+    rows, total = warm_index.upcoming(START, 4)
+
+    assert [row['id'] for row in rows] == [1, 2, 3, 4]
+    assert [row['deadline_at'] for row in rows] == sorted(row['deadline_at'] for row in rows)
+    assert total == 6
+    assert _ids(warm_index.upcoming(START, 100)) == [1, 2, 3, 4, 5, 6]
+
+
+def test_between_excludes_until(warm_index):
+    assert warm_index.between(START, START + timedelta(days=1), 10) == ([{'id': 1, 'deadline_at': START}], 1)
+
+    rows, total = warm_index.between(START, START + timedelta(days=3), 2)
+    assert [row['id'] for row in rows] == [1, 2]
+    assert total == 4
+
+    assert warm_index.between(START, START, 10) == ([], 0)
+
+
+def test_moving_since_prunes_past_deadlines(warm_index):
+    rows, total = warm_index.upcoming(START + timedelta(days=1), 10)
+
+    assert [row['id'] for row in rows] == [2, 3, 4, 5, 6]
+    assert total == 5
+    assert warm_index.stats()['pruned'] == 1
+
+    # Раньше загруженного окна индекс ответить не может
+    assert warm_index.upcoming(START, 10) is None
+
+
+def test_results_are_copies(warm_index):
+    rows, _ = warm_index.upcoming(START, 1)
+    rows[0]['id'] = 100
+
+    assert _ids(warm_index.upcoming(START, 1)) == [1]
+
+
+def test_decorate_is_applied_to_copies():
+    index = _index(_rows(0, 2), decorate=lambda row, now: row.update(marked=True))
+    index.upcoming(START, 1)
+    _wait_loaded(index)
+
+    rows, _ = index.upcoming(START, 2)
+    assert all(row['marked'] for row in rows)
+
+
+def test_invalidate_makes_index_cold(warm_index):
+    warm_index.invalidate()
+
+    assert warm_index.upcoming(START, 1) is None
+    _wait_loaded(warm_index, loads=2)
+    assert _ids(warm_index.upcoming(START, 1)) == [1]
+
+
+def test_write_during_load_discards_stale_rows():
+    release = threading.Event()
+    rows = _rows(0, 1)
+
+    def slow_loader(since):
+        release.wait(5)
+        return list(rows)
+
+    index = DeadlineIndex('test.slow_deadlines', slow_loader, key=lambda row: row['deadline_at'])
+    assert index.upcoming(START, 1) is None
+    index.invalidate()
+    release.set()
+
+    time.sleep(0.1)
+    assert index.stats()['loads'] == 0
+    assert index.upcoming(START, 1) is None
+
+
+def test_upcoming_work_matches_database(migrated_db):
+    from models.work import DEADLINE_INDEX, KIND_HOMEWORK, KIND_TEST, save_work_item, upcoming_work
+
+    today = datetime.now().date()
+    for kind, days, time_value in [(KIND_TEST, 3, '09:00'), (KIND_HOMEWORK, 0, ''), (KIND_TEST, 1, '08:00'),
+                                   (KIND_HOMEWORK, -2, ''), (KIND_TEST, 1, '08:00'), (KIND_TEST, 10, '12:00')]:
+        date = (today + timedelta(days=days)).isoformat()
+        assert save_work_item(kind, 'Matemātika', 'Tests', 'Darbs', date, time_value, '')
+
+    loads = DEADLINE_INDEX.stats()['loads']
+    cold = upcoming_work(10)
+    _wait_loaded(DEADLINE_INDEX, loads=loads + 1)
+    warm = upcoming_work(10)
+
+    # Прошедшая работа (4) не попадает, равные дедлайны (3, 5) — по id
+    assert [work['id'] for work in cold[0]] == [2, 3, 5, 1, 6]
+    assert [work['id'] for work in warm[0]] == [2, 3, 5, 1, 6]
+    assert warm[1] == cold[1] == 5
+    assert all('days_left' in work for work in warm[0])
+
+    assert _ids(upcoming_work(2)) == [2, 3]
+    assert upcoming_work(10, within_days=1)[1] == 3
+    assert _ids(upcoming_work(10, within_days=0)) == [2]
+    assert _ids(upcoming_work(2, within_days=7)) == [2, 3]
+
+
+def _row(number, day):
+    return {'id': number, 'deadline_at': START + timedelta(days=day)}
+
+
+def test_put_inserts_in_deadline_order(warm_index):
+    warm_index.put(_row(7, 2))
+    warm_index.put(_row(8, 1))  # равный дедлайн — после меньших id
+
+    assert _ids(warm_index.upcoming(START, 100)) == [1, 2, 3, 4, 8, 7, 5, 6]
+    assert warm_index.between(START, START + timedelta(days=2), 100)[1] == 5
+    assert warm_index.stats()['loads'] == 1
+
+
+def test_put_moves_updated_row(warm_index):
+    warm_index.put(_row(1, 5))
+    warm_index.put(_row(6, 0))
+
+    assert _ids(warm_index.upcoming(START, 100)) == [6, 2, 3, 4, 5, 1]
+    assert warm_index.upcoming(START, 1)[0][0]['deadline_at'] == START
+
+
+def test_put_drops_rows_before_window(warm_index):
+    warm_index.upcoming(START + timedelta(days=1), 1)
+
+    warm_index.put(_row(3, 0))
+    warm_index.put(_row(9, -3))
+
+    assert _ids(warm_index.upcoming(START + timedelta(days=1), 100)) == [2, 4, 5, 6]
+
+
+def test_discard(warm_index):
+    warm_index.discard(3)
+    warm_index.discard(100)
+
+    assert _ids(warm_index.upcoming(START, 100)) == [1, 2, 4, 5, 6]
+
+
+def test_writes_after_pruning(warm_index):
+    # Окно сдвинулось дальше половины строк — список ужат
+    assert _ids(warm_index.upcoming(START + timedelta(days=3), 100)) == [5, 6]
+
+    warm_index.put(_row(7, 4))
+    warm_index.discard(6)
+
+    assert _ids(warm_index.upcoming(START + timedelta(days=3), 100)) == [5, 7]
+    assert warm_index.stats()['indexed_rows'] == 2
+
+
+def test_writes_to_cold_index_are_not_applied():
+    index = _index(_rows(0, 1))
+    index.put(_row(3, 0))
+    index.discard(1)
+
+    assert index.stats()['applied'] == 0
+    assert index.upcoming(START, 1) is None
+
+
+def test_write_during_load_discards_loaded_rows():
+    release = threading.Event()
+
+    def slow_loader(since):
+        release.wait(5)
+        return _rows(0, 1)
+
+    index = DeadlineIndex('test.slow_put', slow_loader, key=lambda row: row['deadline_at'])
+    assert index.upcoming(START, 1) is None
+    index.put(_row(3, 0))
+    release.set()
+
+    time.sleep(0.1)
+    assert index.stats()['loads'] == 0
+
+
+def test_own_writes_do_not_reload_index(migrated_db):
+    from models.work import (DEADLINE_INDEX, KIND_HOMEWORK, KIND_TEST, delete_work_item, save_work_item,
+                             update_work_item, upcoming_work)
+
+    today = datetime.now().date()
+    day = lambda days: (today + timedelta(days=days)).isoformat()
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, day(2), '09:00', '')
+    loads = DEADLINE_INDEX.stats()['loads']
+    upcoming_work(10)
+    _wait_loaded(DEADLINE_INDEX, loads=loads + 1)
+    invalidations = DEADLINE_INDEX.stats()['invalidations']
+
+    assert save_work_item(KIND_HOMEWORK, 'Fizika', 'Mājasdarbs', None, day(1), '', '')
+    assert save_work_item(KIND_TEST, 'Ķīmija', 'Tests', None, day(-1), '', '')
+    assert update_work_item(1, 'Matemātika', 'Tests', None, day(0), '08:00', '')
+    assert save_work_item(KIND_TEST, 'Fizika', 'Tests', None, day(3), '', '')
+    assert delete_work_item(4)
+
+    warm = upcoming_work(10)
+    stats = DEADLINE_INDEX.stats()
+    assert stats['loads'] == loads + 1
+    assert stats['invalidations'] == invalidations
+    assert _ids(warm) == [1, 2]
+    assert warm[0][0]['time'] == '08:00'
+    assert 'days_left' in warm[0][0]
+
+    # Изменения другого процесса сбрасывают индекс целиком
+    from models.data_versions import invalidate_changed
+    invalidate_changed('tests')
+    assert DEADLINE_INDEX.upcoming(datetime.combine(today, datetime.min.time()), 10) is None
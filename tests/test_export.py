@@ -0,0 +1,200 @@
+"""
+Тесты потокового экспорта работ (services/export_service.py, /api/export/work)
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+import pytest
+from models.work import KIND_HOMEWORK, KIND_TEST, save_work_item
+from services import export_service
+from services.export_service import CSV_FIELDS, generate_export
+
+WORK = [
+    (KIND_TEST, 'Matemātika', 'Kontroldarbs', None, '2030-01-02', '09:00', 'Algebra, "daļas"'),
+    (KIND_HOMEWORK, 'Fizika', 'Mājasdarbs', 'Spēki', '2030-01-01', '', 'lpp. 5\n6. uzdevums'),
+    (KIND_TEST, 'Fizika', 'Tests', None, '2030-01-03', '10:30', ''),
+]
+
+
+@pytest.fixture
+def work_db(migrated_db):
+    for kind, subject, work_type, title, date, time, description in WORK:
+        assert save_work_item(kind, subject, work_type, title, date, time, description)
+    return migrated_db
+
+
+def _export(export_format, **filters):
+    return ''.join(generate_export(export_format, filters))
+
+
+def test_json(work_db):
+    data = json.loads(_export('json'))
+
+    assert data['success'] is True
+    assert data['exported_at']
+    assert [(row['subject'], row['date'], row['time']) for row in data['data']] == [
+        ('Fizika', '2030-01-01', '23:59'), ('Matemātika', '2030-01-02', '09:00'), ('Fizika', '2030-01-03', '10:30')]
+    assert data['data'][0]['description'] == 'lpp. 5\n6. uzdevums'
+    assert 'days_left' in data['data'][0]
+
+
+def test_ndjson_matches_json(work_db):
+    rows = [json.loads(line) for line in _export('ndjson').splitlines()]
+
+    assert rows == json.loads(_export('json'))['data']
+
+
+def test_csv(work_db):
+    text = _export('csv')
+    reader = csv.DictReader(io.StringIO(text))
+
+    assert tuple(reader.fieldnames) == CSV_FIELDS
+    rows = list(reader)
+    assert [row['subject'] for row in rows] == ['Fizika', 'Matemātika', 'Fizika']
+    assert rows[0]['title'] == 'Spēki'
+    assert rows[0]['description'] == 'lpp. 5\n6. uzdevums'
+    assert rows[1]['description'] == 'Algebra, "daļas"'
+    assert rows[1]['title'] == ''
+
+
+def test_ics(work_db):
+    lines = _export('ics').replace('\r\n ', '').split('\r\n')
+
+    assert lines[0] == 'BEGIN:VCALENDAR'
+    assert lines[-2] == 'END:VCALENDAR'
+    assert sum(line == 'BEGIN:VEVENT' for line in lines) == len(WORK)
+    assert 'SUMMARY:Kontroldarbs: Matemātika' in lines
+
+
+@pytest.mark.parametrize('export_format', ['json', 'ndjson', 'csv', 'ics'])
+def test_empty_export_is_valid(migrated_db, export_format):
+    text = _export(export_format)
+
+    if export_format == 'json':
+        assert json.loads(text)['data'] == []
+    elif export_format == 'ndjson':
+        assert text == ''
+    elif export_format == 'csv':
+        assert text.splitlines() == [','.join(CSV_FIELDS)]
+    else:
+        assert 'BEGIN:VEVENT' not in text and text.endswith('END:VCALENDAR\r\n')
+
+
+def test_filters(work_db):
+    rows = [json.loads(line) for line in _export('ndjson', subject='Fizika', date_from='2030-01-02').splitlines()]
+    assert [(row['subject'], row['date']) for row in rows] == [('Fizika', '2030-01-03')]
+
+    rows = [json.loads(line) for line in _export('ndjson', kind=KIND_HOMEWORK, ignored='x').splitlines()]
+    assert [row['kind'] for row in rows] == [KIND_HOMEWORK]
+
+
+def test_output_is_streamed_in_blocks(work_db, monkeypatch):
+    whole = _export('csv')
+    monkeypatch.setattr(export_service, 'CHUNK_SIZE', 50)
+
+    blocks = list(generate_export('csv'))
+
+    assert len(blocks) > 1
+    assert ''.join(blocks) == whole
+
+
+def test_route(client):
+    response = client.get('/api/export/work?format=csv')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="classmate-work-')
+    assert response.headers['Content-Disposition'].endswith('.csv"')
+    assert response.get_data(as_text=True).splitlines()[0] == ','.join(CSV_FIELDS)
+
+
+def test_route_gzip(client):
+    plain = client.get('/api/export/work?format=ndjson').get_data()
+
+    response = client.get('/api/export/work?format=ndjson', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == plain
+
+
+@pytest.mark.parametrize('query', ['format=xml', 'date_from=x'])
+def test_route_rejects_bad_params(client, query):
+    response = client.get(f'/api/export/work?{query}')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    """Папка задач и очередь без фонового потока"""
+    folder = tmp_path / 'exports'
+    folder.mkdir()
+    monkeypatch.setattr(export_service, 'EXPORT_FOLDER', str(folder))
+    monkeypatch.setattr(export_service, 'export_queue', queue.Queue())
+    monkeypatch.setattr(export_service, 'export_thread', threading.current_thread())
+    return folder
+
+
+def _queued():
+    items = []
+    while not export_service.export_queue.empty():
+        items.append(export_service.export_queue.get_nowait())
+    return items
+
+
+def test_job_runs_once(work_db, jobs):
+    job_id = export_service.create_export_job('csv', {'subject': 'Fizika'})
+    assert export_service.export_job_status(job_id) == ('pending', None)
+
+    export_service.run_export_job(job_id)
+    export_service.run_export_job(job_id)
+
+    status, path = export_service.export_job_status(job_id)
+    assert status == 'done'
+    with gzip.open(path, 'rt', encoding='utf-8') as source:
+        assert [row['subject'] for row in csv.DictReader(source)] == ['Fizika', 'Fizika']
+    assert sorted(item.name for item in jobs.iterdir()) == [f'{job_id}.csv.gz']
+
+
+def test_claimed_job_is_skipped(work_db, jobs):
+    job_id = export_service.create_export_job('csv', {})
+    # Задачу уже взял другой процесс
+    os.rename(jobs / f'{job_id}.pending', jobs / f'{job_id}.running')
+
+    export_service.run_export_job(job_id)
+
+    assert sorted(item.name for item in jobs.iterdir()) == [f'{job_id}.running']
+    assert export_service.export_job_status(job_id) == ('pending', None)
+
+
+def test_failed_job_leaves_no_temporary_files(migrated_db, jobs, monkeypatch):
+    job_id = export_service.create_export_job('csv', {})
+
+    def broken(*args):
+        yield 'id\n'
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(export_service, 'generate_export', broken)
+    export_service.run_export_job(job_id)
+
+    assert sorted(item.name for item in jobs.iterdir()) == [f'{job_id}.error']
+    assert export_service.export_job_status(job_id) == ('failed', 'disk full')
+
+
+def test_worker_start_requeues_only_stale_running_jobs(jobs):
+    for name in ('a' * 32 + '.pending', 'b' * 32 + '.running', 'c' * 32 + '.running', 'd' * 32 + '.csv.gz'):
+        (jobs / name).write_text('{}')
+    old = time.time() - export_service.EXPORT_STALE_AFTER - 1
+    os.utime(jobs / ('c' * 32 + '.running'), (old, old))
+
+    export_service.start_export_worker()
+
+    assert _queued() == ['a' * 32, 'c' * 32]
+    assert (jobs / ('b' * 32 + '.running')).exists()
+    assert (jobs / ('c' * 32 + '.pending')).exists()
@@ -0,0 +1,131 @@
+"""
+Тесты сборки собственных шрифтов и подмножества иконок (utils/fonts.py)
+"""
+from types import SimpleNamespace
+import pytest
+from utils import assets
+from utils.fonts import build_text_fonts, parse_icon_rules, scan_icon_names
+
+FA_CSS = (
+    '.fa-house:before,.fa-home:before{content:"\\f015"}'
+    '.fa-book:before{content:"\\f02d"}'
+    '.fa-spin{animation-name:fa-spin}'
+)
+
+GOOGLE_CSS = """
+/* cyrillic */
+@font-face {
+  font-family: 'DM Sans';
+  font-weight: 400;
+  src: url(https://fonts.example/dm-cyr.woff2) format('woff2');
+}
+/* latin-ext */
+@font-face {
+  font-family: 'DM Sans';
+  font-weight: 400;
+  src: url(https://fonts.example/dm-ext.woff2) format('woff2');
+}
+/* latin */
+@font-face {
+  font-family: 'DM Sans';
+  font-weight: 400;
+  src: url(https://fonts.example/dm.woff2) format('woff2');
+}
+/* latin */
+@font-face {
+  font-family: 'DM Sans';
+  font-weight: 700;
+  src: url(https://fonts.example/dm.woff2) format('woff2');
+}
+"""
+
+
+class FakeSession:
+    """Ответы вместо сети: URL -> текст или байты"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        body = self.responses[url]
+        return SimpleNamespace(text=body if isinstance(body, str) else '', content=body,
+                               raise_for_status=lambda: None)
+
+
+def test_scan_icon_names(tmp_path):
+    (tmp_path / 'templates').mkdir()
+    (tmp_path / 'templates' / 'page.html').write_text('<i class="fas fa-book"></i><i class="fa-solid fa-user-graduate">')
+    (tmp_path / 'static' / 'js' / 'dist').mkdir(parents=True)
+    (tmp_path / 'static' / 'js' / 'app.js').write_text("showToast('x', icon='fas fa-inbox')")
+    (tmp_path / 'static' / 'js' / 'dist' / 'app.123.js').write_text("'fa-ignored'")
+
+    assert scan_icon_names(str(tmp_path)) == {'book', 'solid', 'user-graduate', 'inbox'}
+
+
+def test_parse_icon_rules_keeps_aliases():
+    rules = parse_icon_rules(FA_CSS)
+
+    assert rules['home'] == (['.fa-house:before', '.fa-home:before'], 0xf015)
+    assert rules['book'] == (['.fa-book:before'], 0xf02d)
+    assert 'spin' not in rules
+
+
+def test_text_fonts_are_rewritten_to_local_files(tmp_path):
+    from utils.fonts import GOOGLE_FONTS_URL
+
+    session = FakeSession({GOOGLE_FONTS_URL: GOOGLE_CSS,
+                           'https://fonts.example/dm.woff2': b'latin', 'https://fonts.example/dm-ext.woff2': b'ext'})
+
+    preloads = build_text_fonts(session, str(tmp_path))
+
+    css = (tmp_path / 'fonts.css').read_text()
+    assert 'fonts.example' not in css
+    assert css.count('@font-face') == 3
+    assert css.count('font-display: swap') == 3
+    # Файл общий для начертаний одного шрифта скачивается один раз
+    assert session.requested.count('https://fonts.example/dm.woff2') == 1
+    assert 'https://fonts.example/dm-cyr.woff2' not in session.requested
+    assert len(preloads) == 1 and preloads[0].startswith('fonts/dm-sans-latin.')
+    assert (tmp_path / preloads[0].split('/', 1)[1]).read_bytes() == b'latin'
+
+
+def test_missing_fonts_bundle_is_skipped(tmp_path, monkeypatch):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'a.css').write_text('a { color: red; }')
+    monkeypatch.setattr(assets, 'BUNDLES', {'main.css': ['css/a.css'],
+                                            'fonts.css': ['fonts/fonts.css', 'fonts/icons.css']})
+
+    assert set(assets.build_assets(str(tmp_path))) == {'main.css'}
+
+
+def test_pages_fall_back_to_cdn_without_fonts_bundle(client):
+    if assets.has_asset('fonts.css'):
+        pytest.skip('fonts are built in this checkout')
+
+    html = client.get('/').get_data(as_text=True)
+
+    assert 'fonts.googleapis.com' in html
+    assert 'rel="preload"' not in html
+
+
+def test_build_step_never_fails(tmp_path, monkeypatch, capsys):
+    from utils import fonts
+
+    def offline(root):
+        raise ConnectionError('no network')
+
+    monkeypatch.setattr(fonts, 'build_fonts', offline)
+
+    assert fonts.main(str(tmp_path)) == 0
+    assert '❌ Self-hosted fonts not built' in capsys.readouterr().out
+
+
+def test_build_step_prints_preloads(tmp_path, monkeypatch, capsys):
+    from utils import fonts
+
+    monkeypatch.setattr(fonts, 'build_fonts', lambda root: ['fonts/dm-sans-1.woff2'])
+
+    assert fonts.main(str(tmp_path)) == 0
+    assert '✅ preload fonts/dm-sans-1.woff2' in capsys.readouterr().out
@@ -0,0 +1,69 @@
+"""
+Тесты условных ответов: ETag / 304 по версиям данных (utils/http_cache.py)
+"""
+import pytest
+
+CONDITIONAL_URLS = ['/', '/all', '/homework', '/calendar', '/api/work', '/api/stats', '/api/next_work']
+
+
+def _add_homework(client, title):
+    response = client.post('/api/work', json={
+        'type': 'homework', 'subject': 'Matemātika', 'title': title, 'date': '2030-01-01'})
+    assert response.get_json()['success']
+
+
+@pytest.mark.parametrize('url', CONDITIONAL_URLS)
+def test_matching_etag_returns_304(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert 'private' in response.headers['Cache-Control']
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_etag_is_stable_without_writes(client):
+    assert client.get('/api/work').headers['ETag'] == client.get('/api/work').headers['ETag']
+
+
+def test_write_changes_etag(client, host_client):
+    etag = client.get('/api/work').headers['ETag']
+
+    _add_homework(host_client, 'ETag darbs')
+
+    response = client.get('/api/work', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert 'ETag darbs' in [work.get('title') for work in response.get_json()['work']]
+
+
+def test_unrelated_write_keeps_etag(client, host_client):
+    """/api/work не зависит от новостей"""
+    etag = client.get('/api/work').headers['ETag']
+
+    response = host_client.post('/admin/news', data={
+        'title': 'Ziņa', 'content': 'saturs', 'date': '2030-01-01', 'is_active': 'on'})
+    assert response.status_code in (200, 302)
+
+    assert client.get('/api/work', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_etag_depends_on_host_mode_and_query(client, host_client):
+    etag = client.get('/api/work').headers['ETag']
+
+    assert host_client.get('/api/work').headers['ETag'] != etag
+    assert host_client.get('/api/work', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get('/api/work?kind=test').headers['ETag'] != etag
+
+
+def test_post_is_not_conditional(host_client):
+    etag = host_client.get('/api/work').headers['ETag']
+
+    response = host_client.post('/api/work', headers={'If-None-Match': etag}, json={
+        'type': 'homework', 'subject': 'Fizika', 'title': 'POST darbs', 'date': '2030-01-01'})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
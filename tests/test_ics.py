@@ -0,0 +1,216 @@
+"""
+Тесты сериализации iCalendar (utils/ics.py, services/ics_service.py)
+"""
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from utils import ics
+from services.ics_service import _serialize, generate_feed
+
+
+def _unfold(text):
+    """Разворачивает перенесённые строки (RFC 5545, 3.1)"""
+    return text.replace('\r\n ', '').split('\r\n')
+
+
+def _fields(text):
+    return dict(line.split(':', 1) for line in _unfold(text) if line)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('a;b,c', 'a\\;b\\,c'),
+    ('back\\slash', 'back\\\\slash'),
+    ('line 1\nline 2\r\nline 3\rline 4', 'line 1\\nline 2\\nline 3\\nline 4'),
+    ('Matemātika: kontroldarbs', 'Matemātika: kontroldarbs'),
+    (None, ''),
+])
+def test_escape_text(value, expected):
+    assert ics.escape_text(value) == expected
+
+
+def test_short_line_is_not_folded():
+    line = 'SUMMARY:' + 'x' * 67
+
+    assert ics.fold_line(line) == line + '\r\n'
+
+
+@pytest.mark.parametrize('text', [
+    'a' * 200,
+    'ā' * 120,                      # 2 байта на символ
+    'x' + 'ē' * 80 + 'y' * 10,      # граница посередине символа при нечётном сдвиге
+    '€' * 60 + 'Ķīmija' * 10,       # 3 байта на символ
+])
+def test_long_line_folds_at_75_octets_without_splitting_characters(text):
+    line = 'DESCRIPTION:' + text
+
+    folded = ics.fold_line(line)
+
+    assert folded.endswith('\r\n')
+    physical = folded[:-2].split('\r\n')
+    assert len(physical) > 1
+    for number, part in enumerate(physical):
+        assert len(part.encode('utf-8')) <= ics.MAX_LINE_OCTETS
+        if number:
+            assert part.startswith(' ')
+    assert _unfold(folded) == [line, '']
+
+
+def test_event_fields():
+    text = ics.event(
+        uid='work-1@classmate',
+        stamp=datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc),
+        summary='Kontroldarbs: Matemātika; 1, 2',
+        start=datetime(2030, 1, 5, 9, 30),
+        description='Nodaļa 1\nNodaļa 2',
+        categories=['Matemātika', 'Kontroldarbs', None],
+    )
+    fields = _fields(text)
+
+    assert _unfold(text)[0] == 'BEGIN:VEVENT'
+    assert _unfold(text)[-2] == 'END:VEVENT'
+    assert fields['UID'] == 'work-1@classmate'
+    assert fields['DTSTAMP'] == '20300101T120000Z'
+    assert fields['DTSTART'] == '20300105T093000'  # наивное время — плавающее
+    assert fields['SUMMARY'] == 'Kontroldarbs: Matemātika\\; 1\\, 2'
+    assert fields['DESCRIPTION'] == 'Nodaļa 1\\nNodaļa 2'
+    assert fields['CATEGORIES'] == 'Matemātika,Kontroldarbs'
+
+
+def test_start_with_timezone_is_utc():
+    start = datetime(2030, 7, 5, 9, 30, tzinfo=ZoneInfo('Europe/Riga'))
+
+    fields = _fields(ics.event('work-1@classmate', start, 'X', start))
+
+    assert fields['DTSTART'] == '20300705T063000Z'
+
+
+def test_all_day_event_ends_next_day():
+    text = ics.event('work-2@classmate', datetime(2030, 1, 1, tzinfo=timezone.utc), 'X', date(2030, 1, 31), all_day=True)
+    fields = _fields(text)
+
+    assert fields['DTSTART;VALUE=DATE'] == '20300131'
+    assert fields['DTEND;VALUE=DATE'] == '20300201'
+    assert 'DTSTART' not in fields
+
+
+@pytest.mark.parametrize('added_date, expected', [
+    ('2030-01-15 12:00', '20300115T100000Z'),   # EET, UTC+2
+    ('2030-07-15 12:00', '20300715T090000Z'),   # EEST, UTC+3
+])
+def test_stamp_uses_calendar_timezone(added_date, expected):
+    stamp = ics.parse_stamp(added_date, None, 'Europe/Riga')
+
+    assert ics.format_utc(stamp) == expected
+
+
+def test_stamp_falls_back_to_default():
+    default = datetime(2030, 1, 5, 9, 0)
+
+    assert ics.parse_stamp('not a date', default, 'Europe/Riga') == default.replace(tzinfo=ZoneInfo('Europe/Riga'))
+    assert ics.parse_stamp(None, default) == default
+
+
+def test_serialize_work(monkeypatch):
+    monkeypatch.setattr('services.ics_service.CALENDAR_TIMEZONE', 'Europe/Riga')
+    work = {'id': 7, 'kind': 'homework', 'subject': 'Fizika', 'type': 'Mājasdarbs', 'title': 'Spēki',
+            'date': '2030-01-10', 'time': '23:59', 'all_day': True, 'due_date': '2030-01-12',
+            'description': 'lpp. 5', 'added_date': '2030-01-10 08:15'}
+
+    fields = _fields(_serialize(work))
+
+    assert fields['UID'] == 'work-7@classmate'
+    assert fields['DTSTAMP'] == '20300110T061500Z'
+    assert fields['DTSTART;VALUE=DATE'] == '20300112'
+    assert fields['SUMMARY'] == 'Mājasdarbs: Fizika — Spēki'
+    assert fields['DESCRIPTION'] == 'Uzdots: 2030-01-10\\nlpp. 5'
+
+
+@pytest.mark.parametrize('work_date, expected', [
+    ('2030-01-10', '20300110T215900Z'),   # EET, UTC+2
+    ('2030-07-10', '20300710T205900Z'),   # EEST, UTC+3
+])
+def test_serialize_work_at_2359_with_time(monkeypatch, work_date, expected):
+    monkeypatch.setattr('services.ics_service.CALENDAR_TIMEZONE', 'Europe/Riga')
+    work = {'id': 8, 'subject': 'Fizika', 'type': 'Tests', 'date': work_date, 'time': '23:59', 'all_day': False}
+
+    fields = _fields(_serialize(work))
+
+    assert fields['DTSTART'] == expected
+    assert 'DTSTART;VALUE=DATE' not in fields
+
+
+def test_feed_is_a_complete_calendar():
+    work = [
+        {'id': 2, 'subject': 'M', 'type': 'T', 'date': '2030-01-02', 'time': '10:00'},
+        {'id': 1, 'subject': 'M', 'type': 'T', 'date': '2030-01-01', 'time': ''},
+        {'id': 3, 'subject': 'M', 'type': 'T', 'date': None},
+    ]
+
+    lines = _unfold(''.join(generate_feed('Classmate, 12.b', work)))
+
+    assert lines[0] == 'BEGIN:VCALENDAR'
+    assert lines[-2:] == ['END:VCALENDAR', '']
+    assert 'X-WR-CALNAME:Classmate\\, 12.b' in lines
+    assert [line for line in lines if line.startswith('UID:')] == ['UID:work-1@classmate', 'UID:work-2@classmate']
+
+
+def test_feed_route(client):
+    response = client.get('/calendar.ics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/calendar'
+    assert response.get_data(as_text=True).startswith('BEGIN:VCALENDAR\r\n')
+    etag = response.headers['ETag']
+    assert not etag.startswith('W/')
+    assert client.get('/calendar.ics', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_subject_feed_route(client, migrated_db):
+    from models.subjects import save_subject
+    from models.work import KIND_TEST, save_work_item
+    assert save_subject('Fizika', '#00aa00')
+    assert save_work_item(KIND_TEST, 'Fizika', 'Tests', None, '2030-01-05', '09:30', '')
+    assert save_work_item(KIND_TEST, 'Ķīmija', 'Tests', None, '2030-01-06', '09:30', '')
+
+    lines = _unfold(client.get('/subject/Fizika.ics').get_data(as_text=True))
+
+    assert [line for line in lines if line.startswith('UID:')] == ['UID:work-1@classmate']
+    assert 'DTSTART:20300105T073000Z' in lines
+    assert client.get('/subject/Nav%20t%C4%81da.ics').status_code == 404
+
+
+def test_all_day_follows_saved_time(migrated_db):
+    from models.work import KIND_TEST, get_work_item, save_work_item, update_work_item
+    assert save_work_item(KIND_TEST, 'Fizika', 'Tests', None, '2030-01-05', '', '')
+    assert save_work_item(KIND_TEST, 'Fizika', 'Tests', None, '2030-01-06', '23:59', '')
+
+    assert get_work_item(1)['time'] == '23:59'
+    assert _fields(_serialize(get_work_item(1)))['DTSTART;VALUE=DATE'] == '20300105'
+    assert _fields(_serialize(get_work_item(2)))['DTSTART'] == '20300106T215900Z'
+
+    assert update_work_item(2, 'Fizika', 'Tests', None, '2030-01-06', '', '')
+    assert 'DTSTART;VALUE=DATE' in _fields(_serialize(get_work_item(2)))
+
+
+def test_0013_marks_legacy_rows_without_time_as_all_day(migrate_to):
+    from models.migrations import run_migrations
+    from models.work import get_work_item
+
+    cursor = migrate_to(12)
+    cursor.executemany("INSERT INTO work (kind, subject, type, date, time) VALUES ('test', 'M', 'T', '2030-01-01', ?)",
+                       [('23:59',), ('09:00',)])
+    cursor.connection.commit()
+
+    run_migrations(report=False)
+
+    assert get_work_item(1)['all_day']
+    assert not get_work_item(2)['all_day']
+
+
+def test_edit_form_keeps_all_day_without_time(host_client, migrated_db):
+    from models.work import KIND_TEST, save_work_item
+    assert save_work_item(KIND_TEST, 'Fizika', 'Tests', None, '2030-01-05', '', '')
+    assert save_work_item(KIND_TEST, 'Fizika', 'Tests', None, '2030-01-06', '23:59', '')
+
+    assert 'name="time" class="form-input" value=""' in host_client.get('/admin/edit_work/1').get_data(as_text=True)
+    assert 'value="23:59"' in host_client.get('/admin/edit_work/2').get_data(as_text=True)
@@ -0,0 +1,235 @@
+"""
+Тесты обработки загруженных изображений (utils/images.py, services/image_service.py)
+"""
+import io
+import json
+import os
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from services import image_service
+from utils import storage
+from utils.images import render_variants, variant_widths
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+GPS_IFD = 0x8825
+
+URL_PREFIX = '/static/uploads/'
+
+
+def _jpeg(width=1600, height=800, orientation=None):
+    """JPEG с EXIF: модель камеры, GPS и (необязательно) поворот"""
+    exif = Image.Exif()
+    exif[MAKE] = 'SecretCam'
+    exif.get_ifd(GPS_IFD)[1] = 'N'
+    if orientation:
+        exif[ORIENTATION] = orientation
+    out = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(out, 'JPEG', exif=exif)
+    return out.getvalue()
+
+
+class Upload:
+    """Минимальный FileStorage"""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.stream = io.BytesIO(data)
+
+
+def test_variant_widths():
+    assert variant_widths(2000) == [320, 640, 960, 1280]
+    assert variant_widths(700) == [320, 640, 700]
+    assert variant_widths(100) == [100]
+
+
+def test_variants_drop_metadata_and_apply_orientation():
+    info, variants = render_variants(io.BytesIO(_jpeg(orientation=6)))
+
+    assert [(width, ext) for width, ext, _ in variants] == [
+        (320, 'webp'), (320, 'jpg'), (640, 'webp'), (640, 'jpg'), (800, 'webp'), (800, 'jpg')]
+    # Поворот на 90° применён к пикселям: 1600x800 становится 800x1600
+    assert (info['width'], info['height']) == (800, 1600)
+    assert info['placeholder'].startswith('data:image/webp;base64,')
+    for _, _, data in variants:
+        assert b'SecretCam' not in data
+        with Image.open(io.BytesIO(data)) as image:
+            assert not image.getexif()
+
+
+def test_webp_source_gets_only_webp_variants():
+    out = io.BytesIO()
+    Image.new('RGB', (400, 200)).save(out, 'WEBP')
+
+    _, variants = render_variants(io.BytesIO(out.getvalue()))
+
+    assert {ext for _, ext, _ in variants} == {'webp'}
+
+
+@pytest.fixture
+def upload_dirs(tmp_path, monkeypatch):
+    public, incoming = tmp_path / 'uploads', tmp_path / 'incoming'
+    monkeypatch.setattr(storage, '_storage', storage.LocalStorage(str(public), URL_PREFIX))
+    monkeypatch.setattr(image_service, 'UPLOAD_INCOMING_FOLDER', str(incoming))
+    return public, incoming
+
+
+def test_upload_is_served_until_processed(upload_dirs):
+    public, incoming = upload_dirs
+
+    url = image_service.save_upload(Upload('photo.JPEG', _jpeg()))
+
+    assert url.startswith(URL_PREFIX) and url.endswith('.orig.jpg')
+    stem = url.rsplit('/', 1)[1].split('.', 1)[0]
+    # Исходник с EXIF только во внутренней папке, наружу — копия без метаданных
+    assert [path.name for path in incoming.iterdir()] == [f'{stem}.jpg']
+    assert b'SecretCam' in (incoming / f'{stem}.jpg').read_bytes()
+    served = (public / stem[:2] / f'{stem}.orig.jpg').read_bytes()
+    assert b'SecretCam' not in served
+    with Image.open(io.BytesIO(served)) as image:
+        assert not image.getexif()
+        assert image.size == (1600, 800)
+    assert image_service.save_upload(Upload('notes.txt', b'x')) == ''
+
+
+def test_served_copy_applies_orientation(upload_dirs):
+    public, _ = upload_dirs
+
+    url = image_service.save_upload(Upload('photo.jpg', _jpeg(orientation=6)))
+
+    with Image.open(public / url[len(URL_PREFIX):]) as image:
+        assert image.size == (800, 1600)
+
+
+def test_upload_is_rejected_without_pillow(upload_dirs, monkeypatch):
+    public, incoming = upload_dirs
+    monkeypatch.setattr(image_service.images, 'is_available', lambda: False)
+
+    assert image_service.save_upload(Upload('photo.jpg', _jpeg())) == ''
+    assert not public.exists() and not incoming.exists()
+
+
+def test_processing_writes_variants_and_news_meta(upload_dirs, migrated_db):
+    from models.news import get_news_by_id, save_news
+
+    public, incoming = upload_dirs
+    original = image_service.save_upload(Upload('photo.jpg', _jpeg()))
+    assert save_news('Ziņa', 'saturs', '2030-01-01', original, True)
+
+    image_service.process_upload(str(next(incoming.iterdir())))
+
+    assert list(incoming.iterdir()) == []
+    stem = original.rsplit('/', 1)[1].split('.', 1)[0]
+    shard = public / stem[:2]
+    url = f'{URL_PREFIX}{stem[:2]}/{stem}.jpg'
+    # Исходник с EXIF удалён, новость переключена на самый большой вариант
+    assert sorted(path.name for path in shard.iterdir()) == sorted(
+        [f'{stem}-320.webp', f'{stem}-320.jpg', f'{stem}-640.webp', f'{stem}-640.jpg',
+         f'{stem}-960.webp', f'{stem}-960.jpg', f'{stem}.webp', f'{stem}.jpg'])
+    assert all(b'SecretCam' not in path.read_bytes() for path in shard.iterdir())
+
+    news = get_news_by_id(1)
+    assert news['image_url'] == url
+    meta = news['image_meta']
+    assert (meta['width'], meta['height']) == (1280, 640)
+    assert meta['srcset']['original'][-1] == [1280, url]
+    assert [width for width, _ in meta['srcset']['webp']] == [320, 640, 960, 1280]
+    json.dumps(meta)
+
+
+def test_same_bytes_reuse_processed_variants(upload_dirs, migrated_db):
+    from models.news import get_news_by_id, save_news
+
+    public, incoming = upload_dirs
+    data = _jpeg()
+    original = image_service.save_upload(Upload('a.jpg', data))
+    assert save_news('Ziņa 1', 'saturs', '2030-01-01', original, True)
+    image_service.process_upload(str(next(incoming.iterdir())))
+    files = sorted(public.rglob('*'))
+    url = get_news_by_id(1)['image_url']
+
+    assert image_service.save_upload(Upload('b.jpg', data)) == url
+    assert list(incoming.iterdir()) == []
+    assert sorted(public.rglob('*')) == files
+
+    assert save_news('Ziņa 2', 'saturs', '2030-01-02', url, True)
+    image_service.process_upload_async(url)
+    assert get_news_by_id(2)['image_meta'] == get_news_by_id(1)['image_meta']
+
+
+def test_gif_keeps_animation_without_comments(upload_dirs):
+    public, incoming = upload_dirs
+    frames = [Image.new('RGB', (10, 10), (80 * i, 0, 0)) for i in range(3)]
+    out = io.BytesIO()
+    frames[0].save(out, 'GIF', save_all=True, append_images=frames[1:], comment=b'SecretCam', duration=100)
+
+    url = image_service.save_upload(Upload('anim.gif', out.getvalue()))
+
+    assert url.endswith('.gif') and '.orig.' not in url
+    assert list(incoming.iterdir()) == []
+    served = next(public.rglob('*.gif')).read_bytes()
+    assert b'SecretCam' not in served
+    with Image.open(io.BytesIO(served)) as image:
+        assert image.n_frames == 3
+
+
+@pytest.mark.parametrize('path, key', [
+    ('3f/3fa1c9.jpg', '3f/3fa1c9'),
+    ('3f/3fa1c9-640.webp', '3f/3fa1c9'),
+    ('0a1b2c_foto-1.png', '0a1b2c_foto'),
+])
+def test_group_key(path, key):
+    assert image_service.group_key(path) == key
+
+
+def test_collect_garbage_keeps_referenced_and_recent(upload_dirs, migrated_db):
+    from models.news import save_news
+
+    public, incoming = upload_dirs
+    for name in ('aa/aa11.jpg', 'aa/aa11-320.webp', 'bb/bb22.jpg', 'bb/bb22-320.webp', 'cc/cc33.jpg', 'old_name.png'):
+        path = public / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x' * 10)
+    incoming.mkdir()
+    (incoming / 'dd44.jpg').write_bytes(b'x')
+    (incoming / 'ee55.jpg').write_bytes(b'x')
+    old = 1_000_000_000
+    for path in [*public.rglob('*.*'), incoming / 'dd44.jpg']:
+        if path.name != 'cc33.jpg':
+            os.utime(path, (old, old))
+    assert save_news('Ziņa', 'saturs', '2030-01-01', URL_PREFIX + 'aa/aa11.jpg', True)
+
+    removed, freed = image_service.collect_garbage(grace_period=3600)
+
+    assert sorted(str(path.relative_to(public)) for path in public.rglob('*.*')) == [
+        'aa/aa11-320.webp', 'aa/aa11.jpg', 'cc/cc33.jpg']
+    assert not (public / 'bb').exists()
+    assert [path.name for path in incoming.iterdir()] == ['ee55.jpg']
+    assert (removed, freed) == (4, 30)
+
+
+def test_unreadable_upload_is_rejected(upload_dirs):
+    public, incoming = upload_dirs
+
+    assert image_service.save_upload(Upload('broken.png', b'not an image')) == ''
+    assert list(incoming.iterdir()) == []
+    assert not public.exists()
+
+
+def test_failed_processing_keeps_clean_copy(upload_dirs, monkeypatch):
+    public, incoming = upload_dirs
+    url = image_service.save_upload(Upload('photo.jpg', _jpeg()))
+    path = next(incoming.iterdir())
+
+    def broken(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(image_service.images, 'render_variants', broken)
+    image_service.process_upload(str(path))
+
+    # Не ставится в очередь повторно, новость продолжает показывать копию без метаданных
+    assert [item.name for item in incoming.iterdir()] == [path.name + image_service.FAILED_SUFFIX]
+    assert [item.name for item in public.rglob('*.*')] == [url.rsplit('/', 1)[1]]
+    assert b'SecretCam' not in (public / url[len(URL_PREFIX):]).read_bytes()
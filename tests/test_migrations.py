@@ -0,0 +1,140 @@
+"""
+Тесты runner'а миграций (models/migrations)
+"""
+from types import SimpleNamespace
+import pytest
+import models.migrations as migrations
+from models.migrations import discover_migrations, run_migrations
+
+
+def _applied_versions(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT version FROM schema_version ORDER BY version')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_discover_migrations_in_version_order():
+    versions = [version for version, _, _ in discover_migrations()]
+
+    assert versions == sorted(versions)
+    assert versions[0] == 1
+    assert len(versions) == len(set(versions))
+    for _, _, module in discover_migrations():
+        assert module.DESCRIPTION
+        assert callable(module.upgrade)
+
+
+def test_run_migrations_applies_all_once(fresh_db):
+    expected = [version for version, _, _ in discover_migrations()]
+
+    assert run_migrations(report=False) == expected
+    assert _applied_versions(fresh_db()) == expected
+
+    # Повторный запуск ничего не применяет
+    assert run_migrations(report=False) == []
+    assert _applied_versions(fresh_db()) == expected
+
+
+def test_run_migrations_reports_plans(fresh_db, capsys):
+    run_migrations(report=True)
+
+    assert '📊' in capsys.readouterr().out
+
+
+def test_failed_migration_is_not_recorded(fresh_db, monkeypatch):
+    calls = []
+
+    def broken_upgrade(cursor):
+        calls.append('broken')
+        raise RuntimeError('boom')
+
+    known = discover_migrations()
+    broken = SimpleNamespace(DESCRIPTION='broken', upgrade=broken_upgrade)
+    monkeypatch.setattr(migrations, 'discover_migrations', lambda: known + [(9999, 'broken', broken)])
+
+    with pytest.raises(RuntimeError):
+        run_migrations(report=False)
+    assert 9999 not in _applied_versions(fresh_db())
+
+    # Исправленная миграция применяется при следующем запуске
+    broken.upgrade = lambda cursor: calls.append('fixed')
+    assert run_migrations(report=False) == [9999]
+    assert calls == ['broken', 'fixed']
+    assert _applied_versions(fresh_db())[-1] == 9999
+
+
+def test_hot_query_indexes_exist(migrated_db):
+    cursor = migrated_db().cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    indexes = {row[0] for row in cursor.fetchall()}
+
+    assert {'idx_work_kind_date_time', 'idx_work_deadline_at', 'idx_timer_sessions_user_date'} <= indexes
+
+
+def _insert_rows(cursor, table, columns, rows):
+    placeholders = ', '.join('?' * len(columns))
+    cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+
+def _notifications(conn):
+    cursor = conn.cursor()
+    cursor.execute('SELECT work_id, work_type FROM sent_notifications ORDER BY work_id')
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def test_0005_shifts_homework_past_deleted_tests(migrate_to):
+    cursor = migrate_to(4)
+    conn = cursor.connection
+
+    _insert_rows(cursor, 'tests', ('subject', 'type', 'date', 'time'),
+                 [('Matemātika', 'Kontroldarbs', '2030-01-01', '10:00')] * 5)
+    # Удалённые тесты 4 и 5: их id остаются только в последовательности и уведомлениях
+    cursor.execute('DELETE FROM tests WHERE id > 3')
+    _insert_rows(cursor, 'homework', ('subject', 'title', 'date', 'time'),
+                 [('Fizika', f'Mājasdarbs {i}', '2030-01-02', None) for i in range(3)])
+    _insert_rows(cursor, 'sent_notifications', ('user_email', 'work_id', 'work_type', 'notification_type'), [
+        ('a@example.com', 5, 'test', 'reminder'),
+        ('a@example.com', 1, 'homework', 'reminder'),
+        ('a@example.com', 2, 'homework', 'reminder'),
+        ('a@example.com', 3, 'test', 'reminder'),
+        ('a@example.com', 4, 'homework', 'reminder'),
+    ])
+    conn.commit()
+
+    run_migrations(report=False)
+
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, kind FROM work ORDER BY id')
+    assert [tuple(row) for row in cursor.fetchall()] == [
+        (1, 'test'), (2, 'test'), (3, 'test'), (6, 'homework'), (7, 'homework'), (8, 'homework'),
+    ]
+    # Уведомления о домашних заданиях сдвинуты тем же смещением и не совпали с тестами
+    assert _notifications(conn) == [
+        (3, 'test'), (5, 'test'), (6, 'homework'), (7, 'homework'), (9, 'homework'),
+    ]
+
+
+def test_0005_offset_covers_notifications_of_unknown_tests(migrate_to):
+    cursor = migrate_to(4)
+    conn = cursor.connection
+
+    _insert_rows(cursor, 'tests', ('subject', 'type', 'date'), [('Matemātika', 'Tests', '2030-01-01')])
+    _insert_rows(cursor, 'homework', ('subject', 'title', 'date'), [('Fizika', 'Mājasdarbs', '2030-01-02')] * 2)
+    # Уведомление о тесте с id больше, чем знает последовательность (например, после импорта)
+    _insert_rows(cursor, 'sent_notifications', ('user_email', 'work_id', 'work_type', 'notification_type'), [
+        ('a@example.com', 10, 'test', 'reminder'),
+        ('a@example.com', 1, 'homework', 'reminder'),
+        ('a@example.com', 2, 'homework', 'reminder'),
+    ])
+    conn.commit()
+
+    run_migrations(report=False)
+
+    cursor = conn.cursor()
+    cursor.execute('SELECT id FROM work ORDER BY id')
+    assert [row[0] for row in cursor.fetchall()] == [1, 11, 12]
+    assert _notifications(conn) == [(10, 'test'), (11, 'homework'), (12, 'homework')]
+
+    # Новая работа получает id после всех перенесённых
+    cursor.execute("INSERT INTO work (kind, subject, type, date) VALUES ('test', 'Matemātika', 'Tests', '2030-01-03')")
+    assert cursor.lastrowid == 13
@@ -0,0 +1,159 @@
+"""
+Тесты keyset-пагинации работ и новостей
+"""
+import sqlite3
+import pytest
+from models.news import load_news_page, save_news
+from models.work import KIND_HOMEWORK, KIND_TEST, find_work, save_work_item
+from utils.pagination import cursor_date, cursor_time, make_cursor, parse_cursor, parse_limit
+
+# (вид, предмет, дата, время): много строк с одинаковыми (date, time) — порядок решает id
+WORK = [
+    (KIND_TEST, 'Matemātika', '2030-01-02', '09:00'),
+    (KIND_HOMEWORK, 'Fizika', '2030-01-01', ''),
+    (KIND_TEST, 'Fizika', '2030-01-01', '09:00'),
+    (KIND_HOMEWORK, 'Matemātika', '2030-01-02', '09:00'),
+    (KIND_TEST, 'Matemātika', '2030-01-01', '09:00'),
+    (KIND_HOMEWORK, 'Matemātika', '2030-01-01', ''),
+    (KIND_TEST, 'Fizika', '2030-01-02', '09:00'),
+]
+
+
+@pytest.fixture
+def work_db(migrated_db):
+    for kind, subject, date, time in WORK:
+        assert save_work_item(kind, subject, 'Tests', 'Darbs', date, time, '')
+    return migrated_db
+
+
+def _walk(limit, **filters):
+    """Все страницы подряд через токены курсора; id в порядке выдачи"""
+    seen, after = [], None
+    while True:
+        items, next_cursor = find_work(after=after, limit=limit, **filters)
+        assert len(items) <= limit
+        seen += [work['id'] for work in items]
+        if next_cursor is None:
+            return seen
+        after = parse_cursor(next_cursor, cursor_date, cursor_time, int)
+
+
+def _key(work):
+    return work['date'], work['time'], work['id']
+
+
+def test_find_work_orders_by_date_time_id(work_db):
+    items, next_cursor = find_work()
+
+    assert next_cursor is None
+    assert len(items) == len(WORK)
+    assert [_key(work) for work in items] == sorted(_key(work) for work in items)
+    # Пустое время — конец дня
+    assert [work['time'] for work in items if work['kind'] == KIND_HOMEWORK and work['date'] == '2030-01-01'] == [
+        '23:59', '23:59']
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, len(WORK), len(WORK) + 1])
+def test_pages_cover_all_rows_once(work_db, limit):
+    full = [work['id'] for work in find_work()[0]]
+
+    assert _walk(limit) == full
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4])
+def test_descending_pages(work_db, limit):
+    full = [work['id'] for work in find_work(descending=True)[0]]
+    assert full == [work['id'] for work in reversed(find_work()[0])]
+
+    seen, after = [], None
+    while True:
+        items, next_cursor = find_work(after=after, limit=limit, descending=True)
+        seen += [work['id'] for work in items]
+        if next_cursor is None:
+            break
+        after = parse_cursor(next_cursor, cursor_date, cursor_time, int)
+    assert seen == full
+
+
+def test_pages_with_filters(work_db):
+    full = [work['id'] for work in find_work(subject='Matemātika', date_from='2030-01-02')[0]]
+
+    assert len(full) == 2
+    assert _walk(1, subject='Matemātika', date_from='2030-01-02') == full
+    assert _walk(2, kind=KIND_HOMEWORK) == [work['id'] for work in find_work(kind=KIND_HOMEWORK)[0]]
+
+
+def test_last_full_page_has_no_cursor(work_db):
+    items, next_cursor = find_work(limit=len(WORK))
+
+    assert len(items) == len(WORK)
+    assert next_cursor is None
+
+
+def test_news_pages_break_date_ties_by_id(migrated_db):
+    for i in range(5):
+        assert save_news(f'Ziņa {i}', 'saturs', '2030-01-01' if i < 3 else '2030-01-02', '', i != 1)
+
+    full, _ = load_news_page(active_only=False, limit=100)
+    assert [(news['date'], news['id']) for news in full] == sorted(
+        ((news['date'], news['id']) for news in full), reverse=True)
+
+    for active_only in (True, False):
+        expected = [news['id'] for news in full if not active_only or news['is_active']]
+        seen, after = [], None
+        while True:
+            items, next_cursor = load_news_page(active_only=active_only, after=after, limit=2)
+            seen += [news['id'] for news in items]
+            if next_cursor is None:
+                break
+            after = parse_cursor(next_cursor, cursor_date, int)
+        assert seen == expected
+
+
+def test_parse_cursor():
+    token = make_cursor('2030-01-02', '09:00', 17)
+
+    assert parse_cursor(token, cursor_date, cursor_time, int) == ('2030-01-02', '09:00', 17)
+    assert parse_cursor('', cursor_date, cursor_time, int) is None
+    for bad in ('2030-01-02,09:00', '2030-13-01,09:00,1', '2030-01-02,9h,1', '2030-01-02,09:00,x'):
+        with pytest.raises(ValueError):
+            parse_cursor(bad, cursor_date, cursor_time, int)
+
+
+def test_parse_limit():
+    assert parse_limit('5') == 5
+    assert parse_limit('0') == 1
+    assert parse_limit('100000', maximum=200) == 200
+    assert parse_limit('x', default=7) == 7
+    assert parse_limit(None, default=7) == 7
+
+
+def test_null_time_rows_are_paged_after_migration(migrate_to):
+    """Строки с NULL в work.time (до 0012) получают '23:59' и не выпадают из страниц"""
+    from models.migrations import run_migrations
+
+    cursor = migrate_to(11)
+    cursor.executemany("INSERT INTO work (kind, subject, type, date, time) VALUES ('test', 'Matemātika', 'Tests', ?, ?)", [
+        ('2030-01-01', '10:00'), ('2030-01-01', None), ('2030-01-02', None),
+        ('2030-01-01', None), ('2030-01-02', '09:00'), ('2030-01-01', '23:59'),
+    ])
+    cursor.connection.commit()
+
+    run_migrations(report=False)
+
+    full = find_work()[0]
+    assert [(work['date'], work['time'], work['id']) for work in full] == [
+        ('2030-01-01', '10:00', 1), ('2030-01-01', '23:59', 2), ('2030-01-01', '23:59', 4),
+        ('2030-01-01', '23:59', 6), ('2030-01-02', '09:00', 5), ('2030-01-02', '23:59', 3),
+    ]
+    for limit in (1, 2, 4):
+        assert _walk(limit) == [work['id'] for work in full]
+
+
+def test_null_time_is_rejected(migrated_db):
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', 'Darbs', '2030-01-01', '', '')
+    cursor = migrated_db().cursor()
+    with pytest.raises(sqlite3.IntegrityError):
+        cursor.execute("INSERT INTO work (kind, subject, type, date, time) VALUES ('test', 'M', 'T', '2030-01-01', NULL)")
+    with pytest.raises(sqlite3.IntegrityError):
+        cursor.execute('UPDATE work SET time = NULL')
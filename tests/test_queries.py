@@ -0,0 +1,92 @@
+"""
+Тесты диалектно-нейтрального слоя запросов (models/queries.py)
+"""
+import sqlite3
+from datetime import datetime
+import pytest
+from models.queries import (
+    POSTGRESQL, SQLITE, Query, cursor_dialect, epoch_value, execute, fetch_all, fetch_one, fetch_value, get_query
+)
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    cursor.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+    cursor.executemany('INSERT INTO t (name) VALUES (?)', [('a',), ('b',)])
+    yield cursor
+    conn.close()
+
+
+def test_placeholders_follow_dialect():
+    query = Query('test.placeholders', 'SELECT * FROM t WHERE a = ? AND b = ?')
+
+    assert query.text(SQLITE) == 'SELECT * FROM t WHERE a = ? AND b = ?'
+    assert query.text(POSTGRESQL) == 'SELECT * FROM t WHERE a = %s AND b = %s'
+
+
+def test_literals_and_percent_are_preserved():
+    query = Query('test.literals', "SELECT '?' || name FROM t WHERE name LIKE 'x%' AND id = ?")
+
+    assert query.has_params
+    assert query.text(POSTGRESQL) == "SELECT '?' || name FROM t WHERE name LIKE 'x%%' AND id = %s"
+    assert not Query('test.literal_only', "SELECT 'a?b'").has_params
+
+
+def test_ddl_tokens_expand_per_dialect():
+    query = Query('test.ddl', 'CREATE TABLE x (id {pk}, day {date}, at {timestamp})', prepare=False)
+
+    assert query.text(SQLITE) == 'CREATE TABLE x (id INTEGER PRIMARY KEY AUTOINCREMENT, day TEXT, at TEXT)'
+    assert query.text(POSTGRESQL) == 'CREATE TABLE x (id SERIAL PRIMARY KEY, day DATE, at TIMESTAMP)'
+
+
+def test_registry_rejects_conflicting_names():
+    query = Query('test.registry', 'SELECT 1')
+
+    assert Query('test.registry', 'SELECT 1').sql == query.sql
+    assert get_query('test.registry').sql == 'SELECT 1'
+    with pytest.raises(ValueError):
+        Query('test.registry', 'SELECT 2')
+
+
+def test_fetch_helpers_return_dicts(cursor):
+    assert cursor_dialect(cursor) == SQLITE
+
+    execute(cursor, Query('test.select_t', 'SELECT id, name FROM t ORDER BY id'))
+    assert fetch_all(cursor) == [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+
+    by_id = Query('test.select_t_by_id', 'SELECT id, name FROM t WHERE id = ?')
+    assert fetch_one(execute(cursor, by_id, (2,))) == {'id': 2, 'name': 'b'}
+    assert fetch_one(execute(cursor, by_id, (3,))) is None
+
+    count = Query('test.count_t', 'SELECT COUNT(*) FROM t WHERE id > ?')
+    assert fetch_value(execute(cursor, count, (0,))) == 2
+    assert fetch_value(execute(cursor, Query('test.max_empty', 'SELECT MAX(id) FROM t WHERE id > 9')), 0) == 0
+
+
+def test_execute_by_name(cursor):
+    Query('test.by_name', 'SELECT name FROM t WHERE id = ?')
+
+    assert fetch_value(execute(cursor, 'test.by_name', (1,))) == 'a'
+
+
+def test_model_round_trip(migrated_db):
+    from models.subjects import get_subject_details, load_subjects, save_subject
+
+    assert save_subject('Fizika', '#00aa00', 'Spēki')
+    assert not save_subject('Fizika', '#000000')
+
+    assert [subject['name'] for subject in load_subjects()] == ['Fizika']
+    assert get_subject_details('Fizika')['description'] == 'Spēki'
+
+
+def test_epoch_value_only_for_epoch_columns(cursor):
+    moment = datetime(2030, 1, 5, 9, 30)
+
+    assert epoch_value(cursor, moment) == int(moment.timestamp())
+    assert epoch_value(cursor, None) is None
+
+    # Глобального адаптера нет: прочие datetime-параметры не становятся epoch-секундами
+    cursor.execute('SELECT typeof(?)', (moment,))
+    assert cursor.fetchone()[0] == 'text'
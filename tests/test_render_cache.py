@@ -0,0 +1,108 @@
+"""
+Тесты кеша отрендеренных страниц и фрагментов (utils/render_cache.py)
+"""
+import re
+from utils.render_cache import fragment_cache, page_cache
+
+
+def _page_hits():
+    return page_cache.stats()['hits']
+
+
+def test_repeated_page_is_served_from_cache(client):
+    first = client.get('/homework')
+    hits = _page_hits()
+
+    second = client.get('/homework')
+
+    assert second.status_code == 200
+    assert _page_hits() == hits + 1
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_write_invalidates_cached_page(client, host_client):
+    client.get('/homework')
+    before = client.get('/homework')
+    assert 'Kešs apraksts' not in before.get_data(as_text=True)
+
+    response = host_client.post('/api/work', json={
+        'type': 'homework', 'subject': 'Fizika', 'title': 'Darbs', 'date': '2030-02-01',
+        'description': 'Kešs apraksts'})
+    assert response.get_json()['success']
+
+    hits = _page_hits()
+    after = client.get('/homework')
+    assert after.status_code == 200
+    assert _page_hits() == hits
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert 'Kešs apraksts' in after.get_data(as_text=True)
+
+
+def test_cached_page_is_not_shared_with_host(client, host_client):
+    client.get('/all')
+    hits = _page_hits()
+
+    response = host_client.get('/all')
+
+    assert response.status_code == 200
+    assert _page_hits() == hits
+
+
+def test_fragment_is_rendered_once_per_key(app):
+    calls = []
+    template = app.jinja_env.from_string('{% cache "test", key %}{{ render(key) }}{% endcache %}')
+
+    def render(key):
+        calls.append(key)
+        return f'[{key}]'
+
+    assert template.render(key=1, render=render) == '[1]'
+    assert template.render(key=1, render=render) == '[1]'
+    assert template.render(key=2, render=render) == '[2]'
+    assert calls == [1, 2]
+    assert fragment_cache.stats()['size'] >= 2
+
+
+def _render(app, name, **context):
+    with app.app_context():
+        return app.jinja_env.get_template(f'components/{name}.html').render(**context)
+
+
+def test_work_card_is_cached_by_its_fields(app):
+    work = {'id': 9001, 'subject': 'Fizika', 'subject_color': '#00aa00', 'type': 'Tests', 'date': '2030-01-02',
+            'time': '09:00', 'description': 'Kartīte', 'days_left': 3}
+    first = _render(app, 'work_card', work=work, is_host=False)
+    hits = fragment_cache.stats()['hits']
+
+    assert _render(app, 'work_card', work=dict(work), is_host=False) == first
+    assert fragment_cache.stats()['hits'] == hits + 1
+
+    changed = _render(app, 'work_card', work=dict(work, description='Cits apraksts'), is_host=False)
+    assert 'Cits apraksts' in changed and 'Kartīte' not in changed
+    assert '/delete/9001' in _render(app, 'work_card', work=work, is_host=True)
+    assert '/delete/9001' not in first
+
+
+def test_subject_card_is_cached_by_its_fields(app):
+    subject = {'id': 9001, 'name': 'Ķīmija', 'color': '#aa0000', 'description': 'Vielas', 'work_count': 2}
+    first = _render(app, 'subject_card', subject=subject)
+
+    assert '2 darbi' in first
+    assert _render(app, 'subject_card', subject=dict(subject)) == first
+    assert '3 darbi' in _render(app, 'subject_card', subject=dict(subject, work_count=3))
+    assert '#0000aa' in _render(app, 'subject_card', subject=dict(subject, color='#0000aa'))
+
+
+def test_all_page_uses_each_subjects_colour(client, migrated_db):
+    from models.subjects import save_subject
+    from models.work import KIND_TEST, save_work_item
+    assert save_subject('Fizika', '#00aa00')
+    assert save_subject('Matemātika', '#aa0000')
+    for subject, date in [('Matemātika', '2030-01-01'), ('Matemātika', '2030-01-02'), ('Fizika', '2030-01-03')]:
+        assert save_work_item(KIND_TEST, subject, 'Tests', None, date, '', '')
+
+    page = client.get('/all').get_data(as_text=True)
+
+    badges = re.findall(r'work-subject-badge" style="background: ([^"]+)">\s*(\S+)', page)
+    assert badges == [('#aa0000', 'Matemātika'), ('#aa0000', 'Matemātika'), ('#00aa00', 'Fizika')]
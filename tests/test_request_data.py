@@ -0,0 +1,58 @@
+"""
+Тесты данных запроса g.data и счётчика обращений к БД (models/request_data.py)
+"""
+from flask import g
+from models.queries import request_round_trips
+from models.request_data import init_request_data
+from models.work import KIND_HOMEWORK, KIND_TEST, save_work_item
+
+
+def test_datasets_are_loaded_once_per_request(app, migrated_db):
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, '2030-01-02', '09:00', '')
+    assert save_work_item(KIND_HOMEWORK, 'Fizika', 'Mājasdarbs', 'Spēki', '2030-01-01', '', '')
+
+    with app.test_request_context('/'):
+        init_request_data()
+        tests = g.data.tests
+        after_first = request_round_trips()
+
+        assert g.data.tests is tests
+        assert [work['kind'] for work in g.data.all_work] == [KIND_TEST, KIND_HOMEWORK]
+        assert g.data.stats['total'] == 2
+        assert request_round_trips() == after_first + 1  # только homework
+        assert g.data.db_round_trips == request_round_trips()
+
+
+def test_round_trips_are_counted_per_request(app, migrated_db):
+    with app.test_request_context('/'):
+        init_request_data()
+        g.data.subjects
+        assert request_round_trips() == 1
+
+    with app.test_request_context('/'):
+        assert request_round_trips() == 0
+    assert request_round_trips() == 0
+
+
+def test_round_trips_header(client):
+    response = client.get('/')
+
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Round-Trips']) >= 0
+    # Второй запрос берёт справочники из кешей
+    assert int(client.get('/').headers['X-DB-Round-Trips']) <= int(response.headers['X-DB-Round-Trips'])
+
+
+def test_subject_page_reads_request_data(client, host_client, migrated_db):
+    from models.subjects import save_subject
+    assert save_subject('Fizika', '#00aa00', 'Spēki un kustība')
+    assert save_work_item(KIND_TEST, 'Fizika', 'Kontroldarbs', None, '2030-01-02', '09:00', 'Dinamika')
+    assert save_work_item(KIND_TEST, 'Ķīmija', 'Tests', None, '2030-01-03', '09:00', 'Skābes')
+
+    response = client.get('/subject/Fizika')
+
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert 'Dinamika' in page
+    assert 'Skābes' not in page
+    assert host_client.get('/admin/analytics').status_code == 200
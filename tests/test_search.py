@@ -0,0 +1,135 @@
+"""
+Тесты полнотекстового поиска (utils/text.py, models/search.py, services/search_service.py)
+"""
+import pytest
+from models.request_data import init_request_data
+from models.work import KIND_HOMEWORK, KIND_TEST, delete_work_item, save_work_item, update_work_item
+from utils.text import fold, highlight, search_terms, snippet
+
+
+def test_fold_keeps_length():
+    assert fold('Mājasdarbs ĶĪMIJĀ') == 'majasdarbs kimija'
+    assert len(fold('ﬁ Ē')) == len('ﬁ Ē')
+    assert fold(None) == ''
+
+
+def test_search_terms():
+    assert search_terms('  Mājas-darbs, mājas! ') == ['majas', 'darbs']
+    assert search_terms('...') == []
+
+
+def test_highlight_marks_prefixes_in_original_text():
+    assert highlight('Mājasdarbs <b>', ['majas']) == '<mark>Mājasdarbs</mark> &lt;b&gt;'
+    assert highlight('nemājas', ['majas']) == 'nemājas'
+
+
+def test_snippet_is_cut_around_first_match():
+    text = ' '.join(['vārds'] * 60) + ' Ķīmija ' + ' '.join(['cits'] * 60)
+
+    result = snippet(text, ['kimija'], length=60)
+
+    assert '<mark>Ķīmija</mark>' in result
+    assert result.startswith('… ') and result.endswith(' …')
+    assert len(str(result)) < 100
+
+
+def _search(app, query, limit=10, offset=0):
+    from services.search_service import search
+
+    with app.test_request_context('/'):
+        init_request_data()
+        return search(query, limit, offset)
+
+
+@pytest.fixture
+def work_db(migrated_db):
+    assert save_work_item(KIND_TEST, 'Ķīmija', 'Kontroldarbs', None, '2030-01-02', '09:00', 'Skābes un bāzes')
+    assert save_work_item(KIND_HOMEWORK, 'Fizika', 'Mājasdarbs', 'Spēki', '2030-01-01', '', 'Ņūtona likumi')
+    assert save_work_item(KIND_HOMEWORK, 'Matemātika', 'Mājasdarbs', 'Daļas', '2030-01-03', '', 'Ķīmija nav')
+    return migrated_db
+
+
+def test_diacritics_and_prefixes_match(app, work_db):
+    hits, next_cursor = _search(app, 'majasd')
+
+    assert sorted(hit['id'] for hit in hits) == [2, 3]
+    assert next_cursor is None
+    assert [hit['id'] for hit in _search(app, 'nutona')[0]] == [2]
+    assert [hit['id'] for hit in _search(app, 'fizika speki')[0]] == [2]
+    assert _search(app, 'fizika dalas')[0] == []
+
+
+def test_title_outranks_body(app, work_db):
+    hits, _ = _search(app, 'kimija')
+
+    assert [hit['id'] for hit in hits] == [1, 3]
+    assert hits[0]['subject'] == '<mark>Ķīmija</mark>'
+    assert '<mark>Ķīmija</mark>' in hits[1]['snippet']
+
+
+def test_index_follows_updates_and_deletes(app, work_db):
+    assert update_work_item(2, 'Fizika', 'Mājasdarbs', 'Enerģija', '2030-01-01', '', '')
+    assert _search(app, 'speki')[0] == []
+    assert [hit['id'] for hit in _search(app, 'energija')[0]] == [2]
+
+    assert delete_work_item(2)
+    assert _search(app, 'energija')[0] == []
+
+
+def test_pages_by_offset(app, work_db):
+    first, next_cursor = _search(app, 'majasdarbs', limit=1)
+    second, last_cursor = _search(app, 'majasdarbs', limit=1, offset=1)
+
+    assert next_cursor == '1'
+    assert last_cursor is None
+    assert {first[0]['id'], second[0]['id']} == {2, 3}
+
+
+def test_inactive_news_is_not_found(app, migrated_db):
+    from models.news import save_news
+
+    assert save_news('Ekskursija', '<p>Brauciens uz <b>Rīgu</b></p>', '2030-01-01', '', True)
+    assert save_news('Ekskursija 2', 'Slēpta', '2030-01-02', '', False)
+
+    hits, _ = _search(app, 'ekskursija')
+    assert [(hit['type'], hit['url']) for hit in hits] == [('news', '/news/1')]
+    assert [hit['id'] for hit in _search(app, 'rigu')[0]] == [1]
+
+
+def test_hidden_documents_do_not_shorten_pages(app, migrated_db):
+    from models.news import save_news
+
+    assert save_news('Ekskursija', 'Rīga', '2030-01-01', '', True)
+    assert save_news('Ekskursija', 'Slēpta', '2030-01-02', '', False)
+    assert save_news('Ekskursija', 'Cēsis', '2030-01-03', '', True)
+    assert save_news('Ekskursija', 'Slēpta', '2030-01-04', '', False)
+
+    hits, next_cursor = _search(app, 'ekskursija', limit=2)
+    assert sorted(hit['id'] for hit in hits) == [1, 3]
+    assert next_cursor is None
+
+    first, next_cursor = _search(app, 'ekskursija', limit=1)
+    assert len(first) == 1 and next_cursor is not None
+    second, last_cursor = _search(app, 'ekskursija', limit=1, offset=int(next_cursor))
+    assert {first[0]['id'], second[0]['id']} == {1, 3}
+    assert last_cursor is None
+
+
+def test_work_hit_links_to_subject_page(app, client, work_db):
+    from models.subjects import save_subject
+    assert save_subject('Fizika', '#00aa00')
+
+    hits, _ = _search(app, 'speki')
+
+    assert hits[0]['url'] == '/subject/Fizika#work-2'
+    assert _search(app, 'skabes')[0][0]['url'] == '/subject/%C4%B6%C4%ABmija#work-1'
+    assert 'id="work-2"' in client.get('/subject/Fizika').get_data(as_text=True)
+
+
+def test_api_search(client):
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=x&after=bad').status_code == 400
+
+    data = client.get('/api/search?q=nekas').get_json()
+    assert data['success'] and data['results'] == [] and data['next_cursor'] is None
+    assert client.get('/search?q=nekas').status_code == 200
@@ -0,0 +1,134 @@
+"""
+Тесты хранилища загрузок (utils/storage.py) и редиректа /uploads/<ключ>
+"""
+import io
+from urllib.parse import urlparse
+import pytest
+from utils import storage
+from utils.storage import IMMUTABLE_CACHE_CONTROL, LocalStorage, key_from_url
+
+
+@pytest.fixture
+def local(tmp_path, monkeypatch):
+    backend = LocalStorage(str(tmp_path / 'uploads'), '/static/uploads/')
+    monkeypatch.setattr(storage, '_storage', backend)
+    return backend
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    moto = pytest.importorskip('moto')
+    if storage.boto3 is None:
+        pytest.skip('boto3 is not installed')
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        monkeypatch.setenv(name, 'test')
+    with moto.mock_aws():
+        backend = storage.S3Storage('uploads', region='us-east-1')
+        backend.client.create_bucket(Bucket='uploads')
+        monkeypatch.setattr(storage, '_storage', backend)
+        yield backend
+
+
+def test_local_round_trip(local, tmp_path):
+    local.save('ab/abc-320.webp', io.BytesIO(b'webp'))
+    local.save('ab/abc.jpg', io.BytesIO(b'jpeg'))
+
+    assert local.exists('ab/abc.jpg')
+    assert (tmp_path / 'uploads' / 'ab' / 'abc.jpg').read_bytes() == b'jpeg'
+    assert sorted((key, size) for key, _, size in local.list()) == [('ab/abc-320.webp', 4), ('ab/abc.jpg', 4)]
+    assert local.url('ab/abc.jpg') == local.direct_url('ab/abc.jpg') == '/static/uploads/ab/abc.jpg'
+
+    local.delete('ab/abc.jpg')
+    local.delete('ab/abc.jpg')
+    assert not local.exists('ab/abc.jpg')
+    local.delete('ab/abc-320.webp')
+    # Пустой шард удаляется вместе с последним файлом
+    assert not (tmp_path / 'uploads' / 'ab').exists()
+
+
+@pytest.mark.parametrize('key', ['../secret', 'ab/../../secret', '/etc/passwd'])
+def test_local_rejects_keys_outside_root(local, key):
+    with pytest.raises(ValueError):
+        local.save(key, io.BytesIO(b'x'))
+
+
+def test_s3_round_trip(s3):
+    s3.save('ab/abc.jpg', io.BytesIO(b'jpeg'), 'image/jpeg')
+
+    assert s3.exists('ab/abc.jpg')
+    assert not s3.exists('ab/missing.jpg')
+    head = s3.client.head_object(Bucket='uploads', Key='ab/abc.jpg')
+    assert head['CacheControl'] == IMMUTABLE_CACHE_CONTROL
+    assert head['ContentType'] == 'image/jpeg'
+    assert [(key, size) for key, _, size in s3.list()] == [('ab/abc.jpg', 4)]
+
+    s3.touch('ab/abc.jpg')
+    assert s3.client.head_object(Bucket='uploads', Key='ab/abc.jpg')['ContentType'] == 'image/jpeg'
+
+    s3.delete('ab/abc.jpg')
+    assert list(s3.list()) == []
+
+
+def test_s3_urls(s3):
+    assert s3.url('ab/abc.jpg') == '/uploads/ab/abc.jpg'
+    signed = urlparse(s3.direct_url('ab/abc.jpg'))
+    assert signed.path.endswith('/ab/abc.jpg')
+    assert 'Signature' in signed.query or 'X-Amz-Signature' in signed.query
+
+    s3.public_url = 'https://cdn.example'
+    assert s3.url('ab/abc.jpg') == s3.direct_url('ab/abc.jpg') == 'https://cdn.example/ab/abc.jpg'
+    assert key_from_url('https://cdn.example/ab/abc.jpg') == 'ab/abc.jpg'
+
+
+@pytest.mark.parametrize('url, key', [
+    ('/static/uploads/ab/abc.jpg', 'ab/abc.jpg'),
+    ('/uploads/ab/abc-640.webp', 'ab/abc-640.webp'),
+    ('https://example.com/ab/abc.jpg', None),
+    ('', None),
+])
+def test_key_from_url(local, url, key):
+    assert key_from_url(url) == key
+
+
+def test_upload_route_redirects_to_presigned_url(client, s3):
+    key = f'ab/ab{"0" * 30}-640.webp'
+    s3.save(key, io.BytesIO(b'webp'))
+
+    response = client.get(f'/uploads/{key}')
+
+    assert response.status_code == 302
+    assert urlparse(response.headers['Location']).path.endswith(f'/{key}')
+    assert response.cache_control.private
+
+
+@pytest.mark.parametrize('key', [
+    'ab/abc.jpg',                           # не хеш содержимого
+    f'cd/ab{"0" * 30}.jpg',                 # шард не совпадает с хешем
+    f'ab/ab{"0" * 30}.html',                # не изображение
+    f'ab/ab{"0" * 30}-0.jpg',
+    'backups/school.db',
+])
+def test_upload_route_rejects_other_keys(client, s3, key):
+    s3.save(key, io.BytesIO(b'x'))
+
+    assert client.get(f'/uploads/{key}').status_code == 404
+
+
+@pytest.mark.parametrize('key', [f'ab/ab{"0" * 30}.jpg', f'ab/ab{"0" * 30}.orig.png', f'ab/ab{"0" * 30}-320.webp'])
+def test_is_upload_key(key):
+    from services.image_service import is_upload_key
+
+    assert is_upload_key(key)
+
+
+def test_collect_garbage_in_s3(s3, migrated_db, tmp_path, monkeypatch):
+    from models.news import save_news
+    from services import image_service
+
+    monkeypatch.setattr(image_service, 'UPLOAD_INCOMING_FOLDER', str(tmp_path / 'incoming'))
+    for key in ('aa/aa11.jpg', 'aa/aa11-320.webp', 'bb/bb22.jpg', 'bb/bb22-320.webp'):
+        s3.save(key, io.BytesIO(b'x'))
+    assert save_news('Ziņa', 'saturs', '2030-01-01', s3.url('aa/aa11.jpg'), True)
+
+    assert image_service.collect_garbage(grace_period=-1) == (2, 2)
+    assert sorted(key for key, _, _ in s3.list()) == ['aa/aa11-320.webp', 'aa/aa11.jpg']
@@ -0,0 +1,113 @@
+"""
+Тесты индекса подсказок (utils/suggest.py) и /api/suggest
+"""
+import pytest
+from utils.suggest import EXACT_SCORE, SuggestIndex, trigrams
+
+
+def _entries(*labels):
+    return {label.lower(): (label, {'label': label}) for label in labels}
+
+
+def _labels(index, query, limit=8):
+    return [data['label'] for data, _ in index.lookup(query, limit)]
+
+
+@pytest.fixture
+def index():
+    index = SuggestIndex()
+    index.replace('subjects', _entries('Matemātika', 'Fizika', 'Ķīmija', 'Latviešu valoda'))
+    index.replace('types', _entries('Kontroldarbs', 'Mājasdarbs', 'Laboratorijas darbs'))
+    return index
+
+
+def test_trigrams_are_padded():
+    assert trigrams('abc') == {'  a', ' ab', 'abc', 'bc '}
+
+
+def test_prefix_match(index):
+    assert _labels(index, 'mat') == ['Matemātika']
+    assert _labels(index, 'kontr') == ['Kontroldarbs']
+
+
+def test_exact_word_ranks_above_prefix(index):
+    index.replace('titles', _entries('Fizikas projekts'))
+
+    results = index.lookup('fizika', 8)
+
+    assert [data['label'] for data, _ in results] == ['Fizika', 'Fizikas projekts']
+    assert results[0][1] == EXACT_SCORE
+    assert results[1][1] < EXACT_SCORE
+
+
+def test_diacritics_are_folded(index):
+    assert _labels(index, 'kimija') == ['Ķīmija']
+    assert _labels(index, 'MATEMĀTIKA') == ['Matemātika']
+    assert _labels(index, 'majas') == ['Mājasdarbs']
+
+
+@pytest.mark.parametrize('query, label', [
+    ('matmatika', 'Matemātika'),
+    ('matemtika', 'Matemātika'),
+    ('fizka', 'Fizika'),
+    ('kontroldrbs', 'Kontroldarbs'),
+    ('latviesu valda', 'Latviešu valoda'),
+])
+def test_fuzzy_match_survives_typos(index, query, label):
+    results = index.lookup(query, 8)
+
+    assert results[0][0]['label'] == label
+    assert results[0][1] < EXACT_SCORE
+
+
+def test_short_terms_match_prefixes_only(index):
+    # Две буквы дали бы нечёткие совпадения почти со всем
+    assert _labels(index, 'fz') == []
+    assert _labels(index, 'xyzzy') == []
+
+
+def test_every_query_word_must_match(index):
+    assert _labels(index, 'lab darb') == ['Laboratorijas darbs']
+    assert _labels(index, 'darb') == ['Laboratorijas darbs']
+    assert _labels(index, 'lab fizika') == []
+
+
+def test_equal_scores_prefer_shorter_text():
+    index = SuggestIndex()
+    index.replace('titles', _entries('Eseja par dabu', 'Eseja'))
+
+    assert _labels(index, 'ese') == ['Eseja', 'Eseja par dabu']
+
+
+def test_limit(index):
+    assert len(index.lookup('a', 2)) <= 2
+    assert index.lookup('', 8) == []
+
+
+def test_replace_changes_only_differing_entries(index):
+    assert index.replace('subjects', _entries('Matemātika', 'Fizika', 'Ķīmija', 'Latviešu valoda')) == 0
+    assert index.replace('subjects', _entries('Matemātika', 'Fizika', 'Bioloģija')) == 3
+
+    assert _labels(index, 'biol') == ['Bioloģija']
+    assert _labels(index, 'kimija') == []
+    assert _labels(index, 'latv') == []
+    # Слова удалённых записей ушли и из нечёткого поиска
+    assert _labels(index, 'kimja') == []
+
+
+def test_same_key_from_several_sources_is_one_suggestion(index):
+    index.replace('homework', _entries('Kontroldarbs'))
+
+    assert _labels(index, 'kontroldarbs') == ['Kontroldarbs']
+
+
+def test_api_suggest_follows_writes(client, host_client):
+    response = host_client.post('/admin/add_subject', data={'subject_name': 'Ģeogrāfija', 'color': '#00aa00'})
+    assert response.status_code in (200, 302)
+
+    data = client.get('/api/suggest', query_string={'q': 'geografja'}).get_json()
+    assert data['success']
+    suggestion = data['suggestions'][0]
+    assert suggestion['label'] == 'Ģeogrāfija'
+    assert suggestion['category'] == 'subject'
+    assert suggestion['url'] == '/subject/%C4%A2eogr%C4%81fija'
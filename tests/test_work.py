@@ -0,0 +1,76 @@
+"""
+Тесты единой таблицы работ (models/work.py)
+"""
+import pytest
+from models.work import (
+    KIND_HOMEWORK, KIND_TEST, delete_work_item, get_work_item, load_work, save_work_item, update_work_item
+)
+
+
+@pytest.fixture
+def work_db(migrated_db):
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, '2030-01-02', '09:00', '')
+    assert save_work_item(KIND_HOMEWORK, 'Fizika', 'Mājasdarbs', 'Spēki', '2030-01-01', '', 'lpp. 5')
+    assert save_work_item(KIND_TEST, 'Fizika', 'Kontroldarbs', None, '2030-01-01', '10:00', '')
+    return migrated_db
+
+
+def test_ids_are_global_across_kinds(work_db):
+    assert [work['id'] for work in load_work(KIND_TEST)] == [3, 1]
+    assert [work['id'] for work in load_work(KIND_HOMEWORK)] == [2]
+
+
+def test_get_work_item(work_db):
+    work = get_work_item(2)
+
+    assert (work['kind'], work['title'], work['time']) == (KIND_HOMEWORK, 'Spēki', '23:59')
+    assert 'days_left' in work
+    assert get_work_item(99) is None
+
+
+def test_update_and_delete_by_id(work_db):
+    assert update_work_item(2, 'Fizika', 'Mājasdarbs', 'Spēki 2', '2030-01-03', '08:00', '')
+    assert get_work_item(2)['title'] == 'Spēki 2'
+    assert get_work_item(2)['date'] == '2030-01-03'
+    assert not update_work_item(99, 'Fizika', 'Mājasdarbs', 'X', '2030-01-03', '', '')
+
+    assert delete_work_item(1)
+    assert not delete_work_item(1)
+    assert [work['id'] for work in load_work(KIND_TEST)] == [3]
+
+
+def test_legacy_loaders_filter_by_kind(work_db):
+    from models.homework import get_homework_by_id, load_homework
+    from models.tests import get_test_by_id, load_tests
+
+    assert [test['id'] for test in load_tests()] == [3, 1]
+    assert [homework['id'] for homework in load_homework()] == [2]
+    assert get_test_by_id(2) is None
+    assert get_homework_by_id(2)['title'] == 'Spēki'
+
+    delete_work_item(3)
+    assert [test['id'] for test in load_tests()] == [1]
+
+
+def test_0005_merges_tables_with_global_ids(migrate_to):
+    from models.migrations import run_migrations
+
+    cursor = migrate_to(4)
+    cursor.executemany("INSERT INTO tests (subject, type, date, time) VALUES ('Matemātika', 'Tests', ?, '10:00')",
+                       [('2030-01-01',), ('2030-01-02',)])
+    cursor.executemany("INSERT INTO homework (subject, title, date) VALUES ('Fizika', ?, '2030-01-03')",
+                       [('Darbs 1',), ('Darbs 2',)])
+    cursor.executemany("INSERT INTO sent_notifications (user_email, work_id, work_type, notification_type) "
+                       "VALUES ('a@example.com', ?, ?, 'reminder')", [(2, 'test'), (1, 'homework')])
+    cursor.connection.commit()
+
+    run_migrations(report=False)
+
+    cursor.execute('SELECT id, kind, title FROM work ORDER BY id')
+    assert [tuple(row) for row in cursor.fetchall()] == [
+        (1, 'test', None), (2, 'test', None), (3, 'homework', 'Darbs 1'), (4, 'homework', 'Darbs 2')]
+    cursor.execute('SELECT work_id, work_type FROM sent_notifications ORDER BY work_id')
+    assert [tuple(row) for row in cursor.fetchall()] == [(2, 'test'), (3, 'homework')]
+
+    assert save_work_item(KIND_TEST, 'Matemātika', 'Tests', None, '2030-01-04', '', '')
+    assert [work['id'] for work in load_work(KIND_TEST)][-1] == 5
@@ -2,7 +2,7 @@
 Утилиты - инициализация модуля
 """
 from .auth import is_host, login_required, admin_only
-from .cache import cache, SimpleCache
+from .cache import cache, cached, cache_stats, LRUCache, SnapshotCache
 from .date_utils import calculate_days_left, get_work_status, format_date, format_time
 from .template_helpers import inject_common_variables
 
@@ -11,7 +11,10 @@ __all__ = [
     'login_required',
     'admin_only',
     'cache',
-    'SimpleCache',
+    'cached',
+    'cache_stats',
+    'LRUCache',
+    'SnapshotCache',
     'calculate_days_left',
     'get_work_status',
     'format_date',
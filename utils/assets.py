@@ -0,0 +1,177 @@
+"""
+Сборка статики: бандлы CSS/JS с хешем содержимого в имени
+
+Исходники из static/css и static/js склеиваются в несколько бандлов,
+минифицируются и пишутся в static/dist/<имя>.<хеш>.<ext>. Шаблоны берут
+адрес через asset_url():
+
+    <link rel="stylesheet" href="{{ asset_url('main.css') }}">
+
+Имя файла меняется вместе с содержимым, поэтому бандлы отдаются с
+Cache-Control: immutable на год. Сборка выполняется при старте (пишутся
+только отсутствующие файлы) или на этапе сборки: ``python -m utils.assets``.
+"""
+import hashlib
+import os
+import re
+from flask import request, url_for
+
+
+DIST_DIR = 'dist'
+
+# Бандл -> исходники (пути относительно static/) в порядке подключения.
+# Общие бандлы подключает layouts/base.html, страничные — блоки styles/scripts
+BUNDLES = {
+    'main.css': ['css/base.css', 'css/components.css'],
+    # После стилей страниц — как раньше шли <style> навигации и подвала
+    'layout.css': ['css/layout/navigation.css', 'css/layout/footer.css'],
+    'main.js': ['js/layout/navigation.js', 'js/utils.js'],
+    'admin.css': ['css/layout/admin.css'],
+    'admin.js': ['js/layout/admin.js'],
+
+    'index.css': ['css/pages/index.css'],
+    'all.css': ['css/pages/all.css'],
+    'all.js': ['js/pages/all.js'],
+    'homework.css': ['css/pages/homework.css'],
+    'homework.js': ['js/pages/homework.js'],
+    'subject.css': ['css/pages/subject.css'],
+    'subject.js': ['js/pages/subject.js'],
+    'timer.css': ['css/pages/timer.css'],
+    'timer.js': ['js/timer.js'],
+    'search.css': ['css/pages/search.css'],
+    'search.js': ['js/pages/search.js'],
+    'calendar.css': ['css/pages/calendar.css'],
+    'calendar.js': ['js/calendar.js'],
+
+    # Собираются из вывода utils.fonts; без него шаблоны берут шрифты с CDN
+    'fonts.css': ['fonts/fonts.css', 'fonts/icons.css'],
+}
+
+# Бандлы, исходники которых могут отсутствовать (генерируются отдельным шагом)
+OPTIONAL_BUNDLES = {'fonts.css'}
+
+# Каталоги static/ с хешем в имени файлов: бандлы, woff2 из utils.fonts
+# (fonts.css/icons.css оттуда отдаются только в составе бандла) и загрузки
+# (имя — хеш содержимого, см. services.image_service)
+IMMUTABLE_DIRS = (DIST_DIR, 'fonts', 'uploads')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_manifest = {}  # бандл -> путь в static/
+
+
+def minify_css(source):
+    """Удаляет комментарии и лишние пробелы"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """
+    Консервативная минификация: отступы, пустые строки, строчные комментарии
+
+    Строки внутри многострочных шаблонных литералов не трогаются.
+    """
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        # Нечётное число ` — литерал открыт или закрыт на этой строке
+        if (line.count('`') - line.count('\\`')) % 2:
+            in_template = not in_template
+    return '\n'.join(lines)
+
+
+def build_bundle(static_folder, name):
+    """Склеивает и минифицирует исходники бандла, возвращает (имя файла, байты)"""
+    parts = []
+    for path in BUNDLES[name]:
+        with open(os.path.join(static_folder, path), encoding='utf-8') as source:
+            parts.append(source.read())
+
+    stem, ext = os.path.splitext(name)
+    if ext == '.css':
+        content = '\n'.join(minify_css(part) for part in parts)
+    else:
+        # ; между файлами — на случай исходника без завершающей точки с запятой
+        content = '\n;\n'.join(minify_js(part) for part in parts)
+
+    data = content.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return f'{stem}.{digest}{ext}', data
+
+
+def build_assets(static_folder):
+    """
+    Собирает все бандлы в static/dist
+
+    Returns:
+        dict: Бандл -> путь относительно static/
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+
+    manifest = {}
+    for name in BUNDLES:
+        if name in OPTIONAL_BUNDLES and not all(
+                os.path.exists(os.path.join(static_folder, path)) for path in BUNDLES[name]):
+            continue
+        filename, data = build_bundle(static_folder, name)
+        target = os.path.join(dist, filename)
+        if not os.path.exists(target):
+            with open(target + '.tmp', 'wb') as out:
+                out.write(data)
+            os.replace(target + '.tmp', target)
+        manifest[name] = f'{DIST_DIR}/{filename}'
+    return manifest
+
+
+def asset_url(name):
+    """URL бандла с хешем содержимого"""
+    return url_for('static', filename=_manifest[name])
+
+
+def has_asset(name):
+    """Собран ли бандл (для необязательных бандлов)"""
+    return name in _manifest
+
+
+def assets_fingerprint():
+    """Отпечаток текущих бандлов (меняется вместе с любым из них)"""
+    return ','.join(sorted(_manifest.values()))
+
+
+def add_immutable_headers(response):
+    """Файлы с хешем в имени кешируются навсегда (after_request)"""
+    filename = (request.view_args or {}).get('filename', '')
+    if (request.endpoint == 'static' and filename.split('/', 1)[0] in IMMUTABLE_DIRS
+            and '/' in filename and response.status_code == 200):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Собирает бандлы и подключает asset_url() к шаблонам"""
+    _manifest.update(build_assets(app.static_folder))
+    print(f"✅ Built {len(_manifest)} asset bundles")
+
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.jinja_env.globals['has_asset'] = has_asset
+    app.after_request(add_immutable_headers)
+
+
+if __name__ == '__main__':
+    folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+    for bundle, path in build_assets(folder).items():
+        print(f"✅ {bundle} -> {path}")
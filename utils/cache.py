@@ -1,42 +1,477 @@
 """
 Утилиты для кеширования данных
+
+- LRUCache / @cached — ограниченный потокобезопасный кеш с TTL, single-flight
+  загрузкой и stale-while-revalidate (справочные данные: предметы, новости...)
+- SnapshotCache — неизменяемые снимки списков работ с полями, вычисляемыми
+  при чтении (см. models.work)
+- DeadlineIndex — строки, упорядоченные по дедлайну, для запросов
+  "ближайшие N" и "в ближайшие K дней" за O(log n)
 """
-from datetime import datetime, timedelta
-
-
-class SimpleCache:
-    """Простой кэш с временными метками"""
-    
-    def __init__(self, duration=30):
-        self._cache = {}
-        self._timestamps = {}
-        self.duration = duration  # seconds
-    
-    def get(self, key):
-        """Получить значение из кэша"""
-        if key in self._cache:
-            if datetime.now() - self._timestamps[key] < timedelta(seconds=self.duration):
-                return self._cache[key]
-        return None
-    
-    def set(self, key, value):
-        """Сохранить значение в кэш"""
-        self._cache[key] = value
-        self._timestamps[key] = datetime.now()
-    
+import copy
+import functools
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+from config.settings import CACHE_DURATION, CACHE_STALE_DURATION, CACHE_MAX_ENTRIES
+
+
+_caches = {}
+
+
+def _register(name, cache):
+    _caches[name] = cache
+
+
+def cache_stats():
+    """Статистика всех именованных кешей ({имя: счётчики})"""
+    return {name: cache.stats() for name, cache in list(_caches.items())}
+
+
+class _Flight:
+    """Загрузка ключа, которую ждут все параллельные промахи"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class LRUCache:
+    """
+    Потокобезопасный кеш с ограничением размера, TTL и single-flight
+
+    - не больше max_entries ключей, вытесняется давно не использованный
+    - у каждого ключа свой срок жизни (ttl по умолчанию или переданный в set)
+    - параллельные промахи по одному ключу ждут одну загрузку, а не идут в БД
+    - после истечения ttl ещё stale_ttl секунд отдаётся старое значение,
+      а обновление выполняется в фоновом потоке (stale-while-revalidate)
+    """
+
+    def __init__(self, name=None, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_DURATION, stale_ttl=0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._entries = OrderedDict()  # key -> (value, expires_at, stale_until)
+        self._flights = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0, 'misses': 0, 'stale_hits': 0, 'loads': 0, 'load_errors': 0,
+            'refreshes': 0, 'evictions': 0, 'expired': 0,
+        }
+
+        if name:
+            _register(name, self)
+
+    def _store(self, key, value, ttl):
+        """Сохраняет значение и вытесняет лишнее (вызывать под блокировкой)"""
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = (value, now + ttl, now + ttl + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key, default=None):
+        """Свежее значение из кеша или default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() < entry[1]:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[0]
+            self._stats['misses'] += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Сохраняет значение (ttl в секундах, по умолчанию self.ttl)"""
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Значение из кеша, а при промахе — результат loader()
+
+        Ошибка загрузки не кешируется и пробрасывается всем ожидающим.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                value, expires_at, stale_until = entry
+                now = time.monotonic()
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                if now < stale_until:
+                    self._entries.move_to_end(key)
+                    self._stats['stale_hits'] += 1
+                    if key not in self._flights:
+                        flight = self._flights[key] = _Flight()
+                        self._stats['refreshes'] += 1
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, loader, ttl, flight, self._generation),
+                            daemon=True
+                        ).start()
+                    return value
+                del self._entries[key]
+                self._stats['expired'] += 1
+
+            self._stats['misses'] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            generation = self._generation
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        return self._load(key, loader, ttl, flight, generation)
+
+    def _load(self, key, loader, ttl, flight, generation):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._stats['load_errors'] += 1
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.error = e
+            flight.event.set()
+            raise
+
+        with self._lock:
+            self._stats['loads'] += 1
+            # Если во время загрузки кеш сбросили, значение может быть устаревшим
+            if generation == self._generation:
+                self._store(key, value, ttl)
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def _refresh(self, key, loader, ttl, flight, generation):
+        """Фоновое обновление устаревшего значения"""
+        try:
+            self._load(key, loader, ttl, flight, generation)
+        except Exception as e:
+            print(f"❌ Cache refresh error ({self.name}): {e}")
+
     def clear(self, key=None):
-        """Очистить кэш"""
-        if key:
-            self._cache.pop(key, None)
-            self._timestamps.pop(key, None)
-        else:
-            self._cache.clear()
-            self._timestamps.clear()
-    
+        """Очистить кэш (один ключ или весь)"""
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+                self._flights.pop(key, None)
+            else:
+                self._entries.clear()
+                self._flights.clear()
+            # Загрузки, начатые до сброса, не сохранят результат, а новые
+            # промахи не будут ждать их
+            self._generation += 1
+
     def clear_all(self):
         """Полная очистка кэша"""
         self.clear()
 
+    def stats(self):
+        """Счётчики попаданий/промахов/вытеснений"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), max_entries=self.max_entries)
+
+
+def cached(ttl=CACHE_DURATION, stale_ttl=CACHE_STALE_DURATION, max_entries=CACHE_MAX_ENTRIES, name=None):
+    """
+    Декоратор: кеширует результат функции по её аргументам в LRUCache
+
+    Вызывающий получает глубокую копию, так что сортировка или изменение
+    результата не портят кеш. Сброс — func.cache_clear(), как у lru_cache.
+
+    Example:
+        @cached(ttl=60)
+        def fetch_subjects():
+            ...
+    """
+    def decorator(func):
+        cache = LRUCache(
+            name=name or f'{func.__module__}.{func.__name__}',
+            max_entries=max_entries,
+            ttl=ttl,
+            stale_ttl=stale_ttl
+        )
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            value = cache.get_or_load(key, lambda: func(*args, **kwargs))
+            return copy.deepcopy(value)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+class SnapshotCache:
+    """
+    Кеш неизменяемых снимков строк из БД
+
+    Хранит результат loader() как кортеж read-only словарей. Каждый get()
+    отдаёт новые копии строк, поэтому вызывающий код может сортировать и
+    изменять список, не портя кеш. Поля, зависящие от текущего времени
+    (days_left), добавляются функцией decorate при чтении, а не при загрузке.
+
+    invalidate() вызывается после записи в БД; ttl ограничивает устаревание
+    данных, изменённых другим процессом.
+    """
+
+    def __init__(self, name, loader, ttl=CACHE_DURATION, decorate=None):
+        self.name = name
+        self._loader = loader
+        self._decorate = decorate
+        self.ttl = ttl
+
+        self._rows = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'invalidations': 0}
+
+        _register(name, self)
+
+    def _snapshot(self):
+        """Актуальный снимок строк (загружает при необходимости)"""
+        with self._lock:
+            rows = self._rows
+            if rows is not None and time.monotonic() - self._loaded_at < self.ttl:
+                self._stats['hits'] += 1
+                return rows
+            self._stats['misses' if rows is None else 'refreshes'] += 1
+            generation = self._generation
+
+        rows = tuple(MappingProxyType(dict(row)) for row in self._loader())
+
+        with self._lock:
+            # Если во время загрузки была запись, снимок может быть устаревшим
+            if generation == self._generation:
+                self._rows = rows
+                self._loaded_at = time.monotonic()
+        return rows
+
+    def get(self):
+        """Список копий строк с вычисленными при чтении полями"""
+        rows = self._snapshot()
+        now = datetime.now()
+        result = [dict(row) for row in rows]
+        if self._decorate:
+            for row in result:
+                self._decorate(row, now)
+        return result
+
+    def invalidate(self):
+        """Сбрасывает снимок (после записи в БД)"""
+        with self._lock:
+            self._rows = None
+            self._generation += 1
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """Счётчики попаданий/промахов/обновлений"""
+        with self._lock:
+            return dict(self._stats, cached_rows=len(self._rows) if self._rows is not None else 0)
+
+
+class DeadlineIndex:
+    """
+    Строки с дедлайном в памяти процесса, отсортированные по дедлайну
+
+    loader(since) возвращает строки с дедлайном не раньше since, уже
+    упорядоченные по (дедлайн, id) (ORDER BY по индексу БД), поэтому
+    сборка — O(n) без сортировки. upcoming() и between() находят границы
+    бинарным поиском и копируют только возвращаемые строки.
+
+    Записи своего процесса применяются построчно: put() вставляет или
+    переставляет строку (insort), discard() убирает её по id. invalidate()
+    сбрасывает индекс целиком — для изменений других процессов, о которых
+    известен только набор данных.
+
+    Холодный индекс (ещё не загружен или сброшен) запросы не обслуживает:
+    они возвращают None, вызывающий идёт в БД запросом с LIMIT, а загрузка
+    запускается в фоне — одна на все потоки. Прошедшие дедлайны отрезаются,
+    когда since сдвигается (новый день): начало окна просто сдвигается, а
+    список ужимается, когда отрезанная часть больше половины.
+    """
+
+    def __init__(self, name, loader, key, ident=lambda row: row['id'], decorate=None):
+        self.name = name
+        self._loader = loader
+        self._key = key
+        self._ident = ident
+        self._decorate = decorate
+
+        self._keys = None       # отсортированные (дедлайн, id)
+        self._rows = None       # строки в том же порядке
+        self._by_id = None      # id -> ключ строки в индексе
+        self._start = 0         # начало окна (строки раньше since отрезаны)
+        self._since = None
+        self._generation = 0
+        self._loading = False
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'cold': 0, 'loads': 0, 'load_errors': 0, 'invalidations': 0, 'pruned': 0,
+                       'applied': 0}
+
+        _register(name, self)
+
+    def _sort_key(self, row):
+        return (self._key(row), self._ident(row))
+
+    def _load(self, since, generation):
+        try:
+            rows = [MappingProxyType(dict(row)) for row in self._loader(since)]
+        except Exception as e:
+            print(f"❌ Deadline index load error ({self.name}): {e}")
+            with self._lock:
+                self._stats['load_errors'] += 1
+                self._loading = False
+            return
+
+        keys = [self._sort_key(row) for row in rows]
+        with self._lock:
+            self._loading = False
+            # Если во время загрузки была запись, индекс может быть устаревшим
+            if generation == self._generation:
+                self._rows = rows
+                self._keys = keys
+                self._by_id = {key[1]: key for key in keys}
+                self._start = 0
+                self._since = since
+                self._stats['loads'] += 1
+
+    def _window(self, since):
+        """Начало окна строк с дедлайном от since (вызывать под блокировкой); None — холодный"""
+        if self._keys is None or since < self._since:
+            self._stats['cold'] += 1
+            if not self._loading:
+                self._loading = True
+                threading.Thread(target=self._load, args=(since, self._generation), daemon=True).start()
+            return None
+
+        if since > self._since:
+            cut = bisect_left(self._keys, (since,), self._start)
+            for key in self._keys[self._start:cut]:
+                del self._by_id[key[1]]
+            self._stats['pruned'] += cut - self._start
+            self._start = cut
+            self._since = since
+            if self._start * 2 > len(self._keys):
+                del self._keys[:self._start]
+                del self._rows[:self._start]
+                self._start = 0
+
+        self._stats['hits'] += 1
+        return self._start
+
+    def _result(self, rows, total):
+        now = datetime.now()
+        result = [dict(row) for row in rows]
+        if self._decorate:
+            for row in result:
+                self._decorate(row, now)
+        return result, total
+
+    def upcoming(self, since, limit):
+        """
+        Первые limit строк с дедлайном не раньше since
+
+        Returns:
+            tuple: (копии строк, сколько всего таких строк) или None — индекс холодный
+        """
+        with self._lock:
+            start = self._window(since)
+            if start is None:
+                return None
+            rows = self._rows[start:start + limit]
+            total = len(self._keys) - start
+        return self._result(rows, total)
+
+    def between(self, since, until, limit):
+        """Как upcoming(), но только дедлайны раньше until"""
+        with self._lock:
+            start = self._window(since)
+            if start is None:
+                return None
+            end = bisect_left(self._keys, (until,), start)
+            rows = self._rows[start:min(end, start + limit)]
+        return self._result(rows, end - start)
+
+    def _remove(self, row_id):
+        """Убирает строку из прогретого индекса (под блокировкой)"""
+        key = self._by_id.pop(row_id, None)
+        if key is not None:
+            position = bisect_left(self._keys, key, self._start)
+            del self._keys[position]
+            del self._rows[position]
+
+    def _cold_write(self):
+        """Запись при холодном индексе или во время загрузки (под блокировкой); True — применять нечего"""
+        if self._loading:
+            # Загрузка могла прочитать строки до записи — её результат отбрасывается
+            self._generation += 1
+        return self._keys is None
+
+    def put(self, row):
+        """Добавляет или обновляет строку после записи в БД этим процессом"""
+        row = MappingProxyType(dict(row))
+        with self._lock:
+            if self._cold_write():
+                return
+            self._remove(self._ident(row))
+            deadline = self._key(row)
+            if deadline is not None and deadline >= self._since:
+                key = self._sort_key(row)
+                position = bisect_left(self._keys, key, self._start)
+                self._keys.insert(position, key)
+                self._rows.insert(position, row)
+                self._by_id[key[1]] = key
+            self._stats['applied'] += 1
+
+    def discard(self, row_id):
+        """Убирает строку, удалённую из БД этим процессом"""
+        with self._lock:
+            if self._cold_write():
+                return
+            self._remove(row_id)
+            self._stats['applied'] += 1
+
+    def invalidate(self):
+        """Сбрасывает индекс (изменения других процессов)"""
+        with self._lock:
+            self._keys = None
+            self._rows = None
+            self._by_id = None
+            self._generation += 1
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """Счётчики обращений к индексу и к БД при холодном индексе"""
+        with self._lock:
+            size = len(self._keys) - self._start if self._keys is not None else 0
+            return dict(self._stats, indexed_rows=size)
+
 
 # Глобальный экземпляр кэша
-cache = SimpleCache(duration=30)
\ No newline at end of file
+cache = LRUCache(name='default')
@@ -0,0 +1,181 @@
+"""
+Сжатие ответов (gzip / brotli)
+
+- Динамические ответы (HTML, JSON) больше COMPRESS_MIN_SIZE сжимаются
+  в after_request кодировкой, которую клиент предпочитает в Accept-Encoding.
+- Потоковые ответы (экспорт) сжимаются по частям: compress_stream().
+- Статические CSS/JS/SVG сжимаются один раз (при старте или на сборке:
+  ``python -m utils.compression``) в соседние файлы .gz/.br, а static-view
+  отдаёт подходящий вариант через send_file (sendfile на gunicorn).
+
+Brotli — необязательная зависимость: без пакета brotli используется только gzip.
+"""
+import gzip
+import mimetypes
+import os
+import zlib
+from flask import current_app, request, send_from_directory
+from werkzeug.exceptions import NotFound
+from config.settings import (
+    COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/calendar', 'text/csv',
+    'application/json', 'application/javascript', 'text/javascript',
+    'application/xml', 'image/svg+xml',
+}
+
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.svg')
+
+# Суффиксы предсжатых копий статики
+STATIC_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def _available_encodings():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def choose_encoding(available=None):
+    """Кодировка из Accept-Encoding с наибольшим q (br при равенстве) или None"""
+    best, best_quality = None, 0
+    for encoding in available or _available_encodings():
+        quality = request.accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, gzip_level=COMPRESS_GZIP_LEVEL, brotli_quality=COMPRESS_BROTLI_QUALITY):
+    """Сжимает байты выбранной кодировкой"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 — одинаковый вход даёт одинаковые байты
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def compress_stream(chunks, gzip_level=COMPRESS_GZIP_LEVEL, flush_size=64 * 1024):
+    """
+    Сжимает поток частей (str или bytes) в gzip по мере их появления
+
+    Сжатые данные отдаются блоками примерно по flush_size байт исходного
+    текста, поэтому в памяти не копится ни исходный, ни сжатый поток.
+    """
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_size:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response):
+    """Сжимает динамический ответ (after_request)"""
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def precompress_static(static_folder):
+    """
+    Создаёт .gz/.br рядом с CSS/JS/SVG, если их нет или исходник новее
+
+    Returns:
+        int: Сколько файлов сжато заново
+    """
+    written = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            mtime = os.path.getmtime(path)
+
+            with open(path, 'rb') as source:
+                data = None
+                for encoding in _available_encodings():
+                    target = path + STATIC_SUFFIXES[encoding]
+                    if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                        continue
+                    if data is None:
+                        data = source.read()
+                    # Сжимается один раз, поэтому максимальная степень
+                    compressed = compress(data, encoding, gzip_level=9, brotli_quality=11)
+                    with open(target + '.tmp', 'wb') as out:
+                        out.write(compressed)
+                    os.replace(target + '.tmp', target)
+                    written += 1
+    return written
+
+
+def send_static(filename):
+    """Static-view: отдаёт предсжатый вариант файла, если клиент его принимает"""
+    static_folder = current_app.static_folder
+    response = None
+
+    if filename.endswith(PRECOMPRESS_EXTENSIONS):
+        encoding = choose_encoding()
+        if encoding:
+            try:
+                # Тип содержимого — исходного файла, а не архива
+                response = send_from_directory(
+                    static_folder, filename + STATIC_SUFFIXES[encoding],
+                    mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                )
+                response.headers['Content-Encoding'] = encoding
+            except NotFound:
+                # Предсжатой копии нет (например, файл добавлен после старта)
+                response = None
+
+    if response is None:
+        response = send_from_directory(static_folder, filename)
+
+    if filename.endswith(PRECOMPRESS_EXTENSIONS):
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_compression(app):
+    """Подключает сжатие ответов и предсжатую статику"""
+    try:
+        written = precompress_static(app.static_folder)
+        if written:
+            print(f"✅ Precompressed {written} static files")
+    except OSError as e:
+        print(f"❌ Static precompression error: {e}")
+
+    app.view_functions['static'] = send_static
+    app.after_request(compress_response)
+
+
+if __name__ == '__main__':
+    folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+    print(f"✅ Precompressed {precompress_static(folder)} static files")
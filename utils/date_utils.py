@@ -1,31 +1,75 @@
 """
 Утилиты для работы с датами и временем
 """
-from datetime import datetime
+from datetime import date, datetime, time
 
 
 def calculate_days_left(date_str, time_str='23:59', due_date_str=None):
     """Вычисляет количество оставшихся дней до дедлайна"""
+    deadline = compute_deadline_at(date_str, time_str, due_date_str)
+    if deadline is None:
+        print(f"Error calculating days left: invalid date {due_date_str or date_str!r} {time_str!r}")
+    return days_left_until(deadline)
+
+
+def compute_deadline_at(date_value, time_value=None, due_date_value=None):
+    """
+    Момент дедлайна работы: due_date (или date) + time (по умолчанию 23:59)
+
+    Вызывается один раз при записи; результат хранится в колонке deadline_at.
+    Принимает строки ('2024-05-20', '09:00') или date/time объекты.
+
+    Returns:
+        datetime или None, если дата некорректна
+    """
     try:
-        # Используем due_date если указан
-        target_date = due_date_str if due_date_str else date_str
+        target = due_date_value or date_value
+        if isinstance(target, str):
+            target = datetime.strptime(target, '%Y-%m-%d').date()
         
-        if not time_str or time_str == '':
-            time_str = '23:59'
+        if not time_value:
+            time_value = '23:59'
+        if isinstance(time_value, str):
+            time_value = datetime.strptime(time_value, '%H:%M').time()
         
-        datetime_str = f"{target_date} {time_str}"
-        deadline = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M')
-        now = datetime.now()
-        
-        time_left = deadline - now
-        
-        if time_left.total_seconds() <= 0:
-            return 0
-        else:
-            return time_left.days
-    except Exception as e:
-        print(f"Error calculating days left: {e}")
+        return datetime.combine(target, time_value)
+    except (TypeError, ValueError):
+        return None
+
+
+def days_left_until(deadline_at, now=None):
+    """Количество оставшихся дней до уже вычисленного дедлайна (без парсинга строк)"""
+    if deadline_at is None:
         return 999
+    
+    time_left = deadline_at - (now or datetime.now())
+    
+    if time_left.total_seconds() <= 0:
+        return 0
+    return time_left.days
+
+
+def normalize_date_fields(row):
+    """
+    Приводит даты строки из БД к единому виду для обоих драйверов
+
+    PostgreSQL возвращает DATE/TIME объекты — шаблоны и API работают со
+    строками 'YYYY-MM-DD' и 'HH:MM'. deadline_at из SQLite (epoch-секунды)
+    превращается в datetime.
+    """
+    for key, value in row.items():
+        if isinstance(value, datetime):
+            continue
+        if isinstance(value, date):
+            row[key] = value.isoformat()
+        elif isinstance(value, time):
+            row[key] = value.strftime('%H:%M')
+    
+    deadline_at = row.get('deadline_at')
+    if isinstance(deadline_at, (int, float)):
+        row['deadline_at'] = datetime.fromtimestamp(deadline_at)
+    
+    return row
 
 
 def get_work_status(days_left):
@@ -0,0 +1,290 @@
+"""
+Собственные шрифты и подмножество иконок Font Awesome
+
+Шаг сборки (нужна сеть и fontTools): ``python -m utils.fonts``. Без них
+шаг не падает и не роняет деплой — шаблоны остаются на Google Fonts и CDN.
+
+- DM Sans и Poppins скачиваются с Google Fonts (подмножества latin и
+  latin-ext — латышские буквы в latin-ext) в static/fonts, CSS переписывается
+  на локальные адреса с font-display: swap.
+- Шаблоны и JS сканируются на классы fa-*, из webfont'ов Font Awesome
+  вырезаются только эти глифы, а icons.css содержит только их правила.
+- manifest.json перечисляет файлы для <link rel="preload">.
+
+fonts.css и icons.css собираются utils.assets в бандл fonts.css. Пока шаг
+не выполнен (бандла нет), шаблоны подключают Google Fonts и CDN как раньше.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+from flask import url_for
+
+
+FONTS_DIR = 'fonts'
+MANIFEST_NAME = 'manifest.json'
+
+GOOGLE_FONTS_URL = (
+    'https://fonts.googleapis.com/css2'
+    '?family=DM+Sans:wght@400;500;700&family=Poppins:wght@600;700;800&display=swap'
+)
+# Google Fonts отдаёт woff2 только "современному" браузеру
+GOOGLE_FONTS_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+)
+FONT_SUBSETS = ('latin', 'latin-ext')
+
+FA_VERSION = '6.4.0'
+FA_BASE_URL = f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/{FA_VERSION}'
+
+# Стиль -> (webfont, font-family, font-weight, классы стиля)
+FA_STYLES = {
+    'solid': ('fa-solid-900', 'Font Awesome 6 Free', 900, ('fa', 'fas', 'fa-solid')),
+    'regular': ('fa-regular-400', 'Font Awesome 6 Free', 400, ('far', 'fa-regular')),
+    'brands': ('fa-brands-400', 'Font Awesome 6 Brands', 400, ('fab', 'fa-brands')),
+}
+
+# Что предзагружать: основной текст, заголовки и сплошные иконки
+PRELOAD_FONTS = {('DM Sans', '400', 'latin'), ('Poppins', '700', 'latin')}
+PRELOAD_ICONS = ('solid',)
+
+SCAN_DIRS = ('templates', 'static/js')
+SCAN_EXTENSIONS = ('.html', '.js')
+
+ICON_CLASS_RE = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)\b')
+FACE_RE = re.compile(r'/\*\s*([a-z0-9-]+)\s*\*/\s*@font-face\s*\{(.*?)\}', re.S)
+ICON_RULE_RE = re.compile(r'((?:\.fa-[a-z0-9-]+:{1,2}before,?)+)\{content:"\\([0-9a-f]+)"\}')
+
+_preloads = []  # пути в static/ для <link rel="preload">
+
+
+def _slug(value):
+    return re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-')
+
+
+def _write(path, data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    with open(path + '.tmp', 'wb') as out:
+        out.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def _read(fonts_dir, name):
+    with open(os.path.join(fonts_dir, name), encoding='utf-8') as source:
+        return source.read()
+
+
+def _save_hashed(fonts_dir, stem, data):
+    """Пишет woff2 с хешем содержимого в имени, возвращает имя файла"""
+    filename = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}.woff2'
+    _write(os.path.join(fonts_dir, filename), data)
+    return filename
+
+
+def _download(session, url, **kwargs):
+    response = session.get(url, timeout=30, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def scan_icon_names(root):
+    """
+    Имена иконок (без префикса fa-), встречающиеся в шаблонах и JS
+
+    Ловит и классы в атрибутах, и строки вроде icon='fas fa-inbox'.
+    Лишние совпадения (fa-solid, fa-spin) безвредны — у них нет глифа.
+    """
+    names = set()
+    for directory in SCAN_DIRS:
+        for base, dirs, files in os.walk(os.path.join(root, directory)):
+            # Собранные бандлы повторяют исходники
+            dirs[:] = [d for d in dirs if d != 'dist']
+            for name in files:
+                if name.endswith(SCAN_EXTENSIONS):
+                    with open(os.path.join(base, name), encoding='utf-8') as source:
+                        names.update(ICON_CLASS_RE.findall(source.read()))
+    return names
+
+
+def parse_icon_rules(stylesheet):
+    """Имя иконки -> (селекторы, код глифа) из all.min.css Font Awesome"""
+    rules = {}
+    for selectors, codepoint in ICON_RULE_RE.findall(stylesheet):
+        selector_list = selectors.rstrip(',').split(',')
+        for selector in selector_list:
+            name = selector[len('.fa-'):].split(':')[0]
+            rules[name] = (selector_list, int(codepoint, 16))
+    return rules
+
+
+def subset_font(data, codepoints):
+    """Оставляет в шрифте только нужные глифы, возвращает woff2"""
+    import io
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    font = subset.load_font(io.BytesIO(data), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+
+    out = io.BytesIO()
+    subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+def build_text_fonts(session, fonts_dir):
+    """
+    Скачивает DM Sans и Poppins, пишет fonts.css
+
+    Returns:
+        list: Файлы для предзагрузки (относительно static/)
+    """
+    css = _download(session, GOOGLE_FONTS_URL, headers={'User-Agent': GOOGLE_FONTS_USER_AGENT}).text
+
+    saved = {}  # URL -> имя файла (вариативный шрифт общий для всех начертаний)
+    faces, preloads = [], []
+    for subset_name, body in FACE_RE.findall(css):
+        if subset_name not in FONT_SUBSETS:
+            continue
+        family = re.search(r"font-family:\s*'([^']+)'", body).group(1)
+        weight = re.search(r'font-weight:\s*(\d+)', body).group(1)
+        url = re.search(r'url\(([^)]+)\)', body).group(1)
+
+        if url not in saved:
+            data = _download(session, url).content
+            saved[url] = _save_hashed(fonts_dir, f'{_slug(family)}-{subset_name}', data)
+        path = f'{FONTS_DIR}/{saved[url]}'
+
+        body = body.replace(url, f'/static/{path}')
+        if 'font-display' not in body:
+            body += 'font-display: swap;'
+        faces.append(f'/* {subset_name} */\n@font-face {{{body}}}')
+
+        if (family, weight, subset_name) in PRELOAD_FONTS and path not in preloads:
+            preloads.append(path)
+
+    _write(os.path.join(fonts_dir, 'fonts.css'), '\n'.join(faces) + '\n')
+    print(f"✅ fonts.css: {len(faces)} faces, {len(saved)} files")
+    return preloads
+
+
+def build_icon_font(session, fonts_dir, root):
+    """
+    Подмножество Font Awesome по иконкам из шаблонов, пишет icons.css
+
+    Returns:
+        list: Файлы для предзагрузки (относительно static/)
+    """
+    rules = parse_icon_rules(_download(session, f'{FA_BASE_URL}/css/all.min.css').text)
+
+    names = scan_icon_names(root)
+    used = {}
+    for name in sorted(names):
+        if name in rules:
+            selectors, codepoint = rules[name]
+            used.setdefault(codepoint, selectors)
+
+    style_names = {c[len('fa-'):] for *_, classes in FA_STYLES.values() for c in classes}
+    missing = sorted(names - set(rules) - style_names)
+    if missing:
+        # Модификаторы (spin, fw) и иконки, которых нет в бесплатном наборе
+        print(f"🔧 No glyph for: {', '.join('fa-' + n for n in missing)}")
+
+    lines, preloads = [], []
+    all_classes = []
+    for style, (webfont, family, weight, classes) in FA_STYLES.items():
+        data = _download(session, f'{FA_BASE_URL}/webfonts/{webfont}.woff2').content
+        filename = _save_hashed(fonts_dir, webfont, subset_font(data, set(used)))
+        path = f'{FONTS_DIR}/{filename}'
+        # block, а не swap: пока шрифт грузится, вместо иконки не мелькает мусор
+        lines.append(
+            f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};'
+            f'font-display:block;src:url(/static/{path}) format("woff2")}}'
+        )
+        selector = ','.join('.' + c for c in classes)
+        lines.append(f'{selector}{{font-family:"{family}";font-weight:{weight}}}')
+        all_classes.extend(classes)
+        if style in PRELOAD_ICONS:
+            preloads.append(path)
+
+    lines.append(
+        ','.join('.' + c for c in all_classes) + '{-moz-osx-font-smoothing:grayscale;'
+        '-webkit-font-smoothing:antialiased;display:var(--fa-display,inline-block);'
+        'font-style:normal;font-variant:normal;line-height:1;text-rendering:auto}'
+    )
+    for codepoint, selectors in sorted(used.items()):
+        lines.append(f'{",".join(selectors)}{{content:"\\{codepoint:x}"}}')
+
+    _write(os.path.join(fonts_dir, 'icons.css'), '\n'.join(lines) + '\n')
+    print(f"✅ icons.css: {len(used)} icons")
+    return preloads
+
+
+def build_fonts(root):
+    """Скачивает шрифты, собирает подмножество иконок и manifest.json"""
+    import requests
+
+    fonts_dir = os.path.join(root, 'static', FONTS_DIR)
+    os.makedirs(fonts_dir, exist_ok=True)
+
+    with requests.Session() as session:
+        preloads = build_text_fonts(session, fonts_dir)
+        preloads += build_icon_font(session, fonts_dir, root)
+
+    _write(os.path.join(fonts_dir, MANIFEST_NAME), json.dumps({'preload': preloads}, indent=2))
+
+    # Файлы прошлых сборок больше не нужны
+    keep = {os.path.basename(path) for path in preloads}
+    keep.update(re.findall(r'/static/fonts/([^)]+)', _read(fonts_dir, 'fonts.css') + _read(fonts_dir, 'icons.css')))
+    for name in os.listdir(fonts_dir):
+        if name.endswith('.woff2') and name not in keep:
+            os.remove(os.path.join(fonts_dir, name))
+    return preloads
+
+
+def font_preloads():
+    """URL шрифтов для <link rel="preload" as="font">"""
+    return [url_for('static', filename=path) for path in _preloads]
+
+
+def init_fonts(app):
+    """Читает manifest.json собранных шрифтов и подключает font_preloads()"""
+    mimetypes.add_type('font/woff2', '.woff2')
+
+    path = os.path.join(app.static_folder, FONTS_DIR, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as source:
+            _preloads[:] = json.load(source).get('preload', [])
+        print(f"✅ Self-hosted fonts: {len(_preloads)} preloads")
+
+    app.jinja_env.globals['font_preloads'] = font_preloads
+
+
+def main(root=None):
+    """
+    Шаг сборки: ошибка (нет сети, CDN недоступен, нет fontTools) только
+    печатается — приложение работает и без собственных шрифтов
+
+    Returns:
+        int: Код выхода (0 и при ошибке)
+    """
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        preloads = build_fonts(root)
+    except Exception as e:
+        print(f"❌ Self-hosted fonts not built, templates keep using the CDN: {e}")
+        return 0
+    for preload in preloads:
+        print(f"✅ preload {preload}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
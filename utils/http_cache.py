@@ -0,0 +1,101 @@
+"""
+Условные ответы (ETag / 304) для страниц и JSON API
+
+ETag строится из версий наборов данных, которые показывает маршрут
+(models.data_versions), параметров запроса, режима хоста и текущей даты
+(days_left и "сегодня" меняются в полночь). Совпавший If-None-Match
+возвращает 304 до вызова view — без загрузчиков и шаблонов. С
+render_cache=True готовая страница с тем же ETag берётся из
+utils.render_cache без рендеринга:
+
+    @public_bp.route('/homework')
+    @conditional('tests', 'homework', 'subjects', 'terms')
+    def homework():
+        ...
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, make_response, request
+from config.settings import RELEASE_ID
+from models.data_versions import current_versions
+from utils.assets import assets_fingerprint
+from utils.auth import is_host
+from utils.render_cache import get_page, store_page
+
+
+def _validators(datasets):
+    """ETag и Last-Modified для наборов данных в текущем запросе"""
+    versions = current_versions()
+    today = datetime.now().date()
+
+    # Адреса бандлов входят в HTML, поэтому их хеши — часть ETag
+    parts = [RELEASE_ID, assets_fingerprint(), request.full_path, str(bool(is_host())), today.isoformat()]
+    last_modified = datetime.combine(today, datetime.min.time())
+    for dataset in datasets:
+        version, changed_at = versions.get(dataset, (0, None))
+        parts.append(f'{dataset}={version}')
+        if changed_at and changed_at > last_modified:
+            last_modified = changed_at
+
+    etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+    return etag, last_modified
+
+
+def _set_cache_headers(response, etag, last_modified, max_age, strong=False):
+    response.set_etag(etag, weak=not strong)
+    response.last_modified = last_modified
+    # Ответ зависит от сессии (режим хоста), общие кеши его хранить не должны
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
+
+
+def conditional(*datasets, max_age=0, render_cache=False, strong=False):
+    """
+    Декоратор: ETag/Last-Modified/Cache-Control и 304 по If-None-Match
+
+    Args:
+        datasets: Наборы данных, от которых зависит ответ
+        max_age (int): Сколько секунд браузер может не перепроверять ответ
+        render_cache (bool): Кешировать тело ответа по ETag
+        strong (bool): Сильный ETag — только для ответов, побайтно одинаковых
+            при одних версиях данных (ленты .ics: потоковые ответы не сжимаются)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            try:
+                etag, last_modified = _validators(datasets)
+            except Exception as e:
+                # Без версий данных просто отдаём ответ без валидаторов
+                print(f"❌ ETag error: {e}")
+                return view(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                return _set_cache_headers(response, etag, last_modified, max_age, strong)
+
+            cached_page = get_page(etag) if render_cache else None
+            if cached_page is not None:
+                body, mimetype = cached_page
+                response = current_app.response_class(body, mimetype=mimetype)
+                return _set_cache_headers(response, etag, last_modified, max_age, strong)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                if render_cache:
+                    store_page(etag, response)
+                _set_cache_headers(response, etag, last_modified, max_age, strong)
+            return response
+
+        return wrapper
+
+    return decorator
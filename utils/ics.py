@@ -0,0 +1,139 @@
+"""
+Сериализация iCalendar (RFC 5545) для подписок на календарь
+
+Только то, что нужно лентам работ: заголовок календаря, VEVENT и конец.
+Строки заканчиваются CRLF и переносятся по 75 байт (не разрывая символы
+UTF-8), текст экранируется. Вывод детерминирован — одинаковые данные дают
+одинаковые байты, на этом держатся сильные ETag лент.
+"""
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+CRLF = '\r\n'
+MAX_LINE_OCTETS = 75
+
+CALENDAR_END = 'END:VCALENDAR' + CRLF
+
+
+def escape_text(value):
+    """Экранирование значения TEXT: \\ ; , и переводы строк"""
+    return (str(value or '')
+            .replace('\\', '\\\\')
+            .replace(';', '\\;')
+            .replace(',', '\\,')
+            .replace('\r\n', '\\n')
+            .replace('\n', '\\n')
+            .replace('\r', '\\n'))
+
+
+def fold_line(line):
+    """Переносит строку длиннее 75 байт (продолжение начинается с пробела)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line + CRLF
+
+    parts, current, size = [], [], 0
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(''.join(current))
+            current, size = [], 0
+            # Пробел продолжения занимает один байт
+            limit = MAX_LINE_OCTETS - 1
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return (CRLF + ' ').join(parts) + CRLF
+
+
+def format_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def format_datetime(value):
+    """
+    DATE-TIME для DTSTART: время с зоной — в UTC, наивное — плавающее
+
+    Плавающее время клиент показывает в своей зоне, поэтому ленты передают
+    время с зоной календаря (CALENDAR_TIMEZONE).
+    """
+    if value.tzinfo is not None:
+        return format_utc(value)
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def format_utc(value):
+    """Момент в UTC; наивное время считается локальным временем сервера (см. parse_stamp)"""
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def calendar_start(name, timezone_name=None, refresh_minutes=None):
+    """Начало VCALENDAR с именем календаря для клиентов"""
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Classmate//Studentu Palīgs//LV',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ]
+    if timezone_name:
+        lines.append(f'X-WR-TIMEZONE:{timezone_name}')
+    if refresh_minutes:
+        lines.append(f'REFRESH-INTERVAL;VALUE=DURATION:PT{refresh_minutes}M')
+        lines.append(f'X-PUBLISHED-TTL:PT{refresh_minutes}M')
+    return ''.join(fold_line(line) for line in lines)
+
+
+def event(uid, stamp, summary, start, all_day=False, description=None, categories=None):
+    """
+    Блок VEVENT
+
+    Args:
+        uid (str): Постоянный идентификатор события
+        stamp (datetime): DTSTAMP (создание записи)
+        summary (str): Заголовок
+        start (date | datetime): Начало (datetime с зоной выводится в UTC);
+            при all_day — дата события на весь день
+        description (str, optional): Описание
+        categories (list, optional): Категории (предмет, тип)
+    """
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{format_utc(stamp)}',
+    ]
+    if all_day:
+        lines.append(f'DTSTART;VALUE=DATE:{format_date(start)}')
+        lines.append(f'DTEND;VALUE=DATE:{format_date(start + timedelta(days=1))}')
+    else:
+        lines.append(f'DTSTART:{format_datetime(start)}')
+    lines.append(f'SUMMARY:{escape_text(summary)}')
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    if categories:
+        lines.append('CATEGORIES:' + ','.join(escape_text(category) for category in categories if category))
+    lines.append('TRANSP:TRANSPARENT')
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
+
+
+def parse_stamp(value, default, timezone_name=None):
+    """
+    DTSTAMP из added_date ('YYYY-MM-DD HH:MM' или datetime)
+
+    added_date и default — наивное время календаря (как DTSTART), поэтому
+    с timezone_name оно привязывается к этой зоне, а не к зоне сервера.
+    """
+    if isinstance(value, datetime):
+        stamp = value
+    else:
+        try:
+            stamp = datetime.strptime(str(value), '%Y-%m-%d %H:%M')
+        except (TypeError, ValueError):
+            stamp = default
+    if timezone_name and stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=ZoneInfo(timezone_name))
+    return stamp
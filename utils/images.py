@@ -0,0 +1,122 @@
+"""
+Обработка изображений: варианты по ширине, WebP и размытая заглушка
+
+Из загруженного файла получаются уменьшенные копии для srcset в WebP и в
+исходном формате (GIF services.image_service не нарезает, чтобы не
+потерять анимацию). Ориентация из EXIF применяется к пикселям, а сами
+метаданные (EXIF, GPS, текстовые чанки) не попадают ни в варианты, ни в
+копию полного размера, которая показывается до обработки.
+
+Pillow — необязательная зависимость: без него загрузки изображений
+отклоняются (services.image_service).
+"""
+import base64
+import io
+from config.settings import IMAGE_VARIANT_WIDTHS, IMAGE_QUALITY, IMAGE_PLACEHOLDER_WIDTH
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:
+    Image = None
+
+
+# Формат Pillow -> расширение варианта "в исходном формате" (None — только WebP)
+ORIGINAL_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'png', 'WEBP': None}
+
+SAVE_FORMATS = {'jpg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP'}
+
+
+def is_available():
+    """Можно ли обрабатывать изображения (установлен ли Pillow)"""
+    return Image is not None
+
+
+def variant_widths(width):
+    """Ширины вариантов: меньшие исходной плюс сама исходная (не больше максимальной)"""
+    largest = min(width, max(IMAGE_VARIANT_WIDTHS))
+    return [w for w in IMAGE_VARIANT_WIDTHS if w < largest] + [largest]
+
+
+def encode(image, ext, quality=IMAGE_QUALITY):
+    """Сохраняет изображение в байты без метаданных"""
+    out = io.BytesIO()
+    fmt = SAVE_FORMATS[ext]
+    if fmt == 'JPEG':
+        image.convert('RGB').save(out, fmt, quality=quality, optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        image.save(out, fmt, optimize=True)
+    else:
+        image.save(out, fmt, quality=quality, method=4)
+    return out.getvalue()
+
+
+def strip_metadata(source, ext):
+    """
+    Копия изображения в полном размере без метаданных
+
+    Args:
+        source: Путь или файловый объект
+        ext (str): Расширение результата ('jpg', 'png', 'webp', 'gif')
+
+    Returns:
+        bytes: Изображение в формате ext; GIF — со всеми кадрами
+    """
+    with Image.open(source) as image:
+        if ext == 'gif':
+            for field in ('comment', 'xmp', 'exif'):
+                image.info.pop(field, None)
+            out = io.BytesIO()
+            image.save(out, 'GIF', save_all=True)
+            return out.getvalue()
+        return encode(ImageOps.exif_transpose(image), ext)
+
+
+def placeholder(image):
+    """Крошечная размытая копия в виде data: URI (пока грузится вариант)"""
+    height = max(1, round(image.height * IMAGE_PLACEHOLDER_WIDTH / image.width))
+    tiny = image.resize((IMAGE_PLACEHOLDER_WIDTH, height), Image.BILINEAR)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    data = encode(tiny, 'webp', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(data).decode('ascii')
+
+
+def render_variants(source, original_ext=None):
+    """
+    Готовит варианты изображения
+
+    Args:
+        source: Путь или файловый объект
+        original_ext (str, optional): Расширение вариантов "в исходном формате"
+            (по умолчанию — по формату файла; None для WebP — только WebP)
+
+    Returns:
+        tuple: ({'width', 'height', 'placeholder'}, [(ширина, расширение, байты), ...])
+               — варианты от меньшего к большему, WebP первым при равной ширине
+    """
+    with Image.open(source) as image:
+        if original_ext is None:
+            original_ext = ORIGINAL_EXTENSIONS.get(image.format, 'png')
+        elif original_ext == 'webp':
+            original_ext = None
+        # JPEG можно декодировать сразу в уменьшенном масштабе
+        image.draft('RGB', (max(IMAGE_VARIANT_WIDTHS), max(IMAGE_VARIANT_WIDTHS)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('P', 'LA', 'PA') else 'RGB')
+
+        extensions = ['webp'] + ([original_ext] if original_ext else [])
+        variants = []
+        for width in variant_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for ext in extensions:
+                variants.append((width, ext, encode(resized, ext)))
+
+        # Размеры самого большого варианта — для width/height в <img>
+        largest = variants[-1][0]
+        info = {
+            'width': largest,
+            'height': max(1, round(image.height * largest / image.width)),
+            'placeholder': placeholder(image),
+        }
+    return info, variants
@@ -0,0 +1,17 @@
+"""
+JSON-сериализация ответов API
+"""
+from datetime import date, datetime, time
+from flask.json.provider import DefaultJSONProvider
+
+
+class ISODateJSONProvider(DefaultJSONProvider):
+    """Отдаёт даты в ISO 8601 вместо HTTP-формата Flask по умолчанию"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (date, datetime)):
+            return o.isoformat()
+        if isinstance(o, time):
+            return o.strftime('%H:%M')
+        return DefaultJSONProvider.default(o)
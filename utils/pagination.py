@@ -0,0 +1,52 @@
+"""
+Keyset-пагинация: курсоры next/after и размер страницы
+"""
+from datetime import datetime
+from config.settings import PAGE_SIZE, MAX_PAGE_SIZE
+
+
+def parse_limit(value, default=PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Размер страницы из параметра запроса (в пределах 1..maximum)"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def cursor_date(value):
+    """Часть курсора: дата 'YYYY-MM-DD'"""
+    return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+
+
+def cursor_time(value):
+    """Часть курсора: время 'HH:MM'"""
+    return datetime.strptime(value, '%H:%M').strftime('%H:%M')
+
+
+def make_cursor(*values):
+    """Токен курсора из ключа последней строки страницы ('2024-05-20,09:00,17')"""
+    return ','.join(str(value) for value in values)
+
+
+def parse_cursor(token, *parts):
+    """
+    Разбирает токен курсора
+
+    Args:
+        token (str): Токен из параметра after
+        *parts: Функции разбора для каждой части (cursor_date, cursor_time, int)
+
+    Returns:
+        tuple или None, если токен пустой
+
+    Raises:
+        ValueError: Токен некорректен
+    """
+    if not token:
+        return None
+
+    values = token.split(',')
+    if len(values) != len(parts):
+        raise ValueError(f"Invalid cursor: {token!r}")
+    return tuple(parse(value) for parse, value in zip(parts, values))
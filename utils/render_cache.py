@@ -0,0 +1,70 @@
+"""
+Кеш отрендеренного HTML: целые страницы и фрагменты шаблонов
+
+Страницы кешируются по ETag из utils.http_cache (версии данных, путь
+с параметрами, режим хоста, дата), поэтому устаревшая страница не может
+совпасть с новым ключом: @conditional(..., render_cache=True).
+
+Фрагменты — тег {% cache %} в шаблонах. Ключ — имя шаблона, строка тега и
+значения выражений после cache; выражения должны покрывать всё, от чего
+зависит фрагмент:
+
+    {% cache 'subject_card', subject.id, subject.name, subject.color, subject.work_count %}
+        ...
+    {% endcache %}
+
+Оба кеша ограничены по числу записей, счётчики видны в /api/status.
+"""
+import hashlib
+from jinja2 import nodes
+from jinja2.ext import Extension
+from config.settings import (
+    RENDER_CACHE_TTL, RENDER_CACHE_MAX_PAGES, RENDER_CACHE_MAX_FRAGMENTS
+)
+from utils.cache import LRUCache
+
+
+page_cache = LRUCache(name='pages', max_entries=RENDER_CACHE_MAX_PAGES, ttl=RENDER_CACHE_TTL)
+
+fragment_cache = LRUCache(name='fragments', max_entries=RENDER_CACHE_MAX_FRAGMENTS, ttl=RENDER_CACHE_TTL)
+
+
+def get_page(etag):
+    """Сохранённая страница (body, mimetype) или None"""
+    return page_cache.get(etag)
+
+
+def store_page(etag, response):
+    """Сохраняет тело успешного ответа под его ETag"""
+    page_cache.set(etag, (response.get_data(), response.mimetype))
+
+
+class FragmentCacheExtension(Extension):
+    """Тег {% cache key, ... %}...{% endcache %}"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [nodes.Const(f'{parser.name}:{lineno}')]
+        while parser.stream.current.type != 'block_end':
+            if len(parts) > 1:
+                parser.stream.expect('comma')
+            parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_fragment', [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, parts, caller):
+        key = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+        html = fragment_cache.get(key)
+        if html is None:
+            html = caller()
+            fragment_cache.set(key, html)
+        return html
+
+
+def init_render_cache(app):
+    """Подключает тег {% cache %} к Jinja-окружению приложения"""
+    app.jinja_env.add_extension(FragmentCacheExtension)
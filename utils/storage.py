@@ -0,0 +1,203 @@
+"""
+Хранилище загруженных файлов: локальный диск или S3-совместимое (S3, MinIO, R2)
+
+Файлы адресуются ключом вида ``3f/3fa1...c9-640.webp`` (см. services.image_service).
+Бэкенд выбирается настройкой STORAGE_BACKEND:
+
+- local — UPLOAD_FOLDER внутри static/, отдаётся static-view по /static/uploads/<ключ>
+- s3 — бакет S3_BUCKET (S3_ENDPOINT_URL для MinIO и т.п.). При S3_PUBLIC_URL
+  (публичный бакет или CDN) ссылки ведут туда напрямую, иначе — на
+  /uploads/<ключ>, который отвечает редиректом на подписанный URL. В обоих
+  случаях байты изображений идут мимо Python-воркеров.
+
+Ключи содержат хеш содержимого, поэтому объекты кешируются как immutable.
+boto3 — необязательная зависимость, нужна только для s3.
+"""
+import os
+import shutil
+from config.settings import (
+    STORAGE_BACKEND, UPLOAD_FOLDER, S3_BUCKET, S3_ENDPOINT_URL, S3_REGION,
+    S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY, S3_PUBLIC_URL, S3_PRESIGN_EXPIRES
+)
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Маршрут-редирект на прямой адрес файла (routes.public.upload)
+REDIRECT_URL_PREFIX = '/uploads/'
+
+CHUNK_SIZE = 64 * 1024
+
+
+class LocalStorage:
+    """Файлы в каталоге на диске приложения"""
+
+    def __init__(self, root, url_prefix):
+        self.root = root
+        self.url_prefix = url_prefix
+
+    def _path(self, key):
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f'Invalid storage key: {key}')
+        return path
+
+    def save(self, key, stream, content_type=None):
+        """Потоково записывает файл (атомарно: через временный файл)"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as out:
+            shutil.copyfileobj(stream, out, CHUNK_SIZE)
+        os.replace(path + '.tmp', path)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def touch(self, key):
+        """Обновляет время изменения (защита от сборщика мусора)"""
+        os.utime(self._path(key))
+
+    def delete(self, key):
+        path = self._path(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        # Пустой каталог шарда тоже не нужен
+        directory = os.path.dirname(path)
+        if directory != os.path.normpath(self.root) and not os.listdir(directory):
+            os.rmdir(directory)
+
+    def list(self):
+        """Все файлы: (ключ, время изменения, размер)"""
+        for base, _, files in os.walk(self.root):
+            for name in files:
+                if name.startswith('.') or name.endswith('.tmp'):
+                    continue
+                path = os.path.join(base, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, '/')
+                yield key, stat.st_mtime, stat.st_size
+
+    def url(self, key):
+        """Постоянный адрес для HTML и news.image_url"""
+        return self.url_prefix + key
+
+    def direct_url(self, key):
+        return self.url(key)
+
+
+class S3Storage:
+    """Объекты в S3-совместимом бакете"""
+
+    def __init__(self, bucket, endpoint_url=None, region=None, access_key_id=None,
+                 secret_access_key=None, public_url='', presign_expires=3600):
+        if boto3 is None:
+            raise RuntimeError('boto3 is required for STORAGE_BACKEND=s3')
+        self.bucket = bucket
+        self.public_url = public_url.rstrip('/')
+        self.presign_expires = presign_expires
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+        )
+
+    def save(self, key, stream, content_type=None):
+        """Потоковая (multipart для больших файлов) загрузка объекта"""
+        extra = {'CacheControl': IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            extra['ContentType'] = content_type
+        self.client.upload_fileobj(stream, self.bucket, key, ExtraArgs=extra)
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def touch(self, key):
+        """Копия объекта в себя обновляет LastModified"""
+        head = self.client.head_object(Bucket=self.bucket, Key=key)
+        self.client.copy_object(
+            Bucket=self.bucket, Key=key, CopySource={'Bucket': self.bucket, 'Key': key},
+            MetadataDirective='REPLACE', Metadata=head.get('Metadata', {}),
+            ContentType=head.get('ContentType', 'binary/octet-stream'),
+            CacheControl=head.get('CacheControl', IMMUTABLE_CACHE_CONTROL),
+        )
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def list(self):
+        """Все объекты: (ключ, время изменения, размер)"""
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket):
+            for item in page.get('Contents', []):
+                yield item['Key'], item['LastModified'].timestamp(), item['Size']
+
+    def url(self, key):
+        """Постоянный адрес: публичный URL бакета/CDN или редирект через приложение"""
+        if self.public_url:
+            return f'{self.public_url}/{key}'
+        return REDIRECT_URL_PREFIX + key
+
+    def direct_url(self, key):
+        """Адрес, по которому браузер скачает объект напрямую из хранилища"""
+        if self.public_url:
+            return self.url(key)
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=self.presign_expires
+        )
+
+
+_storage = None
+
+
+def get_storage():
+    """Хранилище загрузок по настройкам (создаётся один раз)"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == 's3':
+            _storage = S3Storage(
+                S3_BUCKET, endpoint_url=S3_ENDPOINT_URL, region=S3_REGION,
+                access_key_id=S3_ACCESS_KEY_ID, secret_access_key=S3_SECRET_ACCESS_KEY,
+                public_url=S3_PUBLIC_URL, presign_expires=S3_PRESIGN_EXPIRES,
+            )
+        else:
+            _storage = LocalStorage(UPLOAD_FOLDER, '/' + UPLOAD_FOLDER.strip('/') + '/')
+        print(f"✅ Upload storage: {STORAGE_BACKEND}")
+    return _storage
+
+
+def key_from_url(url):
+    """
+    Ключ хранилища по адресу из news.image_url или None (внешний адрес)
+
+    Понимает адреса текущего бэкенда, редиректа /uploads/ и локальные
+    /static/uploads/ (загрузки до переключения бэкенда).
+    """
+    if not url:
+        return None
+    storage = get_storage()
+    prefixes = [REDIRECT_URL_PREFIX, '/' + UPLOAD_FOLDER.strip('/') + '/']
+    if isinstance(storage, S3Storage) and storage.public_url:
+        prefixes.insert(0, storage.public_url + '/')
+    for prefix in prefixes:
+        if url.startswith(prefix):
+            return url[len(prefix):]
+    return None
@@ -0,0 +1,183 @@
+"""
+Индекс подсказок для поиска по мере ввода (в памяти процесса)
+
+Записи — короткие строки (названия предметов, работ, типы работ). Слова
+записей свёрнуты utils.text.fold и лежат в трёх структурах:
+
+- отсортированный словарь слов — префиксы ищутся bisect'ом
+- триграммы слов (как pg_trgm: "  слово ") — нечёткие совпадения при опечатках
+- слово -> записи
+
+Записи сгруппированы по источникам (наборам данных). replace() сравнивает
+новые записи источника со старыми и меняет только отличающиеся, поэтому
+после записи в БД индекс не перестраивается целиком.
+"""
+import threading
+from bisect import bisect_left, insort
+from utils.text import search_terms
+
+
+# Минимальное сходство по триграммам (коэффициент Жаккара, как similarity() в pg_trgm)
+FUZZY_THRESHOLD = 0.3
+
+# Короче — только префиксы: триграммы одной-двух букв совпадают почти со всем
+FUZZY_MIN_LENGTH = 3
+
+# Вес совпадения: полное слово > префикс > нечёткое
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+
+
+def trigrams(word):
+    """Триграммы слова с границами: "  abc " -> {"  a", " ab", "abc", "bc "}"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestIndex:
+    """
+    Префиксный и триграммный индекс коротких строк
+
+    Example:
+        index = SuggestIndex()
+        index.replace('subjects', {('subject', 'fizika'): ('Fizika', {...})})
+        index.lookup('fiz', 8)  # [({...}, 1.0), ...]
+    """
+
+    def __init__(self):
+        self._sources = {}       # источник -> {ключ: (текст, данные)}
+        self._entries = {}       # (источник, ключ) -> (слова, данные, длина текста)
+        self._postings = {}      # слово -> {(источник, ключ)}
+        self._vocabulary = []    # отсортированные слова
+        self._trigrams = {}      # триграмма -> {слово}
+        self._gram_counts = {}   # слово -> число его триграмм
+        self._lock = threading.Lock()
+
+    def _add_word(self, word, entry):
+        postings = self._postings.get(word)
+        if postings is None:
+            postings = self._postings[word] = set()
+            insort(self._vocabulary, word)
+            grams = trigrams(word)
+            self._gram_counts[word] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(word)
+        postings.add(entry)
+
+    def _remove_word(self, word, entry):
+        postings = self._postings[word]
+        postings.discard(entry)
+        if postings:
+            return
+        del self._postings[word]
+        del self._gram_counts[word]
+        del self._vocabulary[bisect_left(self._vocabulary, word)]
+        for gram in trigrams(word):
+            words = self._trigrams[gram]
+            words.discard(word)
+            if not words:
+                del self._trigrams[gram]
+
+    def _add(self, entry, text, data):
+        words = tuple(search_terms(text, max_terms=None))
+        self._entries[entry] = (words, data, len(text))
+        for word in words:
+            self._add_word(word, entry)
+
+    def _remove(self, entry):
+        words, _, _ = self._entries.pop(entry)
+        for word in words:
+            self._remove_word(word, entry)
+
+    def replace(self, source, entries):
+        """
+        Заменяет записи источника
+
+        Args:
+            source (str): Имя источника (например, набор данных)
+            entries (dict): {ключ: (текст, данные)}; записи с одинаковым
+                ключом из разных источников в выдаче объединяются
+
+        Returns:
+            int: Сколько записей добавлено, изменено или удалено
+        """
+        with self._lock:
+            old = self._sources.get(source, {})
+            changed = 0
+            for key, value in old.items():
+                if entries.get(key) != value:
+                    self._remove((source, key))
+                    changed += 1
+            for key, (text, data) in entries.items():
+                if old.get(key) != (text, data):
+                    self._add((source, key), text, data)
+                    changed += key not in old
+            self._sources[source] = dict(entries)
+            return changed
+
+    def _word_scores(self, term):
+        """{слово словаря: вес совпадения с термином}"""
+        scores = {}
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            word = self._vocabulary[position]
+            # Среди префиксных короче — ближе к введённому
+            scores[word] = EXACT_SCORE if word == term else PREFIX_SCORE + 0.1 * len(term) / len(word)
+            position += 1
+
+        if len(term) < FUZZY_MIN_LENGTH:
+            return scores
+
+        grams = trigrams(term)
+        shared = {}
+        for gram in grams:
+            for word in self._trigrams.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        for word, count in shared.items():
+            if word in scores:
+                continue
+            similarity = count / (len(grams) + self._gram_counts[word] - count)
+            if similarity >= FUZZY_THRESHOLD:
+                scores[word] = FUZZY_SCORE * similarity
+        return scores
+
+    def lookup(self, query, limit):
+        """
+        Лучшие записи для строки запроса
+
+        Запись должна совпасть с каждым словом запроса (полностью, префиксом
+        или нечётко). Вес записи — сумма лучших совпадений по словам, при
+        равенстве выше более короткий текст.
+
+        Returns:
+            list: [(данные, вес), ...] по убыванию веса
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for word, score in self._word_scores(term).items():
+                    for entry in self._postings[word]:
+                        if score > term_scores.get(entry, 0):
+                            term_scores[entry] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {entry: scores[entry] + score
+                              for entry, score in term_scores.items() if entry in scores}
+                if not scores:
+                    return []
+
+            best = {}
+            for (source, key), score in scores.items():
+                _, data, length = self._entries[(source, key)]
+                if key not in best or score > best[key][1]:
+                    best[key] = (data, score, length)
+
+        ranked = sorted(best.values(), key=lambda item: (-item[1], item[2]))
+        return [(data, round(score / len(terms), 3)) for data, score, _ in ranked[:limit]]
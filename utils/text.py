@@ -0,0 +1,99 @@
+"""
+Нормализация текста для поиска и подсветка совпадений
+
+fold() приводит текст к нижнему регистру и убирает диакритику
+("Mājasdarbs" -> "majasdarbs"), сохраняя длину строки: i-й символ результата
+соответствует i-му символу исходника. Поэтому совпадения, найденные в
+свёрнутом тексте, можно подсветить в оригинале.
+"""
+import html
+import re
+import unicodedata
+from functools import lru_cache
+from markupsafe import Markup, escape
+
+
+TAG_RE = re.compile(r'<[^>]+>')
+TERM_RE = re.compile(r'[^\W_]+')
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char):
+    lower = char.lower()
+    base = ''.join(c for c in unicodedata.normalize('NFKD', lower) if not unicodedata.combining(c))
+    # Лигатуры и т.п. раскладываются в несколько символов — оставляем как есть
+    return base if len(base) == 1 else lower if len(lower) == 1 else char
+
+
+def fold(text):
+    """Нижний регистр без диакритики, той же длины, что и исходный текст"""
+    return ''.join(_fold_char(char) for char in text or '')
+
+
+def strip_tags(text):
+    """Текст из HTML (содержимое новостей)"""
+    return html.unescape(TAG_RE.sub(' ', text or ''))
+
+
+def search_terms(query, max_terms=8):
+    """Слова запроса в свёрнутом виде (без пунктуации и дублей)"""
+    terms = []
+    for term in TERM_RE.findall(fold(query)):
+        if term not in terms:
+            terms.append(term)
+    return terms[:max_terms]
+
+
+def _matches(text, terms):
+    """Интервалы слов, начинающихся с одного из terms"""
+    if not terms or not text:
+        return []
+    pattern = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, terms)) + r')\w*')
+    return [match.span() for match in pattern.finditer(fold(text))]
+
+
+def _mark(text, spans, start=0, end=None):
+    end = len(text) if end is None else end
+    parts, position = [], start
+    for span_start, span_end in spans:
+        if span_end <= start or span_start >= end:
+            continue
+        span_start, span_end = max(span_start, start), min(span_end, end)
+        parts.append(escape(text[position:span_start]))
+        parts.append(Markup('<mark>%s</mark>') % text[span_start:span_end])
+        position = span_end
+    parts.append(escape(text[position:end]))
+    return Markup('').join(parts)
+
+
+def highlight(text, terms):
+    """Весь текст с <mark> вокруг совпадений (HTML-безопасно)"""
+    text = text or ''
+    return _mark(text, _matches(text, terms))
+
+
+def snippet(text, terms, length=160):
+    """
+    Фрагмент текста вокруг первого совпадения с подсветкой
+
+    Без совпадений — начало текста.
+    """
+    text = ' '.join((text or '').split())
+    spans = _matches(text, terms)
+    if len(text) <= length:
+        return _mark(text, spans)
+
+    first = spans[0][0] if spans else 0
+    start = max(0, min(first - length // 3, len(text) - length))
+    # Не резать слово на границе фрагмента
+    if start:
+        space = text.find(' ', start)
+        start = space + 1 if 0 <= space < first else start
+    end = min(len(text), start + length)
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        end = space if space > start else end
+
+    prefix = '… ' if start else ''
+    suffix = ' …' if end < len(text) else ''
+    return Markup(prefix) + _mark(text, spans, start, end) + Markup(suffix)